@@ -0,0 +1,408 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""ASTExtractor for Coveron Instrumenter.
+   Walks a translation unit once with clang_visitChildren and stores
+   all facts needed by the parser inside a compact, array backed node table.
+"""
+
+import os
+import ctypes
+from array import array
+
+import clang.cindex
+
+from typing import Dict, Iterator, List
+
+
+# SECTION   ASTPosition class
+class ASTPosition:
+    """ASTPosition class.
+       Line and column of an extent boundary or a location
+    """
+
+    # SECTION   ASTPosition private attribute definitions
+    __slots__ = ['line', 'column']
+
+    line: int
+    column: int
+    # !SECTION
+
+    # SECTION   ASTPosition initialization
+    def __init__(self, line: int, column: int):
+        self.line = line
+        self.column = column
+        return
+    # !SECTION
+# !SECTION
+
+
+# SECTION   ASTExtent class
+class ASTExtent:
+    """ASTExtent class.
+       Start and end position of a node
+    """
+
+    # SECTION   ASTExtent private attribute definitions
+    __slots__ = ['start', 'end']
+
+    start: ASTPosition
+    end: ASTPosition
+    # !SECTION
+
+    # SECTION   ASTExtent initialization
+    def __init__(self, start: ASTPosition, end: ASTPosition):
+        self.start = start
+        self.end = end
+        return
+    # !SECTION
+# !SECTION
+
+
+# SECTION   ASTFile class
+class ASTFile:
+    """ASTFile class.
+       File of a location
+    """
+
+    # SECTION   ASTFile private attribute definitions
+    __slots__ = ['name']
+
+    name: str
+    # !SECTION
+
+    # SECTION   ASTFile initialization
+    def __init__(self, name: str):
+        self.name = name
+        return
+    # !SECTION
+# !SECTION
+
+
+# SECTION   ASTLocation class
+class ASTLocation(ASTPosition):
+    """ASTLocation class.
+       Location of a node (position with file)
+    """
+
+    # SECTION   ASTLocation private attribute definitions
+    __slots__ = ['file']
+
+    file: ASTFile
+    # !SECTION
+
+    # SECTION   ASTLocation initialization
+    def __init__(self, file: ASTFile, line: int, column: int):
+        super().__init__(line, column)
+        self.file = file
+        return
+    # !SECTION
+# !SECTION
+
+
+# SECTION   ASTNodeTable class
+class ASTNodeTable:
+    """ASTNodeTable class.
+       Stores the nodes of an AST in parallel arrays. Node 0 is the translation unit.
+       Children are linked by first child and next sibling indices (-1 = none).
+    """
+
+    # SECTION   ASTNodeTable private attribute definitions
+    __slots__ = ['kinds', 'parents', 'first_children', 'next_siblings',
+                 'start_lines', 'start_columns', 'end_lines', 'end_columns',
+                 'location_lines', 'location_columns', 'location_files',
+                 'files', 'display_names', '_cursors', '_extents', '_last_children']
+
+    kinds: array
+    parents: array
+    first_children: array
+    next_siblings: array
+    start_lines: array
+    start_columns: array
+    end_lines: array
+    end_columns: array
+    location_lines: array
+    location_columns: array
+    location_files: array
+    files: List[ASTFile]
+    display_names: Dict[int, str]
+    _cursors: Dict[int, clang.cindex.Cursor]
+    _extents: list
+    _last_children: array
+    # !SECTION
+
+    # SECTION   ASTNodeTable public attribute definitions
+    # !SECTION
+
+    # SECTION   ASTNodeTable initialization
+    def __init__(self):
+        self.kinds = array('i')
+        self.parents = array('i')
+        self.first_children = array('i')
+        self.next_siblings = array('i')
+        self.start_lines = array('i')
+        self.start_columns = array('i')
+        self.end_lines = array('i')
+        self.end_columns = array('i')
+        self.location_lines = array('i')
+        self.location_columns = array('i')
+        self.location_files = array('i')
+        self.files = list()
+        self.display_names = dict()
+        self._cursors = dict()
+        self._extents = list()
+        self._last_children = array('i')
+        return
+    # !SECTION
+
+    # SECTION   ASTNodeTable getter functions
+    # !SECTION
+
+    # SECTION   ASTNodeTable setter functions
+    # !SECTION
+
+    # SECTION   ASTNodeTable property definitions
+    # !SECTION
+
+    # SECTION   ASTNodeTable private functions
+    # !SECTION
+
+    # SECTION   ASTNodeTable public functions
+    def add_node(self, kind_id: int, parent_index: int, extent: tuple, location: tuple) -> int:
+        """Appends a node and links it to its parent. Returns the index of the new node"""
+        node_index = len(self.kinds)
+        self.kinds.append(kind_id)
+        self.parents.append(parent_index)
+        self.first_children.append(-1)
+        self.next_siblings.append(-1)
+        self._last_children.append(-1)
+        self._extents.append(None)
+        self.start_lines.append(extent[0])
+        self.start_columns.append(extent[1])
+        self.end_lines.append(extent[2])
+        self.end_columns.append(extent[3])
+        self.location_lines.append(location[0])
+        self.location_columns.append(location[1])
+        self.location_files.append(location[2])
+
+        if parent_index >= 0:
+            last_child_index = self._last_children[parent_index]
+            if last_child_index < 0:
+                self.first_children[parent_index] = node_index
+            else:
+                self.next_siblings[last_child_index] = node_index
+            self._last_children[parent_index] = node_index
+        return node_index
+
+    def keep_cursor(self, node_index: int, cursor: clang.cindex.Cursor):
+        """Keeps the cursor of a node, whose rarely used facts get resolved on demand"""
+        self._cursors[node_index] = cursor
+
+    def get_cursor(self, node_index: int) -> clang.cindex.Cursor:
+        return self._cursors[node_index]
+
+    def get_extent(self, node_index: int) -> ASTExtent:
+        """Returns the extent of a node. The parser reads extents many times, so they get created once"""
+        extent = self._extents[node_index]
+        if extent is None:
+            extent = ASTExtent(ASTPosition(self.start_lines[node_index], self.start_columns[node_index]),
+                               ASTPosition(self.end_lines[node_index], self.end_columns[node_index]))
+            self._extents[node_index] = extent
+        return extent
+
+    def get_root(self):
+        return ASTNode(self, 0)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+    # !SECTION
+# !SECTION
+
+
+# SECTION   ASTNode class
+class ASTNode:
+    """ASTNode class.
+       Light weight view on a node of an ASTNodeTable, which offers the
+       cursor attributes used by the parser
+    """
+
+    # SECTION   ASTNode private attribute definitions
+    __slots__ = ['_table', '_index']
+
+    _table: ASTNodeTable
+    _index: int
+    # !SECTION
+
+    # SECTION   ASTNode initialization
+    def __init__(self, table: ASTNodeTable, index: int):
+        self._table = table
+        self._index = index
+        return
+    # !SECTION
+
+    # SECTION   ASTNode getter functions
+    def _get_kind(self) -> clang.cindex.CursorKind:
+        return clang.cindex.CursorKind.from_id(self._table.kinds[self._index])
+
+    def _get_extent(self) -> ASTExtent:
+        return self._table.get_extent(self._index)
+
+    def _get_location(self) -> ASTLocation:
+        table = self._table
+        index = self._index
+        file_index = table.location_files[index]
+        return ASTLocation(table.files[file_index] if file_index >= 0 else None,
+                           table.location_lines[index], table.location_columns[index])
+
+    def _get_displayname(self) -> str:
+        return self._table.display_names.get(self._index, "")
+
+    def _get_binary_operator(self) -> clang.cindex.BinaryOperator:
+        return self._table.get_cursor(self._index).binary_operator
+    # !SECTION
+
+    # SECTION   ASTNode property definitions
+    kind: clang.cindex.CursorKind = property(fget=_get_kind,
+                                             doc="Kind of the node")
+    extent: ASTExtent = property(fget=_get_extent,
+                                 doc="Start and end position of the node")
+    location: ASTLocation = property(fget=_get_location,
+                                     doc="Location of the node (file is only resolved for top level nodes)")
+    displayname: str = property(fget=_get_displayname,
+                                doc="Display name of a function declaration")
+    binary_operator: clang.cindex.BinaryOperator = property(fget=_get_binary_operator,
+                                                            doc="Opcode of a binary operator node")
+    # !SECTION
+
+    # SECTION   ASTNode public functions
+    def get_children(self) -> Iterator:
+        """Returns an iterator over the child nodes"""
+        table = self._table
+        child_index = table.first_children[self._index]
+        while child_index >= 0:
+            yield ASTNode(table, child_index)
+            child_index = table.next_siblings[child_index]
+
+    def get_tokens(self):
+        """Returns the tokens of the node (resolved by libclang on demand)"""
+        return self._table.get_cursor(self._index).get_tokens()
+    # !SECTION
+# !SECTION
+
+
+# SECTION   ASTExtractor class
+class ASTExtractor:
+    """ASTExtractor class.
+       Converts a clang AST into an ASTNodeTable. Top level declarations outside
+       of the main file (headers) are skipped together with their children.
+    """
+
+    # SECTION   ASTExtractor private attribute definitions
+    __slots__ = ['main_file_name']
+
+    main_file_name: str
+    # !SECTION
+
+    # SECTION   ASTExtractor public attribute definitions
+    # cursors of these kinds are kept for facts, which are only resolved on demand
+    CURSOR_KINDS_KEPT = (clang.cindex.CursorKind.BINARY_OPERATOR.value,
+                         clang.cindex.CursorKind.FOR_STMT.value)
+    # !SECTION
+
+    # SECTION   ASTExtractor initialization
+    def __init__(self, main_file: str):
+        self.main_file_name = os.path.basename(main_file)
+        return
+    # !SECTION
+
+    # SECTION   ASTExtractor public functions
+    def extract(self, root_cursor: clang.cindex.Cursor) -> ASTNodeTable:
+        """Walks the AST below the given cursor once and returns the node table"""
+        lib = clang.cindex.conf.lib
+        get_cursor_extent = lib.clang_getCursorExtent
+        get_cursor_location = lib.clang_getCursorLocation
+        get_range_start = lib.clang_getRangeStart
+        get_range_end = lib.clang_getRangeEnd
+        get_instantiation_location = lib.clang_getInstantiationLocation
+
+        compound_statement_kind = clang.cindex.CursorKind.COMPOUND_STMT.value
+        function_decl_kind = clang.cindex.CursorKind.FUNCTION_DECL.value
+        cursor_kinds_kept = ASTExtractor.CURSOR_KINDS_KEPT
+        translation_unit = root_cursor._tu
+
+        # output buffers are reused for every location
+        line = ctypes.c_uint()
+        column = ctypes.c_uint()
+        file_pointer = clang.cindex.c_object_p()
+        line_ref = ctypes.byref(line)
+        column_ref = ctypes.byref(column)
+        file_pointer_ref = ctypes.byref(file_pointer)
+
+        def get_extent(cursor) -> tuple:
+            extent = get_cursor_extent(cursor)
+            get_instantiation_location(
+                get_range_start(extent), None, line_ref, column_ref, None)
+            start_line, start_column = line.value, column.value
+            get_instantiation_location(
+                get_range_end(extent), None, line_ref, column_ref, None)
+            return (start_line, start_column, line.value, column.value)
+
+        table = ASTNodeTable()
+        file_indices = dict()
+        root_extent = get_extent(root_cursor)
+        table.add_node(root_cursor._kind_id, -1,
+                       root_extent, (root_extent[0], root_extent[1], -1))
+
+        # the parent of a visited cursor is found by the raw bytes of the cursor struct
+        node_indices = {bytes(root_cursor): 0}
+
+        def visitor(cursor, parent, _):
+            parent_index = node_indices[bytes(parent)]
+            kind_id = cursor._kind_id
+            extent = get_extent(cursor)
+
+            if parent_index == 0:
+                # top level declaration: resolve the file and skip everything outside of the main file
+                get_instantiation_location(get_cursor_location(cursor), file_pointer_ref,
+                                           line_ref, column_ref, None)
+                if not file_pointer:
+                    return 1  # continue with next sibling
+                file_name = clang.cindex.conf.lib.clang_getFileName(
+                    clang.cindex.File(file_pointer))
+                if file_name.replace('\\', '/').split('/')[-1] != self.main_file_name:
+                    return 1  # continue with next sibling
+                if file_name not in file_indices:
+                    file_indices[file_name] = len(table.files)
+                    table.files.append(ASTFile(file_name))
+                location = (line.value, column.value, file_indices[file_name])
+            elif kind_id == compound_statement_kind:
+                get_instantiation_location(get_cursor_location(cursor), None,
+                                           line_ref, column_ref, None)
+                location = (line.value, column.value, -1)
+            else:
+                # the location of other nodes isn't used, so the extent start is stored
+                location = (extent[0], extent[1], -1)
+
+            node_index = table.add_node(
+                kind_id, parent_index, extent, location)
+            node_indices[bytes(cursor)] = node_index
+
+            if kind_id == function_decl_kind:
+                table.display_names[node_index] = cursor.displayname
+            elif kind_id in cursor_kinds_kept:
+                cursor_copy = clang.cindex.Cursor.from_buffer_copy(cursor)
+                cursor_copy._tu = translation_unit
+                table.keep_cursor(node_index, cursor_copy)
+            return 2  # recurse into children
+
+        lib.clang_visitChildren(root_cursor,
+                                clang.cindex.callbacks['cursor_visit'](visitor), None)
+        return table
+    # !SECTION
+# !SECTION
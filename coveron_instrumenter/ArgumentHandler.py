@@ -11,13 +11,18 @@
    Parses the arguments given via command-line options.
 """
 
-from Configuration import SourceFile, Configuration
+from Configuration import SourceFile, Configuration, RuntimeMode, CIDFormat
+from DaemonClient import DaemonClient
+from ProbeCache import ProbeCache
 
 import argparse
 from itertools import islice
 
 import os
+import re
+import shlex
 import subprocess
+from typing import List
 
 
 # SECTION   ArgumentHandler class
@@ -27,30 +32,53 @@ class ArgumentHandler:
     """
 
     # SECTION   ArgumentHandler private attribute definitions
-    __slots__ = ['_config', '_argparser', '_args', '_other_args']
+    __slots__ = ['_config', '_argv', '_cwd', '_probe_compiler', '_argparser', '_args', '_other_args']
 
     _config: Configuration
+    _argv: List[str]
+    _cwd: str
+    _probe_compiler: bool
     # !SECTION
 
     # SECTION   ArgumentHandler public attribute definitions
+    # the shared CRI file gets passed to the compiler as string define (no spaces or quotes)
+    SHARED_CRI_FILE_PATTERN = r"/?[\w.\-]+(/[\w.\-]+)*"
+    # clang arguments followed by a path (attached or as next argument).
+    # Longer options come first, so their prefixes don't match
+    CLANG_PATH_ARGS = ("-isystem", "-iquote", "-idirafter", "-include", "-imacros",
+                       "-isysroot", "-iframework", "--sysroot", "-I", "-F")
     # !SECTION
 
     # SECTION   ArgumentHandler initialization
-    def __init__(self, config: Configuration):
+    def __init__(self, config: Configuration, argv: List[str] = None, probe_compiler: bool = True,
+                 cwd: str = None):
         # Load configuration
         if config is not None and isinstance(config, Configuration):
             self._config = config
         else:
             raise(RuntimeError("config is None or of bad type!"))
 
+        # use the command line arguments of this process, if no argument list was passed
+        # (the instrumentation daemon passes the arguments of its clients)
+        self._argv = argv
+
+        # relative paths get resolved against the working directory of the wrapper call
+        # (the instrumentation daemon passes the one of its clients)
+        self._cwd = cwd if cwd is not None else os.getcwd()
+
+        # the compiler probes are only needed for parsing. Daemon clients just build the compiler call
+        self._probe_compiler = probe_compiler
+
         # Configure argparser
         self._argparse_config()
 
         # Parse Coveron arguments
         self._parse_args()
 
-        # Parse all other arguments (including clang parsing args)
-        self._parse_other_args()
+        # Parse all other arguments (including clang parsing args).
+        # Not needed in daemon mode, since the daemon gets the arguments from its clients
+        if not self._config.serve:
+            self._parse_other_args()
     # !SECTION
 
     # SECTION   ArgumentHandler getter functions
@@ -73,7 +101,7 @@ class ArgumentHandler:
 
         self._argparser.add_argument('--CVR_COMPILER_EXEC',
                                      dest='compiler_exec',
-                                     type=str, required=True,
+                                     type=str, default=None,
                                      help='Path to executable of the compiler')
 
         self._argparser.add_argument('--CVR_NO_CHECKPOINT',
@@ -86,6 +114,54 @@ class ArgumentHandler:
                                      const=False, default=True,
                                      help='Disable evaluation markers')
 
+        self._argparser.add_argument('--CVR_RUNTIME_MODE',
+                                     dest='runtime_mode', type=str, default=RuntimeMode.TRACE.value,
+                                     choices=[runtime_mode.value for runtime_mode in RuntimeMode],
+                                     help='Record every marker hit in the CRI file (trace), count the hits (counter), only record, if a marker was hit (bitmap) or record one condition vector per decision (mcdc). Counter and bitmap get written once at exit')
+
+        self._argparser.add_argument('--CVR_MCDC_DEDUPE',
+                                     dest='mcdc_dedupe', action='store_const',
+                                     const=True, default=False,
+                                     help='Write every unique condition vector only once per execution (only in mcdc runtime mode)')
+
+        self._argparser.add_argument('--CVR_WRITE_BUFFER_SIZE',
+                                     dest='write_buffer_size', type=int, default=64,
+                                     help='Size of the runtime write buffer of every instrumented file in KiB (0 writes every record directly). Can be overridden at runtime with the COVERON_WRITE_BUFFER_SIZE environment variable (in bytes)')
+
+        self._argparser.add_argument('--CVR_THREAD_SAFE',
+                                     dest='thread_safe', action='store_const',
+                                     const=True, default=False,
+                                     help='Use the thread safe runtime (once-only file setup, per-thread record buffers, atomic counters and bitmaps). Needs pthreads')
+
+        self._argparser.add_argument('--CVR_SHARED_CRI',
+                                     dest='shared_cri_file', type=str, default="",
+                                     help='Write the runtime information of all instrumented files of a process into one shared CRI file (path relative to the working directory of the program). Can be overridden at runtime with the COVERON_SHARED_CRI_FILE environment variable')
+
+        self._argparser.add_argument('--CVR_MMAP_TABLES',
+                                     dest='mmap_tables', action='store_const',
+                                     const=True, default=False,
+                                     help='Keep the counters or the bitmap in a memory mapped CRI file, which all processes of the program add into. Survives crashes without flushing (only in counter and bitmap runtime mode)')
+
+        self._argparser.add_argument('--CVR_PER_PROCESS_CRI',
+                                     dest='per_process_cri', action='store_const',
+                                     const=True, default=False,
+                                     help='Let every process write its own CRI files named <name>.<pid>.<time>.<sequence>.cri, so concurrent processes never share a file. Combine them with "coveron_instrumenter merge"')
+
+        self._argparser.add_argument('--CVR_TRACE_RLE',
+                                     dest='trace_rle', action='store_const',
+                                     const=True, default=False,
+                                     help='Fold repeats of the same record inside the write buffer into one repeat record (CRI version 2). Shrinks the traces of loops (only in trace and mcdc runtime mode)')
+
+        self._argparser.add_argument('--CVR_VARINT_RECORDS',
+                                     dest='varint_records', action='store_const',
+                                     const=True, default=False,
+                                     help='Write marker records as LEB128 varints of the marker id with the outcome in the low bit (CRI version 3). Most records take 1 or 2 bytes instead of 5 (only in trace and mcdc runtime mode)')
+
+        self._argparser.add_argument('--CVR_FIRST_HIT',
+                                     dest='first_hit', action='store_const',
+                                     const=True, default=False,
+                                     help='Record every checkpoint marker only on its first hit per execution (statement coverage without hit order). Later hits only test a static flag (only in trace and mcdc runtime mode)')
+
         self._argparser.add_argument('--CVR_VERBOSE',
                                      dest='verbose', action='store_const',
                                      const=True, default=False,
@@ -106,22 +182,112 @@ class ArgumentHandler:
                                      const=True, default=False,
                                      help='Disable GZIP-compression of CID-data. Only useful, if you want to analyze the contents of the CID file.')
 
+        self._argparser.add_argument('--CVR_CID_FORMAT',
+                                     dest='cid_format', type=str, default=CIDFormat.JSON.value,
+                                     choices=[cid_format.value for cid_format in CIDFormat],
+                                     help='Write the CID files as JSON document (json) or as uncompressed fixed width columns with a string table (binary). Convert between both with "coveron_instrumenter convert"')
+
+        self._argparser.add_argument('--CVR_CID_COMPRESSION_LEVEL',
+                                     dest='cid_compression_level', type=int,
+                                     default=Configuration.DEFAULT_CID_COMPRESSION_LEVEL,
+                                     help='GZIP compression level of JSON CID files from 1 (fastest) to 9 (smallest, default)')
+
+        self._argparser.add_argument('--CVR_JOBS',
+                                     dest='jobs', type=int, default=1,
+                                     help='Number of worker processes used for the instrumentation of multiple source files (0 = number of CPU cores)')
+
+        self._argparser.add_argument('--CVR_PIPELINE',
+                                     dest='pipeline', action='store_const',
+                                     const=True, default=False,
+                                     help='Compile every instrumented file to an object as soon as it is written and link all objects at the end')
+
+        self._argparser.add_argument('--CVR_COMPILE_JOBS',
+                                     dest='compile_jobs', type=int, default=0,
+                                     help='Number of parallel compiler processes in pipeline mode (0 = number of CPU cores)')
+
+        self._argparser.add_argument('--CVR_CACHE_DIR',
+                                     dest='cache_dir', default=None,
+                                     help='Directory for cached compiler probes (default: user cache directory)')
+
+        self._argparser.add_argument('--CVR_INSTR_CACHE',
+                                     dest='instr_cache', action='store_const',
+                                     const=True, default=False,
+                                     help='Store instrumented files and CIDs in a content addressed cache inside the cache directory')
+
+        self._argparser.add_argument('--CVR_INSTR_CACHE_SIZE',
+                                     dest='instr_cache_size', type=int, default=1024,
+                                     help='Maximum size of the instrumentation cache in MiB (default: 1024)')
+
+        self._argparser.add_argument('--CVR_SERVE',
+                                     dest='serve', action='store_const',
+                                     const=True, default=False,
+                                     help='Run as instrumentation daemon, which keeps libclang loaded between compiler calls')
+
+        self._argparser.add_argument('--CVR_DAEMON',
+                                     dest='daemon', action='store_const',
+                                     const=True, default=False,
+                                     help='Forward the instrumentation to a running instrumentation daemon')
+
+        self._argparser.add_argument('--CVR_DAEMON_SOCKET',
+                                     dest='daemon_socket_path', type=str,
+                                     default=DaemonClient.get_default_socket_path(),
+                                     help='Path of the local socket used by the instrumentation daemon')
+
         # parse and save known args to _args. Everything else to _other_args
-        self._args, self._other_args = self._argparser.parse_known_args()
+        self._args, self._other_args = self._argparser.parse_known_args(
+            self._argv)
+
+        # the compiler executable is only optional in daemon mode
+        if self._args.compiler_exec is None and not self._args.serve:
+            self._argparser.error(
+                "the following arguments are required: --CVR_COMPILER_EXEC")
 
     def _parse_args(self):
         # set verbose mode
         self._config.verbose = self._args.verbose
 
+        # set daemon mode and socket path
+        self._config.serve = self._args.serve
+        self._config.daemon_socket_path = self._args.daemon_socket_path
+
         # set force flag
         self._config.force = self._args.force
 
         # set CID nocomp flag
         self._config.nocomp_cid = self._args.nocomp_cid
 
+        # set CID format and compression level
+        self._config.cid_format = CIDFormat(self._args.cid_format)
+        if not 1 <= self._args.cid_compression_level <= 9:
+            raise(RuntimeError("--CVR_CID_COMPRESSION_LEVEL has to be between 1 and 9!"))
+        self._config.cid_compression_level = self._args.cid_compression_level
+
         # set compiler executable
         self._config.compiler_exec = self._args.compiler_exec
 
+        # set number of instrumentation jobs (0 means one job per CPU core)
+        if self._args.jobs < 0:
+            raise(RuntimeError("--CVR_JOBS can't be negative!"))
+        self._config.jobs = self._args.jobs if self._args.jobs > 0 else (
+            os.cpu_count() or 1)
+
+        # set pipeline mode and number of parallel compiler processes
+        if self._args.compile_jobs < 0:
+            raise(RuntimeError("--CVR_COMPILE_JOBS can't be negative!"))
+        self._config.pipeline = self._args.pipeline
+        self._config.compile_jobs = self._args.compile_jobs if self._args.compile_jobs > 0 else (
+            os.cpu_count() or 1)
+
+        # set cache directory
+        self._config.cache_dir = self._resolve_path(self._args.cache_dir) if self._args.cache_dir is not None else (
+            ProbeCache.get_default_cache_dir())
+
+        # set instrumentation cache switch and size limit
+        if self._args.instr_cache_size < 0:
+            raise(RuntimeError("--CVR_INSTR_CACHE_SIZE can't be negative!"))
+        self._config.instr_cache = self._args.instr_cache
+        self._config.instr_cache_size = self._args.instr_cache_size * 1024 * 1024
+
         # set poll ppd flag
         self._config.poll_ppd = self._args.poll_ppd
 
@@ -129,7 +295,73 @@ class ArgumentHandler:
         self._config.checkpoint_markers_enabled = self._args.checkpoint_markers_enabled
         self._config.evaluation_markers_enabled = self._args.evaluation_markers_enabled
 
+        # set runtime mode
+        self._config.runtime_mode = RuntimeMode(self._args.runtime_mode)
+        self._config.mcdc_dedupe = self._args.mcdc_dedupe
+
+        # set runtime write buffer size
+        if self._args.write_buffer_size < 0:
+            raise(RuntimeError("--CVR_WRITE_BUFFER_SIZE can't be negative!"))
+        self._config.write_buffer_size = self._args.write_buffer_size * 1024
+        self._config.thread_safe = self._args.thread_safe
+
+        # set shared CRI file
+        if self._args.shared_cri_file and \
+                re.fullmatch(ArgumentHandler.SHARED_CRI_FILE_PATTERN, self._args.shared_cri_file) is None:
+            raise(RuntimeError("--CVR_SHARED_CRI may only contain letters, digits, '_', '-', '.' and single '/'!"))
+        self._config.shared_cri_file = self._args.shared_cri_file
+
+        # set memory mapped tables
+        if self._args.mmap_tables:
+            if self._config.runtime_mode not in (RuntimeMode.COUNTER, RuntimeMode.BITMAP):
+                raise(RuntimeError("--CVR_MMAP_TABLES needs the counter or bitmap runtime mode!"))
+            if self._config.shared_cri_file:
+                raise(RuntimeError("--CVR_MMAP_TABLES can't be used with --CVR_SHARED_CRI!"))
+        self._config.mmap_tables = self._args.mmap_tables
+
+        # set per-process CRI files
+        if self._args.per_process_cri and self._config.mmap_tables:
+            raise(RuntimeError("--CVR_PER_PROCESS_CRI can't be used with --CVR_MMAP_TABLES!"))
+        self._config.per_process_cri = self._args.per_process_cri
+
+        # set run-length encoding of the trace
+        if self._args.trace_rle:
+            if self._config.runtime_mode not in (RuntimeMode.TRACE, RuntimeMode.MCDC):
+                raise(RuntimeError("--CVR_TRACE_RLE needs the trace or mcdc runtime mode!"))
+            if self._config.write_buffer_size == 0:
+                raise(RuntimeError("--CVR_TRACE_RLE needs a write buffer!"))
+        self._config.trace_rle = self._args.trace_rle
+
+        # set varint marker records
+        if self._args.varint_records and \
+                self._config.runtime_mode not in (RuntimeMode.TRACE, RuntimeMode.MCDC):
+            raise(RuntimeError("--CVR_VARINT_RECORDS needs the trace or mcdc runtime mode!"))
+        self._config.varint_records = self._args.varint_records
+
+        # set first hit checkpoints
+        if self._args.first_hit and \
+                self._config.runtime_mode not in (RuntimeMode.TRACE, RuntimeMode.MCDC):
+            raise(RuntimeError("--CVR_FIRST_HIT needs the trace or mcdc runtime mode!"))
+        self._config.first_hit = self._args.first_hit
+
+    def _resolve_path(self, path: str) -> str:
+        return os.path.abspath(os.path.join(self._cwd, path))
+
+    def _resolve_clang_arg(self, arg: str, previous_arg: str) -> str:
+        """Makes the path of an include argument absolute, since libclang resolves it against its own directory"""
+        if previous_arg in ArgumentHandler.CLANG_PATH_ARGS and not arg.startswith('-'):
+            return self._resolve_path(arg)
+        for path_arg in ArgumentHandler.CLANG_PATH_ARGS:
+            if arg.startswith(path_arg) and len(arg) > len(path_arg):
+                path = arg[len(path_arg):]
+                separator = "=" if path.startswith("=") else ""
+                return path_arg + separator + self._resolve_path(path[len(separator):])
+        return arg
+
     def _parse_other_args(self):
+        # the output directory defaults to the working directory of the wrapper call
+        self._config.output_abs_path = self._cwd
+
         # first copy all args to compiler_args in config
         # self._config.compiler_args = ' '.join(self._other_args)
         # create empty list for compiler pass thru args
@@ -138,6 +370,9 @@ class ArgumentHandler:
         # create empty list for clang parsing args
         clang_args_list = []
 
+        # create empty list for output args (kept apart, so single files can be compiled to objects)
+        compiler_output_args_list = []
+
         # Run through all arguments in order to find source file and
         # relevant arguments for parsing.
         #
@@ -154,68 +389,58 @@ class ArgumentHandler:
             # check, if it's a source file
             if (not arg.startswith('-')) and (argl.endswith('.c')
                                               or argl.endswith('.cpp') or argl.endswith('.c++')):
-                self._config.source_files.append(SourceFile(arg))
+                self._config.source_files.append(SourceFile(self._resolve_path(arg)))
                 continue
             elif (argl == "-c"):
                 self._config.source_files.append(
-                    SourceFile(self._other_args[index + 1]))
+                    SourceFile(self._resolve_path(self._other_args[index + 1])))
                 next(islice(arg_iterator, 1, 1), None)
                 continue
 
             # check, if it's a output argument. If yes, set the output path for CID and CRI files
             # in config by getting directory.
-            elif (argl == "--output" or argl == "-o"):
-                compiler_args_list.append(
+            # (case sensitive, since "-O2" is an optimization level and no output argument)
+            elif (arg == "--output" or arg == "-o"):
+                compiler_output_args_list.append(
                     ' '.join([arg, self._other_args[index + 1]]))
                 next(islice(arg_iterator, 1, 1), None)
 
                 # we can use this to set the new output directory
                 # (single arg output args get checked below)
                 self._config.output_abs_path = os.path.dirname(
-                    os.path.abspath(self._other_args[index + 1]))
+                    self._resolve_path(self._other_args[index + 1]))
                 continue
-            elif (argl.startswith("-o")):
+            elif (arg.startswith("-o")):
+                compiler_output_args_list.append(arg)
                 self._config.output_abs_path = os.path.dirname(
-                    os.path.abspath(arg[2:]))
+                    self._resolve_path(arg[2:]))
                 continue
-            elif (argl.startswith("--output=")):
+            elif (arg.startswith("--output=")):
+                compiler_output_args_list.append(arg)
                 self._config.output_abs_path = os.path.dirname(
-                    os.path.abspath(arg[9:]))
+                    self._resolve_path(arg[9:]))
                 continue
             else:
                 compiler_args_list.append(arg)
-                clang_args_list.append(arg)
-
-        # if user checked poll_ppd, we should do that right now
-        if self._args.poll_ppd:
-            # user wants us to poll the compiler
-            # so execute the compiler with additional "-dM -E" and use the outputs
-            poll_command_string = self._args.compiler_exec + \
-                " -x c nul -dM -E"
-            poll_process = subprocess.run(
-                poll_command_string, stdout=subprocess.PIPE)
-            poll_output = poll_process.stdout.decode('utf-8').splitlines()
-
-            # replace "#define " with "-D", set following data in quotation marks and replace the first space with equal sign
-            for argument in poll_output:
-                argument = "-D\"" + argument[8:].replace(" ", "=", 1) + "\""
-
-            # append definitions to clang parsing args
-            clang_args_list.extend(poll_output)
-
-        # fetch default isystem paths from target compiler
-        isystem_fetch_command_string = self._args.compiler_exec + \
-            " -xc -E -v nul"
-        isystem_fetch_process = subprocess.run(
-            isystem_fetch_command_string, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        isystem_fetch_output = isystem_fetch_process.stderr.decode(
-            'utf-8').splitlines()
-
-        start_index = isystem_fetch_output.index(
-            "#include <...> search starts here:") + 1
-        end_index = isystem_fetch_output.index("End of search list.")
-        for isystem_path in isystem_fetch_output[start_index:end_index]:
-            clang_args_list.append("-isystem " + isystem_path.strip())
+                clang_args_list.append(self._resolve_clang_arg(
+                    arg, self._other_args[index - 1] if index > 0 else ""))
+
+        # probe the target compiler for its default include paths and (if requested) its predefined macros.
+        # The results are cached, so repeated wrapper calls don't spawn the compiler again
+        if self._probe_compiler:
+            probe_cache = ProbeCache(self._config.cache_dir)
+            relevant_flags = ProbeCache.get_relevant_flags(compiler_args_list)
+
+            # if user checked poll_ppd, we should do that right now
+            if self._args.poll_ppd:
+                clang_args_list.extend(probe_cache.get_probe(
+                    self._args.compiler_exec, relevant_flags, "predefined_macros",
+                    lambda: self._probe_predefined_macros(relevant_flags)))
+
+            # fetch default isystem paths from target compiler
+            clang_args_list.extend(probe_cache.get_probe(
+                self._args.compiler_exec, relevant_flags, "isystem_paths",
+                lambda: self._probe_isystem_paths(relevant_flags)))
 
         # write clang args list to config
         self._config.clang_args = ' '.join(
@@ -223,6 +448,43 @@ class ArgumentHandler:
 
         # write compile pass thru args list to config
         self._config.compiler_args = ' '.join(compiler_args_list)
+
+        # write output args list to config
+        self._config.compiler_output_args = ' '.join(
+            compiler_output_args_list)
+    # !SECTION
+
+    def _probe_predefined_macros(self, relevant_flags: List[str]) -> List[str]:
+        """Polls the predefined macros of the target compiler and returns them as defines for clang"""
+        # execute the compiler with additional "-dM -E" and use the outputs
+        poll_process = subprocess.run(
+            shlex.split(self._args.compiler_exec) + relevant_flags +
+            ["-x", "c", os.devnull, "-dM", "-E"],
+            stdout=subprocess.PIPE, cwd=self._cwd)
+        poll_output = poll_process.stdout.decode('utf-8').splitlines()
+
+        # replace "#define " with "-D", set following data in quotation marks and replace the first space with equal sign
+        return ["-D\"" + argument[8:].replace(" ", "=", 1) + "\""
+                for argument in poll_output if argument.startswith("#define ")]
+
+    def _probe_isystem_paths(self, relevant_flags: List[str]) -> List[str]:
+        """Fetches the default isystem paths of the target compiler and returns them as args for clang"""
+        isystem_fetch_process = subprocess.run(
+            shlex.split(self._args.compiler_exec) + relevant_flags +
+            ["-xc", "-E", "-v", os.devnull],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=self._cwd)
+        isystem_fetch_output = isystem_fetch_process.stderr.decode(
+            'utf-8').splitlines()
+
+        try:
+            start_index = isystem_fetch_output.index(
+                "#include <...> search starts here:") + 1
+            end_index = isystem_fetch_output.index("End of search list.")
+        except ValueError:
+            raise(RuntimeError("Include paths of " +
+                               self._args.compiler_exec + " couldn't be determined!"))
+        return ["-isystem " + isystem_path.strip()
+                for isystem_path in isystem_fetch_output[start_index:end_index]]
     # !SECTION
 
     # SECTION   ArgumentHandler public functions
@@ -0,0 +1,615 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""BinaryCID for Coveron Instrumenter.
+   Writes and reads "Coveron Instrumentation Data" in the binary columnar format.
+"""
+
+import io
+import sys
+import json
+import array
+import struct
+from typing import BinaryIO, Dict, List, Tuple
+
+from DataTypes import CustomJSONEncoder
+
+
+# SECTION   BinaryCIDLayout class
+class BinaryCIDLayout:
+    """BinaryCIDLayout class.
+       Describes the tables and columns of a binary CID. Every list of objects of the CID
+       schema is a table with one fixed width column per field
+    """
+
+    # SECTION   BinaryCIDLayout public attribute definitions
+    MAGIC_NUMBER = b"IMACIDB!"
+    VERSION = 1
+    # magic number, version and length of the meta data (little endian)
+    HEADER_FORMAT = "<8sII"
+    HEADER_LENGTH = 16
+    # every column starts at a multiple of 8 bytes
+    ALIGNMENT = 8
+
+    # value, which marks null (None) inside a column of the type code
+    NULL_VALUES = {"q": -2 ** 63, "i": -2 ** 31, "b": -2 ** 7}
+    MAX_VALUES = {"q": 2 ** 63 - 1, "i": 2 ** 31 - 1, "b": 2 ** 7 - 1}
+
+    # field kinds and their columns. Fields with the name of a table as kind store a list
+    # of rows of that table as start and count column
+    INT = "int"  # one 'q' column
+    KIND = "kind"  # one 'b' column (enum values)
+    BOOL = "bool"  # one 'b' column
+    STRING = "string"  # one 'q' column with the index inside the string table
+    POSITION = "position"  # 'i' columns for line and column
+    SECTION = "section"  # 'i' columns for start line, start column, end line and end column
+    INT_LIST = "int_list"  # start and count column into a 'q' column with the values of all lists
+    SUB_FIELDS = {POSITION: ("line", "column"),
+                  SECTION: ("start_line", "start_column", "end_line", "end_column")}
+
+    TABLES = {
+        "checkpoint_markers": (("checkpoint_marker_id", INT), ("code_position", POSITION)),
+        "evaluation_markers": (("evaluation_marker_id", INT), ("evaluation_type", KIND),
+                               ("code_section", SECTION)),
+        "classes": (("class_id", INT), ("class_name", STRING)),
+        "functions": (("function_id", INT), ("function_name", STRING), ("function_type", KIND),
+                      ("parent_function_id", INT), ("checkpoint_marker_id", INT),
+                      ("header_code_section", SECTION), ("inner_code_section", SECTION)),
+        "statements": (("statement_id", INT), ("statement_type", KIND), ("function_id", INT),
+                       ("checkpoint_marker_id", INT), ("code_section", SECTION)),
+        "if_branches": (("if_branch_id", INT), ("function_id", INT),
+                        ("branch_results", "branch_results")),
+        "branch_results": (("evaluation_marker_id", INT),
+                           ("condition_possibilities", "condition_possibilities"),
+                           ("conditions", "conditions"),
+                           ("result_evaluation_code_section", SECTION),
+                           ("result_body_code_section", SECTION)),
+        "switch_branches": (("switch_branch_id", INT), ("function_id", INT),
+                            ("switch_branch_code_section", SECTION), ("cases", "cases")),
+        "cases": (("checkpoint_marker_id", INT), ("case_type", KIND),
+                  ("evaluation_code_section", SECTION), ("body_code_section", SECTION)),
+        "ternary_expressions": (("ternary_expression_id", INT), ("function_id", INT),
+                                ("evaluation_marker_id", INT), ("evaluation_code_section", SECTION),
+                                ("condition_possibilities", "condition_possibilities"),
+                                ("conditions", "conditions"),
+                                ("true_code_section", SECTION), ("false_code_section", SECTION)),
+        "loops": (("loop_id", INT), ("loop_type", KIND), ("function_id", INT),
+                  ("evaluation_marker_id", INT), ("evaluation_code_section", SECTION),
+                  ("body_code_section", SECTION),
+                  ("condition_possibilities", "condition_possibilities"),
+                  ("conditions", "conditions")),
+        "condition_possibilities": (("decision_result", BOOL),
+                                    ("condition_combination", "condition_results")),
+        "condition_results": (("evaluation_marker_id", INT), ("condition_result", BOOL)),
+        "conditions": (("evaluation_marker_id", INT), ("code_section", SECTION)),
+        "counter_indices": (("marker_id", INT), ("counter_index", INT)),
+        "mcdc_data": (("decision_marker_id", INT), ("condition_marker_ids", INT_LIST)),
+    }
+
+    # tables get referenced by their index inside this tuple
+    TABLE_NAMES = tuple(TABLES)
+
+    # tables holding the lists at these paths of the CID document
+    ROOT_TABLES = {
+        ("marker_data", "checkpoint_markers"): "checkpoint_markers",
+        ("marker_data", "evaluation_markers"): "evaluation_markers",
+        ("code_data", "classes"): "classes",
+        ("code_data", "functions"): "functions",
+        ("code_data", "statements"): "statements",
+        ("code_data", "if_branches"): "if_branches",
+        ("code_data", "switch_branches"): "switch_branches",
+        ("code_data", "ternary_expressions"): "ternary_expressions",
+        ("code_data", "loops"): "loops",
+        ("counter_data", "counter_indices"): "counter_indices",
+        ("mcdc_data",): "mcdc_data",
+    }
+    # the source code is stored inside the string table
+    SOURCE_CODE_PATH = ("source_code_base64",)
+
+    # values, which don't fit into the columns of their field (or keys unknown to the table),
+    # are stored as JSON text in these columns and replace the field on decoding
+    OVERRIDE_COLUMNS = (("overrides.table", "b"), ("overrides.row", "q"),
+                        ("overrides.key", "q"), ("overrides.value", "q"))
+    # !SECTION
+
+    # SECTION   BinaryCIDLayout public functions
+    @staticmethod
+    def get_columns(table_name: str) -> List[Tuple[str, str]]:
+        """Returns name and type code of every column of a table"""
+        columns = list()
+        for key, kind in BinaryCIDLayout.TABLES[table_name]:
+            name = table_name + "." + key
+            if kind in (BinaryCIDLayout.INT, BinaryCIDLayout.STRING):
+                columns.append((name, "q"))
+            elif kind in (BinaryCIDLayout.KIND, BinaryCIDLayout.BOOL):
+                columns.append((name, "b"))
+            elif kind in BinaryCIDLayout.SUB_FIELDS:
+                columns.extend((name + "." + sub_field, "i")
+                               for sub_field in BinaryCIDLayout.SUB_FIELDS[kind])
+            else:
+                columns.extend(((name + ".start", "q"), (name + ".count", "q")))
+                if kind == BinaryCIDLayout.INT_LIST:
+                    columns.append((name + ".values", "q"))
+        return columns
+    # !SECTION
+# !SECTION
+
+
+# SECTION   BinaryCIDEncoder class
+class BinaryCIDEncoder:
+    """BinaryCIDEncoder class.
+       Encodes CIDData (or a decoded JSON CID) into a binary CID
+    """
+
+    # SECTION   BinaryCIDEncoder private attribute definitions
+    __slots__ = ["_columns", "_fields", "_row_counts", "_strings", "_string_indices",
+                 "_root_tables", "_source_code_string"]
+
+    _columns: Dict[str, array.array]
+    # key, kind and columns of every field by table
+    _fields: Dict[str, List[Tuple[str, str, Tuple[array.array, ...]]]]
+    _row_counts: Dict[str, int]
+    _strings: List[bytes]
+    _string_indices: Dict[str, int]
+    _root_tables: List[List[str]]
+    _source_code_string: int
+    # !SECTION
+
+    # SECTION   BinaryCIDEncoder initialization
+    def __init__(self):
+        self._columns = dict()
+        self._fields = dict()
+        self._row_counts = dict()
+        for table_name in BinaryCIDLayout.TABLES:
+            self._row_counts[table_name] = 0
+            for name, typecode in BinaryCIDLayout.get_columns(table_name):
+                self._columns[name] = array.array(typecode)
+            self._fields[table_name] = [
+                (key, kind, tuple(column for name, column in self._columns.items()
+                                  if name.startswith(table_name + "." + key + ".") or
+                                  name == table_name + "." + key))
+                for key, kind in BinaryCIDLayout.TABLES[table_name]]
+        for name, typecode in BinaryCIDLayout.OVERRIDE_COLUMNS:
+            self._columns[name] = array.array(typecode)
+        self._strings = list()
+        self._string_indices = dict()
+        self._root_tables = list()
+        self._source_code_string = None
+        return
+    # !SECTION
+
+    # SECTION   BinaryCIDEncoder private functions
+    @staticmethod
+    def _as_dict(value: object) -> object:
+        return value.as_json() if hasattr(value, 'as_json') else value
+
+    @staticmethod
+    def _fits(value: object, typecode: str) -> bool:
+        return (isinstance(value, int) and not isinstance(value, bool) and
+                BinaryCIDLayout.NULL_VALUES[typecode] < value <= BinaryCIDLayout.MAX_VALUES[typecode])
+
+    @staticmethod
+    def _is_table(value: object) -> bool:
+        return isinstance(value, list) and all(isinstance(row, dict) or hasattr(row, 'as_json')
+                                               for row in value)
+
+    def _add_string(self, string: str) -> int:
+        string_index = self._string_indices.get(string)
+        if string_index is None:
+            string_index = len(self._strings)
+            self._string_indices[string] = string_index
+            self._strings.append(string.encode('utf-8'))
+        return string_index
+
+    def _add_field(self, kind: str, columns: Tuple[array.array, ...], value: object) -> bool:
+        """Appends the value to the columns of the field. Returns False (and appends placeholders),
+           if the value doesn't fit into the columns
+        """
+        if kind in (BinaryCIDLayout.INT, BinaryCIDLayout.KIND):
+            typecode = columns[0].typecode
+            fits = value is None or BinaryCIDEncoder._fits(value, typecode)
+            columns[0].append(int(value) if fits and value is not None
+                              else BinaryCIDLayout.NULL_VALUES[typecode])
+            return fits
+        if kind == BinaryCIDLayout.BOOL:
+            fits = value is None or isinstance(value, bool)
+            columns[0].append(int(value) if fits and value is not None
+                              else BinaryCIDLayout.NULL_VALUES["b"])
+            return fits
+        if kind == BinaryCIDLayout.STRING:
+            fits = value is None or isinstance(value, str)
+            columns[0].append(self._add_string(value) if fits and value is not None
+                              else BinaryCIDLayout.NULL_VALUES["q"])
+            return fits
+        if kind in BinaryCIDLayout.SUB_FIELDS:
+            sub_fields = BinaryCIDLayout.SUB_FIELDS[kind]
+            value = BinaryCIDEncoder._as_dict(value)
+            fits = (isinstance(value, dict) and tuple(value) == sub_fields and
+                    all(BinaryCIDEncoder._fits(value[sub_field], "i") for sub_field in sub_fields))
+            for column, sub_field in zip(columns, sub_fields):
+                column.append(value[sub_field] if fits else BinaryCIDLayout.NULL_VALUES["i"])
+            return fits
+
+        # lists of integers or rows of another table
+        if kind == BinaryCIDLayout.INT_LIST:
+            start_column, count_column, values = columns
+            fits = isinstance(value, list) and all(BinaryCIDEncoder._fits(item, "q")
+                                                   for item in value)
+            start_column.append(len(values))
+            count_column.append(len(value) if fits else 0)
+            if fits:
+                values.extend(int(item) for item in value)
+            return fits
+        start_column, count_column = columns
+        fits = BinaryCIDEncoder._is_table(value)
+        start_column.append(self._row_counts[kind])
+        count_column.append(len(value) if fits else 0)
+        if fits:
+            for row in value:
+                self._add_row(kind, row)
+        return fits
+
+    def _add_override(self, table_name: str, row_index: int, key: str, value: object, missing: bool):
+        columns = self._columns
+        columns["overrides.table"].append(BinaryCIDLayout.TABLE_NAMES.index(table_name))
+        columns["overrides.row"].append(row_index)
+        columns["overrides.key"].append(self._add_string(key))
+        # null removes the field from the row
+        columns["overrides.value"].append(BinaryCIDLayout.NULL_VALUES["q"] if missing else
+                                          self._add_string(json.dumps(value, cls=CustomJSONEncoder)))
+
+    def _add_row(self, table_name: str, row: object):
+        row_index = self._row_counts[table_name]
+        self._row_counts[table_name] += 1
+        if type(row) is not dict:
+            row = row.as_json()
+
+        fields = self._fields[table_name]
+        missing_count = 0
+        for key, kind, columns in fields:
+            value = row.get(key)
+            # shortcut for the most frequent fields (integers and code sections)
+            if kind == BinaryCIDLayout.INT:
+                if type(value) is int and BinaryCIDLayout.NULL_VALUES["q"] < value <= BinaryCIDLayout.MAX_VALUES["q"]:
+                    columns[0].append(value)
+                    continue
+            elif kind == BinaryCIDLayout.KIND:
+                if isinstance(value, int) and not isinstance(value, bool) and \
+                        BinaryCIDLayout.NULL_VALUES["b"] < value <= BinaryCIDLayout.MAX_VALUES["b"]:
+                    columns[0].append(int(value))
+                    continue
+            elif kind == BinaryCIDLayout.SECTION:
+                if type(value) is not dict and hasattr(value, 'as_json'):
+                    value = value.as_json()
+                if type(value) is dict and tuple(value) == BinaryCIDLayout.SUB_FIELDS[kind]:
+                    sub_values = tuple(value.values())
+                    if all(type(sub_value) is int for sub_value in sub_values) and \
+                            BinaryCIDLayout.NULL_VALUES["i"] < min(sub_values) and \
+                            max(sub_values) <= BinaryCIDLayout.MAX_VALUES["i"]:
+                        for column, sub_value in zip(columns, sub_values):
+                            column.append(sub_value)
+                        continue
+
+            missing = key not in row
+            if not self._add_field(kind, columns, value) or missing:
+                self._add_override(table_name, row_index, key, value, missing)
+            missing_count += missing
+        # keys unknown to the table
+        if len(row) + missing_count > len(fields):
+            field_keys = [key for key, kind, columns in fields]
+            for key, value in row.items():
+                if key not in field_keys:
+                    self._add_override(table_name, row_index, key, value, False)
+
+    def _add_document(self, value: object, path: Tuple[str, ...]) -> object:
+        """Moves the lists of the root tables and the source code into the columns.
+           Returns the rest of the document
+        """
+        value = BinaryCIDEncoder._as_dict(value)
+        table_name = BinaryCIDLayout.ROOT_TABLES.get(path)
+        if table_name is not None and BinaryCIDEncoder._is_table(value):
+            for row in value:
+                self._add_row(table_name, row)
+            self._root_tables.append(list(path))
+            return None
+        if path == BinaryCIDLayout.SOURCE_CODE_PATH and isinstance(value, str):
+            self._source_code_string = self._add_string(value)
+            return None
+        if isinstance(value, dict):
+            return {key: self._add_document(item, path + (key,)) for key, item in value.items()}
+        return value
+    # !SECTION
+
+    # SECTION   BinaryCIDEncoder public functions
+    def write(self, cid_data: object, output_file_ptr: BinaryIO):
+        """Writes the binary CID of CIDData or a decoded JSON CID (dict) column by column to a file,
+           so the columns don't get copied into one buffer
+        """
+        document = self._add_document(cid_data, tuple())
+
+        # string table with the end offset of string i at index i + 1
+        string_offsets = array.array("q", [0])
+        offset = 0
+        for string in self._strings:
+            offset += len(string)
+            string_offsets.append(offset)
+        self._columns["strings.offsets"] = string_offsets
+        self._columns["strings.data"] = array.array("B", b"".join(self._strings))
+
+        columns = list()
+        column_layout = dict()
+        offset = 0
+        for name, column in self._columns.items():
+            if sys.byteorder != "little":
+                column = array.array(column.typecode, column)
+                column.byteswap()
+            column_layout[name] = [offset, len(column), column.typecode]
+            column_length = len(column) * column.itemsize
+            padding = -column_length % BinaryCIDLayout.ALIGNMENT
+            columns.append((column, padding))
+            offset += column_length + padding
+
+        meta_data = json.dumps(dict(document=document,
+                                    root_tables=self._root_tables,
+                                    source_code_string=self._source_code_string,
+                                    row_counts=self._row_counts,
+                                    columns=column_layout), cls=CustomJSONEncoder).encode('utf-8')
+        # pad with whitespace, so the columns stay aligned
+        meta_data += b" " * (-(BinaryCIDLayout.HEADER_LENGTH + len(meta_data)) %
+                             BinaryCIDLayout.ALIGNMENT)
+        output_file_ptr.write(struct.pack(BinaryCIDLayout.HEADER_FORMAT, BinaryCIDLayout.MAGIC_NUMBER,
+                                          BinaryCIDLayout.VERSION, len(meta_data)))
+        output_file_ptr.write(meta_data)
+        for column, padding in columns:
+            output_file_ptr.write(memoryview(column).cast("B"))
+            output_file_ptr.write(bytes(padding))
+
+    def encode(self, cid_data: object) -> bytes:
+        """Returns the binary CID of CIDData or a decoded JSON CID (dict)"""
+        output_buffer = io.BytesIO()
+        self.write(cid_data, output_buffer)
+        return output_buffer.getvalue()
+    # !SECTION
+# !SECTION
+
+
+# SECTION   BinaryCID class
+class BinaryCID:
+    """BinaryCID class.
+       Reads the columns of a binary CID without creating objects for the rows.
+       The whole CID can be converted back to the JSON document
+    """
+
+    # SECTION   BinaryCID private attribute definitions
+    __slots__ = ["_columns_view", "_meta_data", "_values", "_overrides"]
+
+    _columns_view: memoryview
+    _meta_data: dict
+    # decoded columns by name
+    _values: Dict[str, list]
+    # (key string index, value string index) by row index by table index
+    _overrides: Dict[int, Dict[int, List[Tuple[int, int]]]]
+    # !SECTION
+
+    # SECTION   BinaryCID initialization
+    def __init__(self, cid_bytes: bytes):
+        meta_length = BinaryCID._decode_header(cid_bytes)
+        columns_start = BinaryCIDLayout.HEADER_LENGTH + meta_length
+        self._meta_data = BinaryCID._decode_meta_data(
+            cid_bytes[BinaryCIDLayout.HEADER_LENGTH:columns_start])
+        self._columns_view = memoryview(cid_bytes)[columns_start:]
+        self._values = dict()
+        self._overrides = None
+        for name, (offset, count, typecode) in self._meta_data["columns"].items():
+            if offset + count * array.array(typecode).itemsize > len(self._columns_view):
+                raise(RuntimeError("Invalid binary CID (column " + name + " is truncated)!"))
+        return
+    # !SECTION
+
+    # SECTION   BinaryCID getter functions
+    def _get_document(self) -> dict:
+        return self._meta_data["document"]
+    # !SECTION
+
+    # SECTION   BinaryCID property definitions
+    document: dict = property(fget=_get_document,
+                              doc="CID document without the tables and the source code")
+    # !SECTION
+
+    # SECTION   BinaryCID private functions
+    @staticmethod
+    def _decode_header(cid_bytes: bytes) -> int:
+        """Checks the header and returns the length of the meta data"""
+        if len(cid_bytes) < BinaryCIDLayout.HEADER_LENGTH:
+            raise(RuntimeError("Invalid binary CID header!"))
+        magic_number, version, meta_length = struct.unpack(
+            BinaryCIDLayout.HEADER_FORMAT, cid_bytes[0:BinaryCIDLayout.HEADER_LENGTH])
+        if magic_number != BinaryCIDLayout.MAGIC_NUMBER or version != BinaryCIDLayout.VERSION:
+            raise(RuntimeError("Invalid binary CID header!"))
+        return meta_length
+
+    @staticmethod
+    def _decode_meta_data(meta_bytes: bytes) -> dict:
+        try:
+            return json.loads(bytes(meta_bytes).decode('utf-8'))
+        except ValueError:
+            raise(RuntimeError("Invalid binary CID (meta data can't be decoded)!"))
+
+    @staticmethod
+    def _read_meta_data(cid_path: str) -> dict:
+        try:
+            with open(cid_path, 'rb') as cid_file_ptr:
+                meta_length = BinaryCID._decode_header(
+                    cid_file_ptr.read(BinaryCIDLayout.HEADER_LENGTH))
+                return BinaryCID._decode_meta_data(cid_file_ptr.read(meta_length))
+        except OSError as e:
+            raise(RuntimeError(cid_path + " can't be read! (" + str(e) + ")"))
+
+    @staticmethod
+    def _is_stored_in_columns(meta_data: dict, key: str) -> bool:
+        return ((key,) == BinaryCIDLayout.SOURCE_CODE_PATH and meta_data["source_code_string"] is not None) or \
+            any(path[0] == key for path in meta_data["root_tables"])
+
+    def _get_values(self, name: str) -> list:
+        values = self._values.get(name)
+        if values is None:
+            values = self.get_column(name).tolist()
+            self._values[name] = values
+        return values
+
+    def _get_overrides(self, table_index: int) -> Dict[int, List[Tuple[int, int]]]:
+        """Returns the (key string index, value string index) pairs of the overridden fields by row"""
+        if self._overrides is None:
+            self._overrides = dict()
+            for override_table_index, row_index, key, value in zip(self._get_values("overrides.table"),
+                                                                   self._get_values("overrides.row"),
+                                                                   self._get_values("overrides.key"),
+                                                                   self._get_values("overrides.value")):
+                self._overrides.setdefault(override_table_index, dict()).setdefault(
+                    row_index, list()).append((key, value))
+        return self._overrides.get(table_index, dict())
+
+    def _get_field_values(self, name: str, kind: str, start: int, stop: int) -> list:
+        """Decodes the values of a field for the rows from start to stop"""
+        if kind == BinaryCIDLayout.POSITION:
+            return [{"line": line, "column": column} for line, column in
+                    zip(self._get_values(name + ".line")[start:stop],
+                        self._get_values(name + ".column")[start:stop])]
+        if kind == BinaryCIDLayout.SECTION:
+            return [{"start_line": start_line, "start_column": start_column,
+                     "end_line": end_line, "end_column": end_column}
+                    for start_line, start_column, end_line, end_column in
+                    zip(self._get_values(name + ".start_line")[start:stop],
+                        self._get_values(name + ".start_column")[start:stop],
+                        self._get_values(name + ".end_line")[start:stop],
+                        self._get_values(name + ".end_column")[start:stop])]
+        if kind not in (BinaryCIDLayout.INT, BinaryCIDLayout.KIND, BinaryCIDLayout.BOOL,
+                        BinaryCIDLayout.STRING):
+            item_starts = self._get_values(name + ".start")[start:stop]
+            item_counts = self._get_values(name + ".count")[start:stop]
+            if kind == BinaryCIDLayout.INT_LIST:
+                items = self._get_values(name + ".values")
+                return [items[item_start:item_start + item_count]
+                        for item_start, item_count in zip(item_starts, item_counts)]
+
+            # decode the rows of all lists at once (the lists of consecutive rows follow each other)
+            ranges = [(item_start, item_count) for item_start, item_count in zip(item_starts, item_counts)
+                      if item_count > 0]
+            if not ranges:
+                return [list() for item_count in item_counts]
+            rows_start = min(item_start for item_start, item_count in ranges)
+            rows = self.get_rows(kind, rows_start, max(item_start + item_count for item_start, item_count in ranges) -
+                                 rows_start)
+            return [rows[item_start - rows_start:item_start - rows_start + item_count] if item_count > 0 else list()
+                    for item_start, item_count in zip(item_starts, item_counts)]
+
+        values = self._get_values(name)[start:stop]
+        null_value = BinaryCIDLayout.NULL_VALUES[self._meta_data["columns"][name][2]]
+        if kind == BinaryCIDLayout.BOOL:
+            return [None if value == null_value else value == 1 for value in values]
+        if kind == BinaryCIDLayout.STRING:
+            return [None if value == null_value else self.get_string(value) for value in values]
+        if null_value in values:
+            return [None if value == null_value else value for value in values]
+        return values
+
+    def _fill_document(self, value: object, path: Tuple[str, ...]) -> object:
+        """Puts the tables and the source code back into the document"""
+        if list(path) in self._meta_data["root_tables"]:
+            table_name = BinaryCIDLayout.ROOT_TABLES[path]
+            return self.get_rows(table_name, 0, self.get_row_count(table_name))
+        if path == BinaryCIDLayout.SOURCE_CODE_PATH and self._meta_data["source_code_string"] is not None:
+            return self.get_string(self._meta_data["source_code_string"])
+        if isinstance(value, dict):
+            return {key: self._fill_document(item, path + (key,)) for key, item in value.items()}
+        return value
+    # !SECTION
+
+    # SECTION   BinaryCID public functions
+    @staticmethod
+    def is_binary_cid(cid_path: str) -> bool:
+        """Checks the magic number of a CID file"""
+        with open(cid_path, 'rb') as cid_file_ptr:
+            return cid_file_ptr.read(len(BinaryCIDLayout.MAGIC_NUMBER)) == BinaryCIDLayout.MAGIC_NUMBER
+
+    @staticmethod
+    def encode(cid_data: object) -> bytes:
+        """Returns the binary CID of CIDData or a decoded JSON CID (dict)"""
+        return BinaryCIDEncoder().encode(cid_data)
+
+    @staticmethod
+    def write_file(cid_data: object, output_file_ptr: BinaryIO):
+        """Writes the binary CID of CIDData or a decoded JSON CID (dict) to an opened file"""
+        BinaryCIDEncoder().write(cid_data, output_file_ptr)
+
+    @staticmethod
+    def read_file(cid_path: str) -> "BinaryCID":
+        try:
+            with open(cid_path, 'rb') as cid_file_ptr:
+                return BinaryCID(cid_file_ptr.read())
+        except OSError as e:
+            raise(RuntimeError(cid_path + " can't be read! (" + str(e) + ")"))
+
+    @staticmethod
+    def read_sections(cid_path: str, keys: List[str]) -> Dict[str, object]:
+        """Returns the top level values of the given keys. Only reads the columns, if a key needs them"""
+        meta_data = BinaryCID._read_meta_data(cid_path)
+        if any(BinaryCID._is_stored_in_columns(meta_data, key) for key in keys):
+            binary_cid = BinaryCID.read_file(cid_path)
+            return {key: binary_cid.get_section(key) for key in keys if key in binary_cid.document}
+        return {key: meta_data["document"][key] for key in keys if key in meta_data["document"]}
+
+    def get_column(self, name: str) -> memoryview:
+        """Returns a column (e.g. "statements.code_section.start_line") as memoryview of its type code"""
+        column_layout = self._meta_data["columns"].get(name)
+        if column_layout is None:
+            raise(RuntimeError("Unknown column " + name + "!"))
+        offset, count, typecode = column_layout
+        column_view = self._columns_view[offset:offset +
+                                         count * array.array(typecode).itemsize]
+        if sys.byteorder == "little":
+            return column_view.cast(typecode)
+        column = array.array(typecode, column_view.tobytes())
+        column.byteswap()
+        return memoryview(column)
+
+    def get_row_count(self, table_name: str) -> int:
+        return self._meta_data["row_counts"][table_name]
+
+    def get_string(self, string_index: int) -> str:
+        string_offsets = self._get_values("strings.offsets")
+        return str(self.get_column("strings.data")[string_offsets[string_index]:
+                                                   string_offsets[string_index + 1]], 'utf-8')
+
+    def get_rows(self, table_name: str, start: int, count: int) -> List[dict]:
+        """Decodes rows of a table into the dicts of the JSON document"""
+        keys = [key for key, kind in BinaryCIDLayout.TABLES[table_name]]
+        rows = [dict(zip(keys, row_values)) for row_values in
+                zip(*[self._get_field_values(table_name + "." + key, kind, start, start + count)
+                      for key, kind in BinaryCIDLayout.TABLES[table_name]])]
+
+        for row_index, overrides in self._get_overrides(BinaryCIDLayout.TABLE_NAMES.index(table_name)).items():
+            if start <= row_index < start + count:
+                row = rows[row_index - start]
+                for key, value in overrides:
+                    if value == BinaryCIDLayout.NULL_VALUES["q"]:
+                        del row[self.get_string(key)]
+                    else:
+                        row[self.get_string(key)] = json.loads(self.get_string(value))
+        return rows
+
+    def get_section(self, key: str) -> object:
+        """Decodes a top level value of the JSON document"""
+        return self._fill_document(self.document[key], (key,))
+
+    def to_json(self) -> dict:
+        """Decodes the whole JSON document"""
+        return self._fill_document(self.document, tuple())
+    # !SECTION
+# !SECTION
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""CIDEncoder for Coveron Instrumenter.
+   Encodes CIDData as JSON document without creating the as_json dicts of the rows.
+"""
+
+from operator import attrgetter
+from json.encoder import encode_basestring_ascii
+from typing import Callable, Dict, Iterator, Tuple
+
+from DataTypes import *
+
+
+# SECTION   CIDEncoder class
+class CIDEncoder:
+    """CIDEncoder class.
+       Creates the same document as json.dumps(cid_data, cls=CustomJSONEncoder, indent=4).
+       The attributes of the rows are read directly and filled into a template per row class
+       and indentation. Values of unexpected types are encoded by the CustomJSONEncoder
+    """
+
+    # SECTION   CIDEncoder private attribute definitions
+    __slots__ = ["_encoders", "_json_encoder", "_row_layouts",
+                 "_code_position_templates", "_code_section_templates"]
+
+    # encoding function (value, indentation) by the exact type of a value
+    _encoders: Dict[type, Callable[[object, str], str]]
+    _json_encoder: CustomJSONEncoder
+    # template, attribute getter and indentation of the values by row class and indentation
+    _row_layouts: Dict[Tuple[type, str], Tuple[str, attrgetter, str]]
+    _code_position_templates: Dict[str, str]
+    _code_section_templates: Dict[str, str]
+    # !SECTION
+
+    # SECTION   CIDEncoder public attribute definitions
+    INDENT = "    "
+    # keys of the rows in the order of their as_json functions
+    ROW_KEYS = {
+        CheckpointMarkerData: ("checkpoint_marker_id", "code_position"),
+        EvaluationMarkerData: ("evaluation_marker_id", "evaluation_type", "code_section"),
+        MarkerData: ("checkpoint_markers", "evaluation_markers"),
+        ConditionResult: ("evaluation_marker_id", "condition_result"),
+        ConditionPossibility: ("decision_result", "condition_combination"),
+        ConditionData: ("evaluation_marker_id", "code_section"),
+        CaseData: ("checkpoint_marker_id", "case_type", "evaluation_code_section", "body_code_section"),
+        BranchResultData: ("evaluation_marker_id", "condition_possibilities", "conditions",
+                           "result_evaluation_code_section", "result_body_code_section"),
+        ClassData: ("class_id", "class_name"),
+        FunctionData: ("function_id", "function_name", "function_type", "parent_function_id",
+                       "checkpoint_marker_id", "header_code_section", "inner_code_section"),
+        StatementData: ("statement_id", "statement_type", "function_id", "checkpoint_marker_id",
+                        "code_section"),
+        IfBranchData: ("if_branch_id", "function_id", "branch_results"),
+        SwitchBranchData: ("switch_branch_id", "function_id", "switch_branch_code_section", "cases"),
+        TernaryExpressionData: ("ternary_expression_id", "function_id", "evaluation_marker_id",
+                                "evaluation_code_section", "condition_possibilities", "conditions",
+                                "true_code_section", "false_code_section"),
+        LoopData: ("loop_id", "loop_type", "function_id", "evaluation_marker_id",
+                   "evaluation_code_section", "body_code_section", "condition_possibilities",
+                   "conditions"),
+        CodeData: ("classes", "functions", "statements", "if_branches", "switch_branches",
+                   "ternary_expressions", "loops"),
+        CounterIndexData: ("marker_id", "counter_index"),
+        CounterData: ("counter_count", "counter_indices"),
+        MCDCDecisionData: ("decision_marker_id", "condition_marker_ids"),
+        CIDData: ("source_code_path", "source_code_hash", "instrumentation_random", "cri_path",
+                  "checkpoint_markers_enabled", "evaluation_markers_enabled", "runtime_mode",
+                  "source_code_base64", "marker_data", "code_data", "counter_data", "mcdc_data")}
+    # rows holding the tables, iterencode returns their lists row by row
+    STREAMED_ROWS = (CIDData, MarkerData, CodeData, CounterData)
+    # !SECTION
+
+    # SECTION   CIDEncoder initialization
+    def __init__(self):
+        self._json_encoder = CustomJSONEncoder(indent=4)
+        self._row_layouts = dict()
+        self._code_position_templates = dict()
+        self._code_section_templates = dict()
+
+        def encode_int(value: int, indent: str) -> str:
+            return int.__repr__(value)
+
+        self._encoders = {int: encode_int,
+                          bool: lambda value, indent: "true" if value else "false",
+                          str: lambda value, indent: encode_basestring_ascii(value),
+                          type(None): lambda value, indent: "null",
+                          list: self._encode_list,
+                          CodePositionData: self._encode_code_position,
+                          CodeSectionData: self._encode_code_section}
+        # the enums get encoded as their integer value
+        for enum_type in (EvaluationType, FunctionType, StatementType, CaseType, LoopType):
+            self._encoders[enum_type] = encode_int
+        for row_type in CIDEncoder.ROW_KEYS:
+            self._encoders[row_type] = self._encode_row
+        return
+    # !SECTION
+
+    # SECTION   CIDEncoder private functions
+    def _encode_other(self, value: object, indent: str) -> str:
+        # every line of a nested document is shifted by the indentation of its position
+        return self._json_encoder.encode(value).replace("\n", "\n" + indent)
+
+    def _get_row_layout(self, row_type: type, indent: str) -> Tuple[str, attrgetter, str]:
+        row_layout = self._row_layouts.get((row_type, indent))
+        if row_layout is None:
+            keys = CIDEncoder.ROW_KEYS[row_type]
+            value_indent = indent + CIDEncoder.INDENT
+            template = ("{\n" + ",\n".join(value_indent + encode_basestring_ascii(key) + ": %s"
+                                           for key in keys) +
+                        "\n" + indent + "}")
+            row_layout = (template, attrgetter(*keys), value_indent)
+            self._row_layouts[(row_type, indent)] = row_layout
+        return row_layout
+
+    def _encode_row(self, row: object, indent: str) -> str:
+        template, getter, value_indent = self._get_row_layout(type(row), indent)
+        encoders = self._encoders
+        encode_other = self._encode_other
+        return template % tuple([encoders.get(type(value), encode_other)(value, value_indent)
+                                 for value in getter(row)])
+
+    def _encode_list(self, items: list, indent: str) -> str:
+        if not items:
+            return "[]"
+        item_indent = indent + CIDEncoder.INDENT
+        encoders = self._encoders
+        encode_other = self._encode_other
+        return ("[\n" + item_indent +
+                (",\n" + item_indent).join([encoders.get(type(item), encode_other)(item, item_indent)
+                                            for item in items]) +
+                "\n" + indent + "]")
+
+    def _encode_code_position(self, code_position: CodePositionData, indent: str) -> str:
+        # the validating getters of the position are skipped
+        values = (code_position._line, code_position._column)
+        if type(values[0]) is type(values[1]) is int:
+            template = self._code_position_templates.get(indent)
+            if template is None:
+                value_indent = indent + CIDEncoder.INDENT
+                template = ("{\n" + value_indent + '"line": %d,\n' +
+                            value_indent + '"column": %d\n' + indent + "}")
+                self._code_position_templates[indent] = template
+            return template % values
+        return self._encode_other(code_position, indent)
+
+    def _encode_code_section(self, code_section: CodeSectionData, indent: str) -> str:
+        start_position = code_section.start_position
+        end_position = code_section.end_position
+        if type(start_position) is CodePositionData and type(end_position) is CodePositionData:
+            values = (start_position._line, start_position._column,
+                      end_position._line, end_position._column)
+            if type(values[0]) is type(values[1]) is type(values[2]) is type(values[3]) is int:
+                template = self._code_section_templates.get(indent)
+                if template is None:
+                    value_indent = indent + CIDEncoder.INDENT
+                    template = ("{\n" + value_indent + '"start_line": %d,\n' +
+                                value_indent + '"start_column": %d,\n' +
+                                value_indent + '"end_line": %d,\n' +
+                                value_indent + '"end_column": %d\n' + indent + "}")
+                    self._code_section_templates[indent] = template
+                return template % values
+        return self._encode_other(code_section, indent)
+
+    def _iterencode_value(self, value: object, indent: str) -> Iterator[str]:
+        if type(value) in CIDEncoder.STREAMED_ROWS:
+            value_indent = indent + CIDEncoder.INDENT
+            separator = "{\n"
+            for key in CIDEncoder.ROW_KEYS[type(value)]:
+                yield separator + value_indent + encode_basestring_ascii(key) + ": "
+                yield from self._iterencode_value(getattr(value, key), value_indent)
+                separator = ",\n"
+            yield "\n" + indent + "}"
+        elif type(value) is list and value:
+            item_indent = indent + CIDEncoder.INDENT
+            separator = "[\n"
+            for item in value:
+                yield separator + item_indent + self._encode_value(item, item_indent)
+                separator = ",\n"
+            yield "\n" + indent + "]"
+        else:
+            yield self._encode_value(value, indent)
+
+    def _encode_value(self, value: object, indent: str) -> str:
+        return self._encoders.get(type(value), self._encode_other)(value, indent)
+    # !SECTION
+
+    # SECTION   CIDEncoder public functions
+    def encode(self, cid_data: object) -> str:
+        """Returns the JSON document of CIDData or a decoded CID (dict)"""
+        return self._encode_value(cid_data, "")
+
+    def iterencode(self, cid_data: object) -> Iterator[str]:
+        """Returns the JSON document of CIDData or a decoded CID (dict) in chunks.
+           The tables get encoded row by row, so the document never has to be held in memory
+        """
+        if type(cid_data) is not CIDData:
+            return self._json_encoder.iterencode(cid_data)
+        return self._iterencode_value(cid_data, "")
+    # !SECTION
+# !SECTION
@@ -16,14 +16,17 @@ import string
 import random
 import os
 import copy
-import json
 import gzip
 import base64
+import itertools
+import threading
 
-from typing import List
+from typing import Dict, List
 
 from DataTypes import *
-from Configuration import SourceFile, Configuration
+from Configuration import SourceFile, Configuration, RuntimeMode, CIDFormat
+from BinaryCID import BinaryCID
+from CIDEncoder import CIDEncoder
 
 
 # SECTION   CIDManager class
@@ -34,16 +37,24 @@ class CIDManager:
 
     # SECTION   CIDManager private attribute definitions
     __slots__ = ['config', '_cid_data',
-                 '_compound_statement_inserts', 'source_file', '_current_id']
+                 '_compound_statement_inserts', 'source_file', '_current_id',
+                 '_current_marker_id', '_counter_indices', '_cid_writer', '_cid_writer_error']
 
     config: Configuration
     _cid_data: CIDData
     _compound_statement_inserts: List
     source_file: SourceFile
     _current_id: int
+    _current_marker_id: int
+    _counter_indices: Dict[int, int]
+    # writer thread of write_cid_file(background=True) and the exception it raised
+    _cid_writer: threading.Thread
+    _cid_writer_error: Exception
     # !SECTION
 
     # SECTION   CIDManager public attribute definitions
+    MCDC_MAX_CONDITIONS = 64  # width of the condition masks of the runtime helper
+    WRITE_CHUNK_BATCH_SIZE = 4096  # JSON chunks of iterencode joined per write
     # !SECTION
 
     # SECTION   CIDManager initialization
@@ -51,7 +62,12 @@ class CIDManager:
         self.config = config
         self.source_file = source_file
         self._current_id = 1  # starting with ID 1
+        # markers have their own dense id space, so the ids of the CRI records stay small
+        self._current_marker_id = 1
         self._compound_statement_inserts = list()
+        self._counter_indices = dict()
+        self._cid_writer = None
+        self._cid_writer_error = None
 
         # get SHA256 hash
         source_code_sha256 = hashlib.sha256(
@@ -72,7 +88,12 @@ class CIDManager:
                                  cri_path=os.path.join(self.config.output_abs_path,
                                                        self.source_file.cri_file),
                                  checkpoint_markers_enabled=self.config.checkpoint_markers_enabled,
-                                 evaluation_markers_enabled=self.config.evaluation_markers_enabled)
+                                 evaluation_markers_enabled=self.config.evaluation_markers_enabled,
+                                 runtime_mode=(self.config.runtime_mode.value
+                                               if self.config.runtime_mode in (RuntimeMode.COUNTER,
+                                                                               RuntimeMode.BITMAP,
+                                                                               RuntimeMode.MCDC)
+                                               else RuntimeMode.TRACE.value))
         return
     # !SECTION
 
@@ -86,6 +107,24 @@ class CIDManager:
     # !SECTION
 
     # SECTION   CIDManager private functions
+    def _run_cid_writer(self, *write_arguments):
+        try:
+            CIDManager.write_cid(*write_arguments)
+        except Exception as e:
+            self._cid_writer_error = e
+
+    def _add_counter_index(self, marker_id: int, counter_width: int):
+        """Allocates the next dense counter index for a marker (only used in counter and bitmap runtime mode).
+           In bitmap mode, the counter index is the index of the marker's bit
+        """
+        if self.config.runtime_mode not in (RuntimeMode.COUNTER, RuntimeMode.BITMAP):
+            return
+
+        counter_data = self._cid_data.counter_data
+        self._counter_indices[marker_id] = counter_data.counter_count
+        counter_data.counter_indices.append(
+            CounterIndexData(marker_id, counter_data.counter_count))
+        counter_data.counter_count += counter_width
     # !SECTION
 
     # SECTION   CIDManager public functions
@@ -95,6 +134,12 @@ class CIDManager:
         self._current_id += 1  # increase id counter by one
         return current_id
 
+    def get_new_marker_id(self) -> int:
+        '''Returns a unique id for the new checkpoint or evaluation marker'''
+        current_marker_id = self._current_marker_id
+        self._current_marker_id += 1  # increase marker id counter by one
+        return current_marker_id
+
     def get_instrumentation_random(self) -> str:
         return self._cid_data.instrumentation_random
 
@@ -109,6 +154,17 @@ class CIDManager:
         # return deepcopy to prevent accidental changes
         return copy.deepcopy(self._cid_data.marker_data.evaluation_markers)
 
+    def get_counter_indices(self) -> Dict[int, int]:
+        # return copy to prevent accidental changes
+        return dict(self._counter_indices)
+
+    def get_counter_count(self) -> int:
+        return self._cid_data.counter_data.counter_count
+
+    def get_mcdc_decisions(self) -> list:
+        # return deepcopy to prevent accidental changes
+        return copy.deepcopy(self._cid_data.mcdc_data)
+
     def get_compound_statement_inserts(self) -> list:
         # return deepcopy to prevent accidental changes
         return copy.deepcopy(self._compound_statement_inserts)
@@ -122,6 +178,7 @@ class CIDManager:
 
         self._cid_data.marker_data.checkpoint_markers.append(
             CheckpointMarkerData(checkpoint_marker_id, code_position))
+        self._add_counter_index(checkpoint_marker_id, 1)
         return checkpoint_marker_id
 
     def add_evaluation_marker(self, evaluation_marker_id: int,
@@ -133,8 +190,20 @@ class CIDManager:
 
         self._cid_data.marker_data.evaluation_markers.append(
             EvaluationMarkerData(evaluation_marker_id, evaluation_type, code_section))
+        # one counter for the false and one for the true outcome
+        self._add_counter_index(evaluation_marker_id, 2)
         return evaluation_marker_id
 
+    def add_mcdc_decision(self, decision_marker_id: int, condition_marker_ids: List[int]):
+        '''Link a decision to its conditions (only used in mcdc runtime mode).
+           Decisions with more conditions than the mask width keep one record per condition'''
+        if self.config.runtime_mode != RuntimeMode.MCDC or \
+                len(condition_marker_ids) > CIDManager.MCDC_MAX_CONDITIONS:
+            return
+
+        self._cid_data.mcdc_data.append(
+            MCDCDecisionData(decision_marker_id, list(condition_marker_ids)))
+
     def add_compound_statement(self, code_section: CodeSectionData):
         '''Create curly braces for a new compound statement.'''
         self._compound_statement_inserts.append(code_section)
@@ -217,30 +286,62 @@ class CIDManager:
                                                        evaluation_code_section, body_code_section, condition_possibilities, conditions))
         return loop_id
 
-    def write_cid_file(self):
-        '''Writes a CID file from the curretly stored information to the specified filepath'''
-        cid_file = self.source_file.cid_file
-
-        cid_string = json.dumps(self._cid_data.as_json(),
-                                cls=CustomJSONEncoder, indent=4)
-
-        if self.config.nocomp_cid:
-            with open(os.path.join(self.config.output_abs_path, self.source_file.cid_file), 'w') as output_file_ptr:
-                try:
-                    output_file_ptr.write(cid_string)
-                except:
-                    raise(RuntimeError(
-                        self.source_file.cid_file + " can't be written!"))
-
-        else:
-            # Routine for saving gzip compressed data (not needed during first development)
-            cid_bytes = cid_string.encode('utf-8')
-
-            with gzip.GzipFile(os.path.join(self.config.output_abs_path, self.source_file.cid_file), 'w') as output_file_ptr:
-                try:
-                    output_file_ptr.write(cid_bytes)
-                except:
-                    raise(RuntimeError(
-                        self.source_file.cid_file + " can't be written!"))
+    def write_cid_file(self, background: bool = False):
+        '''Writes a CID file from the curretly stored information to the specified filepath.
+           With background=True the file gets serialised and compressed on a writer thread,
+           wait_for_cid_file() has to be called before the CID file is used'''
+        cid_path = os.path.join(self.config.output_abs_path, self.source_file.cid_file)
+        write_arguments = (cid_path, self._cid_data, self.config.cid_format == CIDFormat.BINARY,
+                           self.config.nocomp_cid, self.config.cid_compression_level)
+        if not background:
+            CIDManager.write_cid(*write_arguments)
+            return
+
+        self.wait_for_cid_file()
+        self._cid_writer_error = None
+        self._cid_writer = threading.Thread(target=self._run_cid_writer, args=write_arguments,
+                                            name="CIDWriter-" + self.source_file.cid_file)
+        self._cid_writer.start()
+
+    def wait_for_cid_file(self):
+        '''Waits for the CID file of write_cid_file(background=True) and raises its write error'''
+        if self._cid_writer is None:
+            return
+        self._cid_writer.join()
+        self._cid_writer = None
+        if self._cid_writer_error is not None:
+            cid_writer_error = self._cid_writer_error
+            self._cid_writer_error = None
+            raise(cid_writer_error)
+
+    @staticmethod
+    def write_cid(cid_path: str, cid_data, binary_format: bool, nocomp_cid: bool,
+                  compression_level: int = Configuration.DEFAULT_CID_COMPRESSION_LEVEL):
+        '''Writes CIDData or a decoded CID (dict) as JSON or binary CID file.
+           The JSON document is streamed into the file (and the gzip compressor) chunk by chunk,
+           so the complete document never has to be held in memory'''
+        try:
+            if binary_format:
+                # binary CIDs stay uncompressed, so the columns can be read in place
+                with open(cid_path, 'wb') as output_file_ptr:
+                    BinaryCID.write_file(cid_data, output_file_ptr)
+                return
+
+            if nocomp_cid:
+                output_file_ptr = open(cid_path, 'w')
+            else:
+                output_file_ptr = gzip.open(cid_path, 'wt', encoding='utf-8',
+                                            compresslevel=compression_level)
+            with output_file_ptr:
+                chunks = CIDEncoder().iterencode(cid_data)
+                # iterencode yields single rows (single tokens for decoded CIDs), so they get joined first
+                while True:
+                    chunk_batch = "".join(itertools.islice(chunks, CIDManager.WRITE_CHUNK_BATCH_SIZE))
+                    if not chunk_batch:
+                        break
+                    output_file_ptr.write(chunk_batch)
+        except (OSError, ValueError):
+            raise(RuntimeError(
+                os.path.basename(cid_path) + " can't be written!"))
     # !SECTION
 # !SECTION
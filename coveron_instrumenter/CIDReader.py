@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""CIDReader for Coveron Instrumenter.
+   Reads the header and single sections of "Coveron Instrumentation Data" files
+   without decoding the whole document.
+"""
+
+import gzip
+import json
+import base64
+from typing import Dict, List, TextIO
+
+from BinaryCID import BinaryCID
+
+
+# SECTION   CIDReader class
+class CIDReader:
+    """CIDReader class.
+       Decodes the sections of a CID file on first access. Works with gzip compressed,
+       uncompressed (--CVR_NOCOMP_CID) and binary (--CVR_CID_FORMAT=binary) CID files
+    """
+
+    # SECTION   CIDReader private attribute definitions
+    __slots__ = ["cid_path", "_header", "_sections"]
+
+    cid_path: str
+    _header: dict
+    # decoded top level values by key
+    _sections: Dict[str, object]
+    # !SECTION
+
+    # SECTION   CIDReader public attribute definitions
+    # top level values in front of the source code and the body of a CID
+    HEADER_KEYS = ("source_code_path", "source_code_hash", "instrumentation_random", "cri_path",
+                   "checkpoint_markers_enabled", "evaluation_markers_enabled", "runtime_mode")
+    REQUIRED_HEADER_KEYS = ("source_code_hash", "instrumentation_random", "cri_path")
+    GZIP_MAGIC = b"\x1f\x8b"
+    # CIDs get written with indent=4, so every top level key starts a line with this indentation
+    TOP_LEVEL_KEY_PREFIX = '    "'
+    # header lines are read in pieces of this length, so the key of a long line is known early
+    HEADER_LINE_LIMIT = 4096
+    # !SECTION
+
+    # SECTION   CIDReader initialization
+    def __init__(self, cid_path: str):
+        self.cid_path = cid_path
+        self._header = None
+        self._sections = dict()
+        return
+    # !SECTION
+
+    # SECTION   CIDReader getter functions
+    def _get_header(self) -> dict:
+        if self._header is None:
+            self._header = CIDReader.read_header(self.cid_path)
+        return self._header
+
+    def _get_marker_data(self) -> dict:
+        return self._get_section("marker_data")
+
+    def _get_code_data(self) -> dict:
+        return self._get_section("code_data")
+
+    def _get_counter_data(self) -> dict:
+        return self._get_section("counter_data", dict(counter_count=0, counter_indices=list()))
+
+    def _get_mcdc_data(self) -> list:
+        return self._get_section("mcdc_data", list())
+
+    def _get_source_code(self) -> str:
+        return base64.b64decode(self._get_section("source_code_base64")).decode("utf-8")
+    # !SECTION
+
+    # SECTION   CIDReader property definitions
+    header: dict = property(fget=_get_header,
+                            doc="Hashes, paths and flags of the CID")
+    marker_data: dict = property(fget=_get_marker_data,
+                                 doc="Checkpoint and evaluation markers of the CID")
+    code_data: dict = property(fget=_get_code_data,
+                               doc="Functions, statements, branches and loops of the CID")
+    counter_data: dict = property(fget=_get_counter_data,
+                                  doc="Counter indices of the markers (counter and bitmap runtime mode)")
+    mcdc_data: list = property(fget=_get_mcdc_data,
+                               doc="Conditions of the MC/DC decisions (mcdc runtime mode)")
+    source_code: str = property(fget=_get_source_code,
+                                doc="Source code the CID was created from")
+    # !SECTION
+
+    # SECTION   CIDReader private functions
+    @staticmethod
+    def _open(cid_path: str) -> TextIO:
+        with open(cid_path, 'rb') as cid_file_ptr:
+            magic_number = cid_file_ptr.read(2)
+        if magic_number == CIDReader.GZIP_MAGIC:
+            return gzip.open(cid_path, 'rt', encoding='utf-8')
+        return open(cid_path, 'r', encoding='utf-8')
+
+    @staticmethod
+    def _read_sections(cid_path: str, keys: List[str]) -> Dict[str, object]:
+        """Decodes the top level values of the given keys. Reading stops as soon as all keys were found,
+           the values of other keys get skipped line by line without decoding them
+        """
+        sections = dict()
+        try:
+            if BinaryCID.is_binary_cid(cid_path):
+                return BinaryCID.read_sections(cid_path, keys)
+            with CIDReader._open(cid_path) as cid_file_ptr:
+                first_line = cid_file_ptr.readline()
+                if first_line.rstrip("\n") != "{":
+                    # not written with indent=4, so the whole document has to be decoded
+                    cid_data = json.loads(first_line + cid_file_ptr.read())
+                    return {key: cid_data[key] for key in keys if key in cid_data}
+
+                json_decoder = json.JSONDecoder()
+                section_key = None
+                section_lines = None
+                for line in cid_file_ptr:
+                    end_of_document = line.startswith("}")
+                    if not end_of_document and not line.startswith(CIDReader.TOP_LEVEL_KEY_PREFIX):
+                        if section_lines is not None:
+                            section_lines.append(line)
+                        continue
+
+                    # a new top level key ends the value in front of it
+                    if section_lines is not None:
+                        sections[section_key] = json.loads(
+                            "".join(section_lines).rstrip().rstrip(","))
+                        section_lines = None
+                    if end_of_document or len(sections) == len(keys):
+                        break
+
+                    section_key, key_end = json_decoder.raw_decode(
+                        line, len(CIDReader.TOP_LEVEL_KEY_PREFIX) - 1)
+                    if section_key in keys:
+                        # the value starts behind the ": " after the key
+                        section_lines = [line[key_end + 2:]]
+        except (OSError, EOFError, ValueError) as e:
+            raise(RuntimeError(cid_path + " can't be read! (" + str(e) + ")"))
+        return sections
+
+    @staticmethod
+    def _read_header_lines(cid_path: str) -> Dict[str, object]:
+        """Decodes the header values from their key lines. Reading stops at the first key,
+           which isn't a header key, so the source code and the body never get read.
+           Returns None for binary CIDs and CIDs, which weren't written with indent=4
+        """
+        header = dict()
+        try:
+            if BinaryCID.is_binary_cid(cid_path):
+                return None
+            with CIDReader._open(cid_path) as cid_file_ptr:
+                if cid_file_ptr.readline(CIDReader.HEADER_LINE_LIMIT).rstrip("\n") != "{":
+                    return None
+
+                json_decoder = json.JSONDecoder()
+                while True:
+                    line = cid_file_ptr.readline(CIDReader.HEADER_LINE_LIMIT)
+                    if not line.startswith(CIDReader.TOP_LEVEL_KEY_PREFIX):
+                        break
+                    key, key_end = json_decoder.raw_decode(
+                        line, len(CIDReader.TOP_LEVEL_KEY_PREFIX) - 1)
+                    if key not in CIDReader.HEADER_KEYS:
+                        break
+
+                    # header values are scalars on the line of their key
+                    while not line.endswith("\n"):
+                        line_continuation = cid_file_ptr.readline(CIDReader.HEADER_LINE_LIMIT)
+                        if not line_continuation:
+                            break
+                        line += line_continuation
+                    header[key] = json.loads(line[key_end + 2:].rstrip().rstrip(","))
+        except (OSError, EOFError, ValueError) as e:
+            raise(RuntimeError(cid_path + " can't be read! (" + str(e) + ")"))
+        return header
+
+    @staticmethod
+    def _check_header(cid_path: str, header: dict):
+        for key in CIDReader.REQUIRED_HEADER_KEYS:
+            if not isinstance(header.get(key), str):
+                raise(RuntimeError("Invalid CID header in " + cid_path + "!"))
+
+    def _get_section(self, key: str, default: object = None) -> object:
+        if key not in self._sections:
+            section = CIDReader._read_sections(self.cid_path, [key]).get(key, default)
+            if section is None:
+                raise(RuntimeError(key + " is missing in " + self.cid_path + "!"))
+            self._sections[key] = section
+        return self._sections[key]
+    # !SECTION
+
+    # SECTION   CIDReader public functions
+    @staticmethod
+    def read_header(cid_path: str) -> dict:
+        """Returns the hashes, paths and flags of a CID without decoding the source code and the body.
+           Header keys missing in the CID are missing in the returned header
+        """
+        header = CIDReader._read_header_lines(cid_path)
+        if header is None or any(key not in header for key in CIDReader.REQUIRED_HEADER_KEYS):
+            # compact documents and CIDs with the header keys behind the source code
+            header = CIDReader._read_sections(cid_path, CIDReader.HEADER_KEYS)
+        CIDReader._check_header(cid_path, header)
+        return header
+
+    def load(self) -> dict:
+        """Decodes the whole CID (same content as json.load of the decompressed JSON file)"""
+        try:
+            if BinaryCID.is_binary_cid(self.cid_path):
+                return BinaryCID.read_file(self.cid_path).to_json()
+            with CIDReader._open(self.cid_path) as cid_file_ptr:
+                return json.load(cid_file_ptr)
+        except (OSError, EOFError, ValueError) as e:
+            raise(RuntimeError(self.cid_path + " can't be read! (" + str(e) + ")"))
+    # !SECTION
+# !SECTION
@@ -0,0 +1,483 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""CRIDecoder for Coveron Instrumenter.
+   Decodes "Coveron Runtime Information" files written by the runtime helper.
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+
+# SECTION   CRIExecution class
+class CRIExecution:
+    """CRIExecution class.
+       Stores the records of a single program execution
+    """
+
+    # SECTION   CRIExecution private attribute definitions
+    __slots__ = ["comment", "markers", "mcdc_vectors",
+                 "counters", "bit_count", "bitmap", "_last_records"]
+
+    comment: str
+    markers: List[Tuple[int, int]]
+    mcdc_vectors: List[Tuple[int, int, int, bool]]
+    counters: List[int]
+    bit_count: int
+    bitmap: bytes
+    # list with the last marker record or MC/DC vector (repeated by repeat records)
+    _last_records: list
+    # !SECTION
+
+    # SECTION   CRIExecution initialization
+    def __init__(self, comment: str):
+        self.comment = comment
+        # (marker id, 0xFF for checkpoints or the evaluation result) in order of appearance
+        self.markers = list()
+        # (decision marker id, evaluated condition mask, condition value mask, outcome) in order of appearance
+        self.mcdc_vectors = list()
+        self.counters = None
+        self.bit_count = 0
+        self.bitmap = None
+        self._last_records = None
+        return
+    # !SECTION
+
+    # SECTION   CRIExecution public functions
+    def is_bit_set(self, bit_index: int) -> bool:
+        """Returns, if a bit of the bitmap is set (bit i is stored in byte i / 8 with mask 1 << (i % 8))"""
+        return bool(self.bitmap[bit_index >> 3] & (1 << (bit_index & 7)))
+    # !SECTION
+# !SECTION
+
+
+# SECTION   CRIData class
+class CRIData:
+    """CRIData class.
+       Stores the header and all executions of a CRI file
+    """
+
+    # SECTION   CRIData private attribute definitions
+    __slots__ = ["version", "source_code_hash",
+                 "instrumentation_random", "executions"]
+
+    version: int
+    source_code_hash: str
+    instrumentation_random: str
+    executions: List[CRIExecution]
+    # !SECTION
+
+    # SECTION   CRIData initialization
+    def __init__(self, version: int, source_code_hash: str, instrumentation_random: str):
+        self.version = version
+        self.source_code_hash = source_code_hash
+        self.instrumentation_random = instrumentation_random
+        self.executions = list()
+        return
+    # !SECTION
+# !SECTION
+
+
+# SECTION   CRIDecoder class
+class CRIDecoder:
+    """CRIDecoder class.
+       Decodes the header and the records of a CRI file
+    """
+
+    # SECTION   CRIDecoder private attribute definitions
+    __slots__ = ["cri_path"]
+
+    cri_path: str
+    # !SECTION
+
+    # SECTION   CRIDecoder public attribute definitions
+    MAGIC_NUMBER = b"IMACRIF!"
+    HEADER_LENGTH = 59
+    CHECKPOINT_RESULT = 0xFF
+    MCDC_VECTOR_TYPE = 0xFE
+    # repeat records (CRI version 2) repeat the marker record or MC/DC vector in front of them
+    REPEAT_RECORD_TYPE = 0xFD
+    # varint records (CRI version 3) store marker records as LEB128 varints of
+    # (marker id << 2 | evaluation flag << 1 | outcome). MC/DC vectors and repeat records follow an escape byte
+    VARINT_RECORDS_VERSION = 3
+    ESCAPE_RECORD = 0x01
+
+    # special records start with 5 zero bytes (marker ids start with 1) and a record magic number
+    RECORD_PADDING = b"\x00" * 5
+    EXECUTION_MAGIC = b"RUN!"
+    COUNTER_TABLE_MAGIC = b"CNT!"
+    BITMAP_MAGIC = b"BIT!"
+    # memory mapped table files store the counters in host byte order behind a byte order mark
+    HOST_COUNTER_TABLE_MAGIC = b"CNH!"
+    BYTE_ORDER_MARK = bytes([1, 2, 3, 4, 5, 6, 7, 8])
+
+    # shared CRI files contain the records of all source files of a process
+    SHARED_MAGIC_NUMBER = b"IMACRIS!"
+    FILE_TABLE_MAGIC = b"FIL!"
+    # !SECTION
+
+    # SECTION   CRIDecoder initialization
+    def __init__(self, cri_path: str):
+        self.cri_path = cri_path
+        return
+    # !SECTION
+
+    # SECTION   CRIDecoder private functions
+    @staticmethod
+    def _decode_header(cri_bytes: bytes) -> CRIData:
+        if len(cri_bytes) < CRIDecoder.HEADER_LENGTH or \
+                cri_bytes[0:8] != CRIDecoder.MAGIC_NUMBER or \
+                cri_bytes[CRIDecoder.HEADER_LENGTH - 1] != 0x0A:
+            raise(RuntimeError("Invalid CRI header!"))
+        return CRIData(int.from_bytes(cri_bytes[8:10], "big"),
+                       cri_bytes[10:42].hex(),
+                       cri_bytes[42:58].hex())
+
+    @staticmethod
+    def _get_record_length(cri_bytes: bytes, position: int) -> int:
+        if position + 4 > len(cri_bytes):
+            raise(RuntimeError("Truncated CRI record at byte " + str(position) + "!"))
+        return int.from_bytes(cri_bytes[position:position + 4], "big")
+
+    @staticmethod
+    def _decode_varint_record(cri_bytes: bytes, position: int, execution: CRIExecution) -> int:
+        """Decodes a varint marker record (7 bits per byte, lowest bits first) into the execution.
+           Returns the position after the record
+        """
+        record_value = 0
+        shift = 0
+        cri_length = len(cri_bytes)
+        while True:
+            if position >= cri_length:
+                raise(RuntimeError("Truncated varint record!"))
+            varint_byte = cri_bytes[position]
+            position += 1
+            record_value |= (varint_byte & 0x7F) << shift
+            shift += 7
+            if not varint_byte & 0x80:
+                break
+
+        if record_value & 0x02:
+            execution.markers.append((record_value >> 2, record_value & 0x01))
+        else:
+            execution.markers.append((record_value >> 2, CRIDecoder.CHECKPOINT_RESULT))
+        execution._last_records = execution.markers
+        return position
+
+    @staticmethod
+    def _decode_record(cri_bytes: bytes, position: int, execution: CRIExecution,
+                       expand_repeats: bool = True, varint_records: bool = False) -> int:
+        """Decodes a marker, MC/DC vector, repeat, counter table or bitmap record into the execution.
+           Returns the position after the record
+        """
+        cri_length = len(cri_bytes)
+        escaped = False
+        if varint_records and position < cri_length:
+            if cri_bytes[position] == CRIDecoder.ESCAPE_RECORD:
+                escaped = True
+                position += 1
+            elif cri_bytes[position] != 0x00:
+                return CRIDecoder._decode_varint_record(cri_bytes, position, execution)
+
+        if position + 5 > cri_length:
+            raise(RuntimeError("Truncated CRI record at byte " + str(position) + "!"))
+        if escaped and cri_bytes[position + 4] not in (CRIDecoder.MCDC_VECTOR_TYPE,
+                                                       CRIDecoder.REPEAT_RECORD_TYPE):
+            raise(RuntimeError("Invalid escaped CRI record at byte " + str(position) + "!"))
+        if varint_records and not escaped and \
+                cri_bytes[position:position + 5] != CRIDecoder.RECORD_PADDING:
+            raise(RuntimeError("Invalid CRI record at byte " + str(position) + "!"))
+
+        if cri_bytes[position:position + 5] != CRIDecoder.RECORD_PADDING:
+            if cri_bytes[position + 4] == CRIDecoder.REPEAT_RECORD_TYPE:
+                # repeat record (4 byte big endian repeat count, type)
+                if execution._last_records is None:
+                    raise(RuntimeError("Repeat record without record!"))
+                if expand_repeats:
+                    execution._last_records.extend([execution._last_records[-1]] *
+                                                   int.from_bytes(cri_bytes[position:position + 4], "big"))
+                return position + 5
+
+            if cri_bytes[position + 4] == CRIDecoder.MCDC_VECTOR_TYPE:
+                # MC/DC vector record (4 byte decision id, type, mask width, masks, outcome)
+                if position + 6 > cri_length:
+                    raise(RuntimeError("Truncated MC/DC vector!"))
+                mask_width = cri_bytes[position + 5]
+                vector_end = position + 7 + 2 * mask_width
+                if vector_end > cri_length:
+                    raise(RuntimeError("Truncated MC/DC vector!"))
+                execution.mcdc_vectors.append((int.from_bytes(cri_bytes[position:position + 4], "big"),
+                                               int.from_bytes(cri_bytes[position + 6:position + 6 + mask_width], "big"),
+                                               int.from_bytes(cri_bytes[position + 6 + mask_width:vector_end - 1], "big"),
+                                               bool(cri_bytes[vector_end - 1])))
+                execution._last_records = execution.mcdc_vectors
+                return vector_end
+
+            # marker record (4 byte big endian marker id, 1 byte result)
+            execution.markers.append((int.from_bytes(cri_bytes[position:position + 4], "big"),
+                                      cri_bytes[position + 4]))
+            execution._last_records = execution.markers
+            return position + 5
+
+        record_magic = cri_bytes[position + 5:position + 9]
+        position += 9
+        if record_magic == CRIDecoder.COUNTER_TABLE_MAGIC:
+            counter_count = CRIDecoder._get_record_length(
+                cri_bytes, position)
+            position += 4
+            if position + 8 * counter_count > cri_length:
+                raise(RuntimeError("Truncated counter table!"))
+            execution.counters = [int.from_bytes(cri_bytes[counter_position:counter_position + 8], "big")
+                                  for counter_position in range(position, position + 8 * counter_count, 8)]
+            return position + 8 * counter_count
+        if record_magic == CRIDecoder.HOST_COUNTER_TABLE_MAGIC:
+            # counter table of a memory mapped table file (host byte order, given by the byte order mark)
+            counter_count = CRIDecoder._get_record_length(
+                cri_bytes, position)
+            position += 4
+            if position + 8 + 8 * counter_count > cri_length:
+                raise(RuntimeError("Truncated counter table!"))
+            byte_order_mark = cri_bytes[position:position + 8]
+            if byte_order_mark == CRIDecoder.BYTE_ORDER_MARK:
+                byte_order = "big"
+            elif byte_order_mark == CRIDecoder.BYTE_ORDER_MARK[::-1]:
+                byte_order = "little"
+            else:
+                raise(RuntimeError("Invalid byte order mark of counter table!"))
+            position += 8
+            execution.counters = [int.from_bytes(cri_bytes[counter_position:counter_position + 8], byte_order)
+                                  for counter_position in range(position, position + 8 * counter_count, 8)]
+            return position + 8 * counter_count
+        if record_magic == CRIDecoder.BITMAP_MAGIC:
+            execution.bit_count = CRIDecoder._get_record_length(
+                cri_bytes, position)
+            position += 4
+            bitmap_length = (execution.bit_count + 7) // 8
+            if position + bitmap_length > cri_length:
+                raise(RuntimeError("Truncated bitmap!"))
+            execution.bitmap = cri_bytes[position:position + bitmap_length]
+            return position + bitmap_length
+        raise(RuntimeError("Unknown CRI record " + repr(record_magic) + "!"))
+
+    @staticmethod
+    def _decode_execution_marker(cri_bytes: bytes, position: int) -> Tuple[CRIExecution, int]:
+        # execution comment (after padding and magic number) is terminated by a null char and a new line
+        comment_end = cri_bytes.find(b"\n", position + 9)
+        if comment_end < 0:
+            raise(RuntimeError("Truncated execution marker!"))
+        return (CRIExecution(cri_bytes[position + 9:comment_end].rstrip(b"\x00")
+                             .decode("utf-8", errors="replace")),
+                comment_end + 1)
+    # !SECTION
+
+    # SECTION   CRIDecoder public functions
+    @staticmethod
+    def decode_bytes(cri_bytes: bytes) -> CRIData:
+        """Decodes the content of a CRI file"""
+        cri_data = CRIDecoder._decode_header(cri_bytes)
+        varint_records = cri_data.version >= CRIDecoder.VARINT_RECORDS_VERSION
+
+        execution = None
+        position = CRIDecoder.HEADER_LENGTH
+        cri_length = len(cri_bytes)
+        while position < cri_length:
+            if cri_bytes[position:position + 9] == CRIDecoder.RECORD_PADDING + CRIDecoder.EXECUTION_MAGIC:
+                execution, position = CRIDecoder._decode_execution_marker(
+                    cri_bytes, position)
+                cri_data.executions.append(execution)
+                continue
+
+            if execution is None:
+                if position + 5 > cri_length:
+                    raise(RuntimeError("Truncated CRI record at byte " + str(position) + "!"))
+                if cri_bytes[position:position + 5] != CRIDecoder.RECORD_PADDING:
+                    raise(RuntimeError("Marker record before execution marker!"))
+                raise(RuntimeError("Record before execution marker!"))
+            position = CRIDecoder._decode_record(
+                cri_bytes, position, execution, varint_records=varint_records)
+
+        return cri_data
+
+    @staticmethod
+    def decode_tables(cri_bytes: bytes) -> Tuple[CRIData, int]:
+        """Decodes the counter tables and bitmaps of a CRI file up to its last complete record
+           (a crashed process can leave a truncated record behind). Marker records and MC/DC vectors
+           get skipped. Returns the data and the length of the complete records
+        """
+        cri_data = CRIDecoder._decode_header(cri_bytes)
+        varint_records = cri_data.version >= CRIDecoder.VARINT_RECORDS_VERSION
+
+        execution = None
+        position = CRIDecoder.HEADER_LENGTH
+        cri_length = len(cri_bytes)
+        try:
+            while position < cri_length:
+                if cri_bytes[position:position + 9] == CRIDecoder.RECORD_PADDING + CRIDecoder.EXECUTION_MAGIC:
+                    next_execution, position = CRIDecoder._decode_execution_marker(
+                        cri_bytes, position)
+                    execution = next_execution
+                    cri_data.executions.append(execution)
+                    continue
+
+                if execution is None:
+                    break
+                next_position = CRIDecoder._decode_record(
+                    cri_bytes, position, execution, expand_repeats=False, varint_records=varint_records)
+                # the last record is kept for repeat records
+                del execution.markers[:-1]
+                del execution.mcdc_vectors[:-1]
+                position = next_position
+        except RuntimeError:
+            pass
+
+        return cri_data, position
+
+    @staticmethod
+    def split_shared_bytes(shared_bytes: bytes) -> Dict[str, bytes]:
+        """Splits the content of a shared CRI file into the contents of the CRI files of its source files.
+           Every shared record starts with a 2 byte file index (0 = execution markers and file table entries
+           of the shared file itself), followed by a record of the CRI format
+        """
+        if len(shared_bytes) < CRIDecoder.HEADER_LENGTH or \
+                shared_bytes[0:8] != CRIDecoder.SHARED_MAGIC_NUMBER or \
+                shared_bytes[CRIDecoder.HEADER_LENGTH - 1] != 0x0A:
+            raise(RuntimeError("Invalid shared CRI header!"))
+        version = shared_bytes[8:10]
+        varint_records = int.from_bytes(version, "big") >= CRIDecoder.VARINT_RECORDS_VERSION
+
+        # CRI file contents by output filename
+        cri_contents = dict()
+        # (output filename, execution marker of the file yet to be written) by file index of the current execution
+        file_table = dict()
+        execution_marker = None
+        scratch_execution = CRIExecution("")
+
+        position = CRIDecoder.HEADER_LENGTH
+        shared_length = len(shared_bytes)
+        while position < shared_length:
+            if position + 2 > shared_length:
+                raise(RuntimeError("Truncated shared CRI record at byte " + str(position) + "!"))
+            file_index = int.from_bytes(shared_bytes[position:position + 2], "big")
+            position += 2
+
+            if file_index == 0:
+                record_magic = shared_bytes[position + 5:position + 9]
+                if shared_bytes[position:position + 5] != CRIDecoder.RECORD_PADDING:
+                    raise(RuntimeError("Invalid shared CRI record at byte " + str(position) + "!"))
+                if record_magic == CRIDecoder.EXECUTION_MAGIC:
+                    # file indices start again with every execution
+                    _, record_end = CRIDecoder._decode_execution_marker(
+                        shared_bytes, position)
+                    execution_marker = shared_bytes[position:record_end]
+                    file_table = dict()
+                    position = record_end
+                elif record_magic == CRIDecoder.FILE_TABLE_MAGIC:
+                    if execution_marker is None:
+                        raise(RuntimeError("Record before execution marker!"))
+                    entry_length = CRIDecoder._get_record_length(
+                        shared_bytes, position + 9)
+                    entry = shared_bytes[position + 13:position + 13 + entry_length]
+                    if entry_length < 50 or len(entry) != entry_length:
+                        raise(RuntimeError("Truncated file table entry!"))
+                    cri_filename = entry[50:].decode("utf-8", errors="replace")
+                    cri_header = (CRIDecoder.MAGIC_NUMBER + version + entry[2:50] + b"\n")
+
+                    # a file with another header gets replaced like by the runtime helper
+                    if cri_filename not in cri_contents or \
+                            cri_contents[cri_filename][0:CRIDecoder.HEADER_LENGTH] != cri_header:
+                        cri_contents[cri_filename] = bytearray(cri_header)
+                    cri_contents[cri_filename] += execution_marker
+                    file_table[int.from_bytes(entry[0:2], "big")] = cri_filename
+                    position += 13 + entry_length
+                else:
+                    raise(RuntimeError("Unknown shared CRI record " +
+                                       repr(record_magic) + "!"))
+                continue
+
+            if file_index not in file_table:
+                raise(RuntimeError("Unknown file index " + str(file_index) + "!"))
+            record_end = CRIDecoder._decode_record(
+                shared_bytes, position, scratch_execution, expand_repeats=False,
+                varint_records=varint_records)
+            cri_contents[file_table[file_index]] += shared_bytes[position:record_end]
+            position = record_end
+
+        return {cri_filename: bytes(cri_content) for cri_filename, cri_content in cri_contents.items()}
+
+    @staticmethod
+    def decode_shared_bytes(shared_bytes: bytes) -> Dict[str, CRIData]:
+        """Decodes the content of a shared CRI file into the data of its source files by CRI filename"""
+        return {cri_filename: CRIDecoder.decode_bytes(cri_bytes)
+                for cri_filename, cri_bytes in CRIDecoder.split_shared_bytes(shared_bytes).items()}
+
+    @staticmethod
+    def split_shared_file(shared_path: str, output_path: str) -> List[str]:
+        """Writes the CRI files of all source files inside a shared CRI file to the output path.
+           Returns the paths of the written CRI files
+        """
+        with open(shared_path, 'rb') as shared_file_ptr:
+            cri_contents = CRIDecoder.split_shared_bytes(
+                shared_file_ptr.read())
+
+        cri_paths = list()
+        for cri_filename, cri_bytes in cri_contents.items():
+            cri_path = os.path.join(output_path, cri_filename)
+            with open(cri_path, 'wb') as cri_file_ptr:
+                cri_file_ptr.write(cri_bytes)
+            cri_paths.append(cri_path)
+        return cri_paths
+
+    @staticmethod
+    def resolve_mcdc_vector(cid_data: dict, mcdc_vector: Tuple[int, int, int, bool]) -> Dict[int, bool]:
+        """Maps a MC/DC vector to the condition marker ids of its decision.
+           Conditions, which weren't evaluated (short circuit), are left out
+        """
+        decision_marker_id, evaluated_mask, value_mask, _ = mcdc_vector
+        for mcdc_decision in cid_data["mcdc_data"]:
+            if mcdc_decision["decision_marker_id"] == decision_marker_id:
+                return {condition_marker_id: bool(value_mask >> condition_index & 1)
+                        for condition_index, condition_marker_id in enumerate(mcdc_decision["condition_marker_ids"])
+                        if evaluated_mask >> condition_index & 1}
+        raise(RuntimeError("Unknown MC/DC decision " + str(decision_marker_id) + "!"))
+
+    def decode(self) -> CRIData:
+        """Decodes the CRI file"""
+        with open(self.cri_path, 'rb') as cri_file_ptr:
+            return CRIDecoder.decode_bytes(cri_file_ptr.read())
+
+    @staticmethod
+    def resolve_counters(cid_data: dict, execution: CRIExecution) -> Dict[int, object]:
+        """Maps the counter table or bitmap of an execution to the markers of a CID.
+           Checkpoint markers get their hit count (bool in bitmap mode), evaluation markers
+           a (false, true) tuple of their outcome counts (bools in bitmap mode)
+        """
+        if execution.counters is not None:
+            def get_value(index):
+                return execution.counters[index]
+        elif execution.bitmap is not None:
+            def get_value(index):
+                return execution.is_bit_set(index)
+        else:
+            raise(RuntimeError("Execution contains neither counter table nor bitmap!"))
+
+        evaluation_marker_ids = set(evaluation_marker["evaluation_marker_id"]
+                                    for evaluation_marker in cid_data["marker_data"]["evaluation_markers"])
+
+        marker_values = dict()
+        for counter_index_data in cid_data["counter_data"]["counter_indices"]:
+            marker_id = counter_index_data["marker_id"]
+            counter_index = counter_index_data["counter_index"]
+            if marker_id in evaluation_marker_ids:
+                marker_values[marker_id] = (get_value(counter_index),
+                                            get_value(counter_index + 1))
+            else:
+                marker_values[marker_id] = get_value(counter_index)
+        return marker_values
+    # !SECTION
+# !SECTION
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""CRIMerger for Coveron Instrumenter.
+   Merges the CRI files of many processes (e.g. per-process CRI files)
+   into one CRI file per instrumented source file.
+"""
+
+import os
+import re
+import mmap
+import multiprocessing
+from typing import Dict, Iterator, List, Tuple
+
+from CRIDecoder import CRIDecoder
+
+
+# SECTION   CRIMergeGroup class
+class CRIMergeGroup:
+    """CRIMergeGroup class.
+       Stores the merged content of all CRI files with the same header
+    """
+
+    # SECTION   CRIMergeGroup private attribute definitions
+    __slots__ = ["header", "cri_filename", "file_count",
+                 "record_segments", "counter_tables", "bitmaps"]
+
+    header: bytes
+    cri_filename: str
+    file_count: int
+    # records of the trace and mcdc runtime mode get copied: (cri path, length of the complete records)
+    record_segments: List[Tuple[str, int]]
+    # counter tables and bitmaps get aggregated per execution comment (bitmaps as (bit count, bits))
+    counter_tables: Dict[str, List[int]]
+    bitmaps: Dict[str, Tuple[int, int]]
+    # !SECTION
+
+    # SECTION   CRIMergeGroup initialization
+    def __init__(self, header: bytes, cri_filename: str):
+        self.header = header
+        self.cri_filename = cri_filename
+        self.file_count = 0
+        self.record_segments = list()
+        self.counter_tables = dict()
+        self.bitmaps = dict()
+        return
+    # !SECTION
+
+    # SECTION   CRIMergeGroup public functions
+    def add_counter_table(self, comment: str, counters: List[int]):
+        """Adds the counters of an execution to the aggregated counter table of its comment"""
+        counter_table = self.counter_tables.get(comment)
+        if counter_table is None:
+            self.counter_tables[comment] = list(counters)
+            return
+        if len(counter_table) != len(counters):
+            raise(RuntimeError("Counter tables of " + self.cri_filename + " differ in size!"))
+        self.counter_tables[comment] = [counter + added_counter for counter, added_counter
+                                        in zip(counter_table, counters)]
+
+    def add_bitmap(self, comment: str, bit_count: int, bits: int):
+        """Adds the bits of an execution to the aggregated bitmap of its comment"""
+        bitmap = self.bitmaps.get(comment)
+        if bitmap is None:
+            self.bitmaps[comment] = (bit_count, bits)
+            return
+        if bitmap[0] != bit_count:
+            raise(RuntimeError("Bitmaps of " + self.cri_filename + " differ in size!"))
+        self.bitmaps[comment] = (bit_count, bitmap[1] | bits)
+
+    def add_group(self, merge_group: 'CRIMergeGroup'):
+        """Adds the content of another group with the same header"""
+        self.file_count += merge_group.file_count
+        self.record_segments += merge_group.record_segments
+        for comment, counters in merge_group.counter_tables.items():
+            self.add_counter_table(comment, counters)
+        for comment, (bit_count, bits) in merge_group.bitmaps.items():
+            self.add_bitmap(comment, bit_count, bits)
+    # !SECTION
+# !SECTION
+
+
+# SECTION   Worker functions
+def _merge_cri_files(cri_paths: List[str]) -> Dict[bytes, CRIMergeGroup]:
+    """Merges a chunk of CRI files into one group per header (runs inside a worker process)"""
+    merge_groups = dict()
+    for cri_path in cri_paths:
+        with open(cri_path, 'rb') as cri_file_ptr:
+            if os.fstat(cri_file_ptr.fileno()).st_size < CRIDecoder.HEADER_LENGTH:
+                raise(RuntimeError("Invalid CRI header in " + cri_path + "!"))
+            # the pages of the file get read on demand instead of loading the whole file
+            with mmap.mmap(cri_file_ptr.fileno(), 0, access=mmap.ACCESS_READ) as cri_bytes:
+                try:
+                    cri_data, complete_length = CRIDecoder.decode_tables(
+                        cri_bytes)
+                except RuntimeError as e:
+                    raise(RuntimeError(str(e) + " (" + cri_path + ")"))
+                header = cri_bytes[0:CRIDecoder.HEADER_LENGTH]
+
+        merge_group = merge_groups.get(header)
+        if merge_group is None:
+            merge_group = CRIMergeGroup(
+                header, CRIMerger.get_merged_filename(os.path.basename(cri_path)))
+            merge_groups[header] = merge_group
+        merge_group.file_count += 1
+
+        table_executions = [execution for execution in cri_data.executions
+                            if execution.counters is not None or execution.bitmap is not None]
+        if not table_executions:
+            merge_group.record_segments.append((cri_path, complete_length))
+        for execution in table_executions:
+            if execution.counters is not None:
+                merge_group.add_counter_table(
+                    execution.comment, execution.counters)
+            else:
+                merge_group.add_bitmap(execution.comment, execution.bit_count,
+                                       int.from_bytes(execution.bitmap, "little"))
+    return merge_groups
+# !SECTION
+
+
+# SECTION   CRIMerger class
+class CRIMerger:
+    """CRIMerger class.
+       Merges CRI files with the same header into one CRI file.
+       Marker records are copied, counter tables get summed up and bitmaps combined
+    """
+
+    # SECTION   CRIMerger private attribute definitions
+    __slots__ = ["jobs", "verbose"]
+
+    jobs: int
+    verbose: bool
+    # !SECTION
+
+    # SECTION   CRIMerger public attribute definitions
+    # per-process CRI files are named <name>.<pid>.<time>.<sequence>.cri by the runtime helper
+    PROCESS_SUFFIX_PATTERN = r"\.\d+\.\d+\.\d+\.cri$"
+    # number of CRI files handed to a worker process at once
+    MAX_CHUNK_SIZE = 64
+    # block size for copying the records of a CRI file
+    COPY_BLOCK_SIZE = 1024 * 1024
+    MAX_COUNTER_VALUE = 2 ** 64 - 1
+    # !SECTION
+
+    # SECTION   CRIMerger initialization
+    def __init__(self, jobs: int = 1, verbose: bool = False):
+        self.jobs = jobs
+        self.verbose = verbose
+        return
+    # !SECTION
+
+    # SECTION   CRIMerger private functions
+    def _merge_chunks(self, cri_paths: List[str]) -> Iterator[Dict[bytes, CRIMergeGroup]]:
+        """Merges the CRI files in chunks. Yields the groups of every chunk in input order"""
+        chunk_size = max(1, min(CRIMerger.MAX_CHUNK_SIZE,
+                                -(-len(cri_paths) // (self.jobs * 4))))
+        chunks = [cri_paths[chunk_start:chunk_start + chunk_size]
+                  for chunk_start in range(0, len(cri_paths), chunk_size)]
+
+        if self.jobs <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                yield _merge_cri_files(chunk)
+            return
+
+        with multiprocessing.Pool(processes=min(self.jobs, len(chunks))) as pool:
+            for merge_groups in pool.imap(_merge_cri_files, chunks):
+                yield merge_groups
+
+    @staticmethod
+    def _write_merge_group(merge_group: CRIMergeGroup, cri_path: str):
+        """Writes the merged CRI file of a group (replaced at once, so it may be one of the input files)"""
+        temporary_path = cri_path + ".merge"
+        with open(temporary_path, 'wb') as cri_file_ptr:
+            cri_file_ptr.write(merge_group.header)
+
+            # copy the records of all executions. In counter and bitmap mode, files without tables
+            # only contain executions, which crashed before exit
+            record_segments = merge_group.record_segments
+            if merge_group.counter_tables or merge_group.bitmaps:
+                record_segments = list()
+            for segment_path, complete_length in record_segments:
+                with open(segment_path, 'rb') as segment_file_ptr:
+                    segment_file_ptr.seek(CRIDecoder.HEADER_LENGTH)
+                    remaining_length = complete_length - CRIDecoder.HEADER_LENGTH
+                    while remaining_length > 0:
+                        block = segment_file_ptr.read(
+                            min(remaining_length, CRIMerger.COPY_BLOCK_SIZE))
+                        if not block:
+                            break
+                        cri_file_ptr.write(block)
+                        remaining_length -= len(block)
+
+            # one execution per comment with the aggregated table
+            for comment, counters in merge_group.counter_tables.items():
+                cri_file_ptr.write(CRIMerger._get_execution_marker(comment))
+                cri_file_ptr.write(CRIDecoder.RECORD_PADDING + CRIDecoder.COUNTER_TABLE_MAGIC +
+                                   len(counters).to_bytes(4, "big") +
+                                   b"".join(min(counter, CRIMerger.MAX_COUNTER_VALUE).to_bytes(8, "big")
+                                            for counter in counters))
+            for comment, (bit_count, bits) in merge_group.bitmaps.items():
+                cri_file_ptr.write(CRIMerger._get_execution_marker(comment))
+                cri_file_ptr.write(CRIDecoder.RECORD_PADDING + CRIDecoder.BITMAP_MAGIC +
+                                   bit_count.to_bytes(4, "big") +
+                                   bits.to_bytes((bit_count + 7) // 8, "little"))
+        os.replace(temporary_path, cri_path)
+
+    @staticmethod
+    def _get_execution_marker(comment: str) -> bytes:
+        return (CRIDecoder.RECORD_PADDING + CRIDecoder.EXECUTION_MAGIC +
+                comment.encode("utf-8") + b"\x00\n")
+    # !SECTION
+
+    # SECTION   CRIMerger public functions
+    @staticmethod
+    def get_merged_filename(cri_filename: str) -> str:
+        """Returns the filename of the merged CRI file (without the process suffix of per-process CRI files)"""
+        return re.sub(CRIMerger.PROCESS_SUFFIX_PATTERN, ".cri", cri_filename)
+
+    @staticmethod
+    def find_cri_files(input_paths: List[str]) -> List[str]:
+        """Returns the given CRI files and all per-process CRI files inside the given directories.
+           Other CRI files of a directory get skipped, so merged CRI files written into
+           the directory aren't merged again by the next run
+        """
+        cri_paths = list()
+        for input_path in input_paths:
+            if os.path.isdir(input_path):
+                cri_paths += sorted(os.path.join(input_path, filename)
+                                    for filename in os.listdir(input_path)
+                                    if re.search(CRIMerger.PROCESS_SUFFIX_PATTERN, filename))
+            else:
+                cri_paths.append(input_path)
+        return cri_paths
+
+    def merge(self, input_paths: List[str], output_path: str) -> List[str]:
+        """Merges all CRI files inside the input paths into one CRI file per header.
+           Returns the paths of the merged CRI files
+        """
+        cri_paths = CRIMerger.find_cri_files(input_paths)
+        if not cri_paths:
+            raise(RuntimeError("No CRI files found!"))
+
+        merge_groups = dict()
+        for chunk_groups in self._merge_chunks(cri_paths):
+            for header, chunk_group in chunk_groups.items():
+                if header in merge_groups:
+                    merge_groups[header].add_group(chunk_group)
+                else:
+                    merge_groups[header] = chunk_group
+
+        # files of different instrumentations of the same source file can't be merged
+        cri_filenames = [merge_group.cri_filename for merge_group in merge_groups.values()]
+        for cri_filename in cri_filenames:
+            if cri_filenames.count(cri_filename) > 1:
+                raise(RuntimeError(cri_filename + " was written by different instrumentations!"))
+
+        merged_paths = list()
+        for merge_group in merge_groups.values():
+            merged_path = os.path.join(output_path, merge_group.cri_filename)
+            if self.verbose:
+                print("Merging " + str(merge_group.file_count) +
+                      " CRI files into " + merged_path)
+            CRIMerger._write_merge_group(merge_group, merged_path)
+            merged_paths.append(merged_path)
+        return merged_paths
+    # !SECTION
+# !SECTION
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""CacheManifest for Coveron Instrumenter.
+   Small sidecar file next to the CID, which allows to decide
+   cache hits by comparing file stats only.
+"""
+
+import os
+import json
+import hashlib
+
+from typing import List
+
+from Configuration import SourceFile, Configuration
+
+
+# SECTION   CacheManifest class
+class CacheManifest:
+    """CacheManifest class.
+       Stores size, mtime and hash of an instrumented source file, the stats of its included files
+       and the fingerprint of the configuration used for its instrumentation
+    """
+
+    # SECTION   CacheManifest private attribute definitions
+    __slots__ = ['config', 'source_file', 'manifest_path']
+
+    config: Configuration
+    source_file: SourceFile
+    manifest_path: str
+    # !SECTION
+
+    # SECTION   CacheManifest public attribute definitions
+    MANIFEST_VERSION = 2
+    # !SECTION
+
+    # SECTION   CacheManifest initialization
+    def __init__(self, config: Configuration, source_file: SourceFile):
+        self.config = config
+        self.source_file = source_file
+        self.manifest_path = os.path.join(config.output_abs_path,
+                                          source_file.cid_file + ".manifest")
+        return
+    # !SECTION
+
+    # SECTION   CacheManifest getter functions
+    # !SECTION
+
+    # SECTION   CacheManifest setter functions
+    # !SECTION
+
+    # SECTION   CacheManifest property definitions
+    # !SECTION
+
+    # SECTION   CacheManifest private functions
+    def _get_cid_path(self) -> str:
+        return os.path.join(self.config.output_abs_path, self.source_file.cid_file)
+
+    def _load(self):
+        """Loads the manifest. Returns None, if it doesn't exist or is broken"""
+        try:
+            with open(self.manifest_path, 'r') as manifest_file_ptr:
+                manifest_data = json.load(manifest_file_ptr)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(manifest_data, dict) or \
+                manifest_data.get("version") != CacheManifest.MANIFEST_VERSION:
+            return None
+        return manifest_data
+
+    def _write(self, manifest_data: dict):
+        tmp_manifest_path = self.manifest_path + ".tmp" + str(os.getpid())
+        with open(tmp_manifest_path, 'w') as manifest_file_ptr:
+            json.dump(manifest_data, manifest_file_ptr)
+        os.replace(tmp_manifest_path, self.manifest_path)
+    # !SECTION
+
+    # SECTION   CacheManifest public functions
+    @staticmethod
+    def get_stat_entry(file_path: str):
+        """Returns [size, mtime_ns] of a file or None, if it doesn't exist"""
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        return [file_stat.st_size, file_stat.st_mtime_ns]
+
+    @staticmethod
+    def hash_source_code(source_code: str) -> str:
+        """Returns the source code hash the same way CIDManager computes it"""
+        return hashlib.sha256(source_code.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_source_file(input_file: str) -> str:
+        with open(input_file, 'r') as source_file_ptr:
+            return CacheManifest.hash_source_code(source_file_ptr.read())
+
+    def is_up_to_date(self) -> bool:
+        """Checks, if the instrumented source file and the CID belong to the current source file
+           and configuration. Only stats files, unless the source file was touched without changes.
+        """
+        manifest_data = self._load()
+        if manifest_data is None:
+            return False
+
+        if manifest_data["config_fingerprint"] != self.config.get_fingerprint():
+            return False
+
+        # the outputs must still be the ones written together with the manifest
+        if CacheManifest.get_stat_entry(self.source_file.output_file) != manifest_data["output_stat"] or \
+                CacheManifest.get_stat_entry(self._get_cid_path()) != manifest_data["cid_stat"]:
+            return False
+
+        # included files are only checked by their stats
+        for dependency_path, dependency_stat in manifest_data["dependency_stats"]:
+            if CacheManifest.get_stat_entry(dependency_path) != dependency_stat:
+                return False
+
+        source_stat = CacheManifest.get_stat_entry(
+            self.source_file.input_file)
+        if source_stat is None:
+            return False
+        if source_stat == manifest_data["source_stat"]:
+            return True
+
+        # only the mtime changed (touch, checkout, ...): compare the hash and refresh the manifest
+        if source_stat[0] != manifest_data["source_stat"][0]:
+            return False
+        if CacheManifest.hash_source_file(self.source_file.input_file) != manifest_data["source_code_hash"]:
+            return False
+        manifest_data["source_stat"] = source_stat
+        try:
+            self._write(manifest_data)
+        except OSError:
+            pass
+        return True
+
+    def write(self, source_stat: list, source_code_hash: str, dependencies: List[str]):
+        """Writes the manifest. Has to be called after the CID and the instrumented source file were written.
+           The source stat has to be taken before the source file was read.
+        """
+        self._write(dict(version=CacheManifest.MANIFEST_VERSION,
+                         source_stat=source_stat,
+                         source_code_hash=source_code_hash,
+                         dependency_stats=[[dependency_path, CacheManifest.get_stat_entry(dependency_path)]
+                                           for dependency_path in dependencies],
+                         config_fingerprint=self.config.get_fingerprint(),
+                         output_stat=CacheManifest.get_stat_entry(
+                             self.source_file.output_file),
+                         cid_stat=CacheManifest.get_stat_entry(self._get_cid_path())))
+
+    def remove(self):
+        """Removes the manifest, so a partially written instrumentation never counts as cached"""
+        try:
+            os.remove(self.manifest_path)
+        except FileNotFoundError:
+            pass
+    # !SECTION
+# !SECTION
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""CompilerPipeline for Coveron Instrumenter.
+   Compiles every instrumented source file to an object file as soon as
+   it is written and links all objects in a final step.
+"""
+
+import os
+import shutil
+import tempfile
+import subprocess
+import concurrent.futures
+import colorama
+
+from typing import List, Tuple
+
+from Configuration import SourceFile, Configuration
+
+
+# SECTION   CompileResult class
+class CompileResult:
+    """CompileResult class.
+       Stores the outcome of a single compiler call
+    """
+
+    # SECTION   CompileResult private attribute definitions
+    __slots__ = ["input_file", "returncode", "output"]
+
+    input_file: str
+    returncode: int
+    output: str
+    # !SECTION
+
+    # SECTION   CompileResult initialization
+    def __init__(self, input_file: str, returncode: int, output: str):
+        self.input_file = input_file
+        self.returncode = returncode
+        self.output = output
+        return
+    # !SECTION
+# !SECTION
+
+
+# SECTION   CompilerPipeline class
+class CompilerPipeline:
+    """CompilerPipeline class.
+       Runs the per-file compiler calls on a bounded pool and links the objects
+    """
+
+    # SECTION   CompilerPipeline private attribute definitions
+    __slots__ = ["config", "runtime_helper_source_path",
+                 "_executor", "_jobs", "_temp_dir"]
+
+    config: Configuration
+    runtime_helper_source_path: str
+    _executor: concurrent.futures.ThreadPoolExecutor
+    _jobs: List[Tuple[str, concurrent.futures.Future]]
+    _temp_dir: str
+    # !SECTION
+
+    # SECTION   CompilerPipeline public attribute definitions
+    # !SECTION
+
+    # SECTION   CompilerPipeline initialization
+    def __init__(self, config: Configuration, runtime_helper_source_path: str):
+        self.config = config
+        self.runtime_helper_source_path = runtime_helper_source_path
+
+        # the compiler calls run as separate processes, so threads are enough to keep them busy
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, config.compile_jobs))
+        self._jobs = list()
+
+        # the runtime helper object is private to this pipeline run,
+        # so parallel builds don't overwrite each other's helper object
+        self._temp_dir = tempfile.mkdtemp(prefix="coveron_")
+        self._submit_compile(runtime_helper_source_path,
+                             runtime_helper_source_path,
+                             os.path.join(self._temp_dir, "coveron_helper.o"))
+        return
+    # !SECTION
+
+    # SECTION   CompilerPipeline getter functions
+    # !SECTION
+
+    # SECTION   CompilerPipeline setter functions
+    # !SECTION
+
+    # SECTION   CompilerPipeline property definitions
+    # !SECTION
+
+    # SECTION   CompilerPipeline private functions
+    def _run_compiler(self, input_file: str, command_string: str) -> CompileResult:
+        """Runs a single compiler call and captures its output"""
+        if self.config.verbose:
+            print(command_string)
+        compiler_process = subprocess.run(command_string, shell=True,
+                                          stdout=subprocess.PIPE,
+                                          stderr=subprocess.STDOUT)
+        return CompileResult(input_file, compiler_process.returncode,
+                             compiler_process.stdout.decode("utf-8", errors="replace"))
+
+    def _submit_compile(self, input_file: str, compile_file: str, object_file: str):
+        """Queues the compilation of a single file to an object file"""
+        command_string = " ".join([self.config.compiler_exec,
+                                   self.config.compiler_args,
+                                   "-c", compile_file,
+                                   "-o", object_file])
+        self._jobs.append((object_file, self._executor.submit(
+            self._run_compiler, input_file, command_string)))
+    # !SECTION
+
+    # SECTION   CompilerPipeline public functions
+    def submit(self, source_file: SourceFile):
+        """Starts the compilation of an instrumented source file"""
+        self._submit_compile(source_file.input_file,
+                             source_file.output_file,
+                             source_file.object_file)
+
+    def finish(self) -> int:
+        """Waits for all compiler calls and links the objects.
+           Returns the returncode of the failed step or the linker
+        """
+        failed_results = list()
+        object_files = list()
+
+        # outputs get printed in submission order, so the log doesn't depend on scheduling
+        for object_file, job in self._jobs:
+            compile_result = job.result()
+            if compile_result.output:
+                print(compile_result.output, end="")
+            if compile_result.returncode != 0:
+                failed_results.append(compile_result)
+            object_files.append(object_file)
+
+        if failed_results:
+            for compile_result in failed_results:
+                print(colorama.Fore.RED + "COVERON ERROR: Compilation of " +
+                      compile_result.input_file + " failed!" + colorama.Fore.RESET)
+            return failed_results[0].returncode
+
+        # link the objects (user objects first, runtime helper last)
+        command_string = " ".join([self.config.compiler_exec,
+                                   self.config.compiler_args,
+                                   self.config.compiler_output_args,
+                                   ' '.join(object_files[1:]),
+                                   object_files[0]])
+        link_result = self._run_compiler("link step", command_string)
+        if link_result.output:
+            print(link_result.output, end="")
+        if link_result.returncode != 0:
+            print(colorama.Fore.RED + "COVERON ERROR: Linking failed!" +
+                  colorama.Fore.RESET)
+        return link_result.returncode
+
+    def close(self):
+        """Waits for pending compiler calls and removes the temporary files"""
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+    # !SECTION
+# !SECTION
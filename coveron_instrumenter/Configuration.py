@@ -12,8 +12,30 @@
 """
 
 import argparse
+import sys
 import os.path
-from typing import List
+import json
+import hashlib
+from enum import Enum
+from typing import Dict, List
+
+
+# SECTION   RuntimeMode
+class RuntimeMode(str, Enum):
+    """Enum for the way the instrumented code records marker hits"""
+    TRACE = "trace"  # every marker hit gets written to the CRI file
+    COUNTER = "counter"  # marker hits get counted and written once at exit
+    BITMAP = "bitmap"  # one bit per checkpoint and evaluation outcome, written once at exit
+    MCDC = "mcdc"  # like trace, but decisions write one record with the vector of their conditions
+# !SECTION
+
+
+# SECTION   CIDFormat
+class CIDFormat(str, Enum):
+    """Enum for the file format of the CID files"""
+    JSON = "json"  # JSON document (gzip compressed unless nocomp_cid is set)
+    BINARY = "binary"  # fixed width columns and a string table (see BinaryCID)
+# !SECTION
 
 
 # SECTION   SourceFile class
@@ -24,11 +46,12 @@ class SourceFile:
 
     # SECTION   SourceFile private attribute definitions
     __slots__ = ['_input_file', '_input_tmp_file',
-                 '_output_file', '_cid_file', '_cri_file']
+                 '_output_file', '_object_file', '_cid_file', '_cri_file']
 
     _input_file: str
     _input_tmp_file: str
     _output_file: str
+    _object_file: str
     _cid_file: str
     _cri_file: str
     # !SECTION
@@ -46,6 +69,10 @@ class SourceFile:
             '.')] + ".instr" + self._input_file[self._input_file.rindex(
                 '.'):]
 
+        # determine object file name for pipelined compilation
+        self._object_file = self._input_file[0:self._input_file.rindex(
+            '.')] + ".instr.o"
+
         # determine temporary input source name for parsing
         self._input_tmp_file = self._input_file[0:self._input_file.rindex(
             '.')] + ".tmp" + self._input_file[self._input_file.rindex(
@@ -73,6 +100,9 @@ class SourceFile:
     def _get_output_file(self) -> str:
         return self._output_file
 
+    def _get_object_file(self) -> str:
+        return self._object_file
+
     def _get_cid_file(self) -> str:
         return self._cid_file
 
@@ -90,6 +120,8 @@ class SourceFile:
                                    doc="Stores the file path for the temporary input source file")
     output_file: str = property(fget=_get_output_file,
                                 doc="Stores the output file path of the instrumented source file")
+    object_file: str = property(fget=_get_object_file,
+                                doc="Stores the object file path of the compiled instrumented source file")
     cid_file: str = property(fget=_get_cid_file,
                              doc="Stores the output file path of the CID file")
     cri_file: str = property(fget=_get_cri_file,
@@ -114,12 +146,33 @@ class Configuration:
     __slots__ = ["verbose",
                  "force",
                  "nocomp_cid",
+                 "cid_format",
+                 "cid_compression_level",
                  "poll_ppd",
+                 "jobs",
+                 "pipeline",
+                 "compile_jobs",
+                 "cache_dir",
+                 "instr_cache",
+                 "instr_cache_size",
+                 "serve",
+                 "daemon_socket_path",
                  "checkpoint_markers_enabled",
                  "evaluation_markers_enabled",
+                 "runtime_mode",
+                 "mcdc_dedupe",
+                 "write_buffer_size",
+                 "thread_safe",
+                 "shared_cri_file",
+                 "mmap_tables",
+                 "per_process_cri",
+                 "trace_rle",
+                 "varint_records",
+                 "first_hit",
                  "source_files",
                  "compiler_exec",
                  "_compiler_args",
+                 "compiler_output_args",
                  "clang_args",
                  "runtime_helper_header_path",
                  "output_abs_path"]
@@ -127,18 +180,45 @@ class Configuration:
     verbose: bool
     force: bool
     nocomp_cid: bool
+    cid_format: CIDFormat
+    cid_compression_level: int
     poll_ppd: bool
+    jobs: int
+    pipeline: bool
+    compile_jobs: int
+    cache_dir: str
+    instr_cache: bool
+    instr_cache_size: int
+    serve: bool
+    daemon_socket_path: str
     checkpoint_markers_enabled: bool
     evaluation_markers_enabled: bool
+    runtime_mode: RuntimeMode
+    mcdc_dedupe: bool
+    write_buffer_size: int
+    thread_safe: bool
+    shared_cri_file: str
+    mmap_tables: bool
+    per_process_cri: bool
+    trace_rle: bool
+    varint_records: bool
+    first_hit: bool
     source_files: list
     compiler_exec: str
     _compiler_args: str
+    compiler_output_args: str
     clang_args: str
     runtime_helper_header_path: str
     output_abs_path: str
     # !SECTION
 
     # SECTION   Configuration public attribute definitions
+    # default size of the runtime helper write buffer in bytes (see coveron_helper.h)
+    DEFAULT_WRITE_BUFFER_SIZE = 64 * 1024
+    # gzip compression level of the CID files (same as the gzip module default)
+    DEFAULT_CID_COMPRESSION_LEVEL = 9
+    # hashes of get_tool_hash by runtime helper header path and the stat of the runtime helper
+    _tool_hashes: Dict[str, str] = dict()
     # !SECTION
 
     # SECTION Configuration initialization
@@ -147,12 +227,33 @@ class Configuration:
         self.verbose = False
         self.force = False
         self.nocomp_cid = False
+        self.cid_format = CIDFormat.JSON
+        self.cid_compression_level = Configuration.DEFAULT_CID_COMPRESSION_LEVEL
         self.poll_ppd = False
+        self.jobs = 1
+        self.pipeline = False
+        self.compile_jobs = 1
+        self.cache_dir = ""
+        self.instr_cache = False
+        self.instr_cache_size = 1024 * 1024 * 1024
+        self.serve = False
+        self.daemon_socket_path = ""
         self.checkpoint_markers_enabled = True
         self.evaluation_markers_enabled = False
+        self.runtime_mode = RuntimeMode.TRACE
+        self.mcdc_dedupe = False
+        self.write_buffer_size = Configuration.DEFAULT_WRITE_BUFFER_SIZE
+        self.thread_safe = False
+        self.shared_cri_file = ""
+        self.mmap_tables = False
+        self.per_process_cri = False
+        self.trace_rle = False
+        self.varint_records = False
+        self.first_hit = False
         self.source_files = list()
         self.compiler_exec = ""
         self.compiler_args = ""
+        self.compiler_output_args = ""
         self.clang_args = ""
         self.runtime_helper_header_path = ""
         # default output path is the current working path
@@ -172,6 +273,33 @@ class Configuration:
             compiler_args += " -D___COVERON_CHECKPOINT_ANALYSIS_ENABLED"
         if self.evaluation_markers_enabled:
             compiler_args += " -D___COVERON_EVALUATION_ANALYSIS_ENABLED"
+        if self.runtime_mode == RuntimeMode.COUNTER:
+            compiler_args += " -D___COVERON_COUNTER_MODE_ENABLED"
+        if self.runtime_mode == RuntimeMode.BITMAP:
+            compiler_args += " -D___COVERON_BITMAP_MODE_ENABLED"
+        if self.runtime_mode == RuntimeMode.MCDC:
+            compiler_args += " -D___COVERON_MCDC_MODE_ENABLED"
+            if self.mcdc_dedupe:
+                compiler_args += " -D___COVERON_MCDC_DEDUPE_ENABLED"
+        if self.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC) and \
+                self.write_buffer_size != Configuration.DEFAULT_WRITE_BUFFER_SIZE:
+            compiler_args += " -DCOVERON_WRITE_BUFFER_SIZE=" + \
+                str(self.write_buffer_size)
+        if self.thread_safe:
+            compiler_args += " -pthread -D___COVERON_THREAD_SAFE_ENABLED"
+        if self.shared_cri_file:
+            compiler_args += " -D___COVERON_SHARED_WRITER_ENABLED -DCOVERON_SHARED_CRI_FILE=\\\"" + \
+                self.shared_cri_file + "\\\""
+        if self.mmap_tables:
+            compiler_args += " -D___COVERON_MMAP_TABLES_ENABLED"
+        if self.per_process_cri:
+            compiler_args += " -D___COVERON_PER_PROCESS_CRI_ENABLED"
+        if self.trace_rle and self.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC):
+            compiler_args += " -D___COVERON_TRACE_RLE_ENABLED"
+        if self.varint_records and self.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC):
+            compiler_args += " -D___COVERON_VARINT_RECORDS_ENABLED"
+        if self.first_hit and self.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC):
+            compiler_args += " -D___COVERON_FIRST_HIT_ENABLED"
         self._compiler_args = compiler_args
     # !SECTION
 
@@ -185,18 +313,98 @@ class Configuration:
     # !SECTION
 
     # SECTION   Configuration public functions
+    @staticmethod
+    def get_tool_hash(runtime_helper_header_path: str) -> str:
+        """Returns a hash identifying the instrumenter version and the runtime helper.
+           The instrumenter modules get hashed by content (frozen executables by size and mtime),
+           so also source trees and reinstalls without a new version number get another hash
+        """
+        helper_paths = [runtime_helper_header_path,
+                        os.path.join(os.path.dirname(runtime_helper_header_path), "coveron_helper.c")]
+        # the runtime helper can change while a daemon is running, so its stat is part of the key
+        helper_stats = list()
+        for helper_path in helper_paths:
+            try:
+                helper_stat = os.stat(helper_path)
+                helper_stats.append((helper_stat.st_size, helper_stat.st_mtime_ns))
+            except OSError:
+                helper_stats.append(None)
+        tool_hash_key = json.dumps([runtime_helper_header_path, helper_stats])
+
+        tool_hash = Configuration._tool_hashes.get(tool_hash_key)
+        if tool_hash is None:
+            tool_hash = hashlib.sha256()
+            if getattr(sys, 'frozen', False):
+                executable_stat = os.stat(sys.executable)
+                tool_hash.update(json.dumps([executable_stat.st_size,
+                                             executable_stat.st_mtime_ns]).encode('utf-8'))
+            instrumenter_dir = os.path.dirname(os.path.realpath(__file__))
+            tool_paths = sorted(os.path.join(instrumenter_dir, file_name)
+                                for file_name in os.listdir(instrumenter_dir)
+                                if file_name.endswith(".py"))
+
+            for tool_path in tool_paths + helper_paths:
+                tool_hash.update(os.path.basename(tool_path).encode('utf-8'))
+                try:
+                    with open(tool_path, 'rb') as tool_file_ptr:
+                        tool_hash.update(hashlib.sha256(tool_file_ptr.read()).digest())
+                except OSError:
+                    tool_hash.update(b"missing")
+            tool_hash = tool_hash.hexdigest()
+            Configuration._tool_hashes[tool_hash_key] = tool_hash
+        return tool_hash
+
+    def get_fingerprint(self) -> str:
+        """Returns a hash over all configuration values, which change the instrumentation result,
+           the instrumenter and the runtime helper (see get_tool_hash)
+        """
+        fingerprint_data = json.dumps([Configuration.get_tool_hash(self.runtime_helper_header_path),
+                                       self.nocomp_cid,
+                                       self.cid_format.value,
+                                       self.checkpoint_markers_enabled,
+                                       self.evaluation_markers_enabled,
+                                       self.runtime_mode.value,
+                                       self.write_buffer_size > 0,
+                                       self.shared_cri_file != "",
+                                       self.mmap_tables,
+                                       self.varint_records,
+                                       self.first_hit,
+                                       self.clang_args,
+                                       self.runtime_helper_header_path,
+                                       self.output_abs_path])
+        return hashlib.sha256(fingerprint_data.encode('utf-8')).hexdigest()
+
     def print_config(self):
         print("Verbose enabled: " + str(self.verbose))
         print("New Instrumentation enforced: " + str(self.force))
         print("CID-Compression disabled: " + str(self.nocomp_cid))
+        print("CID format: " + self.cid_format.value)
+        print("CID compression level: " + str(self.cid_compression_level))
         print("Output absolute path: " + self.output_abs_path)
         print("Poll PPDs from compiler: " + str(self.poll_ppd))
+        print("Instrumentation jobs: " + str(self.jobs))
+        print("Pipelined compilation: " + str(self.pipeline))
+        print("Compiler jobs: " + str(self.compile_jobs))
+        print("Cache directory: " + self.cache_dir)
+        print("Instrumentation cache enabled: " + str(self.instr_cache))
+        print("Instrumentation cache size: " + str(self.instr_cache_size))
         print("Checkpoint markers enabled: " +
               str(self.checkpoint_markers_enabled))
         print("Evaluation markers enabled: " +
               str(self.evaluation_markers_enabled))
-        print("Compile exec: " + self.compiler_exec)
+        print("Runtime mode: " + self.runtime_mode.value)
+        print("MC/DC vector deduplication: " + str(self.mcdc_dedupe))
+        print("Runtime write buffer size: " + str(self.write_buffer_size))
+        print("Thread safe runtime: " + str(self.thread_safe))
+        print("Shared CRI file: " + self.shared_cri_file)
+        print("Memory mapped tables: " + str(self.mmap_tables))
+        print("Per-process CRI files: " + str(self.per_process_cri))
+        print("Run-length encoded trace: " + str(self.trace_rle))
+        print("Varint marker records: " + str(self.varint_records))
+        print("First hit checkpoints: " + str(self.first_hit))
+        print("Compile exec: " + str(self.compiler_exec))
         print("Compiler pass thru arguments: " + self.compiler_args)
+        print("Compiler output arguments: " + self.compiler_output_args)
         print("Clang arguments: " + self.clang_args)
         print("Compile source files: " +
               ' '.join(source_file.input_file for source_file in self.source_files))
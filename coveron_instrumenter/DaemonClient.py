@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""DaemonClient for Coveron Instrumenter.
+   Forwards a compiler wrapper call to a running instrumentation daemon.
+   Kept free of libclang imports, so the client process starts fast.
+"""
+
+import os
+import sys
+import json
+import stat
+import socket
+import struct
+import tempfile
+
+from typing import List
+
+
+# SECTION   DaemonClient class
+class DaemonClient:
+    """DaemonClient class.
+       Sends the arguments of a wrapper call to the instrumentation daemon
+       and returns the daemon response
+    """
+
+    # SECTION   DaemonClient private attribute definitions
+    __slots__ = ['socket_path']
+
+    socket_path: str
+    # !SECTION
+
+    # SECTION   DaemonClient public attribute definitions
+    SOCKET_NAME = "coveron_instrumenter.sock"
+    # seconds to wait for the daemon, before the instrumentation falls back to run locally
+    CONNECT_TIMEOUT = 5.0
+    RESPONSE_TIMEOUT = 600.0
+    # peer credentials on macOS (struct xucred: version, uid, ...)
+    DARWIN_SOL_LOCAL = 0
+    DARWIN_LOCAL_PEERCRED = 0x001
+    DARWIN_XUCRED_SIZE = 76
+    # !SECTION
+
+    # SECTION   DaemonClient initialization
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        return
+    # !SECTION
+
+    # SECTION   DaemonClient getter functions
+    # !SECTION
+
+    # SECTION   DaemonClient setter functions
+    # !SECTION
+
+    # SECTION   DaemonClient property definitions
+    # !SECTION
+
+    # SECTION   DaemonClient private functions
+    @staticmethod
+    def _is_valid_response(response) -> bool:
+        """Checks the fields a client takes from the daemon. Everything else of the response is ignored"""
+        return (isinstance(response, dict) and
+                type(response.get('returncode')) is int and
+                isinstance(response.get('errors'), list) and
+                all(isinstance(error, str) for error in response['errors']) and
+                isinstance(response.get('output_files'), list) and
+                all(isinstance(output_file, str) for output_file in response['output_files']))
+    # !SECTION
+
+    # SECTION   DaemonClient public functions
+    @staticmethod
+    def is_supported() -> bool:
+        """Checks, if local (unix domain) sockets and their peer credentials are available on this platform"""
+        return hasattr(socket, "AF_UNIX") and (hasattr(socket, "SO_PEERCRED") or sys.platform == "darwin")
+
+    @staticmethod
+    def get_default_socket_path() -> str:
+        """Returns the default socket path (one daemon per user).
+           The socket is placed in the private runtime directory of the user,
+           or in a private directory of the user inside the temp directory
+        """
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime_dir and os.path.isdir(runtime_dir):
+            socket_dir = os.path.join(runtime_dir, "coveron_instrumenter")
+        else:
+            socket_dir = os.path.join(tempfile.gettempdir(),
+                                      "coveron_instrumenter_" + str(os.getuid()))
+        return os.path.join(socket_dir, DaemonClient.SOCKET_NAME)
+
+    @staticmethod
+    def is_private_dir(dir_path: str) -> bool:
+        """Checks, if the directory is owned by this user and not accessible by anyone else"""
+        try:
+            dir_stat = os.lstat(dir_path)
+        except OSError:
+            return False
+        return (stat.S_ISDIR(dir_stat.st_mode) and
+                dir_stat.st_uid == os.getuid() and
+                (dir_stat.st_mode & 0o077) == 0)
+
+    @staticmethod
+    def create_private_dir(dir_path: str):
+        """Creates the socket directory with mode 0700. Raises RuntimeError, if an existing one isn't private"""
+        os.makedirs(dir_path, mode=0o700, exist_ok=True)
+        if not DaemonClient.is_private_dir(dir_path):
+            raise(RuntimeError("The socket directory " + dir_path +
+                               " must be owned by the current user and only be accessible by them (mode 0700)!"))
+
+    @staticmethod
+    def get_peer_uid(connection: socket.socket):
+        """Returns the user id of the process on the other end of a local socket.
+           Returns None, if the platform doesn't report it.
+        """
+        if hasattr(socket, "SO_PEERCRED"):
+            credentials = connection.getsockopt(
+                socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+            _, peer_uid, _ = struct.unpack("3i", credentials)
+            return peer_uid
+        if sys.platform == "darwin":
+            credentials = connection.getsockopt(
+                DaemonClient.DARWIN_SOL_LOCAL, DaemonClient.DARWIN_LOCAL_PEERCRED,
+                DaemonClient.DARWIN_XUCRED_SIZE)
+            _, peer_uid = struct.unpack_from("2I", credentials)
+            return peer_uid
+        return None
+
+    @staticmethod
+    def is_trusted_peer(connection: socket.socket) -> bool:
+        """Checks, if the other end of a local socket runs as the same user"""
+        return DaemonClient.get_peer_uid(connection) == os.getuid()
+
+    @staticmethod
+    def get_daemon_socket_path(argv: List[str]):
+        """Returns the daemon socket path, if the arguments request forwarding to the daemon.
+           Otherwise None is returned.
+        """
+        if "--CVR_DAEMON" not in argv:
+            return None
+
+        socket_path = DaemonClient.get_default_socket_path()
+        for index, arg in enumerate(argv):
+            if arg.startswith("--CVR_DAEMON_SOCKET="):
+                socket_path = arg[len("--CVR_DAEMON_SOCKET="):]
+            elif arg == "--CVR_DAEMON_SOCKET" and index + 1 < len(argv):
+                socket_path = argv[index + 1]
+        return socket_path
+
+    @staticmethod
+    def send_message(connection: socket.socket, message: dict):
+        """Sends a message as a single line of JSON"""
+        connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+    @staticmethod
+    def receive_message(connection: socket.socket):
+        """Receives a single line of JSON. Returns None, if the connection was closed"""
+        with connection.makefile("rb") as connection_file:
+            message_line = connection_file.readline()
+        if not message_line:
+            return None
+        return json.loads(message_line.decode("utf-8"))
+
+    def request(self, argv: List[str], cwd: str):
+        """Lets the daemon instrument the source files of the given wrapper call.
+           Returns the daemon response (returncode, errors and output_files) or None,
+           if no trusted daemon answers in time.
+        """
+        if not DaemonClient.is_supported():
+            return None
+
+        # a socket in a directory others can write to might have been placed by another user
+        if not DaemonClient.is_private_dir(os.path.dirname(os.path.abspath(self.socket_path))):
+            return None
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(DaemonClient.CONNECT_TIMEOUT)
+                connection.connect(self.socket_path)
+                if not DaemonClient.is_trusted_peer(connection):
+                    return None
+                connection.settimeout(DaemonClient.RESPONSE_TIMEOUT)
+                DaemonClient.send_message(connection, dict(argv=argv, cwd=cwd))
+                response = DaemonClient.receive_message(connection)
+        except (OSError, ValueError):
+            # unreachable, hanging or broken daemons (timeouts are OSErrors, bad JSON ValueErrors)
+            return None
+
+        if not DaemonClient._is_valid_response(response):
+            return None
+        return dict(returncode=response['returncode'], errors=response['errors'],
+                    output_files=response['output_files'])
+    # !SECTION
+# !SECTION
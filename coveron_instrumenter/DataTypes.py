@@ -1109,6 +1109,146 @@ class CodeData:
 # !SECTION
 
 
+# SECTION   CounterIndexData class
+class CounterIndexData:
+    """CounterIndexData class.
+       Links a marker to its position in the counter array of the counter runtime mode
+    """
+
+    # SECTION   CounterIndexData private attribute definitions
+    __slots__ = ["marker_id", "counter_index"]
+
+    marker_id: int
+    counter_index: int
+    # !SECTION
+
+    # SECTION   CounterIndexData public attribute definitions
+    # !SECTION
+
+    # SECTION   CounterIndexData initialization
+    def __init__(self, marker_id: int, counter_index: int):
+        self.marker_id = marker_id
+        self.counter_index = counter_index
+        return
+    # !SECTION
+
+    # SECTION   CounterIndexData getter functions
+    # !SECTION
+
+    # SECTION   CounterIndexData setter functions
+    # !SECTION
+
+    # SECTION   CounterIndexData property definitions
+    # !SECTION
+
+    # SECTION   CounterIndexData private functions
+    # !SECTION
+
+    # SECTION   CounterIndexData public functions
+    def as_json(self):
+        # JSON encoding helper
+        return dict(
+            marker_id=self.marker_id,
+            counter_index=self.counter_index
+        )
+    # !SECTION
+# !SECTION
+
+
+# SECTION   CounterData class
+class CounterData:
+    """CounterData class.
+       Stores the layout of the counter array. Checkpoint markers use one counter,
+       evaluation markers two (false at counter_index, true at counter_index + 1)
+    """
+
+    # SECTION   CounterData private attribute definitions
+    __slots__ = ["counter_count", "counter_indices"]
+
+    counter_count: int
+    counter_indices: List[CounterIndexData]
+    # !SECTION
+
+    # SECTION   CounterData public attribute definitions
+    # !SECTION
+
+    # SECTION   CounterData initialization
+    def __init__(self):
+        self.counter_count = 0
+        self.counter_indices = list()
+        return
+    # !SECTION
+
+    # SECTION   CounterData getter functions
+    # !SECTION
+
+    # SECTION   CounterData setter functions
+    # !SECTION
+
+    # SECTION   CounterData property definitions
+    # !SECTION
+
+    # SECTION   CounterData private functions
+    # !SECTION
+
+    # SECTION   CounterData public functions
+    def as_json(self):
+        # JSON encoding helper
+        return dict(
+            counter_count=self.counter_count,
+            counter_indices=self.counter_indices
+        )
+    # !SECTION
+# !SECTION
+
+
+# SECTION   MCDCDecisionData class
+class MCDCDecisionData:
+    """MCDCDecisionData class.
+       Links a decision to its conditions for the mcdc runtime mode. Bit i of the
+       condition vectors written for the decision belongs to condition_marker_ids[i]
+    """
+
+    # SECTION   MCDCDecisionData private attribute definitions
+    __slots__ = ["decision_marker_id", "condition_marker_ids"]
+
+    decision_marker_id: int
+    condition_marker_ids: List[int]
+    # !SECTION
+
+    # SECTION   MCDCDecisionData public attribute definitions
+    # !SECTION
+
+    # SECTION   MCDCDecisionData initialization
+    def __init__(self, decision_marker_id: int, condition_marker_ids: List[int]):
+        self.decision_marker_id = decision_marker_id
+        self.condition_marker_ids = condition_marker_ids
+        return
+    # !SECTION
+
+    # SECTION   MCDCDecisionData getter functions
+    # !SECTION
+
+    # SECTION   MCDCDecisionData setter functions
+    # !SECTION
+
+    # SECTION   MCDCDecisionData property definitions
+    # !SECTION
+
+    # SECTION   MCDCDecisionData private functions
+    # !SECTION
+
+    # SECTION   MCDCDecisionData public functions
+    def as_json(self):
+        # JSON encoding helper
+        return dict(
+            decision_marker_id=self.decision_marker_id,
+            condition_marker_ids=self.condition_marker_ids
+        )
+    # !SECTION
+# !SECTION
+
+
 # SECTION   CIDData class
 class CIDData:
     """CIDData class.
@@ -1118,8 +1258,8 @@ class CIDData:
     # SECTION   CIDData private attribute definitions
     __slots__ = ['source_code_path', 'source_code_hash', 'source_code_base64',
                  'instrumentation_random', 'cri_path', 'checkpoint_markers_enabled',
-                 'evaluation_markers_enabled',
-                 'marker_data', 'code_data']
+                 'evaluation_markers_enabled', 'runtime_mode',
+                 'marker_data', 'code_data', 'counter_data', 'mcdc_data']
 
     source_code_path: str
     source_code_hash: str
@@ -1128,8 +1268,11 @@ class CIDData:
     cri_path: str
     checkpoint_markers_enabled: bool
     evaluation_markers_enabled: bool
+    runtime_mode: str
     marker_data: MarkerData
     code_data: CodeData
+    counter_data: CounterData
+    mcdc_data: List[MCDCDecisionData]
     # !SECTION
 
     # SECTION   CIDData public attribute definitions
@@ -1143,7 +1286,8 @@ class CIDData:
                  instrumentation_random: str,
                  cri_path: str,
                  checkpoint_markers_enabled: bool,
-                 evaluation_markers_enabled: bool):
+                 evaluation_markers_enabled: bool,
+                 runtime_mode: str = "trace"):
         self.source_code_path = source_code_path
         self.source_code_hash = source_code_hash
         self.source_code_base64 = source_code_base64
@@ -1151,8 +1295,11 @@ class CIDData:
         self.cri_path = cri_path
         self.checkpoint_markers_enabled = checkpoint_markers_enabled
         self.evaluation_markers_enabled = evaluation_markers_enabled
+        self.runtime_mode = runtime_mode
         self.marker_data = MarkerData()
         self.code_data = CodeData()
+        self.counter_data = CounterData()
+        self.mcdc_data = list()
         return
     # !SECTION
 
@@ -1174,13 +1321,17 @@ class CIDData:
         return dict(
             source_code_path=self.source_code_path,
             source_code_hash=self.source_code_hash,
-            source_code_base64=self.source_code_base64,
             instrumentation_random=self.instrumentation_random,
             cri_path=self.cri_path,
             checkpoint_markers_enabled=self.checkpoint_markers_enabled,
             evaluation_markers_enabled=self.evaluation_markers_enabled,
+            runtime_mode=self.runtime_mode,
+            # the header values come first, so CIDReader.read_header stops in front of the source code
+            source_code_base64=self.source_code_base64,
             marker_data=self.marker_data,
-            code_data=self.code_data
+            code_data=self.code_data,
+            counter_data=self.counter_data,
+            mcdc_data=self.mcdc_data
         )
     # !SECTION
 # !SECTION
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""InstrumentationCache for Coveron Instrumenter.
+   Content addressed store for instrumented source files and CIDs.
+   Entries are keyed by the source code, its resolved include dependencies
+   and the configuration fingerprint (clang args, marker switches, ...).
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+from typing import Dict, List
+
+from Configuration import SourceFile, Configuration
+from ProbeCache import ProbeCache
+
+
+# SECTION   InstrumentationCache class
+class InstrumentationCache:
+    """InstrumentationCache class.
+       Serves instrumentation results by hard-link (or copy) and evicts
+       the least recently used entries, if the store exceeds its size limit.
+       The total size is tracked in a size index file
+    """
+
+    # SECTION   InstrumentationCache private attribute definitions
+    __slots__ = ['config', 'cache_dir', 'max_size', '_dependency_hashes']
+
+    config: Configuration
+    cache_dir: str
+    max_size: int
+    _dependency_hashes: Dict[str, str]
+    # !SECTION
+
+    # SECTION   InstrumentationCache public attribute definitions
+    # file with the total size of the entries, so a store doesn't need to scan all entries
+    SIZE_INDEX_FILENAME = "size_index.json"
+    # eviction frees space down to this share of the size limit, so the next scans are far apart
+    EVICTION_TARGET = 0.9
+    # !SECTION
+
+    # SECTION   InstrumentationCache initialization
+    def __init__(self, config: Configuration):
+        self.config = config
+        self.cache_dir = os.path.join(
+            config.cache_dir or ProbeCache.get_default_cache_dir(), "instrumentation")
+        self.max_size = config.instr_cache_size
+        self._dependency_hashes = dict()
+        return
+    # !SECTION
+
+    # SECTION   InstrumentationCache getter functions
+    # !SECTION
+
+    # SECTION   InstrumentationCache setter functions
+    # !SECTION
+
+    # SECTION   InstrumentationCache property definitions
+    # !SECTION
+
+    # SECTION   InstrumentationCache private functions
+    def _get_source_key(self, source_file: SourceFile, source_code: str) -> str:
+        """Returns the key of the source file without its dependencies.
+           The paths are part of it, since they get written to the instrumented file and the CID
+        """
+        key_data = json.dumps([source_file.input_file,
+                               self.config.get_fingerprint(),
+                               hashlib.sha256(source_code.encode('utf-8')).hexdigest()])
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def _get_dependency_hash(self, dependency_path: str):
+        """Returns the content hash of a dependency or None, if it can't be read"""
+        if dependency_path not in self._dependency_hashes:
+            try:
+                with open(dependency_path, 'rb') as dependency_file_ptr:
+                    self._dependency_hashes[dependency_path] = hashlib.sha256(
+                        dependency_file_ptr.read()).hexdigest()
+            except OSError:
+                return None
+        return self._dependency_hashes[dependency_path]
+
+    def _get_result_key(self, source_key: str, dependency_hashes: List[List[str]]) -> str:
+        key_data = json.dumps([source_key, dependency_hashes])
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def _get_manifest_path(self, source_key: str) -> str:
+        return os.path.join(self.cache_dir, "manifests", source_key[:2], source_key + ".json")
+
+    def _get_entry_dir(self, result_key: str) -> str:
+        return os.path.join(self.cache_dir, "entries", result_key[:2], result_key)
+
+    def _load_manifest(self, source_key: str) -> list:
+        """Returns all known dependency sets of a source key"""
+        try:
+            with open(self._get_manifest_path(source_key), 'r') as manifest_file_ptr:
+                manifest_data = json.load(manifest_file_ptr)
+        except (OSError, ValueError):
+            return list()
+        return manifest_data if isinstance(manifest_data, list) else list()
+
+    def _write_atomic(self, target_path: str, write_function):
+        """Writes a file via a temporary file, so concurrent builds never read partial files"""
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp_file_handle, tmp_file_path = tempfile.mkstemp(
+            dir=os.path.dirname(target_path), suffix=".tmp")
+        try:
+            with os.fdopen(tmp_file_handle, 'wb') as tmp_file_ptr:
+                write_function(tmp_file_ptr)
+            os.replace(tmp_file_path, target_path)
+        except BaseException:
+            os.remove(tmp_file_path)
+            raise
+
+    @staticmethod
+    def _place_file(cached_path: str, target_path: str):
+        """Hard-links the cached file to the target path. Falls back to a copy (e.g. other file system)"""
+        if os.path.lexists(target_path):
+            os.remove(target_path)
+        try:
+            os.link(cached_path, target_path)
+        except OSError:
+            shutil.copyfile(cached_path, target_path)
+
+    def _get_cid_path(self, source_file: SourceFile) -> str:
+        return os.path.join(self.config.output_abs_path, source_file.cid_file)
+
+    def _get_entry_size(self, entry_dir: str) -> int:
+        entry_size = 0
+        for file_name in os.listdir(entry_dir):
+            entry_size += os.path.getsize(os.path.join(entry_dir, file_name))
+        return entry_size
+
+    def _get_size_index_path(self) -> str:
+        return os.path.join(self.cache_dir, InstrumentationCache.SIZE_INDEX_FILENAME)
+
+    def _read_total_size(self):
+        """Returns the total size of the entries from the size index or None, if there is no valid index"""
+        try:
+            with open(self._get_size_index_path(), 'r') as size_index_ptr:
+                total_size = json.load(size_index_ptr).get("total_size")
+        except (OSError, ValueError, AttributeError):
+            return None
+        return total_size if isinstance(total_size, int) else None
+
+    def _write_total_size(self, total_size: int):
+        self._write_atomic(self._get_size_index_path(),
+                           lambda file_ptr: file_ptr.write(json.dumps(dict(total_size=total_size)).encode('utf-8')))
+
+    def _add_to_total_size(self, entry_size: int):
+        """Adds a new entry to the size index. Only scans the store, if the index is missing
+           or the size limit is exceeded. Updates of concurrent builds may get lost in between,
+           the next scan corrects the index
+        """
+        total_size = self._read_total_size()
+        if total_size is None or total_size + entry_size > self.max_size:
+            self._evict()
+        else:
+            self._write_total_size(total_size + entry_size)
+
+    def _evict(self):
+        """Removes the least recently used entries, until the store fits into its size limit.
+           Writes the scanned total size into the size index
+        """
+        entries_dir = os.path.join(self.cache_dir, "entries")
+        entries = list()
+        total_size = 0
+        for root_path, dir_names, file_names in os.walk(entries_dir):
+            if root_path == entries_dir or file_names == []:
+                continue
+            try:
+                entry_size = self._get_entry_size(root_path)
+                entries.append((os.stat(root_path).st_mtime_ns,
+                                entry_size, root_path))
+            except OSError:
+                # removed by a concurrent eviction
+                continue
+            total_size += entry_size
+
+        if total_size > self.max_size:
+            # remove oldest entries first. The last use gets recorded as mtime of the entry directory
+            for _, entry_size, entry_dir in sorted(entries):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total_size -= entry_size
+                if total_size <= self.max_size * InstrumentationCache.EVICTION_TARGET:
+                    break
+        self._write_total_size(total_size)
+    # !SECTION
+
+    # SECTION   InstrumentationCache public functions
+    @staticmethod
+    def get_dependencies(clang_tree) -> List[str]:
+        """Returns the resolved include dependencies of a parsed translation unit"""
+        return sorted(set(os.path.abspath(file_inclusion.include.name)
+                          for file_inclusion in clang_tree.translation_unit.get_includes()))
+
+    def lookup(self, source_file: SourceFile, source_code: str):
+        """Places the cached instrumented file and CID, if an entry for the current source, its
+           dependencies and the configuration exists. Returns the dependencies on a hit, otherwise None.
+        """
+        source_key = self._get_source_key(source_file, source_code)
+
+        for dependencies in self._load_manifest(source_key):
+            dependency_hashes = [[dependency_path, self._get_dependency_hash(dependency_path)]
+                                 for dependency_path in dependencies]
+            if any(dependency_hash is None for _, dependency_hash in dependency_hashes):
+                continue
+
+            entry_dir = self._get_entry_dir(
+                self._get_result_key(source_key, dependency_hashes))
+            try:
+                InstrumentationCache._place_file(os.path.join(entry_dir, "instr"),
+                                                 source_file.output_file)
+                InstrumentationCache._place_file(os.path.join(entry_dir, "cid"),
+                                                 self._get_cid_path(source_file))
+                # mark as recently used (the directory, so the mtime of hard-linked outputs stays untouched)
+                os.utime(entry_dir)
+            except OSError:
+                # evicted or incomplete entry
+                continue
+            return dependencies
+        return None
+
+    def store(self, source_file: SourceFile, source_code: str, dependencies: List[str]):
+        """Stores the instrumented file and CID of a source file"""
+        source_key = self._get_source_key(source_file, source_code)
+        dependency_hashes = [[dependency_path, self._get_dependency_hash(dependency_path)]
+                             for dependency_path in dependencies]
+        if any(dependency_hash is None for _, dependency_hash in dependency_hashes):
+            return
+
+        try:
+            # the entry gets filled in a temporary directory and renamed, so it appears complete or not at all
+            entry_dir = self._get_entry_dir(
+                self._get_result_key(source_key, dependency_hashes))
+            if not os.path.isdir(entry_dir):
+                os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+                tmp_entry_dir = tempfile.mkdtemp(
+                    dir=os.path.dirname(entry_dir))
+                shutil.copyfile(source_file.output_file,
+                                os.path.join(tmp_entry_dir, "instr"))
+                shutil.copyfile(self._get_cid_path(source_file),
+                                os.path.join(tmp_entry_dir, "cid"))
+                entry_size = self._get_entry_size(tmp_entry_dir)
+                try:
+                    os.rename(tmp_entry_dir, entry_dir)
+                except OSError:
+                    # stored by a concurrent build in the meantime
+                    shutil.rmtree(tmp_entry_dir, ignore_errors=True)
+                else:
+                    self._add_to_total_size(entry_size)
+
+            # remember this dependency set for the source key
+            manifest_data = self._load_manifest(source_key)
+            if dependencies not in manifest_data:
+                manifest_data.append(dependencies)
+                self._write_atomic(self._get_manifest_path(source_key),
+                                   lambda file_ptr: file_ptr.write(json.dumps(manifest_data).encode('utf-8')))
+        except OSError:
+            # a cache, which can't be written, only costs another instrumentation next time
+            pass
+    # !SECTION
+# !SECTION
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""InstrumentationDaemon for Coveron Instrumenter.
+   Long-lived process, which keeps libclang loaded and instruments
+   the source files of compiler wrapper calls forwarded by DaemonClient.
+"""
+
+import os
+import socket
+import socketserver
+
+from Parser import ClangBridge
+from Configuration import Configuration
+from ArgumentHandler import ArgumentHandler
+from DaemonClient import DaemonClient
+from JobManager import instrument_source_file
+
+
+# SECTION   DaemonServer class
+class DaemonServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """DaemonServer class.
+       Handles every client connection in a forked child, which inherits the loaded libclang.
+       So requests of parallel builds get instrumented concurrently
+    """
+
+    # SECTION   DaemonServer public attribute definitions
+    max_children = os.cpu_count() or 1
+    # !SECTION
+# !SECTION
+
+
+# SECTION   DaemonRequestHandler class
+class DaemonRequestHandler(socketserver.BaseRequestHandler):
+    """DaemonRequestHandler class.
+       Handles a single client connection of the instrumentation daemon
+    """
+
+    # SECTION   DaemonRequestHandler public functions
+    def handle(self):
+        # only clients of the user running the daemon get served
+        if not DaemonClient.is_trusted_peer(self.request):
+            return
+        try:
+            request = DaemonClient.receive_message(self.request)
+        except ValueError:
+            return
+        if request is None:
+            return
+        response = self.server.instrumentation_daemon.handle_request(request)
+        DaemonClient.send_message(self.request, response)
+    # !SECTION
+# !SECTION
+
+
+# SECTION   InstrumentationDaemon class
+class InstrumentationDaemon:
+    """InstrumentationDaemon class.
+       Serves instrumentation requests on a local socket
+    """
+
+    # SECTION   InstrumentationDaemon private attribute definitions
+    __slots__ = ['config', 'runtime_helper_header_path',
+                 '_clang_bridge', '_server']
+
+    config: Configuration
+    runtime_helper_header_path: str
+    _clang_bridge: ClangBridge
+    _server: socketserver.BaseServer
+    # !SECTION
+
+    # SECTION   InstrumentationDaemon public attribute definitions
+    # !SECTION
+
+    # SECTION   InstrumentationDaemon initialization
+    def __init__(self, config: Configuration, runtime_helper_header_path: str):
+        if not DaemonClient.is_supported():
+            raise(RuntimeError(
+                "The instrumentation daemon needs local socket support, which isn't available on this platform!"))
+
+        self.config = config
+        self.runtime_helper_header_path = runtime_helper_header_path
+
+        # load libclang once. The index is kept for all requests
+        self._clang_bridge = ClangBridge()
+        self._server = None
+        return
+    # !SECTION
+
+    # SECTION   InstrumentationDaemon getter functions
+    # !SECTION
+
+    # SECTION   InstrumentationDaemon setter functions
+    # !SECTION
+
+    # SECTION   InstrumentationDaemon property definitions
+    # !SECTION
+
+    # SECTION   InstrumentationDaemon private functions
+    def _remove_stale_socket(self):
+        """Removes a socket file left behind by a daemon that doesn't run anymore"""
+        socket_path = self.config.daemon_socket_path
+        if not os.path.exists(socket_path):
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            try:
+                connection.connect(socket_path)
+            except ConnectionError:
+                os.remove(socket_path)
+                return
+        raise(RuntimeError("An instrumentation daemon already listens on " + socket_path))
+    # !SECTION
+
+    # SECTION   InstrumentationDaemon public functions
+    def handle_request(self, request: dict) -> dict:
+        """Instruments the source files of a forwarded wrapper call"""
+        # the client builds the compiler call from its own arguments
+        response = dict(returncode=0, errors=list(), output_files=list())
+
+        try:
+            if not (isinstance(request.get('cwd'), str) and os.path.isabs(request['cwd']) and
+                    isinstance(request.get('argv'), list) and
+                    all(isinstance(arg, str) for arg in request['argv'])):
+                raise(RuntimeError("Malformed request!"))
+
+            # relative paths of the wrapper call get resolved against the directory of the client.
+            # The working directory of the daemon is shared by all requests and stays untouched
+            config = Configuration()
+            ArgumentHandler(config, request['argv'], cwd=request['cwd'])
+            config.runtime_helper_header_path = self.runtime_helper_header_path
+
+            if not os.path.exists(config.output_abs_path):
+                os.makedirs(config.output_abs_path)
+
+            for source_file in config.source_files:
+                instrument_source_file(config, self._clang_bridge, source_file)
+                response['output_files'].append(source_file.output_file)
+        except (Exception, SystemExit) as e:
+            # argparse exits on bad arguments, which must not stop the daemon
+            response['returncode'] = 1
+            response['errors'].append(str(e))
+
+        return response
+
+    def serve_forever(self):
+        """Listens on the configured socket until the daemon gets interrupted"""
+        DaemonClient.create_private_dir(os.path.dirname(
+            os.path.abspath(self.config.daemon_socket_path)))
+        self._remove_stale_socket()
+
+        self._server = DaemonServer(
+            self.config.daemon_socket_path, DaemonRequestHandler)
+        self._server.instrumentation_daemon = self
+
+        if self.config.verbose:
+            print("Instrumentation daemon listening on " +
+                  self.config.daemon_socket_path)
+
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.config.daemon_socket_path):
+                os.remove(self.config.daemon_socket_path)
+
+    def shutdown(self):
+        """Stops serve_forever from another thread"""
+        if self._server is not None:
+            self._server.shutdown()
+    # !SECTION
+# !SECTION
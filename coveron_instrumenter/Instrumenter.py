@@ -16,7 +16,7 @@ from DataTypes import *
 import copy
 from itertools import groupby
 
-from Configuration import SourceFile, Configuration
+from Configuration import SourceFile, Configuration, RuntimeMode
 from CIDManager import CIDManager
 
 # SECTION   InstrumenterMarkerType
@@ -163,22 +163,110 @@ class Instrumenter:
 
         return
 
-    def _insert_text(self, insert_text: str, line: int, column: int):
-        """Modify the source code by inserting text at a given position"""
-        source_lines = self._instrumented_code.splitlines()
-        source_lines[line - 1] = source_lines[line -
-                                              1][:(column - 1)] + insert_text + source_lines[line - 1][(column - 1):]
-        self._instrumented_code = "\n".join(source_lines)
+    def _splice_text(self, inserts: list):
+        """Builds the instrumented code from the source code and the inserts in a single forward pass.
+           Inserts are (line, column, text) tuples in ascending order. Inserts at the same position
+           appear in the given order. A column after the end of a line inserts at the line end.
+           Line breaks get normalized to "\n" and a trailing line break gets dropped.
+        """
+        source_lines = self.source_code.splitlines()
+        output_slices = list()
+
+        insert_index = 0
+        insert_count = len(inserts)
+        for line_index, source_line in enumerate(source_lines):
+            if line_index > 0:
+                output_slices.append("\n")
+
+            # copy the line slice by slice up to every insert position
+            line_number = line_index + 1
+            line_offset = 0
+            while insert_index < insert_count and inserts[insert_index][0] == line_number:
+                _, column, insert_text = inserts[insert_index]
+                insert_offset = min(column - 1, len(source_line))
+                output_slices.append(source_line[line_offset:insert_offset])
+                output_slices.append(insert_text)
+                line_offset = insert_offset
+                insert_index += 1
+            output_slices.append(source_line[line_offset:])
+
+        if insert_index < insert_count:
+            raise(RuntimeError("Marker position " + str(inserts[insert_index][0]) + ":" +
+                               str(inserts[insert_index][1]) + " is outside of the source code!"))
+
+        self._instrumented_code = "".join(output_slices)
         return
 
     def _get_file_struct_name(self) -> str:
         """Build a file struct name out of the instrumentation random"""
         return "___COVERON_FILE_" + self.cid_manager.get_instrumentation_random().upper()
 
+    def _get_registration_function_name(self) -> str:
+        """Build a registration function name out of the instrumentation random"""
+        return "___COVERON_REGISTER_" + self.cid_manager.get_instrumentation_random().upper()
+
+    def _get_counter_array_name(self) -> str:
+        """Build a counter array name out of the instrumentation random"""
+        return "___COVERON_COUNTERS_" + self.cid_manager.get_instrumentation_random().upper()
+
+    def _get_bitmap_name(self) -> str:
+        """Build a bitmap name out of the instrumentation random"""
+        return "___COVERON_BITMAP_" + self.cid_manager.get_instrumentation_random().upper()
+
+    def _get_mcdc_scratch_name(self) -> str:
+        """Build a MC/DC scratch array name out of the instrumentation random"""
+        return "___COVERON_MCDC_" + self.cid_manager.get_instrumentation_random().upper()
+
+    def _get_seen_flags_name(self) -> str:
+        """Build a first hit flag array name out of the instrumentation random"""
+        return "___COVERON_SEEN_" + self.cid_manager.get_instrumentation_random().upper()
+
+    def _get_seen_flag_count(self) -> int:
+        """Returns the length of the first hit flag array (indexed by the dense checkpoint marker ids)"""
+        return max([marker.marker_id + 1 for marker in self._instrumenter_marker_list
+                    if marker.marker_type is InstrumenterMarkerType.CHECKPOINT] + [1])
+
     def _write_markers(self):
         """Modify the input source code to integrate the marker calls"""
-
-        for marker in self._instrumenter_marker_list:
+        file_struct_reference = "&" + self._get_file_struct_name()
+
+        # in counter and bitmap mode, markers become increments of their counter
+        # or set their bit instead of calling the runtime helper
+        counter_mode = self.config.runtime_mode == RuntimeMode.COUNTER
+        bitmap_mode = self.config.runtime_mode == RuntimeMode.BITMAP
+        # varint records get encoded by the runtime helper from the plain marker id
+        varint_mode = self.config.varint_records and \
+            self.config.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC)
+        # in first hit mode, checkpoint probes only run until the static flag of their marker is set
+        first_hit_mode = self.config.first_hit and \
+            self.config.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC)
+        if first_hit_mode:
+            seen_flags_name = self._get_seen_flags_name()
+        if counter_mode:
+            counter_array_name = self._get_counter_array_name()
+        if bitmap_mode:
+            bitmap_name = self._get_bitmap_name()
+        if counter_mode or bitmap_mode:
+            counter_indices = self.cid_manager.get_counter_indices()
+
+        # in mcdc mode, conditions fill the scratch masks of their decision (bit = position in the decision)
+        # and the decision writes the whole vector
+        mcdc_decisions = dict()
+        mcdc_conditions = dict()
+        if self.config.runtime_mode == RuntimeMode.MCDC:
+            mcdc_scratch_name = self._get_mcdc_scratch_name()
+            for decision_index, mcdc_decision in enumerate(self.cid_manager.get_mcdc_decisions()):
+                mcdc_decision: MCDCDecisionData
+                mask_width = max(1, (len(mcdc_decision.condition_marker_ids) + 7) // 8)
+                mcdc_decisions[mcdc_decision.decision_marker_id] = (
+                    decision_index, mask_width)
+                for condition_index, condition_marker_id in enumerate(mcdc_decision.condition_marker_ids):
+                    mcdc_conditions[condition_marker_id] = (
+                        decision_index, condition_index)
+
+        # the marker list is sorted in reverse, so the reversed list gives the inserts in ascending order
+        inserts = list()
+        for marker in reversed(self._instrumenter_marker_list):
             marker: InstrumenterMarker
 
             if not (marker.marker_type is InstrumenterMarkerType.COMPOUND_START or
@@ -187,13 +275,69 @@ class Instrumenter:
                     4, byteorder="big")
 
             insert_code = ""
-            if marker.marker_type is InstrumenterMarkerType.CHECKPOINT:
+            if counter_mode and marker.marker_type is InstrumenterMarkerType.CHECKPOINT:
+                insert_code = ("___COVERON_COUNT_CHECKPOINT(" +
+                               counter_array_name + ", " +
+                               str(counter_indices[marker.marker_id]) + ", " +
+                               file_struct_reference + ");")
+            elif counter_mode and (marker.marker_type is InstrumenterMarkerType.DECISION_START or
+                                   marker.marker_type is InstrumenterMarkerType.CONDITION_START):
+                insert_code = ("___COVERON_COUNT_EVALUATION(" +
+                               "&" + counter_array_name + "[" +
+                               str(counter_indices[marker.marker_id]) + "], " +
+                               file_struct_reference + ", " +
+                               "(int) (")
+            elif bitmap_mode and marker.marker_type is InstrumenterMarkerType.CHECKPOINT:
+                # byte index and bit mask are constant, so the probe is a single OR
+                bit_index = counter_indices[marker.marker_id]
+                insert_code = ("___COVERON_MARK_CHECKPOINT(" +
+                               bitmap_name + ", " +
+                               str(bit_index >> 3) + ", " +
+                               "0x" + "%02x" % (1 << (bit_index & 7)) + ", " +
+                               file_struct_reference + ");")
+            elif bitmap_mode and (marker.marker_type is InstrumenterMarkerType.DECISION_START or
+                                  marker.marker_type is InstrumenterMarkerType.CONDITION_START):
+                insert_code = ("___COVERON_MARK_EVALUATION(" +
+                               bitmap_name + ", " +
+                               str(counter_indices[marker.marker_id]) + ", " +
+                               file_struct_reference + ", " +
+                               "(int) (")
+            elif marker.marker_type is InstrumenterMarkerType.CONDITION_START and \
+                    marker.marker_id in mcdc_conditions:
+                decision_index, condition_index = mcdc_conditions[marker.marker_id]
+                insert_code = ("___COVERON_SET_MCDC_CONDITION(" +
+                               "&" + mcdc_scratch_name + "[" + str(decision_index) + "], " +
+                               str(condition_index) + ", " +
+                               "(int) (")
+            elif marker.marker_type is InstrumenterMarkerType.DECISION_START and \
+                    marker.marker_id in mcdc_decisions:
+                decision_index, mask_width = mcdc_decisions[marker.marker_id]
+                insert_code = ("___COVERON_SET_MCDC_VECTOR(" +
+                               "0x" + "%02x" % m_id_1 + ", " +
+                               "0x" + "%02x" % m_id_2 + ", " +
+                               "0x" + "%02x" % m_id_3 + ", " +
+                               "0x" + "%02x" % m_id_4 + ", " +
+                               file_struct_reference + ", " +
+                               "&" + mcdc_scratch_name + "[" + str(decision_index) + "], " +
+                               str(mask_width) + ", " +
+                               "(int) (")
+            elif varint_mode and marker.marker_type is InstrumenterMarkerType.CHECKPOINT:
+                insert_code = ("___COVERON_SET_CHECKPOINT_VARINT(" +
+                               str(marker.marker_id) + ", " +
+                               file_struct_reference + ")")
+            elif varint_mode and (marker.marker_type is InstrumenterMarkerType.DECISION_START or
+                                  marker.marker_type is InstrumenterMarkerType.CONDITION_START):
+                insert_code = ("___COVERON_SET_EVALUATION_VARINT(" +
+                               str(marker.marker_id) + ", " +
+                               file_struct_reference + ", " +
+                               "(int) (")
+            elif marker.marker_type is InstrumenterMarkerType.CHECKPOINT:
                 insert_code = ("___COVERON_SET_CHECKPOINT_MARKER(" +
                                "0x" + "%02x" % m_id_1 + ", " +
                                "0x" + "%02x" % m_id_2 + ", " +
                                "0x" + "%02x" % m_id_3 + ", " +
                                "0x" + "%02x" % m_id_4 + ", " +
-                               "&" + self._get_file_struct_name() + ");")
+                               file_struct_reference + ")")
             elif (marker.marker_type is InstrumenterMarkerType.DECISION_START or
                     marker.marker_type is InstrumenterMarkerType.CONDITION_START):
                 insert_code = ("___COVERON_SET_EVALUATION_MARKER(" +
@@ -201,7 +345,7 @@ class Instrumenter:
                                "0x" + "%02x" % m_id_2 + ", " +
                                "0x" + "%02x" % m_id_3 + ", " +
                                "0x" + "%02x" % m_id_4 + ", " +
-                               "&" + self._get_file_struct_name() + ", " +
+                               file_struct_reference + ", " +
                                "(int) (")
             elif marker.marker_type is InstrumenterMarkerType.EVALUATION_END:
                 insert_code = "))"
@@ -210,10 +354,16 @@ class Instrumenter:
             elif marker.marker_type is InstrumenterMarkerType.COMPOUND_END:
                 insert_code = "}"
 
-            self._insert_text(insert_code, marker.code_line,
-                              marker.code_column)
+            if marker.marker_type is InstrumenterMarkerType.CHECKPOINT and not (counter_mode or bitmap_mode):
+                if first_hit_mode:
+                    insert_code = ("___COVERON_FIRST_HIT_CHECKPOINT(" +
+                                   seen_flags_name + "[" + str(marker.marker_id) + "], " +
+                                   insert_code + ")")
+                insert_code += ";"
 
-        # TODO implement function
+            inserts.append((marker.code_line, marker.code_column, insert_code))
+
+        self._splice_text(inserts)
         return
 
     def _write_wrapper(self):
@@ -236,18 +386,86 @@ class Instrumenter:
         instr_random_array = [("0x" + hexbyte.upper())
                               for hexbyte in instr_random_array]
 
+        # create counter array, bitmap or MC/DC scratch array string and the matching fields of the
+        # file object (counter, bitmap and mcdc mode only). C doesn't allow arrays of size zero
+        counter_array_string = ""
+        counter_fields_string = ""
+        if self.config.mmap_tables and self.config.runtime_mode in (RuntimeMode.COUNTER, RuntimeMode.BITMAP):
+            # the probes use the table behind the pointer, which gets switched to the mapped table file
+            # during the initialization. Hits before that are kept in the memory table and added afterwards
+            if self.config.runtime_mode == RuntimeMode.COUNTER:
+                table_type = "___COVERON_COUNTER_T"
+                table_name = self._get_counter_array_name()
+                memory_name = "___COVERON_COUNTER_MEMORY_" + \
+                    self.cid_manager.get_instrumentation_random().upper()
+                table_length = max(1, self.cid_manager.get_counter_count())
+            else:
+                table_type = "___COVERON_BYTE"
+                table_name = self._get_bitmap_name()
+                memory_name = "___COVERON_BITMAP_MEMORY_" + \
+                    self.cid_manager.get_instrumentation_random().upper()
+                table_length = max(1, (self.cid_manager.get_counter_count() + 7) // 8)
+            counter_array_string = ("static " + table_type + " " + memory_name +
+                                    "[" + str(table_length) + "];\n" +
+                                    "static " + table_type + " *" + table_name + " = " + memory_name + ";\n")
+            counter_fields_string = (memory_name + ",\n" +
+                                     str(self.cid_manager.get_counter_count()) + ",\n&" + table_name + ",\n")
+        elif self.config.runtime_mode == RuntimeMode.COUNTER:
+            counter_count = self.cid_manager.get_counter_count()
+            counter_array_string = ("static ___COVERON_COUNTER_T " + self._get_counter_array_name() +
+                                    "[" + str(max(1, counter_count)) + "];\n")
+            counter_fields_string = (self._get_counter_array_name() + ",\n" +
+                                     str(counter_count) + ",\n(void *)0,\n")
+        elif self.config.runtime_mode == RuntimeMode.BITMAP:
+            bit_count = self.cid_manager.get_counter_count()
+            counter_array_string = ("static ___COVERON_BYTE " + self._get_bitmap_name() +
+                                    "[" + str(max(1, (bit_count + 7) // 8)) + "];\n")
+            counter_fields_string = (self._get_bitmap_name() + ",\n" +
+                                     str(bit_count) + ",\n(void *)0,\n")
+        elif self.config.runtime_mode == RuntimeMode.MCDC:
+            decision_count = len(self.cid_manager.get_mcdc_decisions())
+            # every thread evaluates its own decisions in the thread safe runtime
+            counter_array_string = ("static ___COVERON_THREAD_LOCAL ___COVERON_MCDC_SCRATCH_T " +
+                                    self._get_mcdc_scratch_name() +
+                                    "[" + str(max(1, decision_count)) + "];\n")
+
+        # one first hit flag per checkpoint marker (trace and mcdc mode)
+        if self.config.first_hit and self.config.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC):
+            counter_array_string += ("static ___COVERON_BYTE " + self._get_seen_flags_name() +
+                                     "[" + str(self._get_seen_flag_count()) + "];\n")
+
+        # the write buffer gets allocated and the file registered during the initialization (trace and mcdc mode)
+        if self.config.runtime_mode in (RuntimeMode.TRACE, RuntimeMode.MCDC) and \
+                self.config.write_buffer_size > 0:
+            counter_fields_string += "(void *)0,\n(void *)0,\n"
+
+            # the thread safe runtime assigns the index of the thread buffers during the initialization
+            counter_fields_string += "0,\n"
+
+        # the file index inside the shared output file gets assigned during the initialization
+        if self.config.shared_cri_file:
+            counter_fields_string += "0,\n"
+
         # create file object string
         file_object_string = ("___COVERON_FILE_T " + self._get_file_struct_name() + " = {\n" +
                               "{" + ", ".join(source_hash_array) + "},\n" +
                               "{" + ", ".join(instr_random_array) + "},\n" +
-                              "___COVERON_BOOL_FALSE,\n(void *)0,\n " +
+                              "___COVERON_BOOL_FALSE,\n(void *)0,\n" +
+                              counter_fields_string + " " +
                               "\"" + self.source_file.cri_file + "\"};")
 
         # create full wrapper string
-        wrapper_string = (include_string + "\n" + file_object_string + "\n\n")
+        wrapper_string = (include_string + "\n" + counter_array_string +
+                          file_object_string + "\n\n")
+
+        # create registration function, which sets up the file object before main,
+        # so the probes don't have to check it on every hit
+        registration_string = ("\n\n___COVERON_CONSTRUCTOR static void " + self._get_registration_function_name() +
+                               "(void) { ___COVERON_REGISTER_FILE(&" + self._get_file_struct_name() + "); }\n")
 
-        # insert wrapper string
-        self._insert_text(wrapper_string, 1, 1)
+        # insert wrapper string and append registration function
+        self._instrumented_code = wrapper_string + \
+            self._instrumented_code + registration_string
         return
 
     # !SECTION
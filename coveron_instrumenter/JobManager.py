@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""JobManager for Coveron Instrumenter.
+   Runs the instrumentation of all source files, either sequentially
+   or distributed over a pool of worker processes.
+"""
+
+import os
+import multiprocessing
+import multiprocessing.pool
+
+from typing import Iterator, List
+
+from Parser import ClangBridge, Parser
+from ASTExtractor import ASTExtractor
+from CIDManager import CIDManager
+from CacheManifest import CacheManifest
+from InstrumentationCache import InstrumentationCache
+from Configuration import SourceFile, Configuration
+from Instrumenter import Instrumenter
+from DataTypes import *
+
+
+# SECTION   Worker process state
+# every worker process keeps its own configuration and clang bridge,
+# so the libclang index stays warm across all files handled by the worker
+_worker_config: Configuration = None
+_worker_clang_bridge: ClangBridge = None
+
+
+def _init_worker(config: Configuration):
+    """Initializes a worker process of the instrumentation pool"""
+    global _worker_config, _worker_clang_bridge
+    _worker_config = config
+    _worker_clang_bridge = ClangBridge()
+
+
+def _run_worker_job(source_file: SourceFile):
+    """Instruments a single source file inside a worker process"""
+    return instrument_source_file(_worker_config, _worker_clang_bridge, source_file)
+# !SECTION
+
+
+# SECTION   JobResult class
+class JobResult:
+    """JobResult class.
+       Stores the outcome of the instrumentation of a single source file
+    """
+
+    # SECTION   JobResult private attribute definitions
+    __slots__ = ["source_file", "cached", "error"]
+
+    source_file: SourceFile
+    cached: bool
+    error: str
+    # !SECTION
+
+    # SECTION   JobResult initialization
+    def __init__(self, source_file: SourceFile, cached: bool = False, error: str = None):
+        self.source_file = source_file
+        self.cached = cached
+        self.error = error
+        return
+    # !SECTION
+# !SECTION
+
+
+# SECTION   instrument_source_file function
+def instrument_source_file(config: Configuration, clang_bridge: ClangBridge,
+                           source_file: SourceFile) -> JobResult:
+    """Runs the full instrumentation (parse, CID, instrumented source) for one source file"""
+
+    if config.verbose:
+        print("Instrumenting " + source_file.input_file + " ...")
+
+    # check if the file was already instrumented with the same configuration.
+    # The manifest check only stats files, so cache hits need no hashing or CID decoding
+    cache_manifest = CacheManifest(config, source_file)
+    if not config.force and cache_manifest.is_up_to_date():
+        if config.verbose:
+            print("Using cached version for " +
+                  source_file.input_file)
+        return JobResult(source_file, cached=True)
+
+    # the outputs get rewritten from here on, so they don't count as cached until the new manifest exists
+    cache_manifest.remove()
+
+    # load source code (the stat is taken first, so a later change can't slip into the manifest)
+    source_stat = CacheManifest.get_stat_entry(source_file.input_file)
+    source_code: SourceCode = ""
+    if os.path.isfile(source_file.input_file):
+        with open(source_file.input_file, 'r') as source_file_ptr:
+            try:
+                source_code = source_file_ptr.read()
+            except (OSError, UnicodeDecodeError):
+                raise(RuntimeError(
+                    source_file.input_file + " can't be accessed!"))
+    else:
+        raise(RuntimeError(source_file.input_file + " not found!"))
+
+    # hard-linked outputs of the instrumentation cache must never be written in place
+    for output_path in (source_file.output_file,
+                        os.path.join(config.output_abs_path, source_file.cid_file)):
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+
+    # check the content addressed instrumentation cache (covers the included files and the configuration)
+    instrumentation_cache = InstrumentationCache(
+        config) if config.instr_cache else None
+    if instrumentation_cache is not None and not config.force:
+        dependencies = instrumentation_cache.lookup(source_file, source_code)
+        if dependencies is not None:
+            if config.verbose:
+                print("Using instrumentation cache for " +
+                      source_file.input_file)
+            cache_manifest.write(source_stat, CacheManifest.hash_source_code(source_code),
+                                 dependencies)
+            return JobResult(source_file, cached=True)
+
+    # create a cid_manager
+    cid_manager = CIDManager(config, source_file, source_code)
+
+    # get a clang AST from the source file
+    clang_tree = clang_bridge.clang_parse(
+        source_file.input_file, config.clang_args)
+
+    # extract the facts needed by the parser in a single walk over the clang AST
+    ast_table = ASTExtractor(source_file.input_file).extract(clang_tree)
+
+    # create a parser instance, pass the extracted AST. Start the parser
+    parser = Parser(config, cid_manager, ast_table.get_root(), source_code)
+    parser.start_parser()
+
+    # write cid data. The CID gets serialised and compressed on a writer thread
+    # while the instrumented source code is created (the instrumenter only reads the CID data)
+    cid_manager.write_cid_file(background=True)
+    try:
+        # create a instrumenter instance
+        instrumenter = Instrumenter(
+            config, cid_manager, source_file, source_code)
+
+        # create the instrumented source code and write the instrumened source file
+        instrumenter.start_instrumentation()
+        instrumenter.write_output_file()
+    finally:
+        # the manifest stats the CID file, so it has to be complete first
+        cid_manager.wait_for_cid_file()
+
+    # mark the outputs as up to date and store them in the instrumentation cache
+    dependencies = InstrumentationCache.get_dependencies(clang_tree)
+    cache_manifest.write(
+        source_stat, cid_manager.get_source_code_hash(), dependencies)
+    if instrumentation_cache is not None:
+        instrumentation_cache.store(source_file, source_code, dependencies)
+
+    return JobResult(source_file)
+# !SECTION
+
+
+# SECTION   JobManager class
+class JobManager:
+    """JobManager class.
+       Instruments a list of source files and returns the results in input order
+    """
+
+    # SECTION   JobManager private attribute definitions
+    __slots__ = ["config", "_clang_bridge", "_pool"]
+
+    config: Configuration
+    _clang_bridge: ClangBridge
+    _pool: multiprocessing.pool.Pool
+    # !SECTION
+
+    # SECTION   JobManager public attribute definitions
+    # !SECTION
+
+    # SECTION   JobManager initialization
+    def __init__(self, config: Configuration):
+        self.config = config
+        self._clang_bridge = None
+        self._pool = None
+        return
+    # !SECTION
+
+    # SECTION   JobManager getter functions
+    # !SECTION
+
+    # SECTION   JobManager setter functions
+    # !SECTION
+
+    # SECTION   JobManager property definitions
+    # !SECTION
+
+    # SECTION   JobManager private functions
+    def _instrument_sequential(self, source_files: List[SourceFile]) -> Iterator[JobResult]:
+        """Instruments all source files inside the current process"""
+        if self._clang_bridge is None:
+            self._clang_bridge = ClangBridge()
+
+        for source_file in source_files:
+            try:
+                yield instrument_source_file(self.config, self._clang_bridge, source_file)
+            except Exception as e:
+                yield JobResult(source_file, error=str(e))
+
+    def _instrument_parallel(self, source_files: List[SourceFile]) -> Iterator[JobResult]:
+        """Instruments all source files with the worker pool"""
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(processes=self.config.jobs,
+                                              initializer=_init_worker,
+                                              initargs=(self.config,))
+
+        # imap keeps the input order and hands out every result as soon as it's available
+        results = self._pool.imap(_run_worker_job, source_files)
+        for source_file in source_files:
+            try:
+                yield next(results)
+            except Exception as e:
+                yield JobResult(source_file, error=str(e))
+    # !SECTION
+
+    # SECTION   JobManager public functions
+    def instrument(self, source_files: List[SourceFile]) -> Iterator[JobResult]:
+        """Instruments the given source files. Yields a JobResult per file in input order"""
+        if self.config.jobs > 1 and len(source_files) > 1:
+            return self._instrument_parallel(source_files)
+        return self._instrument_sequential(source_files)
+
+    def close(self):
+        """Shuts down the worker pool and releases the clang bridge"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._clang_bridge = None
+    # !SECTION
+# !SECTION
@@ -13,6 +13,9 @@
 
 import clang.cindex
 import shutil
+import re
+import bisect
+from array import array
 
 from DataTypes import *
 
@@ -28,6 +31,7 @@ class ClangBridge:
     """
 
     # SECTION   ClangBridge private attribute definitions
+    _clang_index: clang.cindex.Index
     # !SECTION
 
     # SECTION   ClangBridge public attribute definitions
@@ -38,6 +42,10 @@ class ClangBridge:
         if not clang.cindex.Config.loaded:
             clang.cindex.Config.set_library_path(os.path.join(
                 os.path.dirname(os.path.realpath(__file__)), "clang", "bin"))
+
+        # the index gets created on the first parse and is reused afterwards,
+        # so long running processes keep a warm libclang index
+        self._clang_index = None
         return
     # !SECTION
 
@@ -56,8 +64,9 @@ class ClangBridge:
     # SECTION   ClangBridge public functions
     def clang_parse(self, file, parse_args) -> clang.cindex.Cursor:
         """Invoke libclang to parse the given source file"""
-        clang_index = clang.cindex.Index.create()
-        tu = clang_index.parse(file, [parse_args]).cursor
+        if self._clang_index is None:
+            self._clang_index = clang.cindex.Index.create()
+        tu = self._clang_index.parse(file, [parse_args]).cursor
         return tu
     # !SECTION
 # !SECTION
@@ -70,12 +79,14 @@ class Parser:
     """
 
     # SECTION   Parser private attribute definitions
-    __slots__ = ['config', 'cid_manager', 'clang_ast', 'source_code']
+    __slots__ = ['config', 'cid_manager', 'clang_ast', 'source_code',
+                 '_statement_end_index']
 
     config: Configuration
     cid_manager: CIDManager
     clang_ast: clang.cindex.Cursor
     source_code: SourceCode
+    _statement_end_index: tuple
     # !SECTION
 
     # SECTION   Parser public attribute definitions
@@ -91,6 +102,7 @@ class Parser:
         self.cid_manager = cid_manager
         self.clang_ast = clang_ast
         self.source_code = source_code
+        self._statement_end_index = None
         return
     # !SECTION
 
@@ -104,27 +116,48 @@ class Parser:
     # !SECTION
 
     # SECTION   Parser private functions
-    def find_statement_end(self, start_line: int, start_column: int):
-        found_end = False
-        found_line = 0
-        found_column = 0
-        for i_line, line in enumerate("\n".join(self.source_code.splitlines()[start_line - 1:])[start_column - 1:].splitlines()):
-            for i_column, column in enumerate(line):
-                if column == ";":
-                    found_end = True
-                    found_line = i_line
-                    found_column = i_column
-                    break
-
-            if found_end == True:
-                break
+    def _build_statement_end_index(self):
+        """Builds the position tables for find_statement_end once per source code.
+           Positions are offsets inside the source code with normalized line breaks.
+        """
+        lines = self.source_code.splitlines()
+        normalized_source_code = "\n".join(lines)
 
-        if found_line == 0:
-            found_column += start_column
-        else:
-            found_column += 1
+        line_offsets = array('l')
+        line_offset = 0
+        for line in lines:
+            line_offsets.append(line_offset)
+            line_offset += len(line) + 1
+
+        self._statement_end_index = (
+            line_offsets,
+            array('l', (match.start() for match in re.finditer("\n", normalized_source_code))),
+            array('l', (match.start() for match in re.finditer(";", normalized_source_code))))
 
-        return (start_line + found_line), found_column
+    def find_statement_end(self, start_line: int, start_column: int):
+        """Returns line and column of the first semicolon at or after the given position.
+           If there is none, the start position is returned.
+        """
+        if self._statement_end_index is None:
+            self._build_statement_end_index()
+        line_offsets, newline_offsets, semicolon_offsets = self._statement_end_index
+
+        if start_line - 1 >= len(line_offsets):
+            return start_line, start_column
+
+        start_offset = line_offsets[start_line - 1] + start_column - 1
+        semicolon_index = bisect.bisect_left(semicolon_offsets, start_offset)
+        if semicolon_index == len(semicolon_offsets):
+            return start_line, start_column
+        semicolon_offset = semicolon_offsets[semicolon_index]
+
+        # lines are counted from the start position on (also, if the start column exceeds its line)
+        newline_index = bisect.bisect_left(newline_offsets, semicolon_offset)
+        found_line = newline_index - \
+            bisect.bisect_left(newline_offsets, start_offset)
+        if found_line == 0:
+            return start_line, start_column + semicolon_offset - start_offset
+        return (start_line + found_line), semicolon_offset - newline_offsets[newline_index - 1]
 
     def _traverse_root(self, ast_pointer: clang.cindex.Cursor):
         """Searches for functions inside the code of the active source file."""
@@ -209,8 +242,9 @@ class Parser:
     def _traverse_compound_statement(self, ast_cursor: clang.cindex.Cursor, args: dict, return_data: dict):
         """Parses a compound statement given to it"""
         # use given checkpoint_marker_id if passed (i.e. CompoundStmt in CompoundStmt)
-        active_checkpoint_marker_id = args.get(
-            'start_checkpoint_marker_id', self.cid_manager.get_new_id())
+        active_checkpoint_marker_id = args.get('start_checkpoint_marker_id')
+        if active_checkpoint_marker_id is None:
+            active_checkpoint_marker_id = self.cid_manager.get_new_marker_id()
         return_data['first_checkpoint_marker_id'] = active_checkpoint_marker_id
         # status variable to check, if the first checkpoint was set
         first_checkpoint_set = False
@@ -259,7 +293,7 @@ class Parser:
                     checkpoint_position = CodePositionData(
                         child_element.extent.end.line, child_element.extent.end.column + 1)
                 # get new id for new checkpoint
-                active_checkpoint_marker_id = self.cid_manager.get_new_id()
+                active_checkpoint_marker_id = self.cid_manager.get_new_marker_id()
                 # insert new checkpoint marker
                 self.cid_manager.add_checkpoint_marker(
                     active_checkpoint_marker_id, checkpoint_position)
@@ -275,7 +309,7 @@ class Parser:
             # check, if a new checkpoint is required since the last child element
             if new_checkpoint_required and self.config.checkpoint_markers_enabled:
                 # get new id for new checkpoint
-                active_checkpoint_marker_id = self.cid_manager.get_new_id()
+                active_checkpoint_marker_id = self.cid_manager.get_new_marker_id()
                 # insert new checkpoint marker
                 self.cid_manager.add_checkpoint_marker(active_checkpoint_marker_id,
                                                        CodePositionData(child_element.extent.start.line, child_element.extent.start.column))
@@ -438,7 +472,7 @@ class Parser:
         """Traverse a single statement and make it a compound statement for instrumentation.
            Useful for single statement branches or loops. """
 
-        active_checkpoint_marker_id = self.cid_manager.get_new_id()
+        active_checkpoint_marker_id = self.cid_manager.get_new_marker_id()
         return_data['new_parent_checkpoint_required'] = False
 
         if (ast_cursor.extent.start.line == ast_cursor.extent.end.line and
@@ -592,13 +626,16 @@ class Parser:
 
             # Create evaluation_code_section and EvaluationMarker for the whole decision
             # and pass back all the information
-            evaluation_marker_id = self.cid_manager.get_new_id()
+            evaluation_marker_id = self.cid_manager.get_new_marker_id()
             evaluation_code_section = CodeSectionData(
                 CodePositionData(ast_cursor.extent.start.line,
                                  ast_cursor.extent.start.column),
                 CodePositionData(ast_cursor.extent.end.line, ast_cursor.extent.end.column))
             self.cid_manager.add_evaluation_marker(evaluation_marker_id, evaluation_code_section,
                                                    EvaluationType.DECISION)
+            # the condition order defines the bits of the MC/DC condition vectors
+            self.cid_manager.add_mcdc_decision(evaluation_marker_id,
+                                               [condition.evaluation_marker_id for condition in conditions])
             return_data['evaluation_marker_id'] = evaluation_marker_id
             return_data['evaluation_code_section'] = evaluation_code_section
             return_data['conditions'] = conditions
@@ -690,7 +727,7 @@ class Parser:
 
             else:
                 # This is a atomic condition. Create a EvaluationMarker and create new ConditionData
-                evaluation_marker_id = self.cid_manager.get_new_id()
+                evaluation_marker_id = self.cid_manager.get_new_marker_id()
                 evaluation_code_section = CodeSectionData(
                     CodePositionData(ast_cursor.extent.start.line,
                                      ast_cursor.extent.start.column),
@@ -898,7 +935,7 @@ class Parser:
                             return_data['new_parent_checkpoint_required'] = True
 
                         # manually create a checkpoint marker directly after the evaluation code section
-                        case_checkpoint_marker_id = self.cid_manager.get_new_id()
+                        case_checkpoint_marker_id = self.cid_manager.get_new_marker_id()
                         case_checkpoint_marker_position = CodePositionData(
                             case_evaluation_code_section.end_position.line, case_evaluation_code_section.end_position.column + 1)
                         self.cid_manager.add_checkpoint_marker(
@@ -963,7 +1000,7 @@ class Parser:
                             return_data['new_parent_checkpoint_required'] = True
 
                         # manually create a checkpoint marker directly after the evaluation code section
-                        case_checkpoint_marker_id = self.cid_manager.get_new_id()
+                        case_checkpoint_marker_id = self.cid_manager.get_new_marker_id()
                         case_checkpoint_marker_position = CodePositionData(
                             case_evaluation_code_section.end_position.line, case_evaluation_code_section.end_position.column + 1)
                         self.cid_manager.add_checkpoint_marker(
@@ -1125,7 +1162,6 @@ class Parser:
                     self._traverse_compound_statement(
                         child_element, inner_traverse_args, inner_return_data)
                 else:
-                    ast_cursor.linkage
                     self._traverse_single_statement(
                         child_element, inner_traverse_args, inner_return_data)
 
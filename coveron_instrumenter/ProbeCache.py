@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""ProbeCache for Coveron Instrumenter.
+   Persists the results of target compiler probes (include paths, predefined macros),
+   so repeated wrapper calls don't need to spawn the compiler again.
+"""
+
+import os
+import sys
+import json
+import shlex
+import shutil
+import hashlib
+import tempfile
+
+from typing import Callable, List
+
+
+# SECTION   ProbeCache class
+class ProbeCache:
+    """ProbeCache class.
+       Stores probe results keyed by compiler executable (path, mtime, size) and relevant flags
+    """
+
+    # SECTION   ProbeCache private attribute definitions
+    __slots__ = ['cache_dir']
+
+    cache_dir: str
+    # !SECTION
+
+    # SECTION   ProbeCache public attribute definitions
+    # !SECTION
+
+    # SECTION   ProbeCache initialization
+    def __init__(self, cache_dir: str = None):
+        if cache_dir is None or cache_dir == "":
+            cache_dir = ProbeCache.get_default_cache_dir()
+        self.cache_dir = os.path.join(cache_dir, "probes")
+        return
+    # !SECTION
+
+    # SECTION   ProbeCache getter functions
+    # !SECTION
+
+    # SECTION   ProbeCache setter functions
+    # !SECTION
+
+    # SECTION   ProbeCache property definitions
+    # !SECTION
+
+    # SECTION   ProbeCache private functions
+    def _get_cache_key(self, compiler_exec: str, relevant_flags: List[str], probe_name: str):
+        """Returns the cache key of a probe or None, if the compiler executable can't be found"""
+        compiler_command = shlex.split(compiler_exec)
+        if not compiler_command:
+            return None
+        compiler_path = shutil.which(compiler_command[0])
+        if compiler_path is None:
+            return None
+        compiler_path = os.path.realpath(compiler_path)
+        compiler_stat = os.stat(compiler_path)
+
+        key_data = json.dumps([probe_name, compiler_path, compiler_stat.st_mtime_ns,
+                               compiler_stat.st_size, compiler_command[1:], relevant_flags])
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def _load(self, cache_file_path: str):
+        """Loads a cached probe result. Returns None on a miss or a broken entry"""
+        try:
+            with open(cache_file_path, 'r') as cache_file_ptr:
+                probe_result = json.load(cache_file_ptr)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(probe_result, list):
+            return None
+        return probe_result
+
+    def _store(self, cache_file_path: str, probe_result: List[str]):
+        """Stores a probe result. The entry gets written to a temporary file and moved in place,
+           so concurrent wrapper calls never see a partially written entry
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file_handle, tmp_file_path = tempfile.mkstemp(
+                dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(tmp_file_handle, 'w') as tmp_file_ptr:
+                    json.dump(probe_result, tmp_file_ptr)
+                os.replace(tmp_file_path, cache_file_path)
+            except BaseException:
+                os.remove(tmp_file_path)
+                raise
+        except OSError:
+            # a cache, which can't be written, only costs another probe next time
+            pass
+    # !SECTION
+
+    # SECTION   ProbeCache public functions
+    @staticmethod
+    def get_default_cache_dir() -> str:
+        """Returns the user cache directory of the Coveron Instrumenter"""
+        if sys.platform == "win32":
+            cache_root = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+        elif sys.platform == "darwin":
+            cache_root = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+        else:
+            cache_root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(
+                os.path.join("~", ".cache"))
+        return os.path.join(cache_root, "coveron_instrumenter")
+
+    @staticmethod
+    def get_relevant_flags(compiler_args: List[str]) -> List[str]:
+        """Returns the compiler arguments, which change the result of a probe"""
+        relevant_flags = list()
+        arg_iterator = iter(compiler_args)
+        for arg in arg_iterator:
+            if arg.startswith("-std") or arg.startswith("-m") or \
+                    arg.startswith("--target") or arg.startswith("--sysroot"):
+                relevant_flags.append(arg)
+            elif arg in ("-target", "-isysroot"):
+                relevant_flags.append(arg)
+                relevant_flags.append(next(arg_iterator, ""))
+        return relevant_flags
+
+    def get_probe(self, compiler_exec: str, relevant_flags: List[str], probe_name: str,
+                  probe_function: Callable[[], List[str]]) -> List[str]:
+        """Returns the cached result of a probe. On a miss, the probe function gets called
+           and its result gets stored
+        """
+        cache_key = self._get_cache_key(
+            compiler_exec, relevant_flags, probe_name)
+        if cache_key is None:
+            return probe_function()
+
+        cache_file_path = os.path.join(self.cache_dir, cache_key + ".json")
+        probe_result = self._load(cache_file_path)
+        if probe_result is None:
+            probe_result = probe_function()
+            self._store(cache_file_path, probe_result)
+        return probe_result
+    # !SECTION
+# !SECTION
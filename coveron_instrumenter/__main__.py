@@ -12,24 +12,62 @@
 
 import sys
 import os
+import argparse
 import subprocess
 import colorama
-import json
-import gzip
 colorama.init()
 coveron_path = getattr(
     sys, '_MEIPASS', os.path.dirname(os.path.realpath(__file__)))
 sys.path.append(coveron_path)
 
-from Parser import ClangBridge, Parser
-from CIDManager import CIDManager
-from Configuration import SourceFile, Configuration
+from Configuration import Configuration, CIDFormat
 from ArgumentHandler import ArgumentHandler
-from Instrumenter import Instrumenter
-from DataTypes import *
+from DaemonClient import DaemonClient
+
+# path to the Coveron runtime helper
+runtime_helper_source_path = os.path.join(coveron_path,
+                                          "coveron_runtime_helper", "src",
+                                          "coveron_helper.c")
+runtime_helper_header_path = os.path.join(coveron_path,
+                                          "coveron_runtime_helper", "src",
+                                          "coveron_helper.h")
 
 
 def main():
+    # merge CRI files instead of instrumenting (coveron_instrumenter merge ...)
+    if len(sys.argv) > 1 and sys.argv[1] == "merge":
+        exit(merge(sys.argv[2:]))
+
+    # convert CID files between the JSON and the binary format (coveron_instrumenter convert ...)
+    if len(sys.argv) > 1 and sys.argv[1] == "convert":
+        exit(convert(sys.argv[2:]))
+
+    # forward the call to the instrumentation daemon, if requested.
+    # If no daemon is reachable, the instrumentation runs locally
+    daemon_socket_path = DaemonClient.get_daemon_socket_path(sys.argv[1:])
+    if daemon_socket_path is not None:
+        # the compiler call is built from the own arguments. The daemon only instruments the source files
+        client_config: Configuration = Configuration()
+        ArgumentHandler(client_config, probe_compiler=False)
+        daemon_response = DaemonClient(daemon_socket_path).request(
+            sys.argv[1:], os.getcwd())
+        if daemon_response is not None:
+            if daemon_response['returncode'] != 0:
+                for error in daemon_response['errors']:
+                    print(colorama.Fore.RED + "COVERON ERROR: " +
+                          error + colorama.Fore.RESET)
+                exit(daemon_response['returncode'])
+
+            # only the instrumented files of the own source files get passed to the compiler
+            output_files = [source_file.output_file for source_file in client_config.source_files]
+            if daemon_response['output_files'] == output_files:
+                invoke_compiler(client_config.compiler_exec,
+                                client_config.compiler_args,
+                                client_config.compiler_output_args,
+                                output_files,
+                                client_config.verbose)
+                return
+
     # load configuration
     config: Configuration = Configuration()
 
@@ -41,22 +79,7 @@ def main():
         print_title()
         config.print_config()
 
-    # check if the output folder exists. if not, create it
-    if not os.path.exists(config.output_abs_path):
-        try:
-            os.makedirs(config.output_abs_path)
-        except:
-            print(colorama.Fore.RED +
-                  "COVERON ERROR: output folder couldn't be created." +
-                  colorama.Fore.RESET)
-
     # check for existence of Coveron runtime helper
-    runtime_helper_source_path = os.path.join(coveron_path,
-                                              "coveron_runtime_helper", "src",
-                                              "coveron_helper.c")
-    runtime_helper_header_path = os.path.join(coveron_path,
-                                              "coveron_runtime_helper", "src",
-                                              "coveron_helper.h")
     if not (os.path.isfile(runtime_helper_source_path) and
             os.path.isfile(runtime_helper_header_path)):
         print(colorama.Fore.RED +
@@ -66,100 +89,147 @@ def main():
     # store runtime helper header path inside config for later use in instrumentation
     config.runtime_helper_header_path = runtime_helper_header_path
 
-    # instantiate clang bridge
-    clang_bridge = ClangBridge()
+    # libclang gets only loaded from here on, so daemon clients don't pay for it
+    if config.serve:
+        from InstrumentationDaemon import InstrumentationDaemon
+        InstrumentationDaemon(
+            config, runtime_helper_header_path).serve_forever()
+        return
+    from JobManager import JobManager
+
+    # check if the output folder exists. if not, create it
+    if not os.path.exists(config.output_abs_path):
+        try:
+            os.makedirs(config.output_abs_path)
+        except:
+            print(colorama.Fore.RED +
+                  "COVERON ERROR: output folder couldn't be created." +
+                  colorama.Fore.RESET)
 
     if config.verbose:
         print("Starting Instrumentation ...")
 
-    # create new instrumentation process for every source file detected by ArgumentHandler
-    for source_file in config.source_files:
-        source_file: SourceFile
-
-        if config.verbose:
-            print("Instrumenting " + source_file.input_file + " ...")
-
-        # load source code
-        source_code: SourceCode = ""
-        if os.path.isfile(source_file.input_file):
-            with open(source_file.input_file, 'r') as source_file_ptr:
-                try:
-                    source_code = source_file_ptr.read()
-                except:
-                    raise(RuntimeError(
-                        source_file.input_file + " can't be accessed!"))
-        else:
-            raise(RuntimeError(source_file.input_file + " not found!"))
-
-        # create a cid_manager
-        cid_manager = CIDManager(config, source_file, source_code)
-
-        # check if the file was already instrumented (check existence of cid, check if source hash is equal)
-        # if it was already instrumented, we're skipping instrumentation, if config allows
-        if not config.force:
-            if os.path.isfile(source_file.cid_file) and os.path.isfile(source_file.output_file):
-                with open(source_file.cid_file, 'r') as cid_file_ptr:
-                    try:
-                        cid_data = json.load(cid_file_ptr)
-                    except:
-                        try:
-                            with gzip.GzipFile(source_file.cid_file, 'r') as cid_comp_file_ptr:
-                                cid_data = json.load(cid_comp_file_ptr)
-                        except:
-                            pass
-
-                    if cid_data["source_code_hash"] == cid_manager.get_source_code_hash():
-                        if config.verbose:
-                            print("Using cached version for " +
-                                  source_file.input_file)
-                        continue
-
-        # create a clang bridge and get a clang AST from the source file
-        clang_tree = clang_bridge.clang_parse(
-            source_file.input_file, config.clang_args)
-
-        # create a parser instance, pass the clang AST. Start the parser
-        parser = Parser(config, cid_manager, clang_tree, source_code)
-        parser.start_parser()
-
-        # write cid data
-        cid_manager.write_cid_file()
-
-        # create a instrumenter instance
-        instrumenter = Instrumenter(
-            config, cid_manager, source_file, source_code)
-
-        # create the instrumented source code and write the instrumened source file
-        instrumenter.start_instrumentation()
-        instrumenter.write_output_file()
-
-        # delete cid_manager, parser and instrumenter instances
-        del cid_manager
-        del parser
-        del instrumenter
-        continue
-
-    # delete clang bridge after running through every file
-    del clang_bridge
+    # in pipeline mode, every instrumented file gets compiled while the next ones are instrumented
+    compiler_pipeline = None
+    if config.pipeline:
+        from CompilerPipeline import CompilerPipeline
+        compiler_pipeline = CompilerPipeline(
+            config, runtime_helper_source_path)
+
+    # create new instrumentation job for every source file detected by ArgumentHandler.
+    # Results arrive in input order, no matter how many worker processes are used
+    job_manager = JobManager(config)
+    try:
+        try:
+            for job_result in job_manager.instrument(config.source_files):
+                if job_result.error is not None:
+                    raise(RuntimeError(job_result.error))
+                if compiler_pipeline is not None:
+                    compiler_pipeline.submit(job_result.source_file)
+        finally:
+            job_manager.close()
+
+        if compiler_pipeline is not None:
+            if config.verbose:
+                print("Linking ...")
+            compiler_returncode = compiler_pipeline.finish()
+            if compiler_returncode != 0:
+                exit(compiler_returncode)
+            return
+    finally:
+        if compiler_pipeline is not None:
+            compiler_pipeline.close()
+
+    invoke_compiler(config.compiler_exec,
+                    config.compiler_args,
+                    config.compiler_output_args,
+                    [source_file.output_file for source_file in config.source_files],
+                    config.verbose)
+    return
 
-    if config.verbose:
+
+def merge(argv: list) -> int:
+    """Merges the CRI files of many processes into one CRI file per source file"""
+    argparser = argparse.ArgumentParser(prog="coveron_instrumenter merge",
+                                        description="Merge CRI files (e.g. per-process CRI files) with the same instrumentation into one CRI file")
+    argparser.add_argument('input_paths', nargs='+',
+                           help='CRI files or directories containing per-process CRI files (<name>.<pid>.<time>.<sequence>.cri)')
+    argparser.add_argument('-o', '--output', dest='output_path', default=os.getcwd(),
+                           help='Directory of the merged CRI files (default: working directory)')
+    argparser.add_argument('-j', '--jobs', dest='jobs', type=int, default=os.cpu_count() or 1,
+                           help='Number of worker processes reading the CRI files (default: number of CPUs)')
+    argparser.add_argument('-v', '--verbose', dest='verbose', action='store_const',
+                           const=True, default=False,
+                           help='Print the merged CRI files')
+    args = argparser.parse_args(argv)
+
+    from CRIMerger import CRIMerger
+    try:
+        if not os.path.exists(args.output_path):
+            os.makedirs(args.output_path)
+        CRIMerger(max(1, args.jobs), args.verbose).merge(
+            args.input_paths, args.output_path)
+    except (RuntimeError, OSError) as e:
+        print(colorama.Fore.RED + "COVERON ERROR: " +
+              str(e) + colorama.Fore.RESET)
+        return 1
+    return 0
+
+
+def convert(argv: list) -> int:
+    """Converts a CID file into the JSON or the binary format"""
+    argparser = argparse.ArgumentParser(prog="coveron_instrumenter convert",
+                                        description="Convert a CID file (JSON, gzip compressed JSON or binary) into the JSON or the binary format without losing information")
+    argparser.add_argument('input_path',
+                           help='CID file to convert')
+    argparser.add_argument('output_path',
+                           help='Path of the converted CID file')
+    argparser.add_argument('-f', '--format', dest='cid_format', type=str, default=CIDFormat.JSON.value,
+                           choices=[cid_format.value for cid_format in CIDFormat],
+                           help='Format of the converted CID file (default: json)')
+    argparser.add_argument('--nocomp', dest='nocomp_cid', action='store_const',
+                           const=True, default=False,
+                           help='Don\'t compress JSON output with GZIP')
+    argparser.add_argument('--compression-level', dest='compression_level', type=int,
+                           default=Configuration.DEFAULT_CID_COMPRESSION_LEVEL, choices=range(1, 10),
+                           metavar='{1..9}',
+                           help='GZIP compression level of JSON output (default: 9)')
+    args = argparser.parse_args(argv)
+
+    from CIDReader import CIDReader
+    from CIDManager import CIDManager
+    try:
+        CIDManager.write_cid(args.output_path, CIDReader(args.input_path).load(),
+                             CIDFormat(args.cid_format) == CIDFormat.BINARY, args.nocomp_cid,
+                             args.compression_level)
+    except (RuntimeError, OSError) as e:
+        print(colorama.Fore.RED + "COVERON ERROR: " +
+              str(e) + colorama.Fore.RESET)
+        return 1
+    return 0
+
+
+def invoke_compiler(compiler_exec: str, compiler_args: str, compiler_output_args: str,
+                    output_files: list, verbose: bool) -> int:
+    """Calls the compiler with the instrumented source files and the runtime helper"""
+    if verbose:
         print("Invoking compiler ...")
 
     # call the compiler with the pass thru arguments, the new instrumented files and the link to the runtime_helper (as absolute path)
-    command_string = " ".join([config.compiler_exec,
-                               config.compiler_args,
-                               ' '.join(
-                                   source_file.output_file for source_file in config.source_files),
+    command_string = " ".join([compiler_exec,
+                               compiler_args,
+                               compiler_output_args,
+                               ' '.join(output_files),
                                runtime_helper_source_path])
     compiler_returncode = subprocess.call(command_string, shell=True)
 
-    if config.verbose:
+    if verbose:
         if compiler_returncode != 0:
             print(colorama.Fore.RED + "Compiler failed!" + colorama.Fore.RESET)
         else:
             print(colorama.Fore.GREEN +
                   "Compiler succeeded!" + colorama.Fore.RESET)
-    return
+    return compiler_returncode
 
 
 def print_title():
@@ -7,8 +7,51 @@
 /*
  * SECTION   INCLUDES
  */
+// pread, pwrite, ftruncate, fork and clock_gettime are POSIX, so they need to be enabled before any system include
+#ifndef _XOPEN_SOURCE
+#define _XOPEN_SOURCE 700
+#endif
 #include "coveron_helper.h"
 #include <stdio.h>
+#include <stdlib.h>
+#if defined(___COVERON_SHARED_WRITER_ENABLED) || defined(___COVERON_PER_PROCESS_CRI_ENABLED)
+#include <string.h>
+#endif
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+#include <errno.h>
+#include <pthread.h>
+#include <time.h>
+#include <unistd.h>
+#endif
+#ifdef ___COVERON_MMAP_TABLES_ENABLED
+#include <fcntl.h>
+#include <sys/file.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+#include <signal.h>
+#endif
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+#include <pthread.h>
+#endif
+// !SECTION
+
+/*
+ * SECTION   THREAD SAFETY SETUP
+ */
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+// releases the file setup to the threads, which check ___COVERON_IS_INITIALIZED
+#define ___COVERON_MARK_INITIALIZED(coveronFile) \
+    __atomic_store_n(&(coveronFile)->helperInitialized, ___COVERON_BOOL_TRUE, __ATOMIC_RELEASE)
+
+// guards the file setup, the file registry, the thread buffer list and the MC/DC deduplication table
+pthread_mutex_t ___COVERON_MUTEX = PTHREAD_MUTEX_INITIALIZER;
+#else
+#define ___COVERON_MARK_INITIALIZED(coveronFile) \
+    ((coveronFile)->helperInitialized = ___COVERON_BOOL_TRUE)
+#endif
 // !SECTION
 
 /*
@@ -29,9 +72,17 @@
 /*
  * SECTION   VERSION INFORMATION
  */
+// version 2 adds repeat records (run-length encoding of repeated records),
+// version 3 varint marker records and escaped MC/DC vectors and repeat records
 ___COVERON_BYTE ___COVERON_CRI_VERSION[2] = {
     0x00, // High byte
-    0x01  // Low byte
+#if defined(___COVERON_VARINT_RECORDS_ENABLED)
+    0x03 // Low byte
+#elif defined(___COVERON_TRACE_RLE_ENABLED)
+    0x02 // Low byte
+#else
+    0x01 // Low byte
+#endif
 };
 // !SECTION
 
@@ -48,6 +99,20 @@ const ___COVERON_BYTE ___COVERON_MAGIC_NUMBER[8] = {
     0x46, // F
     0x21  // !
 };
+
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+// magic number of the shared output file (IMACRIS!)
+const ___COVERON_BYTE ___COVERON_SHARED_MAGIC_NUMBER[8] = {
+    0x49, // I
+    0x4D, // M
+    0x41, // A
+    0x43, // C
+    0x52, // R
+    0x49, // I
+    0x53, // S
+    0x21  // !
+};
+#endif
 // !SECTION
 
 /*
@@ -57,10 +122,41 @@ const ___COVERON_BYTE ___COVERON_MAGIC_NUMBER[8] = {
 ___COVERON_BOOL_T ___COVERON_SETUP_INSTRUMENTATION(
     ___COVERON_FILE_T *coveronFile);
 
+// initializes a file at startup or on its first hit (only once, if multiple threads hit the file at the same time)
+___COVERON_BOOL_T ___COVERON_INITIALIZE(___COVERON_FILE_T *coveronFile);
+
 // creates new output file in case old is damaged or not existing
 ___COVERON_BOOL_T ___COVERON_CREATE_NEW_OUTPUT_FILE(
     ___COVERON_FILE_T *coveronFile);
 
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+// creates a new output file with the pid, the start time and a sequence number inside the filename
+FILE *___COVERON_OPEN_PROCESS_FILE(const char *filename);
+
+// installs the fork handlers (once per process)
+void ___COVERON_INSTALL_FORK_HANDLERS(void);
+
+// remembers a file with an open output file, so a forked child can replace it
+void ___COVERON_ADD_PROCESS_FILE(___COVERON_FILE_T *coveronFile);
+
+// flushes the output files before a fork, so the child can't write the buffered data of the parent again
+void ___COVERON_PREPARE_FORK(void);
+
+// lets the parent continue after a fork
+void ___COVERON_PARENT_AFTER_FORK(void);
+
+// drops the inherited records and hits of a forked child and lets it write to its own per-process files
+void ___COVERON_CHILD_AFTER_FORK(void);
+
+// replaces the inherited output file of a file in a forked child
+void ___COVERON_REOPEN_PROCESS_FILE(___COVERON_FILE_T *coveronFile);
+
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+// replaces the inherited shared output file in a forked child and writes the file table again
+void ___COVERON_REOPEN_SHARED_FILE(void);
+#endif
+#endif
+
 // compares arrays (useful for validation of existing files)
 ___COVERON_BOOL_T ___COVERON_EQUAL_ARRAYS(___COVERON_BYTE *Array1,
                                           ___COVERON_BYTE *Array2,
@@ -74,7 +170,307 @@ void ___COVERON_GENERATE_HEADER(___COVERON_FILE_T *coveronFile,
                                 ___COVERON_BYTE emptyArray[59]);
 
 // generates execution marker
-void ___COVERON_GENERATE_EXECUTION_MARKER(___COVERON_FILE_T *coveronFile);
+void ___COVERON_GENERATE_EXECUTION_MARKER(void *outputFile);
+
+#if defined(___COVERON_COUNTER_MODE_ENABLED) && defined(___COVERON_EXIT_RECORDS_ENABLED)
+// writes the counter table record of a file
+void ___COVERON_GENERATE_COUNTER_TABLE(___COVERON_FILE_T *coveronFile);
+#endif
+
+#if defined(___COVERON_BITMAP_MODE_ENABLED) && defined(___COVERON_EXIT_RECORDS_ENABLED)
+// writes the bitmap record of a file
+void ___COVERON_GENERATE_BITMAP(___COVERON_FILE_T *coveronFile);
+#endif
+
+#ifdef ___COVERON_MMAP_TABLES_ENABLED
+// maps the counter table or bitmap of a file into its table file (created, if it doesn't exist or doesn't match)
+___COVERON_BOOL_T ___COVERON_MAP_TABLE(___COVERON_FILE_T *coveronFile);
+#endif
+
+#ifdef ___COVERON_MCDC_DEDUPE_ENABLED
+// checks, if a condition vector was already written during this execution and remembers it otherwise
+___COVERON_BOOL_T ___COVERON_MCDC_VECTOR_SEEN(___COVERON_FILE_T *coveronFile,
+                                             ___COVERON_BYTE vectorData[],
+                                             int vectorLength);
+#endif
+
+#ifdef ___COVERON_EXIT_RECORDS_ENABLED
+// generates the padding, magic number and 4 byte big endian length of a exit record
+void ___COVERON_GENERATE_EXIT_RECORD_HEADER(___COVERON_FILE_T *coveronFile,
+                                            const char recordMagic[4],
+                                            unsigned long recordLength);
+#endif
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+// allocates the write buffer of a file (records get written directly, if the allocation fails)
+void ___COVERON_SETUP_WRITE_BUFFER(___COVERON_FILE_T *coveronFile);
+
+// writes the content of the write buffer to the output file
+void ___COVERON_FLUSH_WRITE_BUFFER(___COVERON_FILE_T *coveronFile);
+
+// flushes all write buffers on fatal signals and passes the signal on to the default handler
+void ___COVERON_HANDLE_FATAL_SIGNAL(int signalNumber);
+#endif
+
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+// folds a record into the repeat record behind the same last record of a buffer.
+// Returns the new number of used bytes of the buffer or 0, if the record has to be appended
+unsigned long ___COVERON_FOLD_RECORD(___COVERON_BYTE bufferData[],
+                                     unsigned long used,
+                                     unsigned long size,
+                                     unsigned long lastRecord,
+                                     unsigned long lastRecordLength,
+                                     ___COVERON_BYTE recordData[],
+                                     unsigned long recordLength);
+#endif
+
+#ifdef ___COVERON_VARINT_RECORDS_ENABLED
+// writes a value as LEB128 varint (7 bits per byte, lowest bits first). Returns the number of bytes
+unsigned long ___COVERON_ENCODE_VARINT(unsigned long value, ___COVERON_BYTE varintData[]);
+#endif
+
+#ifdef ___COVERON_THREAD_BUFFERS_ENABLED
+// allocates the buffer of the calling thread for a file. Returns NULL, if the file has no thread buffers
+struct ___COVERON_THREAD_BUFFER_S *___COVERON_BIND_THREAD_BUFFER(___COVERON_FILE_T *coveronFile);
+
+// writes the content of a thread buffer to the output file of its bound file
+void ___COVERON_FLUSH_THREAD_BUFFER(struct ___COVERON_THREAD_BUFFER_S *threadBuffer);
+
+// flushes and frees the buffers of an exiting thread (pthread key destructor)
+void ___COVERON_RELEASE_THREAD_BUFFERS(void *threadBufferArray);
+#endif
+
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+// opens the shared output file (once per process) and adds the file to its file table
+___COVERON_BOOL_T ___COVERON_SETUP_SHARED_FILE(___COVERON_FILE_T *coveronFile);
+
+// opens or creates the shared output file and writes the execution marker
+___COVERON_BOOL_T ___COVERON_OPEN_SHARED_FILE(void);
+
+// writes the file table entry of a file (file index, SHA256 hash, instrumentation random and filename)
+___COVERON_BOOL_T ___COVERON_GENERATE_FILE_TABLE_ENTRY(___COVERON_FILE_T *coveronFile);
+#endif
+
+// appends a record to the write buffer of a file or writes it directly
+void ___COVERON_WRITE_RECORD(___COVERON_FILE_T *coveronFile,
+                             ___COVERON_BYTE recordData[],
+                             unsigned long recordLength);
+
+#ifdef ___COVERON_FILE_REGISTRY_ENABLED
+// adds a file to the registry (the first registration installs the exit handler)
+void ___COVERON_ADD_REGISTERED_FILE(___COVERON_FILE_T *coveronFile);
+
+// writes the exit records or write buffers of all registered files (registered with atexit)
+void ___COVERON_WRITE_REGISTERED_FILES(void);
+
+// writes the registered files without taking the lock of the thread safe runtime
+void ___COVERON_WRITE_REGISTERED_FILES_UNLOCKED(void);
+#endif
+// !SECTION
+
+/*
+ * SECTION   FILE REGISTRY
+ */
+#ifdef ___COVERON_FILE_REGISTRY_ENABLED
+___COVERON_FILE_T *___COVERON_REGISTERED_FILES = NULL;
+#endif
+// !SECTION
+
+/*
+ * SECTION   PROCESS FILES
+ */
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+// files with an open output file (a forked child replaces them with its own files)
+___COVERON_FILE_T **___COVERON_PROCESS_FILES = NULL;
+unsigned long ___COVERON_PROCESS_FILE_COUNT = 0;
+unsigned long ___COVERON_PROCESS_FILE_CAPACITY = 0;
+
+___COVERON_BOOL_T ___COVERON_FORK_HANDLERS_INSTALLED = ___COVERON_BOOL_FALSE;
+#endif
+// !SECTION
+
+/*
+ * SECTION   WRITE BUFFER
+ */
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+typedef struct ___COVERON_WRITE_BUFFER_S
+{
+    // capacity of the buffer in bytes
+    unsigned long size;
+
+    // number of bytes, which weren't written to the output file yet
+    unsigned long used;
+
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+    // position and length of the last record inside the buffer (length 0 = no record since the last flush)
+    unsigned long lastRecord;
+    unsigned long lastRecordLength;
+#endif
+
+    // buffered records
+    ___COVERON_BYTE data[];
+} ___COVERON_WRITE_BUFFER_T;
+
+#ifdef ___COVERON_THREAD_BUFFERS_ENABLED
+// every thread gets a buffer per file it records, whose size is the write buffer size divided by this value
+#ifndef COVERON_THREAD_BUFFER_DIVISOR
+#define COVERON_THREAD_BUFFER_DIVISOR 8
+#endif
+
+typedef struct ___COVERON_THREAD_BUFFER_S
+{
+    // file of the buffered records
+    ___COVERON_FILE_T *coveronFile;
+
+    // number of published bytes, which weren't written to the output file yet
+    // (___COVERON_THREAD_BUFFER_BUSY while the thread folds a record, ___COVERON_THREAD_BUFFER_CLOSED after the flush at exit)
+    unsigned long used;
+
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+    // position and length of the last record inside the buffer (length 0 = no record since the last flush)
+    unsigned long lastRecord;
+    unsigned long lastRecordLength;
+#endif
+
+    // list of all thread buffers for the flush at exit
+    struct ___COVERON_THREAD_BUFFER_S *previousBuffer;
+    struct ___COVERON_THREAD_BUFFER_S *nextBuffer;
+
+    // buffered records
+    ___COVERON_BYTE data[];
+} ___COVERON_THREAD_BUFFER_T;
+
+typedef struct ___COVERON_THREAD_BUFFER_ARRAY_S
+{
+    // buffers of a thread by the thread buffer index of their file (NULL = no record of the file yet)
+    ___COVERON_THREAD_BUFFER_T **buffers;
+
+    // number of entries of the array
+    unsigned long count;
+} ___COVERON_THREAD_BUFFER_ARRAY_T;
+
+// states of the used bytes of a thread buffer: claimed by its thread or taken by the flush at exit
+#define ___COVERON_THREAD_BUFFER_BUSY ((unsigned long)-2)
+#define ___COVERON_THREAD_BUFFER_CLOSED ((unsigned long)-1)
+
+unsigned long ___COVERON_THREAD_BUFFER_SIZE = 0;
+
+// set by the flush at exit or on a fatal signal, later records get written directly under the mutex
+int ___COVERON_THREAD_BUFFERS_CLOSING = 0;
+
+// number of files with thread buffers (their indices start with 1)
+unsigned long ___COVERON_THREAD_BUFFER_FILE_COUNT = 0;
+
+___COVERON_THREAD_BUFFER_T *___COVERON_THREAD_BUFFERS = NULL;
+
+___COVERON_THREAD_LOCAL ___COVERON_THREAD_BUFFER_ARRAY_T ___COVERON_THREAD_BUFFER_ARRAY;
+
+// flushes the thread buffers of exiting threads
+pthread_key_t ___COVERON_THREAD_EXIT_KEY;
+#endif
+
+// signals, which terminate the program without calling the exit handlers
+const int ___COVERON_FATAL_SIGNALS[] = {
+    SIGABRT,
+    SIGFPE,
+    SIGILL,
+    SIGINT,
+    SIGSEGV,
+    SIGTERM,
+#ifdef SIGBUS
+    SIGBUS,
+#endif
+};
+#endif
+// !SECTION
+
+/*
+ * SECTION   VARINT RECORDS
+ */
+#ifdef ___COVERON_VARINT_RECORDS_ENABLED
+// marker ids start with 1, so varint records start with 0x04 or more. 0x00 starts the padding of special
+// records and this escape byte MC/DC vectors and repeat records
+#define ___COVERON_ESCAPE_RECORD 0x01
+#define ___COVERON_ESCAPE_LENGTH 1
+
+// longest varint of an unsigned long (7 bits per byte)
+#define ___COVERON_MAX_VARINT_LENGTH ((sizeof(unsigned long) * 8 + 6) / 7)
+#else
+#define ___COVERON_ESCAPE_LENGTH 0
+#endif
+// !SECTION
+
+/*
+ * SECTION   RUN-LENGTH ENCODING
+ */
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+// record type of the repeat record, which repeats the record in front of it
+#define ___COVERON_REPEAT_RECORD_TYPE 0xFD
+
+#define ___COVERON_MAX_REPEAT_COUNT 0xFFFFFFFFUL
+
+// records of the shared output file start with the 2 byte index of their file
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+#define ___COVERON_RECORD_PREFIX_LENGTH 2
+#else
+#define ___COVERON_RECORD_PREFIX_LENGTH 0
+#endif
+#endif
+// !SECTION
+
+/*
+ * SECTION   SHARED WRITER
+ */
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+// the file index is stored as 2 byte big endian value in front of every record (0 = record of the shared file itself)
+#define ___COVERON_MAX_FILE_INDEX 0xFFFF
+
+// longest record of the probes (MC/DC vector with two masks)
+#define ___COVERON_MAX_RECORD_LENGTH (___COVERON_ESCAPE_LENGTH + 7 + 2 * sizeof(___COVERON_MCDC_MASK_T))
+
+FILE *___COVERON_SHARED_FILE = NULL;
+
+// number of files inside the file table of the current execution
+unsigned long ___COVERON_SHARED_FILE_COUNT = 0;
+#endif
+// !SECTION
+
+/*
+ * SECTION   MAPPED TABLES
+ */
+#ifdef ___COVERON_MMAP_TABLES_ENABLED
+// the table file is a CRI file with a single execution, whose counter table or bitmap gets updated in place:
+// header, execution marker (padded with null chars to align the table to 8 bytes) and table record
+#define ___COVERON_TABLE_FILE_START_MAX (59 + 10 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT)) + 7 + 21)
+
+// the counters are stored in host byte order. The byte order mark behind the counter count tells the analyzer
+#define ___COVERON_BYTE_ORDER_MARK 0x0102030405060708ULL
+#endif
+// !SECTION
+
+/*
+ * SECTION   MCDC VECTOR DEDUPLICATION TABLE
+ */
+#ifdef ___COVERON_MCDC_DEDUPE_ENABLED
+// number of table entries (power of two). If the table is full, further vectors get written every time
+#ifndef COVERON_MCDC_DEDUPE_TABLE_SIZE
+#define COVERON_MCDC_DEDUPE_TABLE_SIZE 4096
+#endif
+
+typedef struct ___COVERON_MCDC_DEDUPE_ENTRY_S
+{
+    // file of the decision (NULL = unused entry)
+    ___COVERON_FILE_T *coveronFile;
+
+    // length of the record
+    int vectorLength;
+
+    // the record as written to the output file (decision id, type, masks, outcome)
+    ___COVERON_BYTE vectorData[7 + 2 * sizeof(___COVERON_MCDC_MASK_T)];
+} ___COVERON_MCDC_DEDUPE_ENTRY_T;
+
+___COVERON_MCDC_DEDUPE_ENTRY_T ___COVERON_MCDC_DEDUPE_TABLE[COVERON_MCDC_DEDUPE_TABLE_SIZE];
+#endif
 // !SECTION
 
 /*
@@ -83,7 +479,11 @@ void ___COVERON_GENERATE_EXECUTION_MARKER(___COVERON_FILE_T *coveronFile);
 ___COVERON_BOOL_T ___COVERON_SETUP_INSTRUMENTATION(
     ___COVERON_FILE_T *coveronFile)
 {
-#ifdef COVERON_NO_CONCATENATED_EXECUTIONS
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+    // the file writes to the shared output file instead of its own
+    return ___COVERON_SETUP_SHARED_FILE(coveronFile);
+#endif
+#if defined(COVERON_NO_CONCATENATED_EXECUTIONS) || defined(___COVERON_PER_PROCESS_CRI_ENABLED)
     // shortcut to just create a new file
     return ___COVERON_CREATE_NEW_OUTPUT_FILE(coveronFile);
 #endif
@@ -128,12 +528,19 @@ ___COVERON_BOOL_T ___COVERON_SETUP_INSTRUMENTATION(
     /*
      * generate execution marker
      */
-    ___COVERON_GENERATE_EXECUTION_MARKER(coveronFile);
+    ___COVERON_GENERATE_EXECUTION_MARKER(coveronFile->criFile);
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+    /*
+     * collect the following records in the write buffer
+     */
+    ___COVERON_SETUP_WRITE_BUFFER(coveronFile);
+#endif
 
     /*
      * set initialization var to true
      */
-    coveronFile->helperInitialized = ___COVERON_BOOL_TRUE;
+    ___COVERON_MARK_INITIALIZED(coveronFile);
 
     return ___COVERON_BOOL_TRUE;
 }
@@ -145,8 +552,12 @@ ___COVERON_BOOL_T ___COVERON_CREATE_NEW_OUTPUT_FILE(
      * load input file
      */
     // load file as read and write
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+    coveronFile->criFile = ___COVERON_OPEN_PROCESS_FILE(coveronFile->outputFilename);
+#else
     coveronFile->criFile =
         freopen(coveronFile->outputFilename, "wb+", coveronFile->criFile);
+#endif
 
     // check if file was successfully opened
     if (coveronFile->criFile == NULL)
@@ -154,6 +565,9 @@ ___COVERON_BOOL_T ___COVERON_CREATE_NEW_OUTPUT_FILE(
         // if not, return bad
         return ___COVERON_BOOL_FALSE;
     }
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+    ___COVERON_ADD_PROCESS_FILE(coveronFile);
+#endif
 
     /*
      * generate header
@@ -168,95 +582,1182 @@ ___COVERON_BOOL_T ___COVERON_CREATE_NEW_OUTPUT_FILE(
     /*
      * generate execution marker
      */
-    ___COVERON_GENERATE_EXECUTION_MARKER(coveronFile);
+    ___COVERON_GENERATE_EXECUTION_MARKER(coveronFile->criFile);
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+    /*
+     * collect the following records in the write buffer
+     */
+    ___COVERON_SETUP_WRITE_BUFFER(coveronFile);
+#endif
 
     /*
      * set initialization var to true
      */
-    coveronFile->helperInitialized = ___COVERON_BOOL_TRUE;
+    ___COVERON_MARK_INITIALIZED(coveronFile);
+
+    return ___COVERON_BOOL_TRUE;
 }
 
-___COVERON_BOOL_T ___COVERON_EQUAL_ARRAYS(___COVERON_BYTE *Array1,
-                                          ___COVERON_BYTE *Array2,
-                                          int byteCount)
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+___COVERON_BOOL_T ___COVERON_SETUP_SHARED_FILE(___COVERON_FILE_T *coveronFile)
 {
-    // iterate over arrays for given byte length
-    for (int i = 0; i < byteCount; i++)
+    // the first file opens the shared output file
+    if (___COVERON_SHARED_FILE == NULL &&
+        ___COVERON_OPEN_SHARED_FILE() == ___COVERON_BOOL_FALSE)
     {
-        // compare array items
-        if (Array1[i] != Array2[i])
-        {
-            return ___COVERON_BOOL_FALSE;
-        }
+        return ___COVERON_BOOL_FALSE;
+    }
+
+    // files beyond the largest file index don't get recorded
+    if (___COVERON_SHARED_FILE_COUNT >= ___COVERON_MAX_FILE_INDEX)
+    {
+        return ___COVERON_BOOL_FALSE;
+    }
+    coveronFile->criFile = ___COVERON_SHARED_FILE;
+    coveronFile->fileIndex = ___COVERON_SHARED_FILE_COUNT + 1;
+
+    if (___COVERON_GENERATE_FILE_TABLE_ENTRY(coveronFile) == ___COVERON_BOOL_FALSE)
+    {
+        return ___COVERON_BOOL_FALSE;
     }
+    ___COVERON_SHARED_FILE_COUNT++;
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+    ___COVERON_ADD_PROCESS_FILE(coveronFile);
+#endif
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+    /*
+     * collect the following records in the write buffer
+     */
+    ___COVERON_SETUP_WRITE_BUFFER(coveronFile);
+#endif
+
+    /*
+     * set initialization var to true
+     */
+    ___COVERON_MARK_INITIALIZED(coveronFile);
 
     return ___COVERON_BOOL_TRUE;
 }
 
-void ___COVERON_COPY_ARRAY(___COVERON_BYTE *SrcArray, ___COVERON_BYTE *DestArray, int byteCount)
+___COVERON_BOOL_T ___COVERON_OPEN_SHARED_FILE(void)
 {
-    // iterate over arrays for given byte length
-    for (int i = 0; i < byteCount; i++)
+    // the environment variable overrides the compiled filename
+    const char *sharedFilename = getenv("COVERON_SHARED_CRI_FILE");
+    if (sharedFilename == NULL || sharedFilename[0] == '\0')
     {
-        // set destination array value equal to source array
-        DestArray[i] = SrcArray[i];
+        sharedFilename = COVERON_SHARED_CRI_FILE;
     }
-}
 
-void ___COVERON_GENERATE_HEADER(___COVERON_FILE_T *coveronFile,
-                                ___COVERON_BYTE emptyArray[59])
-{
-    // write magic number
-    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&___COVERON_MAGIC_NUMBER[0], &emptyArray[0], 8);
+    // header of the shared output file: magic number, version and 48 reserved bytes
+    ___COVERON_BYTE headerSample[59] = {0};
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&___COVERON_SHARED_MAGIC_NUMBER[0], &headerSample[0], 8);
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&___COVERON_CRI_VERSION[0], &headerSample[8], 2);
+    headerSample[58] = 0x0A;
 
-    // write version
-    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&___COVERON_CRI_VERSION[0], &emptyArray[8], 2);
+#if !defined(COVERON_NO_CONCATENATED_EXECUTIONS) && !defined(___COVERON_PER_PROCESS_CRI_ENABLED)
+    // append to a valid shared output file
+    ___COVERON_SHARED_FILE = fopen(sharedFilename, "ab+");
+    if (___COVERON_SHARED_FILE != NULL)
+    {
+        ___COVERON_BYTE headerRead[59];
+        fseek(___COVERON_SHARED_FILE, 0, SEEK_SET);
+        if (fread(&headerRead[0], 1, 59, ___COVERON_SHARED_FILE) != 59 ||
+            ___COVERON_EQUAL_ARRAYS(&headerSample[0], &headerRead[0], 59) == ___COVERON_BOOL_FALSE)
+        {
+            fclose(___COVERON_SHARED_FILE);
+            ___COVERON_SHARED_FILE = NULL;
+        }
+        else
+        {
+            fseek(___COVERON_SHARED_FILE, 0, SEEK_END);
+        }
+    }
+#endif
 
-    // write SHA256 hash
-    ___COVERON_COPY_ARRAY(&coveronFile->SHA256Hash[0], &emptyArray[10], 32);
+    // create a new shared output file otherwise
+    if (___COVERON_SHARED_FILE == NULL)
+    {
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+        ___COVERON_SHARED_FILE = ___COVERON_OPEN_PROCESS_FILE(sharedFilename);
+#else
+        ___COVERON_SHARED_FILE = fopen(sharedFilename, "wb+");
+#endif
+        if (___COVERON_SHARED_FILE == NULL)
+        {
+            return ___COVERON_BOOL_FALSE;
+        }
+        fwrite(&headerSample[0], 1, 59, ___COVERON_SHARED_FILE);
+    }
 
-    // write instrumentation random
-    ___COVERON_COPY_ARRAY(
-        &coveronFile->instrumentationRandom[0], &emptyArray[42], 16);
+    // execution marker as record of the shared file itself (file index 0)
+    const ___COVERON_BYTE sharedFileIndex[2] = {0x00, 0x00};
+    fwrite(&sharedFileIndex[0], 1, 2, ___COVERON_SHARED_FILE);
+    ___COVERON_GENERATE_EXECUTION_MARKER(___COVERON_SHARED_FILE);
 
-    // new line marker
-    emptyArray[58] = 0x0A;
+    ___COVERON_SHARED_FILE_COUNT = 0;
+    return ___COVERON_BOOL_TRUE;
 }
 
-void ___COVERON_GENERATE_EXECUTION_MARKER(___COVERON_FILE_T *coveronFile)
+___COVERON_BOOL_T ___COVERON_GENERATE_FILE_TABLE_ENTRY(___COVERON_FILE_T *coveronFile)
 {
-    // generate execution marker array
-    ___COVERON_BYTE executionMarkerArray[10 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT))];
+    // shared file index, padding, magic number, length, file index, hash, random and filename
+    unsigned long filenameLength = strlen(coveronFile->outputFilename);
+    unsigned long entryLength = 50 + filenameLength;
+    ___COVERON_BYTE *entryData = malloc(15 + entryLength);
+    if (entryData == NULL)
+    {
+        return ___COVERON_BOOL_FALSE;
+    }
 
-    // fill first 5 bytes with padding
-    executionMarkerArray[0] = 0x00;
-    executionMarkerArray[1] = 0x00;
-    executionMarkerArray[2] = 0x00;
-    executionMarkerArray[3] = 0x00;
-    executionMarkerArray[4] = 0x00;
+    const ___COVERON_BYTE entryHeader[15] = {
+        0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00,
+        0x46, 0x49, 0x4C, 0x21, // FIL!
+        (___COVERON_BYTE)(entryLength >> 24),
+        (___COVERON_BYTE)(entryLength >> 16),
+        (___COVERON_BYTE)(entryLength >> 8),
+        (___COVERON_BYTE)(entryLength)};
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&entryHeader[0], &entryData[0], 15);
+    entryData[15] = (___COVERON_BYTE)(coveronFile->fileIndex >> 8);
+    entryData[16] = (___COVERON_BYTE)(coveronFile->fileIndex);
+    ___COVERON_COPY_ARRAY(&coveronFile->SHA256Hash[0], &entryData[17], 32);
+    ___COVERON_COPY_ARRAY(&coveronFile->instrumentationRandom[0], &entryData[49], 16);
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)coveronFile->outputFilename, &entryData[65], (int)filenameLength);
 
-    // fill next 4 bytes with execution marker magic number
-    executionMarkerArray[5] = 0x52;
-    executionMarkerArray[6] = 0x55;
-    executionMarkerArray[7] = 0x4E;
-    executionMarkerArray[8] = 0x21;
+    // one write, so records of other threads can't get in between
+    fwrite(entryData, 1, 15 + entryLength, ___COVERON_SHARED_FILE);
+    free(entryData);
+    return ___COVERON_BOOL_TRUE;
+}
+#endif
 
-    // fill in execution comment
+#ifdef ___COVERON_MMAP_TABLES_ENABLED
+___COVERON_BOOL_T ___COVERON_MAP_TABLE(___COVERON_FILE_T *coveronFile)
+{
+    /*
+     * generate the start of the table file
+     */
+#ifdef ___COVERON_COUNTER_MODE_ENABLED
+    unsigned long tableLength = coveronFile->counterCount;
+    unsigned long tableSize = coveronFile->counterCount * sizeof(___COVERON_COUNTER_T);
+    const ___COVERON_BYTE recordMagic[4] = {0x43, 0x4E, 0x48, 0x21}; // CNH!
+    unsigned long recordHeaderLength = 21;
+#else
+    unsigned long tableLength = coveronFile->bitCount;
+    unsigned long tableSize = (coveronFile->bitCount + 7) / 8;
+    const ___COVERON_BYTE recordMagic[4] = {0x42, 0x49, 0x54, 0x21}; // BIT!
+    unsigned long recordHeaderLength = 13;
+#endif
+    ___COVERON_BYTE fileStart[___COVERON_TABLE_FILE_START_MAX] = {0};
+    ___COVERON_GENERATE_HEADER(coveronFile, fileStart);
+
+    // execution marker (the analyzer strips the padding null chars of the comment)
+    unsigned long markerLength = 10 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT));
+    markerLength += (8 - (59 + markerLength + recordHeaderLength) % 8) % 8;
+    const ___COVERON_BYTE executionMagic[4] = {0x52, 0x55, 0x4E, 0x21}; // RUN!
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)executionMagic, &fileStart[59 + 5], 4);
     char commentString[sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT))] =
         CMD_STRING(COVERON_EXECUTION_COMMENT);
-    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)commentString,
-                          &executionMarkerArray[9],
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)commentString, &fileStart[59 + 9],
                           sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT)));
+    fileStart[59 + markerLength - 1] = 0x0A;
 
-    // new line char
-    executionMarkerArray[9 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT))] = 0x0A;
+    // table record: padding, magic number, 4 byte big endian length (and byte order mark)
+    unsigned long recordStart = 59 + markerLength;
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)recordMagic, &fileStart[recordStart + 5], 4);
+    fileStart[recordStart + 9] = (___COVERON_BYTE)(tableLength >> 24);
+    fileStart[recordStart + 10] = (___COVERON_BYTE)(tableLength >> 16);
+    fileStart[recordStart + 11] = (___COVERON_BYTE)(tableLength >> 8);
+    fileStart[recordStart + 12] = (___COVERON_BYTE)(tableLength);
+#ifdef ___COVERON_COUNTER_MODE_ENABLED
+    ___COVERON_COUNTER_T byteOrderMark = ___COVERON_BYTE_ORDER_MARK;
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&byteOrderMark, &fileStart[recordStart + 13], 8);
+#endif
+    unsigned long tableOffset = recordStart + recordHeaderLength;
+    unsigned long fileSize = tableOffset + tableSize;
 
-    // write to file
-    fwrite(&executionMarkerArray[0],
+    /*
+     * open the table file (processes, which set up the same file, wait for each other)
+     */
+    int tableFile = open(coveronFile->outputFilename, O_RDWR | O_CREAT, 0644);
+    if (tableFile < 0)
+    {
+        return ___COVERON_BOOL_FALSE;
+    }
+    flock(tableFile, LOCK_EX);
+
+    // table files of another build or execution comment get replaced
+#ifdef COVERON_NO_CONCATENATED_EXECUTIONS
+    ___COVERON_BOOL_T replaceFile = ___COVERON_BOOL_TRUE;
+#else
+    ___COVERON_BYTE fileStartRead[___COVERON_TABLE_FILE_START_MAX];
+    struct stat tableFileStat;
+    ___COVERON_BOOL_T replaceFile =
+        (fstat(tableFile, &tableFileStat) != 0 ||
+         (unsigned long)tableFileStat.st_size != fileSize ||
+         pread(tableFile, fileStartRead, tableOffset, 0) != (ssize_t)tableOffset ||
+         ___COVERON_EQUAL_ARRAYS(fileStart, fileStartRead, (int)tableOffset) == ___COVERON_BOOL_FALSE)
+            ? ___COVERON_BOOL_TRUE
+            : ___COVERON_BOOL_FALSE;
+#endif
+    if (replaceFile == ___COVERON_BOOL_TRUE &&
+        (ftruncate(tableFile, 0) != 0 ||
+         ftruncate(tableFile, (off_t)fileSize) != 0 ||
+         pwrite(tableFile, fileStart, tableOffset, 0) != (ssize_t)tableOffset))
+    {
+        flock(tableFile, LOCK_UN);
+        close(tableFile);
+        return ___COVERON_BOOL_FALSE;
+    }
+
+    // the mapping stays valid after closing the file
+    void *mappedFile = mmap(NULL, fileSize, PROT_READ | PROT_WRITE, MAP_SHARED, tableFile, 0);
+    flock(tableFile, LOCK_UN);
+    close(tableFile);
+    if (mappedFile == MAP_FAILED)
+    {
+        return ___COVERON_BOOL_FALSE;
+    }
+
+    /*
+     * add the hits before the mapping and let the probes use the mapped table
+     */
+#ifdef ___COVERON_COUNTER_MODE_ENABLED
+    ___COVERON_COUNTER_T *mappedCounters = (___COVERON_COUNTER_T *)((___COVERON_BYTE *)mappedFile + tableOffset);
+    for (unsigned long i = 0; i < coveronFile->counterCount; i++)
+    {
+        if (coveronFile->counters[i] != 0)
+        {
+            __atomic_fetch_add(&mappedCounters[i], coveronFile->counters[i], __ATOMIC_RELAXED);
+        }
+    }
+    __atomic_store_n(coveronFile->counterTable, mappedCounters, __ATOMIC_RELEASE);
+#else
+    ___COVERON_BYTE *mappedBitmap = (___COVERON_BYTE *)mappedFile + tableOffset;
+    for (unsigned long i = 0; i < tableSize; i++)
+    {
+        if (coveronFile->bitmap[i] != 0)
+        {
+            __atomic_fetch_or(&mappedBitmap[i], coveronFile->bitmap[i], __ATOMIC_RELAXED);
+        }
+    }
+    __atomic_store_n(coveronFile->bitmapTable, mappedBitmap, __ATOMIC_RELEASE);
+#endif
+
+    return ___COVERON_BOOL_TRUE;
+}
+#endif
+
+___COVERON_BOOL_T ___COVERON_INITIALIZE(___COVERON_FILE_T *coveronFile)
+{
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    // the first thread sets up the file, the others wait for it and skip the setup
+    pthread_mutex_lock(&___COVERON_MUTEX);
+    ___COVERON_BOOL_T initialized = ___COVERON_BOOL_TRUE;
+    if (!___COVERON_IS_INITIALIZED(coveronFile))
+    {
+        initialized = ___COVERON_SETUP_INSTRUMENTATION(coveronFile);
+    }
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+    return initialized;
+#else
+    return ___COVERON_SETUP_INSTRUMENTATION(coveronFile);
+#endif
+}
+
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+FILE *___COVERON_OPEN_PROCESS_FILE(const char *filename)
+{
+    // a forked child must not write to the files of its parent
+    ___COVERON_INSTALL_FORK_HANDLERS();
+
+    // <name>.cri becomes <name>.<pid>.<time>.<sequence>.cri. The sequence number only counts up,
+    // if a file with the same name already exists (reused pid within the same second)
+    size_t baseLength = strlen(filename);
+    if (baseLength >= 4 && strcmp(&filename[baseLength - 4], ".cri") == 0)
+    {
+        baseLength -= 4;
+    }
+    size_t processFilenameSize = baseLength + 64;
+    char *processFilename = (char *)malloc(processFilenameSize);
+    if (processFilename == NULL)
+    {
+        return NULL;
+    }
+
+    FILE *processFile = NULL;
+    long processId = (long)getpid();
+    long long startTime = (long long)time(NULL);
+    for (unsigned int sequenceNumber = 0; processFile == NULL && sequenceNumber < 1000; sequenceNumber++)
+    {
+        snprintf(processFilename, processFilenameSize, "%.*s.%ld.%lld.%u.cri",
+                 (int)baseLength, filename, processId, startTime, sequenceNumber);
+
+        // exclusive creation, so two processes never share a file
+        processFile = fopen(processFilename, "wb+x");
+        if (processFile == NULL && errno != EEXIST)
+        {
+            break;
+        }
+    }
+
+    free(processFilename);
+    return processFile;
+}
+
+void ___COVERON_INSTALL_FORK_HANDLERS(void)
+{
+    if (___COVERON_FORK_HANDLERS_INSTALLED == ___COVERON_BOOL_FALSE)
+    {
+        pthread_atfork(___COVERON_PREPARE_FORK, ___COVERON_PARENT_AFTER_FORK, ___COVERON_CHILD_AFTER_FORK);
+        ___COVERON_FORK_HANDLERS_INSTALLED = ___COVERON_BOOL_TRUE;
+    }
+}
+
+void ___COVERON_ADD_PROCESS_FILE(___COVERON_FILE_T *coveronFile)
+{
+    if (___COVERON_PROCESS_FILE_COUNT == ___COVERON_PROCESS_FILE_CAPACITY)
+    {
+        unsigned long capacity = (___COVERON_PROCESS_FILE_CAPACITY == 0) ? 16 : 2 * ___COVERON_PROCESS_FILE_CAPACITY;
+        ___COVERON_FILE_T **processFiles = realloc(___COVERON_PROCESS_FILES, capacity * sizeof(___COVERON_FILE_T *));
+        if (processFiles == NULL)
+        {
+            return;
+        }
+        ___COVERON_PROCESS_FILES = processFiles;
+        ___COVERON_PROCESS_FILE_CAPACITY = capacity;
+    }
+    ___COVERON_PROCESS_FILES[___COVERON_PROCESS_FILE_COUNT++] = coveronFile;
+}
+
+void ___COVERON_PREPARE_FORK(void)
+{
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    // no other thread may set up a file or flush a buffer during the fork
+    pthread_mutex_lock(&___COVERON_MUTEX);
+#endif
+    for (unsigned long i = 0; i < ___COVERON_PROCESS_FILE_COUNT; i++)
+    {
+        fflush(___COVERON_PROCESS_FILES[i]->criFile);
+    }
+}
+
+void ___COVERON_PARENT_AFTER_FORK(void)
+{
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+#endif
+}
+
+void ___COVERON_CHILD_AFTER_FORK(void)
+{
+    // buffered records and counted hits belong to the parent, which still writes them
+#ifdef ___COVERON_THREAD_BUFFERS_ENABLED
+    for (___COVERON_THREAD_BUFFER_T *threadBuffer = ___COVERON_THREAD_BUFFERS;
+         threadBuffer != NULL;
+         threadBuffer = threadBuffer->nextBuffer)
+    {
+        threadBuffer->used = 0;
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+        threadBuffer->lastRecordLength = 0;
+#endif
+    }
+#endif
+#ifdef ___COVERON_FILE_REGISTRY_ENABLED
+    for (___COVERON_FILE_T *coveronFile = ___COVERON_REGISTERED_FILES;
+         coveronFile != NULL;
+         coveronFile = coveronFile->nextFile)
+    {
+#if defined(___COVERON_WRITE_BUFFER_ENABLED) && !defined(___COVERON_THREAD_BUFFERS_ENABLED)
+        if (coveronFile->writeBuffer != NULL)
+        {
+            coveronFile->writeBuffer->used = 0;
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+            coveronFile->writeBuffer->lastRecordLength = 0;
+#endif
+        }
+#endif
+#ifdef ___COVERON_COUNTER_MODE_ENABLED
+        memset(coveronFile->counters, 0, coveronFile->counterCount * sizeof(___COVERON_COUNTER_T));
+#endif
+#ifdef ___COVERON_BITMAP_MODE_ENABLED
+        memset(coveronFile->bitmap, 0, (coveronFile->bitCount + 7) / 8);
+#endif
+    }
+#endif
+#ifdef ___COVERON_MCDC_DEDUPE_ENABLED
+    // the vectors seen by the parent have to be written to the files of the child again
+    memset(___COVERON_MCDC_DEDUPE_TABLE, 0, sizeof(___COVERON_MCDC_DEDUPE_TABLE));
+#endif
+
+    // the child writes its records to its own per-process files
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+    if (___COVERON_SHARED_FILE != NULL)
+    {
+        ___COVERON_REOPEN_SHARED_FILE();
+    }
+#else
+    for (unsigned long i = 0; i < ___COVERON_PROCESS_FILE_COUNT; i++)
+    {
+        ___COVERON_REOPEN_PROCESS_FILE(___COVERON_PROCESS_FILES[i]);
+    }
+#endif
+
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+#endif
+}
+
+void ___COVERON_REOPEN_PROCESS_FILE(___COVERON_FILE_T *coveronFile)
+{
+    // if no file can be created, the child keeps appending to the file of its parent
+    FILE *processFile = ___COVERON_OPEN_PROCESS_FILE(coveronFile->outputFilename);
+    if (processFile == NULL)
+    {
+        return;
+    }
+
+    // the stdio buffer was flushed before the fork, so closing writes nothing to the file of the parent
+    fclose(coveronFile->criFile);
+    coveronFile->criFile = processFile;
+
+    ___COVERON_BYTE headerArray[59];
+    ___COVERON_GENERATE_HEADER(coveronFile, headerArray);
+    fwrite(&headerArray[0], 1, 59, coveronFile->criFile);
+    ___COVERON_GENERATE_EXECUTION_MARKER(coveronFile->criFile);
+}
+
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+void ___COVERON_REOPEN_SHARED_FILE(void)
+{
+    FILE *parentFile = ___COVERON_SHARED_FILE;
+    unsigned long fileCount = ___COVERON_SHARED_FILE_COUNT;
+
+    // if no file can be created, the child keeps appending to the file of its parent
+    ___COVERON_SHARED_FILE = NULL;
+    if (___COVERON_OPEN_SHARED_FILE() == ___COVERON_BOOL_FALSE)
+    {
+        ___COVERON_SHARED_FILE = parentFile;
+        ___COVERON_SHARED_FILE_COUNT = fileCount;
+        return;
+    }
+    fclose(parentFile);
+
+    // the files keep their indices
+    ___COVERON_SHARED_FILE_COUNT = fileCount;
+    for (unsigned long i = 0; i < ___COVERON_PROCESS_FILE_COUNT; i++)
+    {
+        ___COVERON_PROCESS_FILES[i]->criFile = ___COVERON_SHARED_FILE;
+        ___COVERON_GENERATE_FILE_TABLE_ENTRY(___COVERON_PROCESS_FILES[i]);
+    }
+}
+#endif
+#endif
+
+___COVERON_BOOL_T ___COVERON_EQUAL_ARRAYS(___COVERON_BYTE *Array1,
+                                          ___COVERON_BYTE *Array2,
+                                          int byteCount)
+{
+    // iterate over arrays for given byte length
+    for (int i = 0; i < byteCount; i++)
+    {
+        // compare array items
+        if (Array1[i] != Array2[i])
+        {
+            return ___COVERON_BOOL_FALSE;
+        }
+    }
+
+    return ___COVERON_BOOL_TRUE;
+}
+
+void ___COVERON_COPY_ARRAY(___COVERON_BYTE *SrcArray, ___COVERON_BYTE *DestArray, int byteCount)
+{
+    // iterate over arrays for given byte length
+    for (int i = 0; i < byteCount; i++)
+    {
+        // set destination array value equal to source array
+        DestArray[i] = SrcArray[i];
+    }
+}
+
+void ___COVERON_GENERATE_HEADER(___COVERON_FILE_T *coveronFile,
+                                ___COVERON_BYTE emptyArray[59])
+{
+    // write magic number
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&___COVERON_MAGIC_NUMBER[0], &emptyArray[0], 8);
+
+    // write version
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)&___COVERON_CRI_VERSION[0], &emptyArray[8], 2);
+
+    // write SHA256 hash
+    ___COVERON_COPY_ARRAY(&coveronFile->SHA256Hash[0], &emptyArray[10], 32);
+
+    // write instrumentation random
+    ___COVERON_COPY_ARRAY(
+        &coveronFile->instrumentationRandom[0], &emptyArray[42], 16);
+
+    // new line marker
+    emptyArray[58] = 0x0A;
+}
+
+void ___COVERON_GENERATE_EXECUTION_MARKER(void *outputFile)
+{
+    // generate execution marker array
+    ___COVERON_BYTE executionMarkerArray[10 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT))];
+
+    // fill first 5 bytes with padding
+    executionMarkerArray[0] = 0x00;
+    executionMarkerArray[1] = 0x00;
+    executionMarkerArray[2] = 0x00;
+    executionMarkerArray[3] = 0x00;
+    executionMarkerArray[4] = 0x00;
+
+    // fill next 4 bytes with execution marker magic number
+    executionMarkerArray[5] = 0x52;
+    executionMarkerArray[6] = 0x55;
+    executionMarkerArray[7] = 0x4E;
+    executionMarkerArray[8] = 0x21;
+
+    // fill in execution comment
+    char commentString[sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT))] =
+        CMD_STRING(COVERON_EXECUTION_COMMENT);
+    ___COVERON_COPY_ARRAY((___COVERON_BYTE *)commentString,
+                          &executionMarkerArray[9],
+                          sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT)));
+
+    // new line char
+    executionMarkerArray[9 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT))] = 0x0A;
+
+    // write to file
+    fwrite(&executionMarkerArray[0],
            1,
            10 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT)),
-           coveronFile->criFile);
+           outputFile);
+}
+
+#ifdef ___COVERON_MCDC_DEDUPE_ENABLED
+___COVERON_BOOL_T ___COVERON_MCDC_VECTOR_SEEN(___COVERON_FILE_T *coveronFile,
+                                             ___COVERON_BYTE vectorData[],
+                                             int vectorLength)
+{
+    // FNV-1a hash of the record
+    unsigned long hash = 2166136261UL;
+    for (int i = 0; i < vectorLength; i++)
+    {
+        hash = ((hash ^ vectorData[i]) * 16777619UL) & 0xFFFFFFFFUL;
+    }
+
+    // linear probing
+    for (unsigned long probe = 0; probe < COVERON_MCDC_DEDUPE_TABLE_SIZE; probe++)
+    {
+        ___COVERON_MCDC_DEDUPE_ENTRY_T *entry =
+            &___COVERON_MCDC_DEDUPE_TABLE[(hash + probe) & (COVERON_MCDC_DEDUPE_TABLE_SIZE - 1)];
+
+        if (entry->coveronFile == NULL)
+        {
+            // unknown vector, remember it
+            entry->coveronFile = coveronFile;
+            entry->vectorLength = vectorLength;
+            ___COVERON_COPY_ARRAY(vectorData, entry->vectorData, vectorLength);
+            return ___COVERON_BOOL_FALSE;
+        }
+
+        if (entry->coveronFile == coveronFile &&
+            entry->vectorLength == vectorLength &&
+            ___COVERON_EQUAL_ARRAYS(entry->vectorData, vectorData, vectorLength) == ___COVERON_BOOL_TRUE)
+        {
+            return ___COVERON_BOOL_TRUE;
+        }
+    }
+
+    // table is full
+    return ___COVERON_BOOL_FALSE;
+}
+#endif
+
+#ifdef ___COVERON_EXIT_RECORDS_ENABLED
+void ___COVERON_GENERATE_EXIT_RECORD_HEADER(___COVERON_FILE_T *coveronFile,
+                                            const char recordMagic[4],
+                                            unsigned long recordLength)
+{
+    // record header: 5 bytes padding, record magic number and length
+    ___COVERON_BYTE recordHeader[13] = {
+        0x00, 0x00, 0x00, 0x00, 0x00,
+        (___COVERON_BYTE)recordMagic[0],
+        (___COVERON_BYTE)recordMagic[1],
+        (___COVERON_BYTE)recordMagic[2],
+        (___COVERON_BYTE)recordMagic[3],
+        (___COVERON_BYTE)(recordLength >> 24),
+        (___COVERON_BYTE)(recordLength >> 16),
+        (___COVERON_BYTE)(recordLength >> 8),
+        (___COVERON_BYTE)(recordLength)};
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+    // the record belongs to the file with this index (exit records are only written at exit)
+    const ___COVERON_BYTE fileIndex[2] = {(___COVERON_BYTE)(coveronFile->fileIndex >> 8),
+                                          (___COVERON_BYTE)(coveronFile->fileIndex)};
+    fwrite(&fileIndex[0], 1, 2, coveronFile->criFile);
+#endif
+    fwrite(&recordHeader[0], 1, 13, coveronFile->criFile);
+}
+#endif
+
+#if defined(___COVERON_COUNTER_MODE_ENABLED) && defined(___COVERON_EXIT_RECORDS_ENABLED)
+void ___COVERON_GENERATE_COUNTER_TABLE(___COVERON_FILE_T *coveronFile)
+{
+    ___COVERON_GENERATE_EXIT_RECORD_HEADER(coveronFile, "CNT!", coveronFile->counterCount);
+
+    // counters as 8 byte big endian values
+    for (unsigned long i = 0; i < coveronFile->counterCount; i++)
+    {
+        ___COVERON_BYTE counterData[8];
+        for (int byteIndex = 0; byteIndex < 8; byteIndex++)
+        {
+            counterData[byteIndex] =
+                (___COVERON_BYTE)(coveronFile->counters[i] >> (8 * (7 - byteIndex)));
+        }
+        fwrite(&counterData[0], 1, 8, coveronFile->criFile);
+    }
 }
+#endif
+
+#if defined(___COVERON_BITMAP_MODE_ENABLED) && defined(___COVERON_EXIT_RECORDS_ENABLED)
+void ___COVERON_GENERATE_BITMAP(___COVERON_FILE_T *coveronFile)
+{
+    ___COVERON_GENERATE_EXIT_RECORD_HEADER(coveronFile, "BIT!", coveronFile->bitCount);
+
+    // bit i is stored in byte i / 8 with the mask 1 << (i % 8)
+    if (coveronFile->bitCount > 0)
+    {
+        fwrite(coveronFile->bitmap, 1, (coveronFile->bitCount + 7) / 8, coveronFile->criFile);
+    }
+}
+#endif
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+void ___COVERON_SETUP_WRITE_BUFFER(___COVERON_FILE_T *coveronFile)
+{
+    // the environment variable overrides the compiled buffer size
+    unsigned long bufferSize = COVERON_WRITE_BUFFER_SIZE;
+    char *bufferSizeString = getenv("COVERON_WRITE_BUFFER_SIZE");
+    if (bufferSizeString != NULL)
+    {
+        bufferSize = strtoul(bufferSizeString, NULL, 10);
+    }
+
+    // without a buffer, every record gets written directly
+    if (bufferSize == 0)
+    {
+        return;
+    }
+
+#ifdef ___COVERON_THREAD_BUFFERS_ENABLED
+    // the records get collected in the buffers of the threads (allocated on their first record)
+    if (___COVERON_THREAD_BUFFER_SIZE == 0)
+    {
+        pthread_key_create(&___COVERON_THREAD_EXIT_KEY, ___COVERON_RELEASE_THREAD_BUFFERS);
+        ___COVERON_THREAD_BUFFER_SIZE = bufferSize / COVERON_THREAD_BUFFER_DIVISOR;
+        if (___COVERON_THREAD_BUFFER_SIZE == 0)
+        {
+            ___COVERON_THREAD_BUFFER_SIZE = 1;
+        }
+    }
+
+    // the threads find the buffers of the file by its index, so files never share a buffer
+    __atomic_store_n(&coveronFile->threadBufferIndex, ++___COVERON_THREAD_BUFFER_FILE_COUNT, __ATOMIC_RELAXED);
+    ___COVERON_ADD_REGISTERED_FILE(coveronFile);
+    return;
+#endif
+    coveronFile->writeBuffer = malloc(sizeof(___COVERON_WRITE_BUFFER_T) + bufferSize);
+    if (coveronFile->writeBuffer == NULL)
+    {
+        return;
+    }
+    coveronFile->writeBuffer->size = bufferSize;
+    coveronFile->writeBuffer->used = 0;
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+    coveronFile->writeBuffer->lastRecordLength = 0;
+#endif
+
+    ___COVERON_ADD_REGISTERED_FILE(coveronFile);
+}
+
+void ___COVERON_FLUSH_WRITE_BUFFER(___COVERON_FILE_T *coveronFile)
+{
+    if (coveronFile->writeBuffer->used > 0)
+    {
+        fwrite(coveronFile->writeBuffer->data, 1, coveronFile->writeBuffer->used, coveronFile->criFile);
+        coveronFile->writeBuffer->used = 0;
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+        coveronFile->writeBuffer->lastRecordLength = 0;
+#endif
+    }
+}
+
+void ___COVERON_HANDLE_FATAL_SIGNAL(int signalNumber)
+{
+    // NOTE stdio isn't async signal safe, but the program gets terminated anyway
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    // the crashed thread might hold the lock already, so it's only taken if it's free
+    ___COVERON_BOOL_T locked = (pthread_mutex_trylock(&___COVERON_MUTEX) == 0) ? ___COVERON_BOOL_TRUE : ___COVERON_BOOL_FALSE;
+    ___COVERON_WRITE_REGISTERED_FILES_UNLOCKED();
+    if (locked == ___COVERON_BOOL_TRUE)
+    {
+        pthread_mutex_unlock(&___COVERON_MUTEX);
+    }
+#else
+    ___COVERON_WRITE_REGISTERED_FILES();
+#endif
+
+    // the exit handler mustn't write the buffers again
+    ___COVERON_REGISTERED_FILES = NULL;
+
+    signal(signalNumber, SIG_DFL);
+    raise(signalNumber);
+}
+#endif
+
+#ifdef ___COVERON_THREAD_BUFFERS_ENABLED
+___COVERON_THREAD_BUFFER_T *___COVERON_BIND_THREAD_BUFFER(___COVERON_FILE_T *coveronFile)
+{
+    unsigned long threadBufferIndex = __atomic_load_n(&coveronFile->threadBufferIndex, __ATOMIC_RELAXED);
+    if (threadBufferIndex == 0)
+    {
+        // the file writes its records directly (no write buffer size at runtime)
+        return NULL;
+    }
+
+    // grow the buffer array of the thread up to the index of the file
+    ___COVERON_THREAD_BUFFER_ARRAY_T *bufferArray = &___COVERON_THREAD_BUFFER_ARRAY;
+    if (threadBufferIndex >= bufferArray->count)
+    {
+        unsigned long count = (bufferArray->count == 0) ? 16 : bufferArray->count;
+        while (count <= threadBufferIndex)
+        {
+            count *= 2;
+        }
+        ___COVERON_THREAD_BUFFER_T **buffers = realloc(bufferArray->buffers, count * sizeof(___COVERON_THREAD_BUFFER_T *));
+        if (buffers == NULL)
+        {
+            return NULL;
+        }
+        for (unsigned long i = bufferArray->count; i < count; i++)
+        {
+            buffers[i] = NULL;
+        }
+        bufferArray->buffers = buffers;
+        bufferArray->count = count;
+    }
+
+    // first record of the thread for this file
+    ___COVERON_THREAD_BUFFER_T *threadBuffer = malloc(sizeof(___COVERON_THREAD_BUFFER_T) + ___COVERON_THREAD_BUFFER_SIZE);
+    if (threadBuffer == NULL)
+    {
+        return NULL;
+    }
+    threadBuffer->coveronFile = coveronFile;
+    threadBuffer->used = 0;
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+    threadBuffer->lastRecordLength = 0;
+#endif
+    threadBuffer->previousBuffer = NULL;
+
+    pthread_mutex_lock(&___COVERON_MUTEX);
+    if (__atomic_load_n(&___COVERON_THREAD_BUFFERS_CLOSING, __ATOMIC_ACQUIRE))
+    {
+        // the buffers were written already
+        pthread_mutex_unlock(&___COVERON_MUTEX);
+        free(threadBuffer);
+        return NULL;
+    }
+    threadBuffer->nextBuffer = ___COVERON_THREAD_BUFFERS;
+    if (___COVERON_THREAD_BUFFERS != NULL)
+    {
+        ___COVERON_THREAD_BUFFERS->previousBuffer = threadBuffer;
+    }
+    ___COVERON_THREAD_BUFFERS = threadBuffer;
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+
+    // any value other than NULL lets the key destructor run at thread exit
+    pthread_setspecific(___COVERON_THREAD_EXIT_KEY, bufferArray);
+    bufferArray->buffers[threadBufferIndex] = threadBuffer;
+
+    return threadBuffer;
+}
+
+void ___COVERON_FLUSH_THREAD_BUFFER(___COVERON_THREAD_BUFFER_T *threadBuffer)
+{
+    // take the published records and close the buffer, so its thread writes later records directly.
+    // A claimed buffer gets written by its thread, when it fails to publish its records
+    unsigned long used = __atomic_exchange_n(&threadBuffer->used, ___COVERON_THREAD_BUFFER_CLOSED, __ATOMIC_ACQ_REL);
+    if (used != ___COVERON_THREAD_BUFFER_BUSY && used != ___COVERON_THREAD_BUFFER_CLOSED && used > 0)
+    {
+        fwrite(threadBuffer->data, 1, used, threadBuffer->coveronFile->criFile);
+    }
+}
+
+void ___COVERON_RELEASE_THREAD_BUFFERS(void *threadBufferArray)
+{
+    ___COVERON_THREAD_BUFFER_ARRAY_T *bufferArray = (___COVERON_THREAD_BUFFER_ARRAY_T *)threadBufferArray;
+    pthread_mutex_lock(&___COVERON_MUTEX);
+    for (unsigned long i = 0; i < bufferArray->count; i++)
+    {
+        ___COVERON_THREAD_BUFFER_T *threadBuffer = bufferArray->buffers[i];
+        if (threadBuffer == NULL)
+        {
+            continue;
+        }
+        ___COVERON_FLUSH_THREAD_BUFFER(threadBuffer);
+
+        // remove buffer from the list
+        if (threadBuffer->previousBuffer != NULL)
+        {
+            threadBuffer->previousBuffer->nextBuffer = threadBuffer->nextBuffer;
+        }
+        else
+        {
+            ___COVERON_THREAD_BUFFERS = threadBuffer->nextBuffer;
+        }
+        if (threadBuffer->nextBuffer != NULL)
+        {
+            threadBuffer->nextBuffer->previousBuffer = threadBuffer->previousBuffer;
+        }
+        free(threadBuffer);
+    }
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+
+    free(bufferArray->buffers);
+    bufferArray->buffers = NULL;
+    bufferArray->count = 0;
+}
+#endif
+
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+unsigned long ___COVERON_FOLD_RECORD(___COVERON_BYTE bufferData[],
+                                     unsigned long used,
+                                     unsigned long size,
+                                     unsigned long lastRecord,
+                                     unsigned long lastRecordLength,
+                                     ___COVERON_BYTE recordData[],
+                                     unsigned long recordLength)
+{
+    if (lastRecordLength != recordLength ||
+        ___COVERON_EQUAL_ARRAYS(&bufferData[lastRecord], recordData, (int)recordLength) == ___COVERON_BOOL_FALSE)
+    {
+        return 0;
+    }
+
+    // repeat record: (file index of the shared writer), (escape byte of varint records),
+    // 4 byte big endian repeat count, record type
+    unsigned long repeatRecord = lastRecord + recordLength;
+    unsigned long repeatRecordLength = ___COVERON_RECORD_PREFIX_LENGTH + ___COVERON_ESCAPE_LENGTH + 5;
+    if (used == repeatRecord + repeatRecordLength)
+    {
+        // count up the repeat record behind the last record (a full counter starts a new run)
+        ___COVERON_BYTE *repeatCount =
+            &bufferData[repeatRecord + ___COVERON_RECORD_PREFIX_LENGTH + ___COVERON_ESCAPE_LENGTH];
+        unsigned long count = ((unsigned long)repeatCount[0] << 24) | ((unsigned long)repeatCount[1] << 16) |
+                              ((unsigned long)repeatCount[2] << 8) | (unsigned long)repeatCount[3];
+        if (count == ___COVERON_MAX_REPEAT_COUNT)
+        {
+            return 0;
+        }
+        count++;
+        repeatCount[0] = (___COVERON_BYTE)(count >> 24);
+        repeatCount[1] = (___COVERON_BYTE)(count >> 16);
+        repeatCount[2] = (___COVERON_BYTE)(count >> 8);
+        repeatCount[3] = (___COVERON_BYTE)(count);
+        return used;
+    }
+    if (used == repeatRecord && used + repeatRecordLength <= size)
+    {
+        // first repeat of the last record
+        ___COVERON_COPY_ARRAY(recordData, &bufferData[used], ___COVERON_RECORD_PREFIX_LENGTH);
+#ifdef ___COVERON_VARINT_RECORDS_ENABLED
+        ___COVERON_BYTE repeatData[6] = {___COVERON_ESCAPE_RECORD, 0x00, 0x00, 0x00, 0x01, ___COVERON_REPEAT_RECORD_TYPE};
+#else
+        ___COVERON_BYTE repeatData[5] = {0x00, 0x00, 0x00, 0x01, ___COVERON_REPEAT_RECORD_TYPE};
+#endif
+        ___COVERON_COPY_ARRAY(repeatData, &bufferData[used + ___COVERON_RECORD_PREFIX_LENGTH],
+                              ___COVERON_ESCAPE_LENGTH + 5);
+        return used + repeatRecordLength;
+    }
+    return 0;
+}
+#endif
+
+#ifdef ___COVERON_VARINT_RECORDS_ENABLED
+unsigned long ___COVERON_ENCODE_VARINT(unsigned long value, ___COVERON_BYTE varintData[])
+{
+    unsigned long varintLength = 0;
+    while (value >= 0x80)
+    {
+        varintData[varintLength++] = (___COVERON_BYTE)(value | 0x80);
+        value >>= 7;
+    }
+    varintData[varintLength++] = (___COVERON_BYTE)value;
+    return varintLength;
+}
+#endif
+
+void ___COVERON_WRITE_RECORD(___COVERON_FILE_T *coveronFile,
+                             ___COVERON_BYTE recordData[],
+                             unsigned long recordLength)
+{
+#if defined(___COVERON_THREAD_BUFFERS_ENABLED)
+    // every thread appends to its own buffer of the file, so no lock is needed until the buffer is full
+    unsigned long threadBufferIndex = __atomic_load_n(&coveronFile->threadBufferIndex, __ATOMIC_RELAXED);
+    ___COVERON_THREAD_BUFFER_T *threadBuffer = (threadBufferIndex < ___COVERON_THREAD_BUFFER_ARRAY.count)
+                                                   ? ___COVERON_THREAD_BUFFER_ARRAY.buffers[threadBufferIndex]
+                                                   : NULL;
+    if (threadBuffer == NULL)
+    {
+        // only files with a buffer were initialized for sure (index 0 never has a buffer)
+        if (!___COVERON_IS_INITIALIZED(coveronFile) &&
+            ___COVERON_INITIALIZE(coveronFile) == ___COVERON_BOOL_FALSE)
+        {
+            return;
+        }
+        threadBuffer = ___COVERON_BIND_THREAD_BUFFER(coveronFile);
+    }
+#elif defined(___COVERON_WRITE_BUFFER_ENABLED)
+    // only initialized files have a write buffer, so the initialization gets checked without a buffer only
+    ___COVERON_WRITE_BUFFER_T *writeBuffer = coveronFile->writeBuffer;
+    if (writeBuffer == NULL)
+    {
+        if (!___COVERON_IS_INITIALIZED(coveronFile) &&
+            ___COVERON_INITIALIZE(coveronFile) == ___COVERON_BOOL_FALSE)
+        {
+            return;
+        }
+        writeBuffer = coveronFile->writeBuffer;
+    }
+#else
+    // check, if the helper was initialized
+    if (!___COVERON_IS_INITIALIZED(coveronFile) &&
+        ___COVERON_INITIALIZE(coveronFile) == ___COVERON_BOOL_FALSE)
+    {
+        return;
+    }
+#endif
+
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+    // records of the shared output file start with the index of their file (known after the initialization)
+    ___COVERON_BYTE sharedRecordData[2 + ___COVERON_MAX_RECORD_LENGTH];
+    sharedRecordData[0] = (___COVERON_BYTE)(coveronFile->fileIndex >> 8);
+    sharedRecordData[1] = (___COVERON_BYTE)(coveronFile->fileIndex);
+    ___COVERON_COPY_ARRAY(recordData, &sharedRecordData[2], (int)recordLength);
+    recordData = sharedRecordData;
+    recordLength += 2;
+#endif
+
+#if defined(___COVERON_THREAD_BUFFERS_ENABLED)
+    // the bytes behind the published records belong to the thread, so an appended record only needs to be
+    // published. Folding a repeat changes a published record, so the buffer gets claimed for it first.
+    // The flush at exit takes the published records, the thread writes the ones it couldn't publish anymore
+    unsigned long used = (threadBuffer != NULL) ? __atomic_load_n(&threadBuffer->used, __ATOMIC_RELAXED)
+                                                : ___COVERON_THREAD_BUFFER_CLOSED;
+    if (used != ___COVERON_THREAD_BUFFER_CLOSED && recordLength <= ___COVERON_THREAD_BUFFER_SIZE)
+    {
+        unsigned long publishedUsed = used;
+        unsigned long foldedUsed = 0;
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+        if (threadBuffer->lastRecordLength == recordLength &&
+            ___COVERON_EQUAL_ARRAYS(&threadBuffer->data[threadBuffer->lastRecord], recordData, (int)recordLength) ==
+                ___COVERON_BOOL_TRUE)
+        {
+            if (__atomic_compare_exchange_n(&threadBuffer->used, &publishedUsed, ___COVERON_THREAD_BUFFER_BUSY, 0,
+                                            __ATOMIC_ACQUIRE, __ATOMIC_RELAXED))
+            {
+                publishedUsed = ___COVERON_THREAD_BUFFER_BUSY;
+                foldedUsed = ___COVERON_FOLD_RECORD(threadBuffer->data, used, ___COVERON_THREAD_BUFFER_SIZE,
+                                                    threadBuffer->lastRecord, threadBuffer->lastRecordLength,
+                                                    recordData, recordLength);
+            }
+            else
+            {
+                used = ___COVERON_THREAD_BUFFER_CLOSED;
+            }
+        }
+#endif
+        if (used != ___COVERON_THREAD_BUFFER_CLOSED && foldedUsed == 0 &&
+            used + recordLength > ___COVERON_THREAD_BUFFER_SIZE)
+        {
+            // take the records of the full buffer (a claimed buffer belongs to the thread already)
+            if (publishedUsed == ___COVERON_THREAD_BUFFER_BUSY ||
+                __atomic_compare_exchange_n(&threadBuffer->used, &publishedUsed, 0, 0,
+                                            __ATOMIC_ACQUIRE, __ATOMIC_RELAXED))
+            {
+                pthread_mutex_lock(&___COVERON_MUTEX);
+                fwrite(threadBuffer->data, 1, used, coveronFile->criFile);
+                pthread_mutex_unlock(&___COVERON_MUTEX);
+                if (publishedUsed != ___COVERON_THREAD_BUFFER_BUSY)
+                {
+                    publishedUsed = 0;
+                }
+                used = 0;
+            }
+            else
+            {
+                used = ___COVERON_THREAD_BUFFER_CLOSED;
+            }
+        }
+        if (used != ___COVERON_THREAD_BUFFER_CLOSED)
+        {
+            if (foldedUsed != 0)
+            {
+                used = foldedUsed;
+            }
+            else
+            {
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+                threadBuffer->lastRecord = used;
+                threadBuffer->lastRecordLength = recordLength;
+#endif
+                ___COVERON_COPY_ARRAY(recordData, &threadBuffer->data[used], (int)recordLength);
+                used += recordLength;
+            }
+
+            // publish the records. If the flush at exit closed the buffer in the meantime, it took the records
+            // published before, so the thread writes the rest (a claimed buffer wasn't taken at all)
+            unsigned long expectedUsed = publishedUsed;
+            if (!__atomic_compare_exchange_n(&threadBuffer->used, &expectedUsed, used, 0,
+                                             __ATOMIC_RELEASE, __ATOMIC_RELAXED))
+            {
+                unsigned long unwritten = (publishedUsed == ___COVERON_THREAD_BUFFER_BUSY) ? 0 : publishedUsed;
+                pthread_mutex_lock(&___COVERON_MUTEX);
+                fwrite(&threadBuffer->data[unwritten], 1, used - unwritten, coveronFile->criFile);
+                pthread_mutex_unlock(&___COVERON_MUTEX);
+            }
+            return;
+        }
+    }
+    if (threadBuffer != NULL || __atomic_load_n(&___COVERON_THREAD_BUFFERS_CLOSING, __ATOMIC_ACQUIRE))
+    {
+        // records after the flush at exit (and records larger than the buffer) get written behind the flushed buffers
+        pthread_mutex_lock(&___COVERON_MUTEX);
+        fwrite(recordData, 1, recordLength, coveronFile->criFile);
+        pthread_mutex_unlock(&___COVERON_MUTEX);
+        return;
+    }
+#elif defined(___COVERON_WRITE_BUFFER_ENABLED)
+    if (writeBuffer != NULL)
+    {
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+        unsigned long foldedUsed = ___COVERON_FOLD_RECORD(writeBuffer->data, writeBuffer->used, writeBuffer->size,
+                                                          writeBuffer->lastRecord, writeBuffer->lastRecordLength,
+                                                          recordData, recordLength);
+        if (foldedUsed != 0)
+        {
+            writeBuffer->used = foldedUsed;
+            return;
+        }
+#endif
+        // flush the buffer, if the record doesn't fit anymore
+        if (writeBuffer->used + recordLength > writeBuffer->size)
+        {
+            ___COVERON_FLUSH_WRITE_BUFFER(coveronFile);
+        }
+
+        // append the record (records larger than the buffer get written directly)
+        if (recordLength <= writeBuffer->size)
+        {
+#ifdef ___COVERON_TRACE_RLE_ENABLED
+            writeBuffer->lastRecord = writeBuffer->used;
+            writeBuffer->lastRecordLength = recordLength;
+#endif
+            ___COVERON_COPY_ARRAY(recordData, &writeBuffer->data[writeBuffer->used], (int)recordLength);
+            writeBuffer->used += recordLength;
+            return;
+        }
+    }
+#endif
+
+    fwrite(recordData, 1, recordLength, coveronFile->criFile);
+}
+
+#ifdef ___COVERON_FILE_REGISTRY_ENABLED
+void ___COVERON_ADD_REGISTERED_FILE(___COVERON_FILE_T *coveronFile)
+{
+    // the registered files get written once at exit
+    if (___COVERON_REGISTERED_FILES == NULL)
+    {
+        atexit(___COVERON_WRITE_REGISTERED_FILES);
+#ifdef ___COVERON_PER_PROCESS_CRI_ENABLED
+        // the hits counted before a fork mustn't be written by the child again
+        ___COVERON_INSTALL_FORK_HANDLERS();
+#endif
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+        // fatal signals skip the exit handlers. Handlers of the program itself are kept
+        for (unsigned long i = 0; i < sizeof(___COVERON_FATAL_SIGNALS) / sizeof(___COVERON_FATAL_SIGNALS[0]); i++)
+        {
+            void (*previousHandler)(int) = signal(___COVERON_FATAL_SIGNALS[i], ___COVERON_HANDLE_FATAL_SIGNAL);
+            if (previousHandler != SIG_DFL && previousHandler != SIG_ERR)
+            {
+                signal(___COVERON_FATAL_SIGNALS[i], previousHandler);
+            }
+        }
+#endif
+    }
+
+    // add file to the registry
+    coveronFile->nextFile = ___COVERON_REGISTERED_FILES;
+    ___COVERON_REGISTERED_FILES = coveronFile;
+}
+
+void ___COVERON_WRITE_REGISTERED_FILES(void)
+{
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    pthread_mutex_lock(&___COVERON_MUTEX);
+    ___COVERON_WRITE_REGISTERED_FILES_UNLOCKED();
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+#else
+    ___COVERON_WRITE_REGISTERED_FILES_UNLOCKED();
+#endif
+}
+
+void ___COVERON_WRITE_REGISTERED_FILES_UNLOCKED(void)
+{
+#ifdef ___COVERON_THREAD_BUFFERS_ENABLED
+    // buffers of all threads, which are still running (the buffers of exited threads were already written).
+    // Threads, which keep recording, write their records directly from now on
+    __atomic_store_n(&___COVERON_THREAD_BUFFERS_CLOSING, 1, __ATOMIC_SEQ_CST);
+    for (___COVERON_THREAD_BUFFER_T *threadBuffer = ___COVERON_THREAD_BUFFERS;
+         threadBuffer != NULL;
+         threadBuffer = threadBuffer->nextBuffer)
+    {
+        ___COVERON_FLUSH_THREAD_BUFFER(threadBuffer);
+    }
+#endif
+
+    for (___COVERON_FILE_T *coveronFile = ___COVERON_REGISTERED_FILES;
+         coveronFile != NULL;
+         coveronFile = coveronFile->nextFile)
+    {
+#ifdef ___COVERON_EXIT_RECORDS_ENABLED
+        // open the output file (validates the header and writes the execution marker)
+        if (___COVERON_SETUP_INSTRUMENTATION(coveronFile) == ___COVERON_BOOL_FALSE)
+        {
+            continue;
+        }
+#endif
+
+#ifdef ___COVERON_COUNTER_MODE_ENABLED
+        ___COVERON_GENERATE_COUNTER_TABLE(coveronFile);
+#endif
+#ifdef ___COVERON_BITMAP_MODE_ENABLED
+        ___COVERON_GENERATE_BITMAP(coveronFile);
+#endif
+#if defined(___COVERON_WRITE_BUFFER_ENABLED) && !defined(___COVERON_THREAD_BUFFERS_ENABLED)
+        ___COVERON_FLUSH_WRITE_BUFFER(coveronFile);
+#endif
+        fflush(coveronFile->criFile);
+    }
+}
+#endif
 // !SECTION
 /*
  * SECTION   PUBLIC FUNCTION DEFINITIONS
@@ -268,15 +1769,8 @@ inline void ___COVERON_SET_CHECKPOINT_MARKER(___COVERON_BYTE markerId_B0,
                                              ___COVERON_BYTE markerId_B3,
                                              ___COVERON_FILE_T *coveronFile)
 {
-    // check, if the helper was initialized
-    if (coveronFile->helperInitialized == ___COVERON_BOOL_FALSE &&
-        ___COVERON_SETUP_INSTRUMENTATION(coveronFile) == ___COVERON_BOOL_FALSE)
-    {
-        return;
-    }
-
     ___COVERON_BYTE markerData[5] = {markerId_B0, markerId_B1, markerId_B2, markerId_B3, 0xFF};
-    fwrite(markerData, 1, 5, coveronFile->criFile);
+    ___COVERON_WRITE_RECORD(coveronFile, markerData, 5);
 }
 #endif
 
@@ -289,21 +1783,146 @@ inline ___COVERON_BOOL_T ___COVERON_SET_EVALUATION_MARKER(
     ___COVERON_FILE_T *coveronFile,
     int evaluation)
 {
-    // check, if the helper was initialized
-    if (coveronFile->helperInitialized == ___COVERON_BOOL_FALSE &&
-        ___COVERON_SETUP_INSTRUMENTATION(coveronFile) == ___COVERON_BOOL_FALSE)
-    {
-        return evaluation;
-    }
-
     // create output array
     ___COVERON_BYTE markerData[5] = {markerId_B0, markerId_B1, markerId_B2, markerId_B3, (___COVERON_BYTE) !(!evaluation)};
 
     // write marker to output file
-    fwrite(markerData, 1, 5, coveronFile->criFile);
+    ___COVERON_WRITE_RECORD(coveronFile, markerData, 5);
+
+    // pass on the input data
+    return evaluation;
+}
+#endif
+
+#ifdef ___COVERON_VARINT_RECORDS_ENABLED
+#ifdef ___COVERON_CHECKPOINT_ANALYSIS_ENABLED
+inline void ___COVERON_SET_CHECKPOINT_VARINT(unsigned long markerId,
+                                             ___COVERON_FILE_T *coveronFile)
+{
+    ___COVERON_BYTE markerData[___COVERON_MAX_VARINT_LENGTH];
+    ___COVERON_WRITE_RECORD(coveronFile, markerData,
+                            ___COVERON_ENCODE_VARINT(markerId << 2, markerData));
+}
+#endif
+
+#ifdef ___COVERON_EVALUATION_ANALYSIS_ENABLED
+inline ___COVERON_BOOL_T ___COVERON_SET_EVALUATION_VARINT(unsigned long markerId,
+                                                          ___COVERON_FILE_T *coveronFile,
+                                                          int evaluation)
+{
+    // the evaluation flag and the outcome are the lowest bits of the varint
+    ___COVERON_BYTE markerData[___COVERON_MAX_VARINT_LENGTH];
+    ___COVERON_WRITE_RECORD(coveronFile, markerData,
+                            ___COVERON_ENCODE_VARINT(markerId << 2 | 0x02 | (unsigned long)!(!evaluation), markerData));
 
     // pass on the input data
     return evaluation;
 }
 #endif
-// !SECTION
\ No newline at end of file
+#endif
+
+#ifdef ___COVERON_MCDC_MODE_ENABLED
+int ___COVERON_SET_MCDC_VECTOR(___COVERON_BYTE markerId_B0,
+                               ___COVERON_BYTE markerId_B1,
+                               ___COVERON_BYTE markerId_B2,
+                               ___COVERON_BYTE markerId_B3,
+                               ___COVERON_FILE_T *coveronFile,
+                               ___COVERON_MCDC_SCRATCH_T *scratch,
+                               int maskWidth,
+                               int evaluation)
+{
+    // take the condition vector and reset the scratch masks for the next evaluation of the decision
+    ___COVERON_MCDC_MASK_T evaluatedMask = scratch->evaluatedMask;
+    ___COVERON_MCDC_MASK_T valueMask = scratch->valueMask;
+    scratch->evaluatedMask = 0;
+    scratch->valueMask = 0;
+
+    // create output array: (escape byte of varint records), decision id, record type, mask width,
+    // masks (big endian) and outcome
+    ___COVERON_BYTE vectorRecord[___COVERON_ESCAPE_LENGTH + 7 + 2 * sizeof(___COVERON_MCDC_MASK_T)];
+#ifdef ___COVERON_VARINT_RECORDS_ENABLED
+    vectorRecord[0] = ___COVERON_ESCAPE_RECORD;
+#endif
+    ___COVERON_BYTE *vectorData = &vectorRecord[___COVERON_ESCAPE_LENGTH];
+    vectorData[0] = markerId_B0;
+    vectorData[1] = markerId_B1;
+    vectorData[2] = markerId_B2;
+    vectorData[3] = markerId_B3;
+    vectorData[4] = 0xFE;
+    vectorData[5] = (___COVERON_BYTE)maskWidth;
+    for (int i = 0; i < maskWidth; i++)
+    {
+        vectorData[6 + i] = (___COVERON_BYTE)(evaluatedMask >> (8 * (maskWidth - 1 - i)));
+        vectorData[6 + maskWidth + i] = (___COVERON_BYTE)(valueMask >> (8 * (maskWidth - 1 - i)));
+    }
+    vectorData[6 + 2 * maskWidth] = (___COVERON_BYTE) !(!evaluation);
+
+#ifdef ___COVERON_MCDC_DEDUPE_ENABLED
+    // every unique vector only gets written once
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    pthread_mutex_lock(&___COVERON_MUTEX);
+    ___COVERON_BOOL_T vectorSeen = ___COVERON_MCDC_VECTOR_SEEN(coveronFile, vectorData, 7 + 2 * maskWidth);
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+#else
+    ___COVERON_BOOL_T vectorSeen = ___COVERON_MCDC_VECTOR_SEEN(coveronFile, vectorData, 7 + 2 * maskWidth);
+#endif
+    if (vectorSeen == ___COVERON_BOOL_TRUE)
+    {
+        return evaluation;
+    }
+#endif
+
+    // write vector to output file
+    ___COVERON_WRITE_RECORD(coveronFile, vectorRecord, ___COVERON_ESCAPE_LENGTH + 7 + 2 * maskWidth);
+
+    // pass on the input data
+    return evaluation;
+}
+#endif
+
+___COVERON_BOOL_T ___COVERON_REGISTER_FILE(___COVERON_FILE_T *coveronFile)
+{
+#if defined(___COVERON_MMAP_TABLES_ENABLED)
+    // the table gets mapped once. If the mapping fails, the hits are only counted in memory
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    pthread_mutex_lock(&___COVERON_MUTEX);
+#endif
+    if (!___COVERON_IS_INITIALIZED(coveronFile))
+    {
+        ___COVERON_MAP_TABLE(coveronFile);
+        ___COVERON_MARK_INITIALIZED(coveronFile);
+    }
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+#endif
+    return ___COVERON_BOOL_TRUE;
+#elif !defined(___COVERON_EXIT_RECORDS_ENABLED)
+    // open the output file and set up the write buffer before the first record
+    if (___COVERON_IS_INITIALIZED(coveronFile))
+    {
+        return ___COVERON_BOOL_TRUE;
+    }
+    return ___COVERON_INITIALIZE(coveronFile);
+#elif defined(___COVERON_THREAD_SAFE_ENABLED)
+    // only the first thread registers the file
+    pthread_mutex_lock(&___COVERON_MUTEX);
+    if (!___COVERON_IS_INITIALIZED(coveronFile))
+    {
+        ___COVERON_ADD_REGISTERED_FILE(coveronFile);
+        ___COVERON_MARK_INITIALIZED(coveronFile);
+    }
+    pthread_mutex_unlock(&___COVERON_MUTEX);
+    return ___COVERON_BOOL_TRUE;
+#else
+    // counter tables and bitmaps get written once at exit instead of writing a marker per hit
+    if (!___COVERON_IS_INITIALIZED(coveronFile))
+    {
+        ___COVERON_ADD_REGISTERED_FILE(coveronFile);
+
+        // the output file gets opened at exit
+        ___COVERON_MARK_INITIALIZED(coveronFile);
+    }
+    return ___COVERON_BOOL_TRUE;
+#endif
+}
+// !SECTION
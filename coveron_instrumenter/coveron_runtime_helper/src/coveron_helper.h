@@ -23,6 +23,101 @@
 #define fread FREAD
 #define fwrite FWRITE
 #define fflush FFLUSH
+#define atexit ATEXIT
+#endif
+// !SECTION
+
+/*
+ * SECTION   RUNTIME MODE SETUP
+ */
+// counter and bitmap mode collect the marker hits in memory and write them at exit. With mapped tables,
+// the counters or the bitmap live in a memory mapped file shared by all processes of the program instead
+#if defined(___COVERON_COUNTER_MODE_ENABLED) || defined(___COVERON_BITMAP_MODE_ENABLED)
+#ifndef ___COVERON_MMAP_TABLES_ENABLED
+#define ___COVERON_EXIT_RECORDS_ENABLED
+#endif
+#endif
+
+// size of the write buffer of every output file in bytes (0 = write every record directly).
+// The COVERON_WRITE_BUFFER_SIZE environment variable overrides the size at runtime
+#ifndef COVERON_WRITE_BUFFER_SIZE
+#define COVERON_WRITE_BUFFER_SIZE 65536
+#endif
+
+// records of marker hits get collected in a write buffer (counter and bitmap mode don't write records per hit)
+#if COVERON_WRITE_BUFFER_SIZE > 0 && !defined(___COVERON_COUNTER_MODE_ENABLED) && !defined(___COVERON_BITMAP_MODE_ENABLED)
+#define ___COVERON_WRITE_BUFFER_ENABLED
+#endif
+
+// run-length encoding: repeats of the last record inside a write buffer get folded into a repeat record
+// (CRI version 2). Without write buffer, every record gets written as it is
+#if defined(___COVERON_TRACE_RLE_ENABLED) && !defined(___COVERON_WRITE_BUFFER_ENABLED)
+#undef ___COVERON_TRACE_RLE_ENABLED
+#endif
+
+// varint records: marker records become LEB128 varints of (marker id << 2 | evaluation flag << 1 | outcome)
+// (CRI version 3). Counter and bitmap mode don't write marker records
+#if defined(___COVERON_VARINT_RECORDS_ENABLED) && defined(___COVERON_EXIT_RECORDS_ENABLED)
+#undef ___COVERON_VARINT_RECORDS_ENABLED
+#endif
+
+// registered files get their exit records written or their write buffer flushed at exit
+#if defined(___COVERON_EXIT_RECORDS_ENABLED) || defined(___COVERON_WRITE_BUFFER_ENABLED)
+#define ___COVERON_FILE_REGISTRY_ENABLED
+#endif
+
+// thread safe runtime: files get initialized once, records are collected in thread-local
+// buffers instead of the write buffer of the file and counters and bitmaps are updated atomically
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+#define ___COVERON_THREAD_BUFFERS_ENABLED
+#endif
+#define ___COVERON_THREAD_LOCAL __thread
+#define ___COVERON_IS_INITIALIZED(coveronFile) \
+    (__atomic_load_n(&(coveronFile)->helperInitialized, __ATOMIC_ACQUIRE) == ___COVERON_BOOL_TRUE)
+#define ___COVERON_INCREMENT_COUNTER(counter) \
+    ((void)__atomic_fetch_add(&(counter), 1, __ATOMIC_RELAXED))
+// already set bits are only read to keep the cache line shared between the threads
+#define ___COVERON_SET_BITS(bitmapByte, bitMask)                                       \
+    ((void)((__atomic_load_n(&(bitmapByte), __ATOMIC_RELAXED) & (bitMask)) == (bitMask) || \
+            __atomic_fetch_or(&(bitmapByte), (bitMask), __ATOMIC_RELAXED)))
+#else
+#define ___COVERON_THREAD_LOCAL
+#define ___COVERON_IS_INITIALIZED(coveronFile) \
+    ((coveronFile)->helperInitialized == ___COVERON_BOOL_TRUE)
+#ifdef ___COVERON_MMAP_TABLES_ENABLED
+// other processes update the mapped tables at the same time
+#define ___COVERON_INCREMENT_COUNTER(counter) \
+    ((void)__atomic_fetch_add(&(counter), 1, __ATOMIC_RELAXED))
+#define ___COVERON_SET_BITS(bitmapByte, bitMask)                                       \
+    ((void)((__atomic_load_n(&(bitmapByte), __ATOMIC_RELAXED) & (bitMask)) == (bitMask) || \
+            __atomic_fetch_or(&(bitmapByte), (bitMask), __ATOMIC_RELAXED)))
+#else
+#define ___COVERON_INCREMENT_COUNTER(counter) ((void)++(counter))
+#define ___COVERON_SET_BITS(bitmapByte, bitMask) ((void)((bitmapByte) |= (bitMask)))
+#endif
+#endif
+
+// every instrumented file registers itself in a constructor function before main (GCC and Clang),
+// so the probes don't check the initialization. COVERON_LAZY_REGISTRATION registers the files on their first hit
+#if (defined(__GNUC__) || defined(__clang__)) && !defined(COVERON_LAZY_REGISTRATION)
+#define ___COVERON_STARTUP_REGISTRATION_ENABLED
+#define ___COVERON_CONSTRUCTOR __attribute__((constructor))
+#define ___COVERON_ENSURE_REGISTERED(coveronFile) ((void)(coveronFile))
+#else
+#if defined(__GNUC__) || defined(__clang__)
+#define ___COVERON_CONSTRUCTOR __attribute__((unused))
+#else
+#define ___COVERON_CONSTRUCTOR
+#endif
+#define ___COVERON_ENSURE_REGISTERED(coveronFile) \
+    ((void)(___COVERON_IS_INITIALIZED(coveronFile) || ___COVERON_REGISTER_FILE(coveronFile)))
+#endif
+
+// shared writer: all files of a process write to one output file, whose records carry the index of their file.
+// The COVERON_SHARED_CRI_FILE environment variable overrides the filename at runtime
+#if defined(___COVERON_SHARED_WRITER_ENABLED) && !defined(COVERON_SHARED_CRI_FILE)
+#define COVERON_SHARED_CRI_FILE "coveron_shared.cri"
 #endif
 // !SECTION
 
@@ -31,6 +126,20 @@
  */
 typedef unsigned char ___COVERON_BYTE;
 
+typedef unsigned long long ___COVERON_COUNTER_T;
+
+typedef unsigned long long ___COVERON_MCDC_MASK_T;
+
+// Scratch masks of a decision, filled by its conditions (bit i = condition i)
+typedef struct ___COVERON_MCDC_SCRATCH_S
+{
+    // Conditions, which were evaluated (short circuit evaluation skips conditions)
+    ___COVERON_MCDC_MASK_T evaluatedMask;
+
+    // Results of the evaluated conditions
+    ___COVERON_MCDC_MASK_T valueMask;
+} ___COVERON_MCDC_SCRATCH_T;
+
 typedef enum
 {
     ___COVERON_BOOL_FALSE,
@@ -54,6 +163,53 @@ typedef struct ___COVERON_FILE_S
     // File pointer
     void *criFile;
 
+#ifdef ___COVERON_COUNTER_MODE_ENABLED
+    // Hit counter array of the source file (one counter per checkpoint, two per evaluation)
+    ___COVERON_COUNTER_T *counters;
+
+    // Number of counters inside the counter array
+    unsigned long counterCount;
+
+#ifdef ___COVERON_MMAP_TABLES_ENABLED
+    // Counter table used by the probes (set to the mapped counters during the initialization)
+    ___COVERON_COUNTER_T **counterTable;
+#endif
+#endif
+
+#ifdef ___COVERON_BITMAP_MODE_ENABLED
+    // Hit bitmap of the source file (one bit per checkpoint, two per evaluation)
+    ___COVERON_BYTE *bitmap;
+
+    // Number of bits inside the bitmap
+    unsigned long bitCount;
+
+#ifdef ___COVERON_MMAP_TABLES_ENABLED
+    // Bitmap used by the probes (set to the mapped bitmap during the initialization)
+    ___COVERON_BYTE **bitmapTable;
+#endif
+#endif
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+    // Write buffer for the records of the file (allocated during the initialization)
+    struct ___COVERON_WRITE_BUFFER_S *writeBuffer;
+#endif
+
+#ifdef ___COVERON_FILE_REGISTRY_ENABLED
+    // Next registered file (exit records and write buffers get written at exit)
+    struct ___COVERON_FILE_S *nextFile;
+#endif
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+    // Index of the buffers of the file inside the thread buffer array of every thread
+    // (thread safe runtime only, assigned during the initialization, 0 = no thread buffers)
+    unsigned long threadBufferIndex;
+#endif
+
+#ifdef ___COVERON_SHARED_WRITER_ENABLED
+    // Index of the file inside the file table of the shared output file (assigned during the initialization)
+    unsigned long fileIndex;
+#endif
+
     // Filename for the output file (last item because of variable size)
     char outputFilename[];
 } ___COVERON_FILE_T;
@@ -78,6 +234,112 @@ ___COVERON_BOOL_T ___COVERON_SET_EVALUATION_MARKER(___COVERON_BYTE markerId_B0,
                                                    ___COVERON_FILE_T *coveronFile,
                                                    int evaluation);
 #endif
+
+#ifdef ___COVERON_VARINT_RECORDS_ENABLED
+#ifdef ___COVERON_CHECKPOINT_ANALYSIS_ENABLED
+void ___COVERON_SET_CHECKPOINT_VARINT(unsigned long markerId,
+                                      ___COVERON_FILE_T *coveronFile);
+#endif
+
+#ifdef ___COVERON_EVALUATION_ANALYSIS_ENABLED
+___COVERON_BOOL_T ___COVERON_SET_EVALUATION_VARINT(unsigned long markerId,
+                                                   ___COVERON_FILE_T *coveronFile,
+                                                   int evaluation);
+#endif
+#endif
+
+#ifdef ___COVERON_MCDC_MODE_ENABLED
+int ___COVERON_SET_MCDC_VECTOR(___COVERON_BYTE markerId_B0,
+                               ___COVERON_BYTE markerId_B1,
+                               ___COVERON_BYTE markerId_B2,
+                               ___COVERON_BYTE markerId_B3,
+                               ___COVERON_FILE_T *coveronFile,
+                               ___COVERON_MCDC_SCRATCH_T *scratch,
+                               int maskWidth,
+                               int evaluation);
+#endif
+
+___COVERON_BOOL_T ___COVERON_REGISTER_FILE(___COVERON_FILE_T *coveronFile);
+// !SECTION
+
+/*
+ * SECTION   COUNTER MODE PROBES
+ */
+#ifdef ___COVERON_COUNTER_MODE_ENABLED
+// increments the counter of a checkpoint
+#define ___COVERON_COUNT_CHECKPOINT(counterArray, counterIndex, coveronFile) \
+    (___COVERON_ENSURE_REGISTERED(coveronFile),                             \
+     ___COVERON_INCREMENT_COUNTER((counterArray)[(counterIndex)]))
+
+// increments the false (first) or true (second) counter of an evaluation and passes on the evaluation
+static inline int ___COVERON_COUNT_EVALUATION(___COVERON_COUNTER_T *counterPair,
+                                              ___COVERON_FILE_T *coveronFile,
+                                              int evaluation)
+{
+    ___COVERON_ENSURE_REGISTERED(coveronFile);
+    ___COVERON_INCREMENT_COUNTER(counterPair[!!evaluation]);
+    return evaluation;
+}
+#endif
+// !SECTION
+
+/*
+ * SECTION   BITMAP MODE PROBES
+ */
+#ifdef ___COVERON_BITMAP_MODE_ENABLED
+// sets the bit of a checkpoint. Byte index and bit mask get calculated during instrumentation
+#define ___COVERON_MARK_CHECKPOINT(bitmapArray, byteIndex, bitMask, coveronFile) \
+    (___COVERON_ENSURE_REGISTERED(coveronFile),                                 \
+     ___COVERON_SET_BITS((bitmapArray)[(byteIndex)], (___COVERON_BYTE)(bitMask)))
+
+// sets the false (first) or true (second) bit of an evaluation without branching on the result
+static inline int ___COVERON_MARK_EVALUATION(___COVERON_BYTE *bitmapArray,
+                                             unsigned long bitIndex,
+                                             ___COVERON_FILE_T *coveronFile,
+                                             int evaluation)
+{
+    ___COVERON_ENSURE_REGISTERED(coveronFile);
+    bitIndex += !!evaluation;
+    ___COVERON_SET_BITS(bitmapArray[bitIndex >> 3], (___COVERON_BYTE)(1u << (bitIndex & 7)));
+    return evaluation;
+}
+#endif
+// !SECTION
+
+/*
+ * SECTION   FIRST HIT PROBES
+ */
+#ifdef ___COVERON_FIRST_HIT_ENABLED
+// true on the first hit of a marker only. The flag gets set atomically in the thread safe runtime,
+// so exactly one thread records the marker
+#ifdef ___COVERON_THREAD_SAFE_ENABLED
+#define ___COVERON_FIRST_HIT(seenFlag)                        \
+    (__atomic_load_n(&(seenFlag), __ATOMIC_RELAXED) == 0 && \
+     __atomic_exchange_n(&(seenFlag), 1, __ATOMIC_RELAXED) == 0)
+#else
+#define ___COVERON_FIRST_HIT(seenFlag) ((seenFlag) == 0 && ((seenFlag) = 1))
+#endif
+
+// records a checkpoint on its first hit only. Later hits cost a load and a branch
+#define ___COVERON_FIRST_HIT_CHECKPOINT(seenFlag, checkpointProbe) \
+    (___COVERON_FIRST_HIT(seenFlag) ? (void)(checkpointProbe) : (void)0)
+#endif
+// !SECTION
+
+/*
+ * SECTION   MCDC MODE PROBES
+ */
+#ifdef ___COVERON_MCDC_MODE_ENABLED
+// stores the result of a condition in the scratch masks of its decision and passes on the evaluation
+static inline int ___COVERON_SET_MCDC_CONDITION(___COVERON_MCDC_SCRATCH_T *scratch,
+                                                int conditionIndex,
+                                                int evaluation)
+{
+    scratch->evaluatedMask |= (___COVERON_MCDC_MASK_T)1 << conditionIndex;
+    scratch->valueMask |= (___COVERON_MCDC_MASK_T)(!!evaluation) << conditionIndex;
+    return evaluation;
+}
+#endif
 // !SECTION
 
 #endif // ___COVERON_HELPER_
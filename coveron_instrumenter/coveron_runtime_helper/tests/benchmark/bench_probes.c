@@ -0,0 +1,83 @@
+// Copyright 2020 Glenn Töws
+//
+// This file is part of the Coveron project
+//
+// The Coveron project is licensed under the LGPL-3.0 license
+
+// MICRO BENCHMARK FOR THE TRACE PROBES (not part of the unit tests)
+
+/* Measures the time per checkpoint and evaluation marker with and without the write buffer:
+ *
+ *   gcc -O2 -std=c11 -D___COVERON_CHECKPOINT_ANALYSIS_ENABLED -D___COVERON_EVALUATION_ANALYSIS_ENABLED \
+ *       -DCOVERON_WRITE_BUFFER_SIZE=0 -I../../src bench_probes.c ../../src/coveron_helper.c -o bench_unbuffered
+ *   gcc -O2 -std=c11 -D___COVERON_CHECKPOINT_ANALYSIS_ENABLED -D___COVERON_EVALUATION_ANALYSIS_ENABLED \
+ *       -I../../src bench_probes.c ../../src/coveron_helper.c -o bench_buffered
+ *   ./bench_unbuffered [probe count] && ./bench_buffered [probe count]
+ *
+ * Adding -pthread -D___COVERON_THREAD_SAFE_ENABLED measures the thread safe runtime.
+ */
+
+#include "coveron_helper.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+
+/*
+ * SECTION   BENCHMARK DATA
+ */
+___COVERON_FILE_T benchmarkFile = {{0}, {0}, ___COVERON_BOOL_FALSE, NULL,
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+                                   NULL,
+                                   NULL,
+                                   0,
+#endif
+                                   "bench_probes.cri"};
+
+// keeps the compiler from removing the evaluations
+volatile int benchmarkSink;
+// !SECTION
+
+/*
+ * SECTION   BENCHMARK FUNCTIONS
+ */
+double get_seconds(void)
+{
+    struct timespec timestamp;
+    timespec_get(&timestamp, TIME_UTC);
+    return (double)timestamp.tv_sec + (double)timestamp.tv_nsec * 1e-9;
+}
+
+int main(int argc, char *argv[])
+{
+    unsigned long probeCount = (argc > 1) ? strtoul(argv[1], NULL, 10) : 10000000UL;
+    remove(benchmarkFile.outputFilename);
+
+    // the registration opens the output file like the constructor of an instrumented file
+    ___COVERON_REGISTER_FILE(&benchmarkFile);
+
+    double startTime = get_seconds();
+    for (unsigned long i = 0; i < probeCount; i++)
+    {
+        ___COVERON_SET_CHECKPOINT_MARKER(0x00, 0x00, 0x00, 0x01, &benchmarkFile);
+    }
+    double checkpointTime = get_seconds() - startTime;
+
+    startTime = get_seconds();
+    for (unsigned long i = 0; i < probeCount; i++)
+    {
+        benchmarkSink = ___COVERON_SET_EVALUATION_MARKER(0x00, 0x00, 0x00, 0x02, &benchmarkFile, (int)(i & 1));
+    }
+    double evaluationTime = get_seconds() - startTime;
+
+#ifdef ___COVERON_WRITE_BUFFER_ENABLED
+    printf("write buffer: %d bytes\n", COVERON_WRITE_BUFFER_SIZE);
+#else
+    printf("write buffer: disabled\n");
+#endif
+    printf("checkpoint marker: %.2f ns/probe\n", checkpointTime * 1e9 / (double)probeCount);
+    printf("evaluation marker: %.2f ns/probe\n", evaluationTime * 1e9 / (double)probeCount);
+
+    remove(benchmarkFile.outputFilename);
+    return 0;
+}
+// !SECTION
@@ -0,0 +1,122 @@
+// Copyright 2020 Glenn Töws
+//
+// This file is part of the Coveron project
+//
+// The Coveron project is licensed under the LGPL-3.0 license
+
+// TEST FILE FOR BITMAP MODE
+
+#include "coveron_helper.h"
+#include "mock_fake_stdio.h"
+#include "unity.h"
+
+/*
+ * SECTION   STRINGIFY FOR COMMENT PARSING
+ */
+#define STRINGIFY(x) #x
+#define CMD_STRING(x) STRINGIFY(x)
+// !SECTION
+
+/*
+ * SECTION   PRIVATE RUNTIME HELPER SYMBOLS
+ */
+extern ___COVERON_FILE_T *___COVERON_REGISTERED_FILES;
+
+void ___COVERON_WRITE_REGISTERED_FILES(void);
+// !SECTION
+
+/*
+ * SECTION   TEST DATA
+ */
+
+FILE dummy_file;
+FILE *dummyFilePointer = &dummy_file;
+
+___COVERON_BYTE testBitmap[2];
+
+___COVERON_FILE_T testInputData = {{0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA,
+                                    0xAB, 0xAC, 0xAD, 0xAE, 0xAF, 0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5,
+                                    0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF},
+                                   {0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57,
+                                    0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F},
+                                   ___COVERON_BOOL_FALSE,
+                                   NULL,
+                                   testBitmap,
+                                   10,
+                                   NULL,
+                                   "test_output.cri"};
+// !SECTION
+
+/*
+ * SECTION   SETUP & TEARDOWN FUNCTIONS
+ */
+void setUp()
+{
+    // reset bitmap and registry
+    testBitmap[0] = 0;
+    testBitmap[1] = 0;
+    testInputData.helperInitialized = ___COVERON_BOOL_FALSE;
+    testInputData.criFile = NULL;
+    testInputData.nextFile = NULL;
+    ___COVERON_REGISTERED_FILES = NULL;
+}
+
+void tearDown() {}
+// !SECTION
+
+/*
+ * SECTION   TEST FUNCTIONS
+ */
+// Test the marking of checkpoints and evaluation outcomes without any file access
+void test_mark_markers(void)
+{
+    // expect the registration of the exit handler on the first hit only
+    ATEXIT_ExpectAnyArgsAndReturn(0);
+
+    // checkpoint with bit 0 and bit 9
+    ___COVERON_MARK_CHECKPOINT(testBitmap, 0, 0x01, &testInputData);
+    ___COVERON_MARK_CHECKPOINT(testBitmap, 1, 0x02, &testInputData);
+    ___COVERON_MARK_CHECKPOINT(testBitmap, 1, 0x02, &testInputData);
+
+    // evaluation with bits 7 (false) and 8 (true), only true outcomes
+    TEST_ASSERT_EQUAL_INT(5, ___COVERON_MARK_EVALUATION(testBitmap, 7, &testInputData, 5));
+    TEST_ASSERT_EQUAL_INT(1, ___COVERON_MARK_EVALUATION(testBitmap, 7, &testInputData, 1));
+
+    TEST_ASSERT_EQUAL_INT(___COVERON_BOOL_TRUE, testInputData.helperInitialized);
+    TEST_ASSERT_EQUAL_HEX8(0x01, testBitmap[0]);
+    TEST_ASSERT_EQUAL_HEX8(0x03, testBitmap[1]);
+
+    // false outcome
+    TEST_ASSERT_EQUAL_INT(0, ___COVERON_MARK_EVALUATION(testBitmap, 7, &testInputData, 0));
+    TEST_ASSERT_EQUAL_HEX8(0x81, testBitmap[0]);
+}
+
+// Test the writing of the bitmap at exit
+void test_write_bitmap(void)
+{
+    ATEXIT_ExpectAnyArgsAndReturn(0);
+    ___COVERON_MARK_CHECKPOINT(testBitmap, 0, 0x01, &testInputData);
+    ___COVERON_MARK_CHECKPOINT(testBitmap, 1, 0x02, &testInputData);
+
+    // the output file doesn't exist yet, header creation was already tested
+    FOPEN_ExpectAndReturn(testInputData.outputFilename, "ab+", (void *)NULL);
+    FREOPEN_ExpectAndReturn(testInputData.outputFilename, "wb+", (void *)NULL, dummyFilePointer);
+    FWRITE_ExpectAnyArgsAndReturn(59);
+    FWRITE_ExpectAnyArgsAndReturn(10 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT)));
+
+    // expect the bitmap record header (padding, magic number, bit count)
+    uint8_t comparisonBitmapHeader[13] = {
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x42, 0x49, 0x54, 0x21, 0x00, 0x00, 0x00, 0x0A};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonBitmapHeader, 13, 1, 13, dummyFilePointer, sizeof(dummyFilePointer), 13);
+
+    // expect the bitmap bytes (10 bits = 2 bytes)
+    uint8_t comparisonBitmap[2] = {0x01, 0x02};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonBitmap, 2, 1, 2, dummyFilePointer, sizeof(dummyFilePointer), 2);
+    FFLUSH_ExpectAndReturn(dummyFilePointer, 0);
+
+    // simulate the exit of the program
+    ___COVERON_WRITE_REGISTERED_FILES();
+}
+// !SECTION
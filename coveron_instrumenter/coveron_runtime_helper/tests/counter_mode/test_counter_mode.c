@@ -0,0 +1,125 @@
+// Copyright 2020 Glenn Töws
+//
+// This file is part of the Coveron project
+//
+// The Coveron project is licensed under the LGPL-3.0 license
+
+// TEST FILE FOR COUNTER MODE
+
+#include "coveron_helper.h"
+#include "mock_fake_stdio.h"
+#include "unity.h"
+
+/*
+ * SECTION   STRINGIFY FOR COMMENT PARSING
+ */
+#define STRINGIFY(x) #x
+#define CMD_STRING(x) STRINGIFY(x)
+// !SECTION
+
+/*
+ * SECTION   PRIVATE RUNTIME HELPER SYMBOLS
+ */
+extern ___COVERON_FILE_T *___COVERON_REGISTERED_FILES;
+
+void ___COVERON_WRITE_REGISTERED_FILES(void);
+// !SECTION
+
+/*
+ * SECTION   TEST DATA
+ */
+
+FILE dummy_file;
+FILE *dummyFilePointer = &dummy_file;
+
+___COVERON_COUNTER_T testCounters[3];
+
+___COVERON_FILE_T testInputData = {{0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA,
+                                    0xAB, 0xAC, 0xAD, 0xAE, 0xAF, 0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5,
+                                    0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF},
+                                   {0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57,
+                                    0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F},
+                                   ___COVERON_BOOL_FALSE,
+                                   NULL,
+                                   testCounters,
+                                   3,
+                                   NULL,
+                                   "test_output.cri"};
+// !SECTION
+
+/*
+ * SECTION   SETUP & TEARDOWN FUNCTIONS
+ */
+void setUp()
+{
+    // reset counters and registry
+    for (int i = 0; i < 3; i++)
+    {
+        testCounters[i] = 0;
+    }
+    testInputData.helperInitialized = ___COVERON_BOOL_FALSE;
+    testInputData.criFile = NULL;
+    testInputData.nextFile = NULL;
+    ___COVERON_REGISTERED_FILES = NULL;
+}
+
+void tearDown() {}
+// !SECTION
+
+/*
+ * SECTION   TEST FUNCTIONS
+ */
+// Test the counting of checkpoints and evaluations without any file access
+void test_count_markers(void)
+{
+    // expect the registration of the exit handler on the first hit only
+    ATEXIT_ExpectAnyArgsAndReturn(0);
+
+    ___COVERON_COUNT_CHECKPOINT(testCounters, 0, &testInputData);
+    ___COVERON_COUNT_CHECKPOINT(testCounters, 0, &testInputData);
+    TEST_ASSERT_EQUAL_INT(7, ___COVERON_COUNT_EVALUATION(&testCounters[1], &testInputData, 7));
+    TEST_ASSERT_EQUAL_INT(0, ___COVERON_COUNT_EVALUATION(&testCounters[1], &testInputData, 0));
+    TEST_ASSERT_EQUAL_INT(1, ___COVERON_COUNT_EVALUATION(&testCounters[1], &testInputData, 1));
+
+    TEST_ASSERT_EQUAL_INT(___COVERON_BOOL_TRUE, testInputData.helperInitialized);
+    TEST_ASSERT_EQUAL_PTR(&testInputData, ___COVERON_REGISTERED_FILES);
+    TEST_ASSERT_EQUAL_UINT64(2, testCounters[0]);
+    TEST_ASSERT_EQUAL_UINT64(1, testCounters[1]);
+    TEST_ASSERT_EQUAL_UINT64(2, testCounters[2]);
+}
+
+// Test the writing of the counter table at exit
+void test_write_counter_table(void)
+{
+    ATEXIT_ExpectAnyArgsAndReturn(0);
+    ___COVERON_COUNT_CHECKPOINT(testCounters, 0, &testInputData);
+    testCounters[2] = 0x0102030405060708ULL;
+
+    // the output file doesn't exist yet, header creation was already tested
+    FOPEN_ExpectAndReturn(testInputData.outputFilename, "ab+", (void *)NULL);
+    FREOPEN_ExpectAndReturn(testInputData.outputFilename, "wb+", (void *)NULL, dummyFilePointer);
+    FWRITE_ExpectAnyArgsAndReturn(59);
+    FWRITE_ExpectAnyArgsAndReturn(10 + sizeof(CMD_STRING(COVERON_EXECUTION_COMMENT)));
+
+    // expect the counter table record header (padding, magic number, counter count)
+    uint8_t comparisonCounterTableHeader[13] = {
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x43, 0x4E, 0x54, 0x21, 0x00, 0x00, 0x00, 0x03};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonCounterTableHeader, 13, 1, 13, dummyFilePointer, sizeof(dummyFilePointer), 13);
+
+    // expect the counters as 8 byte big endian values
+    uint8_t comparisonCounter0[8] = {0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x01};
+    uint8_t comparisonCounter1[8] = {0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00};
+    uint8_t comparisonCounter2[8] = {0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonCounter0, 8, 1, 8, dummyFilePointer, sizeof(dummyFilePointer), 8);
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonCounter1, 8, 1, 8, dummyFilePointer, sizeof(dummyFilePointer), 8);
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonCounter2, 8, 1, 8, dummyFilePointer, sizeof(dummyFilePointer), 8);
+    FFLUSH_ExpectAndReturn(dummyFilePointer, 0);
+
+    // simulate the exit of the program
+    ___COVERON_WRITE_REGISTERED_FILES();
+}
+// !SECTION
@@ -0,0 +1,90 @@
+// Copyright 2020 Glenn Töws
+//
+// This file is part of the Coveron project
+//
+// The Coveron project is licensed under the LGPL-3.0 license
+
+// TEST FILE FOR MCDC MODE
+
+#include "coveron_helper.h"
+#include "mock_fake_stdio.h"
+#include "unity.h"
+
+/*
+ * SECTION   TEST DATA
+ */
+
+FILE dummy_file;
+FILE *dummyFilePointer = &dummy_file;
+
+___COVERON_MCDC_SCRATCH_T testScratch[2];
+
+___COVERON_FILE_T testInputData = {{0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA,
+                                    0xAB, 0xAC, 0xAD, 0xAE, 0xAF, 0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5,
+                                    0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF},
+                                   {0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57,
+                                    0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F},
+                                   ___COVERON_BOOL_TRUE,
+                                   NULL,
+                                   "test_output.cri"};
+// !SECTION
+
+/*
+ * SECTION   SETUP & TEARDOWN FUNCTIONS
+ */
+void setUp()
+{
+    // reset scratch masks and set criFile pointer to dummy
+    testScratch[0].evaluatedMask = 0;
+    testScratch[0].valueMask = 0;
+    testScratch[1].evaluatedMask = 0;
+    testScratch[1].valueMask = 0;
+    testInputData.criFile = dummyFilePointer;
+}
+
+void tearDown() {}
+// !SECTION
+
+/*
+ * SECTION   TEST FUNCTIONS
+ */
+// Test the filling of the scratch masks by the conditions
+void test_set_mcdc_condition(void)
+{
+    TEST_ASSERT_EQUAL_INT(7, ___COVERON_SET_MCDC_CONDITION(&testScratch[0], 0, 7));
+    TEST_ASSERT_EQUAL_INT(0, ___COVERON_SET_MCDC_CONDITION(&testScratch[0], 2, 0));
+
+    TEST_ASSERT_EQUAL_UINT64(0x05, testScratch[0].evaluatedMask);
+    TEST_ASSERT_EQUAL_UINT64(0x01, testScratch[0].valueMask);
+}
+
+// Test the writing of a condition vector and the reset of the scratch masks
+void test_set_mcdc_vector(void)
+{
+    // expect one record: decision id, type, mask width, evaluated mask, value mask, outcome
+    uint8_t comparisonVector[9] = {0x00, 0x00, 0x00, 0x04, 0xFE, 0x01, 0x03, 0x02, 0x00};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonVector, 9, 1, 9, dummyFilePointer, sizeof(dummyFilePointer), 9);
+
+    // simulate (a || b) with a = false and b = true, negated by the decision
+    ___COVERON_SET_MCDC_CONDITION(&testScratch[1], 0, 0);
+    ___COVERON_SET_MCDC_CONDITION(&testScratch[1], 1, 1);
+    TEST_ASSERT_EQUAL_INT(0, ___COVERON_SET_MCDC_VECTOR(0x00, 0x00, 0x00, 0x04, &testInputData,
+                                                        &testScratch[1], 1, 0));
+
+    TEST_ASSERT_EQUAL_UINT64(0, testScratch[1].evaluatedMask);
+    TEST_ASSERT_EQUAL_UINT64(0, testScratch[1].valueMask);
+
+    // the same vector gets deduplicated, a new one gets written
+    ___COVERON_SET_MCDC_CONDITION(&testScratch[1], 0, 0);
+    ___COVERON_SET_MCDC_CONDITION(&testScratch[1], 1, 1);
+    ___COVERON_SET_MCDC_VECTOR(0x00, 0x00, 0x00, 0x04, &testInputData, &testScratch[1], 1, 0);
+
+    uint8_t comparisonVectorShortCircuit[9] = {0x00, 0x00, 0x00, 0x04, 0xFE, 0x01, 0x01, 0x01, 0x01};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonVectorShortCircuit, 9, 1, 9, dummyFilePointer, sizeof(dummyFilePointer), 9);
+    ___COVERON_SET_MCDC_CONDITION(&testScratch[1], 0, 1);
+    TEST_ASSERT_EQUAL_INT(1, ___COVERON_SET_MCDC_VECTOR(0x00, 0x00, 0x00, 0x04, &testInputData,
+                                                        &testScratch[1], 1, 1));
+}
+// !SECTION
@@ -0,0 +1,83 @@
+// Copyright 2020 Glenn Töws
+//
+// This file is part of the Coveron project
+//
+// The Coveron project is licensed under the LGPL-3.0 license
+
+// TEST FILE FOR THE REGISTRATION OF FILES BEFORE MAIN
+
+#include "coveron_helper.h"
+#include "mock_fake_stdio.h"
+#include "unity.h"
+
+/*
+ * SECTION   PRIVATE RUNTIME HELPER SYMBOLS
+ */
+extern ___COVERON_FILE_T *___COVERON_REGISTERED_FILES;
+// !SECTION
+
+/*
+ * SECTION   TEST DATA
+ */
+
+___COVERON_COUNTER_T testCounters[3];
+
+___COVERON_FILE_T testInputData = {{0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA,
+                                    0xAB, 0xAC, 0xAD, 0xAE, 0xAF, 0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5,
+                                    0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF},
+                                   {0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57,
+                                    0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F},
+                                   ___COVERON_BOOL_FALSE,
+                                   NULL,
+                                   testCounters,
+                                   3,
+                                   NULL,
+                                   "test_output.cri"};
+// !SECTION
+
+/*
+ * SECTION   SETUP & TEARDOWN FUNCTIONS
+ */
+void setUp()
+{
+    // reset counters and registry
+    for (int i = 0; i < 3; i++)
+    {
+        testCounters[i] = 0;
+    }
+    testInputData.helperInitialized = ___COVERON_BOOL_FALSE;
+    testInputData.nextFile = NULL;
+    ___COVERON_REGISTERED_FILES = NULL;
+}
+
+void tearDown() {}
+// !SECTION
+
+/*
+ * SECTION   TEST FUNCTIONS
+ */
+// Test, that the probes don't register the file themselves
+void test_probes_skip_registration(void)
+{
+    ___COVERON_COUNT_CHECKPOINT(testCounters, 0, &testInputData);
+    TEST_ASSERT_EQUAL_INT(1, ___COVERON_COUNT_EVALUATION(&testCounters[1], &testInputData, 1));
+
+    TEST_ASSERT_EQUAL_INT(___COVERON_BOOL_FALSE, testInputData.helperInitialized);
+    TEST_ASSERT_NULL(___COVERON_REGISTERED_FILES);
+    TEST_ASSERT_EQUAL_UINT64(1, testCounters[0]);
+    TEST_ASSERT_EQUAL_UINT64(1, testCounters[2]);
+}
+
+// Test, that the registration function of the file registers it only once
+void test_register_file_once(void)
+{
+    ATEXIT_ExpectAnyArgsAndReturn(0);
+
+    TEST_ASSERT_EQUAL_INT(___COVERON_BOOL_TRUE, ___COVERON_REGISTER_FILE(&testInputData));
+    TEST_ASSERT_EQUAL_INT(___COVERON_BOOL_TRUE, ___COVERON_REGISTER_FILE(&testInputData));
+
+    TEST_ASSERT_EQUAL_INT(___COVERON_BOOL_TRUE, testInputData.helperInitialized);
+    TEST_ASSERT_EQUAL_PTR(&testInputData, ___COVERON_REGISTERED_FILES);
+    TEST_ASSERT_NULL(testInputData.nextFile);
+}
+// !SECTION
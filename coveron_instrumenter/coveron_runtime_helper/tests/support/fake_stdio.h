@@ -18,3 +18,7 @@ int FSEEK(FILE *, long, int);
 size_t FREAD(void *, size_t, size_t, FILE *);
 
 size_t FWRITE(const void *, size_t, size_t, FILE *);
+
+int FFLUSH(FILE *);
+
+int ATEXIT(void (*)(void));
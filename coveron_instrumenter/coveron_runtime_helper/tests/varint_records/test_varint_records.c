@@ -0,0 +1,104 @@
+// Copyright 2020 Glenn Töws
+//
+// This file is part of the Coveron project
+//
+// The Coveron project is licensed under the LGPL-3.0 license
+
+// TEST FILE FOR THE VARINT MARKER RECORDS OF THE TRACE
+
+#include "coveron_helper.h"
+#include "mock_fake_stdio.h"
+#include "unity.h"
+#include <stdlib.h>
+
+/*
+ * SECTION   PRIVATE RUNTIME HELPER SYMBOLS
+ */
+extern ___COVERON_FILE_T *___COVERON_REGISTERED_FILES;
+
+void ___COVERON_SETUP_WRITE_BUFFER(___COVERON_FILE_T *coveronFile);
+
+void ___COVERON_WRITE_REGISTERED_FILES(void);
+// !SECTION
+
+/*
+ * SECTION   TEST DATA
+ */
+
+FILE dummy_file;
+FILE *dummyFilePointer = &dummy_file;
+
+___COVERON_FILE_T testInputData = {{0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA,
+                                    0xAB, 0xAC, 0xAD, 0xAE, 0xAF, 0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5,
+                                    0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF},
+                                   {0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57,
+                                    0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F},
+                                   ___COVERON_BOOL_TRUE,
+                                   NULL,
+                                   NULL,
+                                   NULL,
+                                   0,
+                                   "test_output.cri"};
+// !SECTION
+
+/*
+ * SECTION   SETUP & TEARDOWN FUNCTIONS
+ */
+void setUp()
+{
+    // set criFile pointer to dummy and reset the registry
+    testInputData.criFile = dummyFilePointer;
+    testInputData.writeBuffer = NULL;
+    testInputData.nextFile = NULL;
+    ___COVERON_REGISTERED_FILES = NULL;
+
+    // the first registration installs the exit handler
+    ATEXIT_ExpectAnyArgsAndReturn(0);
+    ___COVERON_SETUP_WRITE_BUFFER(&testInputData);
+}
+
+void tearDown()
+{
+    free(testInputData.writeBuffer);
+}
+// !SECTION
+
+/*
+ * SECTION   TEST FUNCTIONS
+ */
+// Test the varint encoding of marker records and the escaped repeat record
+void test_varint_records(void)
+{
+    // checkpoint 1, evaluation 2 (true), evaluation 300 (false) and checkpoint 1 twice
+    ___COVERON_SET_CHECKPOINT_VARINT(1, &testInputData);
+    ___COVERON_SET_EVALUATION_VARINT(2, &testInputData, 1);
+    ___COVERON_SET_EVALUATION_VARINT(300, &testInputData, 0);
+    ___COVERON_SET_CHECKPOINT_VARINT(1, &testInputData);
+    ___COVERON_SET_CHECKPOINT_VARINT(1, &testInputData);
+
+    uint8_t comparisonBuffer[11] = {0x04,
+                                    0x0B,
+                                    0xB2, 0x09,
+                                    0x04,
+                                    0x01, 0x00, 0x00, 0x00, 0x01, 0xFD};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonBuffer, 11, 1, 11, dummyFilePointer, sizeof(dummyFilePointer), 11);
+    FFLUSH_ExpectAndReturn(dummyFilePointer, 0);
+
+    // simulate the exit of the program
+    ___COVERON_WRITE_REGISTERED_FILES();
+}
+
+// Test, that the evaluation passes on the input data
+void test_evaluation_passthrough(void)
+{
+    TEST_ASSERT_EQUAL_INT(5, ___COVERON_SET_EVALUATION_VARINT(2, &testInputData, 5));
+    TEST_ASSERT_EQUAL_INT(0, ___COVERON_SET_EVALUATION_VARINT(2, &testInputData, 0));
+
+    uint8_t comparisonBuffer[2] = {0x0B, 0x0A};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonBuffer, 2, 1, 2, dummyFilePointer, sizeof(dummyFilePointer), 2);
+    FFLUSH_ExpectAndReturn(dummyFilePointer, 0);
+    ___COVERON_WRITE_REGISTERED_FILES();
+}
+// !SECTION
@@ -0,0 +1,103 @@
+// Copyright 2020 Glenn Töws
+//
+// This file is part of the Coveron project
+//
+// The Coveron project is licensed under the LGPL-3.0 license
+
+// TEST FILE FOR THE WRITE BUFFER
+
+#include "coveron_helper.h"
+#include "mock_fake_stdio.h"
+#include "unity.h"
+#include <stdlib.h>
+
+/*
+ * SECTION   PRIVATE RUNTIME HELPER SYMBOLS
+ */
+extern ___COVERON_FILE_T *___COVERON_REGISTERED_FILES;
+
+void ___COVERON_SETUP_WRITE_BUFFER(___COVERON_FILE_T *coveronFile);
+
+void ___COVERON_WRITE_REGISTERED_FILES(void);
+// !SECTION
+
+/*
+ * SECTION   TEST DATA
+ */
+
+FILE dummy_file;
+FILE *dummyFilePointer = &dummy_file;
+
+___COVERON_FILE_T testInputData = {{0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA,
+                                    0xAB, 0xAC, 0xAD, 0xAE, 0xAF, 0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5,
+                                    0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF},
+                                   {0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57,
+                                    0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F},
+                                   ___COVERON_BOOL_TRUE,
+                                   NULL,
+                                   NULL,
+                                   NULL,
+                                   0,
+                                   "test_output.cri"};
+// !SECTION
+
+/*
+ * SECTION   SETUP & TEARDOWN FUNCTIONS
+ */
+void setUp()
+{
+    // set criFile pointer to dummy and reset the registry
+    testInputData.criFile = dummyFilePointer;
+    testInputData.writeBuffer = NULL;
+    testInputData.nextFile = NULL;
+    ___COVERON_REGISTERED_FILES = NULL;
+
+    // the first registration installs the exit handler
+    ATEXIT_ExpectAnyArgsAndReturn(0);
+    ___COVERON_SETUP_WRITE_BUFFER(&testInputData);
+}
+
+void tearDown()
+{
+    free(testInputData.writeBuffer);
+}
+// !SECTION
+
+/*
+ * SECTION   TEST FUNCTIONS
+ */
+// Test the collection of records until the buffer (12 bytes) is full
+void test_buffer_full(void)
+{
+    TEST_ASSERT_NOT_NULL(testInputData.writeBuffer);
+    TEST_ASSERT_EQUAL_PTR(&testInputData, ___COVERON_REGISTERED_FILES);
+
+    // two records fit into the buffer without any file access
+    ___COVERON_SET_CHECKPOINT_MARKER(0x00, 0x00, 0x00, 0x01, &testInputData);
+    ___COVERON_SET_EVALUATION_MARKER(0x00, 0x00, 0x00, 0x02, &testInputData, 5);
+
+    // the third record flushes the buffer
+    uint8_t comparisonBuffer[10] = {0x00, 0x00, 0x00, 0x01, 0xFF, 0x00, 0x00, 0x00, 0x02, 0x01};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonBuffer, 10, 1, 10, dummyFilePointer, sizeof(dummyFilePointer), 10);
+    ___COVERON_SET_CHECKPOINT_MARKER(0x00, 0x00, 0x00, 0x03, &testInputData);
+}
+
+// Test the flushing of the remaining records at exit
+void test_flush_at_exit(void)
+{
+    ___COVERON_SET_EVALUATION_MARKER(0x00, 0x00, 0x00, 0x02, &testInputData, 0);
+
+    uint8_t comparisonBuffer[5] = {0x00, 0x00, 0x00, 0x02, 0x00};
+    FWRITE_ExpectWithArrayAndReturn(
+        comparisonBuffer, 5, 1, 5, dummyFilePointer, sizeof(dummyFilePointer), 5);
+    FFLUSH_ExpectAndReturn(dummyFilePointer, 0);
+
+    // simulate the exit of the program
+    ___COVERON_WRITE_REGISTERED_FILES();
+
+    // nothing left to write
+    FFLUSH_ExpectAndReturn(dummyFilePointer, 0);
+    ___COVERON_WRITE_REGISTERED_FILES();
+}
+// !SECTION
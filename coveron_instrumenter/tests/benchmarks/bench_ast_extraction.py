@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Benchmark for the AST extraction.
+   Compares the parser running directly on clang cursors with the parser
+   running on the node table of the ASTExtractor (extraction time included,
+   clang parsing excluded, since it is the same for both).
+
+   Usage: python bench_ast_extraction.py [number of generated lines]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(
+    os.path.realpath(__file__)), "..", ".."))
+
+from Configuration import SourceFile, Configuration
+from CIDManager import CIDManager
+from Parser import ClangBridge, Parser
+from ASTExtractor import ASTExtractor
+
+# every generated function has this many lines
+function_template = """int function_{0}(int a, int b)
+{{
+    int result = 0;
+    if (a > b)
+        result = a;
+    else
+    {{
+        result = b;
+    }}
+    switch (result)
+    {{
+    case 1:
+        result += 1;
+        break;
+    default:
+        result -= 1;
+    }}
+    return result;
+}}
+
+"""
+function_line_count = function_template.count("\n")
+
+
+def run_parser(source_file_path: str, source_code: str, use_ast_table: bool) -> float:
+    """Runs the parser (and the extraction). Returns the run time in seconds, clang parsing excluded"""
+    config = Configuration()
+    config.checkpoint_markers_enabled = True
+    config.evaluation_markers_enabled = False
+    cid_manager = CIDManager(config, SourceFile(
+        source_file_path), source_code)
+
+    clang_cursor = ClangBridge().clang_parse(source_file_path, "")
+    start_time = time.perf_counter()
+    if use_ast_table:
+        clang_cursor = ASTExtractor(
+            source_file_path).extract(clang_cursor).get_root()
+    Parser(config, cid_manager, clang_cursor, source_code).start_parser()
+    return time.perf_counter() - start_time
+
+
+def main():
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source_code = "".join(function_template.format(i)
+                          for i in range(max(1, line_count // function_line_count)))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_file_path = os.path.join(work_dir, "bench_input.c")
+        with open(source_file_path, "w") as source_file_ptr:
+            source_file_ptr.write(source_code)
+
+        cursor_time = run_parser(source_file_path, source_code, False)
+        table_time = run_parser(source_file_path, source_code, True)
+
+    print("Generated lines:       " + str(source_code.count("\n")))
+    print("Parser on cursors:     {0:.3f} s".format(cursor_time))
+    print("Parser on node table:  {0:.3f} s".format(table_time))
+    print("Speedup:               {0:.1f}x".format(cursor_time / table_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Benchmark for the CID encoding.
+   Compares the throughput of the CIDEncoder with json.dumps and the
+   CustomJSONEncoder in encoded objects (CID rows, code sections and
+   code positions) per second. Both have to create the same document.
+
+   Usage: python bench_cid_encoder.py [number of functions]
+"""
+
+import os
+import sys
+import json
+import time
+
+sys.path.append(os.path.join(os.path.dirname(
+    os.path.realpath(__file__)), "..", ".."))
+
+from DataTypes import *
+from Configuration import SourceFile, Configuration, RuntimeMode
+from CIDManager import CIDManager
+from CIDEncoder import CIDEncoder
+
+
+class CountingJSONEncoder(CustomJSONEncoder):
+    """Counts the objects passed to CustomJSONEncoder.default"""
+    object_count = 0
+
+    def default(self, obj):
+        CountingJSONEncoder.object_count += 1
+        return CustomJSONEncoder.default(self, obj)
+
+
+def section(line: int, start_column: int, end_column: int) -> CodeSectionData:
+    return CodeSectionData(CodePositionData(line, start_column), CodePositionData(line, end_column))
+
+
+def create_cid_data(function_count: int) -> CIDData:
+    """Creates the CID of a file with functions holding a statement, an if branch and a loop each"""
+    config = Configuration()
+    config.evaluation_markers_enabled = True
+    config.runtime_mode = RuntimeMode.COUNTER
+    cid_manager = CIDManager(config, SourceFile("bench_input.c"), "int main() { return 0; }\n")
+
+    for function_index in range(function_count):
+        line = function_index * 10 + 1
+        function_id = cid_manager.get_new_id()
+        checkpoint_marker_id = cid_manager.get_new_marker_id()
+        cid_manager.add_checkpoint_marker(checkpoint_marker_id, CodePositionData(line, 12))
+        cid_manager.add_function_data(function_id, "function_" + str(function_index), FunctionType.NORMAL,
+                                      None, checkpoint_marker_id, section(line, 1, 10), section(line, 12, 40))
+        cid_manager.add_statement_data(cid_manager.get_new_id(), StatementType.NORMAL, function_id,
+                                       checkpoint_marker_id, section(line + 1, 5, 20))
+
+        for _ in range(2):
+            decision_marker_id = cid_manager.get_new_marker_id()
+            condition_marker_id = cid_manager.get_new_marker_id()
+            cid_manager.add_evaluation_marker(decision_marker_id, section(line + 2, 9, 20),
+                                              EvaluationType.DECISION)
+            cid_manager.add_evaluation_marker(condition_marker_id, section(line + 2, 9, 14),
+                                              EvaluationType.CONDITION)
+            condition_possibilities = [
+                ConditionPossibility(True, [ConditionResult(condition_marker_id, True)]),
+                ConditionPossibility(False, [ConditionResult(condition_marker_id, False)])]
+            conditions = [ConditionData(condition_marker_id, section(line + 2, 9, 14))]
+            cid_manager.add_if_branch_data(cid_manager.get_new_id(), function_id, [
+                BranchResultData(decision_marker_id, condition_possibilities, conditions,
+                                 section(line + 2, 9, 20), section(line + 3, 5, 30))])
+            cid_manager.add_loop_data(cid_manager.get_new_id(), LoopType.WHILE, function_id,
+                                      decision_marker_id, section(line + 4, 12, 20),
+                                      section(line + 5, 5, 30), condition_possibilities, conditions)
+    return cid_manager._cid_data
+
+
+def main():
+    function_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cid_data = create_cid_data(function_count)
+
+    start_time = time.perf_counter()
+    reference_string = json.dumps(cid_data, cls=CountingJSONEncoder, indent=4)
+    reference_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    cid_string = CIDEncoder().encode(cid_data)
+    encoder_time = time.perf_counter() - start_time
+
+    if cid_string != reference_string:
+        raise(RuntimeError("CIDEncoder and CustomJSONEncoder created different documents!"))
+
+    object_count = CountingJSONEncoder.object_count
+    print("Encoded objects:       " + str(object_count))
+    print("CustomJSONEncoder:     {0:.3f} s ({1:.0f} objects/s)".format(
+        reference_time, object_count / reference_time))
+    print("CIDEncoder:            {0:.3f} s ({1:.0f} objects/s)".format(
+        encoder_time, object_count / encoder_time))
+    print("Speedup:               {0:.1f}x".format(reference_time / encoder_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Benchmark for the instrumentation daemon.
+   Compares the per-file latency of cold wrapper calls with calls
+   forwarded to a running daemon (--CVR_DAEMON).
+
+   Usage: python bench_daemon.py [number of calls] [compiler executable]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+coveron_main_path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                 "..", "..", "__main__.py")
+input_file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                               "..", "unit_tests", "Parser", "input_files", "Goto", "Goto_basic.c")
+
+
+def run_wrapper_calls(work_dir: str, call_count: int, wrapper_args: list) -> float:
+    """Runs the given number of wrapper calls and returns the mean latency in seconds"""
+    start_time = time.perf_counter()
+    for i in range(call_count):
+        subprocess.run([sys.executable, coveron_main_path] + wrapper_args +
+                       ["-c", "bench_" + str(i) + ".c", "-o", "bench_" + str(i) + ".o"],
+                       cwd=work_dir, check=True)
+    return (time.perf_counter() - start_time) / call_count
+
+
+def main():
+    call_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    compiler_exec = sys.argv[2] if len(sys.argv) > 2 else "gcc"
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for i in range(call_count):
+            shutil.copy(input_file_path, os.path.join(
+                work_dir, "bench_" + str(i) + ".c"))
+
+        socket_path = os.path.join(work_dir, "bench.sock")
+        wrapper_args = ["--CVR_COMPILER_EXEC=" + compiler_exec,
+                        "--CVR_FORCE", "--CVR_NO_EVALUATION"]
+
+        # cold wrapper calls (interpreter and libclang startup for every call)
+        cold_latency = run_wrapper_calls(work_dir, call_count, wrapper_args)
+
+        # daemon wrapper calls
+        daemon_process = subprocess.Popen([sys.executable, coveron_main_path, "--CVR_SERVE",
+                                           "--CVR_DAEMON_SOCKET=" + socket_path])
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.05)
+            daemon_latency = run_wrapper_calls(work_dir, call_count,
+                                               wrapper_args + ["--CVR_DAEMON",
+                                                               "--CVR_DAEMON_SOCKET=" + socket_path])
+        finally:
+            daemon_process.terminate()
+            daemon_process.wait()
+
+    print("cold start:  %8.1f ms per file" % (cold_latency * 1000))
+    print("daemon:      %8.1f ms per file" % (daemon_latency * 1000))
+    print("speedup:     %8.2fx" % (cold_latency / daemon_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Benchmark for the output generation of the Instrumenter.
+   Measures the marker writing for growing numbers of checkpoint markers
+   and compares it with the previous insert-per-marker implementation.
+
+   Usage: python bench_instrumenter.py [largest marker count]
+"""
+
+import os
+import sys
+import time
+
+from unittest.mock import Mock
+
+sys.path.append(os.path.join(os.path.dirname(
+    os.path.realpath(__file__)), "..", ".."))
+
+from DataTypes import *
+from Configuration import SourceFile
+from Instrumenter import Instrumenter
+
+# the previous implementation gets too slow for larger files
+reference_max_marker_count = 10000
+
+
+def create_instrumenter(marker_count: int) -> Instrumenter:
+    """Creates an instrumenter for a generated file with one checkpoint marker per line"""
+    source_code = "".join("    statement_" + str(i) +
+                          "();\n" for i in range(marker_count))
+
+    config = Mock()
+    config.checkpoint_markers_enabled = True
+    config.evaluation_markers_enabled = False
+    config.runtime_helper_header_path = "coveron_helper.h"
+
+    cid_manager = Mock()
+    cid_manager.get_instrumentation_random.return_value = "0123456789abcdef0123456789abcdef"
+    cid_manager.get_source_code_hash.return_value = "ab" * 32
+    cid_manager.get_checkpoint_markers.return_value = [
+        CheckpointMarkerData(i + 1, CodePositionData(i + 1, 5)) for i in range(marker_count)]
+    cid_manager.get_compound_statement_inserts.return_value = []
+
+    instrumenter = Instrumenter(
+        config, cid_manager, SourceFile("bench.c"), source_code)
+    instrumenter._prepare_markers()
+    return instrumenter
+
+
+def run_splice(marker_count: int) -> float:
+    instrumenter = create_instrumenter(marker_count)
+    start_time = time.perf_counter()
+    instrumenter._write_markers()
+    return time.perf_counter() - start_time
+
+
+def run_reference(marker_count: int) -> float:
+    """Previous implementation: every insert splits and joins the whole code"""
+    instrumenter = create_instrumenter(marker_count)
+    instrumented_code = instrumenter.source_code
+    start_time = time.perf_counter()
+    for marker in instrumenter._instrumenter_marker_list:
+        source_lines = instrumented_code.splitlines()
+        source_lines[marker.code_line - 1] = (source_lines[marker.code_line - 1][:(marker.code_column - 1)] +
+                                              "___COVERON_SET_CHECKPOINT_MARKER();" +
+                                              source_lines[marker.code_line - 1][(marker.code_column - 1):])
+        instrumented_code = "\n".join(source_lines)
+    return time.perf_counter() - start_time
+
+
+def main():
+    max_marker_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("{0:>10} {1:>14} {2:>14} {3:>14}".format(
+        "markers", "splice [s]", "per marker", "previous [s]"))
+    marker_count = 1000
+    while marker_count <= max_marker_count:
+        splice_time = run_splice(marker_count)
+        reference_time = "-"
+        if marker_count <= reference_max_marker_count:
+            reference_time = "{0:.3f}".format(run_reference(marker_count))
+        print("{0:>10} {1:>14.3f} {2:>12.2f}us {3:>14}".format(
+            marker_count, splice_time, splice_time / marker_count * 1e6, reference_time))
+        marker_count *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Benchmark for the statement end lookup of the Parser.
+   Measures the time per find_statement_end call for a growing number of
+   single statement branches. With the binary search over the precomputed
+   offsets it only grows slowly with the size of the source code.
+
+   Usage: python bench_statement_end.py [maximum number of branches]
+"""
+
+import os
+import sys
+import time
+
+from unittest.mock import Mock
+
+sys.path.append(os.path.join(os.path.dirname(
+    os.path.realpath(__file__)), "..", ".."))
+
+from Parser import Parser
+
+
+def run_statement_end_lookups(branch_count: int) -> float:
+    """Looks up the end of every single statement branch. Returns the time per lookup in seconds"""
+    source_code = "int f(int x)\n{\n" + \
+        "    if (x)\n        foo(x);\n" * branch_count + "}\n"
+    parser = Parser(Mock(), Mock(), None, source_code)
+
+    start_time = time.perf_counter()
+    for i in range(branch_count):
+        if parser.find_statement_end(4 + 2 * i, 9) != (4 + 2 * i, 15):
+            raise(RuntimeError("Wrong statement end for branch " + str(i) + "!"))
+    return (time.perf_counter() - start_time) / branch_count
+
+
+def main():
+    max_branch_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("{0:>10} {1:>14}".format("branches", "per lookup"))
+    branch_count = 1000
+    while branch_count <= max_branch_count:
+        print("{0:>10} {1:>12.2f}us".format(
+            branch_count, run_statement_end_lookups(branch_count) * 1e6))
+        branch_count *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the ASTExtractor module.
+"""
+
+import glob
+import json
+import itertools
+import pytest
+
+from unittest.mock import MagicMock
+
+from coveron_instrumenter.DataTypes import *
+from coveron_instrumenter.Configuration import SourceFile
+
+from coveron_instrumenter.Parser import ClangBridge, Parser
+from coveron_instrumenter.ASTExtractor import ASTExtractor
+
+abs_path_parser_input_dir = os.path.join(os.path.abspath(
+    os.path.dirname(os.path.realpath(__file__))), "..", "Parser", "input_files")
+
+input_file_paths = sorted(glob.glob(os.path.join(
+    abs_path_parser_input_dir, "*", "*.c")))
+
+
+def run_parser(source_file_path: str, evaluation_markers_enabled: bool, use_ast_table: bool):
+    """Runs the parser and returns all calls to the CIDManager"""
+    with open(source_file_path) as input_file:
+        source_code = input_file.read()
+
+    config = MagicMock()
+    config.checkpoint_markers_enabled = True
+    config.evaluation_markers_enabled = evaluation_markers_enabled
+
+    cid_manager = MagicMock()
+    cid_manager.source_file = SourceFile(source_file_path)
+    cid_manager.get_new_id.side_effect = itertools.count(1)
+
+    clang_cursor = ClangBridge().clang_parse(source_file_path, "")
+    if use_ast_table:
+        clang_cursor = ASTExtractor(
+            source_file_path).extract(clang_cursor).get_root()
+
+    Parser(config, cid_manager, clang_cursor, source_code).start_parser()
+
+    # the data types have no equality, so the calls get compared in their JSON representation
+    return [(name, json.dumps(list(args), default=to_plain_data))
+            for name, args, _ in cid_manager.mock_calls]
+
+
+def to_plain_data(data_object):
+    return {slot: getattr(data_object, slot, None)
+            for data_class in type(data_object).__mro__
+            for slot in getattr(data_class, '__slots__', ())}
+
+
+@pytest.mark.parametrize("evaluation_markers_enabled", [False, True])
+@pytest.mark.parametrize("source_file_path", input_file_paths,
+                         ids=[os.path.basename(path) for path in input_file_paths])
+def test_ASTExtractor_sameParserResult(source_file_path, evaluation_markers_enabled):
+    try:
+        expected_calls = run_parser(
+            source_file_path, evaluation_markers_enabled, False)
+    except AttributeError as e:
+        # the loaded libclang might not export all functions used by the clang bindings
+        pytest.skip(str(e))
+    except Exception as e:
+        # parser errors have to show up the same way
+        with pytest.raises(type(e)):
+            run_parser(source_file_path, evaluation_markers_enabled, True)
+        return
+
+    assert run_parser(source_file_path,
+                      evaluation_markers_enabled, True) == expected_calls
+
+
+def test_ASTExtractor_table():
+    source_file_path = os.path.join(
+        abs_path_parser_input_dir, "Functions", "Functions_basic.c")
+    clang_cursor = ClangBridge().clang_parse(source_file_path, "")
+    ast_table = ASTExtractor(source_file_path).extract(clang_cursor)
+
+    # the table has the same shape as the (main file part of the) clang AST
+    def count_nodes(node) -> int:
+        return 1 + sum(count_nodes(child) for child in node.get_children())
+    assert count_nodes(ast_table.get_root()) == len(ast_table)
+
+    for cursor, node in zip(clang_cursor.get_children(), ast_table.get_root().get_children()):
+        assert node.kind == cursor.kind
+        assert node.displayname == cursor.displayname
+        assert node.location.file.name == cursor.location.file.name
+        assert (node.extent.start.line, node.extent.start.column,
+                node.extent.end.line, node.extent.end.column) == (
+            cursor.extent.start.line, cursor.extent.start.column,
+            cursor.extent.end.line, cursor.extent.end.column)
+        assert ast_table.parents[ast_table.first_children[0]] == 0
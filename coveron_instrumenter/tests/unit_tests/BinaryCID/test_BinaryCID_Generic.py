@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the BinaryCID module.
+"""
+
+import pytest
+import json
+import gzip
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.BinaryCID import BinaryCID, BinaryCIDLayout
+from coveron_instrumenter.CIDReader import CIDReader
+from coveron_instrumenter.Configuration import RuntimeMode, CIDFormat
+import coveron_instrumenter.__main__ as main_func
+
+
+@pytest.mark.parametrize("runtime_mode", [RuntimeMode.COUNTER, RuntimeMode.MCDC])
+def test_BinaryCID_convert(tmpdir, runtime_mode, create_cid_manager):
+    cid_manager = create_cid_manager(runtime_mode)
+    cid_manager.config.nocomp_cid = True
+    cid_manager.write_cid_file()
+    with open(tmpdir.join("test_file.cid"), 'r') as cid_file_ptr:
+        cid_string = cid_file_ptr.read()
+
+    # CIDManager writes the same content in binary format
+    cid_manager.config.cid_format = CIDFormat.BINARY
+    cid_manager.write_cid_file()
+    assert BinaryCID.is_binary_cid(str(tmpdir.join("test_file.cid")))
+    assert BinaryCID.read_file(str(tmpdir.join("test_file.cid"))).to_json() == json.loads(cid_string)
+
+    # JSON -> binary -> compressed JSON -> JSON gives the same document
+    with open(tmpdir.join("input.cid"), 'w') as cid_file_ptr:
+        cid_file_ptr.write(cid_string)
+    assert main_func.convert([str(tmpdir.join("input.cid")), str(tmpdir.join("binary.cid")),
+                              "--format", "binary"]) == 0
+    assert main_func.convert([str(tmpdir.join("binary.cid")), str(tmpdir.join("compressed.cid"))]) == 0
+    assert main_func.convert([str(tmpdir.join("compressed.cid")), str(tmpdir.join("output.cid")),
+                              "--nocomp"]) == 0
+    with gzip.GzipFile(tmpdir.join("compressed.cid"), 'r') as cid_file_ptr:
+        assert cid_file_ptr.read().decode('utf-8') == cid_string
+    with open(tmpdir.join("output.cid"), 'r') as cid_file_ptr:
+        assert cid_file_ptr.read() == cid_string
+
+    assert main_func.convert([str(tmpdir.join("missing.cid")), str(tmpdir.join("output.cid"))]) == 1
+
+
+def test_BinaryCID_columns(create_cid_manager):
+    binary_cid = BinaryCID(BinaryCID.encode(
+        create_cid_manager(RuntimeMode.COUNTER)._cid_data))
+
+    # columns can be read without building rows
+    assert binary_cid.get_row_count("evaluation_markers") == 2
+    assert binary_cid.get_column("evaluation_markers.evaluation_marker_id").tolist() == [2, 3]
+    assert binary_cid.get_column("evaluation_markers.evaluation_type").tolist() == [1, 2]
+    assert binary_cid.get_column("evaluation_markers.code_section.end_column").tolist() == [15, 9]
+    assert binary_cid.get_column("counter_indices.counter_index").tolist() == [0, 1, 3]
+    assert binary_cid.get_string(binary_cid.get_column("functions.function_name")[0]) == "main"
+    assert binary_cid.get_column("functions.parent_function_id")[0] == \
+        BinaryCIDLayout.NULL_VALUES["q"]
+
+    # nested lists reference a range of rows of their table
+    assert binary_cid.get_column("if_branches.branch_results.count").tolist() == [2]
+    assert binary_cid.get_column("branch_results.condition_possibilities.count").tolist() == [2, 0]
+    assert binary_cid.get_rows("condition_results", 0, 1) == [
+        {"evaluation_marker_id": 3, "condition_result": True}]
+
+    with pytest.raises(RuntimeError):
+        binary_cid.get_column("unknown")
+
+
+def test_BinaryCID_writeFile(tmpdir, create_cid_manager):
+    cid_data = create_cid_manager(RuntimeMode.MCDC)._cid_data
+
+    # the columns get written one by one into the file
+    with open(tmpdir.join("binary.cid"), 'wb') as cid_file_ptr:
+        BinaryCID.write_file(cid_data, cid_file_ptr)
+    with open(tmpdir.join("binary.cid"), 'rb') as cid_file_ptr:
+        assert cid_file_ptr.read() == BinaryCID.encode(cid_data)
+
+
+def test_BinaryCID_overrides():
+    # values outside of the schema columns are stored as JSON text
+    cid_data = {"source_code_hash": "00" * 32, "extra": [1, 2],
+                "marker_data": {"checkpoint_markers": [
+                    {"checkpoint_marker_id": 2 ** 70, "code_position": {"line": 1, "column": 2}},
+                    {"checkpoint_marker_id": 1.5, "code_position": {"column": 2, "line": 1}},
+                    {"code_position": None, "comment": "unknown key"},
+                    {"checkpoint_marker_id": True, "code_position": {"line": 1, "column": 2}}],
+                    "evaluation_markers": "no table"},
+                "mcdc_data": [{"decision_marker_id": None, "condition_marker_ids": [1, "2"]}]}
+
+    binary_cid = BinaryCID(BinaryCID.encode(cid_data))
+    assert binary_cid.to_json() == cid_data
+    assert binary_cid.get_section("marker_data") == cid_data["marker_data"]
+
+
+def test_BinaryCID_reader(tmpdir, create_cid_manager):
+    cid_manager = create_cid_manager(RuntimeMode.COUNTER)
+    cid_manager.config.cid_format = CIDFormat.BINARY
+    cid_manager.write_cid_file()
+    cid_path = str(tmpdir.join("test_file.cid"))
+    cid_data = BinaryCID.read_file(cid_path).to_json()
+
+    # header reads only need the meta data in front of the columns
+    with open(cid_path, 'rb') as cid_file_ptr:
+        cid_bytes = cid_file_ptr.read()
+    meta_length = int.from_bytes(cid_bytes[12:16], "little")
+    with open(cid_path, 'wb') as cid_file_ptr:
+        cid_file_ptr.write(cid_bytes[:BinaryCIDLayout.HEADER_LENGTH + meta_length])
+    assert CIDReader.read_header(cid_path) == {
+        key: cid_data[key] for key in CIDReader.HEADER_KEYS}
+    with pytest.raises(RuntimeError):
+        CIDReader(cid_path).marker_data
+
+    with open(cid_path, 'wb') as cid_file_ptr:
+        cid_file_ptr.write(cid_bytes)
+    cid_reader = CIDReader(cid_path)
+    assert cid_reader.code_data == cid_data["code_data"]
+    assert cid_reader.source_code == "int main() {\n    return 0; /* äöü */\n}\n"
+    assert cid_reader.load() == cid_data
+
+
+def test_BinaryCID_invalid():
+    cid_bytes = BinaryCID.encode({"marker_data": {"checkpoint_markers": [
+        {"checkpoint_marker_id": 1, "code_position": {"line": 1, "column": 2}}]}})
+
+    with pytest.raises(RuntimeError):
+        BinaryCID(b"IMACIDX!" + cid_bytes[8:])
+    with pytest.raises(RuntimeError):
+        BinaryCID(cid_bytes[:-8])
+    with pytest.raises(RuntimeError):
+        BinaryCID(cid_bytes[:BinaryCIDLayout.HEADER_LENGTH + 4])
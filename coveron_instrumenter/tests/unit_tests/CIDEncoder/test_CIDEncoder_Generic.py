@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the CIDEncoder module.
+"""
+
+import pytest
+import json
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CIDEncoder import CIDEncoder
+from coveron_instrumenter.Configuration import RuntimeMode
+
+
+@pytest.mark.parametrize("runtime_mode", [RuntimeMode.COUNTER, RuntimeMode.MCDC])
+def test_CIDEncoder_encode(runtime_mode, create_cid_manager):
+    cid_data = create_cid_manager(runtime_mode)._cid_data
+    cid_string = json.dumps(cid_data, cls=CustomJSONEncoder, indent=4)
+
+    # same document as the CustomJSONEncoder, in one piece and in chunks
+    assert CIDEncoder().encode(cid_data) == cid_string
+    assert "".join(CIDEncoder().iterencode(cid_data)) == cid_string
+
+    # decoded CIDs are encoded by the CustomJSONEncoder
+    assert CIDEncoder().encode(json.loads(cid_string)) == cid_string
+    assert "".join(CIDEncoder().iterencode(json.loads(cid_string))) == cid_string
+
+
+def test_CIDEncoder_unexpectedTypes(create_cid_manager):
+    cid_data = create_cid_manager(RuntimeMode.COUNTER)._cid_data
+
+    # values outside of the annotated types fall back to the CustomJSONEncoder
+    cid_data.marker_data.checkpoint_markers[0].checkpoint_marker_id = 1.5
+    cid_data.marker_data.checkpoint_markers[0].code_position = CodePositionData(4, True)
+    cid_data.marker_data.evaluation_markers[0].code_section = CodeSectionData(
+        CodePositionData(True, 2), CodePositionData(3, 4))
+    cid_data.marker_data.evaluation_markers[1].code_section = dict(start_line=[1, {"a": None}])
+    cid_data.code_data.classes[0].class_name = "äöü\n\"class\""
+    cid_data.mcdc_data = [MCDCDecisionData(2, (3, 4)), dict(decision_marker_id=5), "no row"]
+    cid_data.counter_data.counter_indices = dict()
+
+    assert CIDEncoder().encode(cid_data) == json.dumps(
+        cid_data, cls=CustomJSONEncoder, indent=4)
+    with pytest.raises(TypeError):
+        cid_data.mcdc_data = [object()]
+        CIDEncoder().encode(cid_data)
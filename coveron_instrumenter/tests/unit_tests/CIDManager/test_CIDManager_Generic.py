@@ -19,7 +19,7 @@ import gzip
 from coveron_instrumenter.DataTypes import *
 
 from coveron_instrumenter.CIDManager import CIDManager
-from coveron_instrumenter.Configuration import Configuration, SourceFile
+from coveron_instrumenter.Configuration import Configuration, SourceFile, RuntimeMode
 
 
 @patch('coveron_instrumenter.Configuration.Configuration')
@@ -492,6 +492,7 @@ def test_CIDManager_writeCidFile(mock_config, tmpdir):
     mock_config.checkpoint_markers_enabled = True
     mock_config.evaluation_markers_enabled = True
     mock_config.output_abs_path = tmpdir
+    mock_config.cid_compression_level = Configuration.DEFAULT_CID_COMPRESSION_LEVEL
 
     cid_manager = CIDManager(
         mock_config, SourceFile('test_file.c'), 'test_code')
@@ -605,3 +606,91 @@ def test_CIDManager_writeCidFile(mock_config, tmpdir):
 
     # validate the compressed CID-File
     jsonschema.validate(cid_data, json_schema)
+
+
+@patch('coveron_instrumenter.Configuration.Configuration')
+def test_CIDManager_counterIndices(mock_config, tmpdir):
+
+    # setup for configuration mock
+    mock_config.checkpoint_markers_enabled = True
+    mock_config.evaluation_markers_enabled = True
+    mock_config.runtime_mode = RuntimeMode.COUNTER
+    mock_config.output_abs_path = tmpdir
+    mock_config.nocomp_cid = True
+
+    cid_manager = CIDManager(
+        mock_config, SourceFile('test_file.c'), 'test_code')
+
+    # checkpoints take one counter, evaluations two (false, true)
+    cid_manager.add_checkpoint_marker(4, CodePositionData(1, 6))
+    cid_manager.add_evaluation_marker(5,
+                                      CodeSectionData(CodePositionData(
+                                          1, 5), CodePositionData(1, 15)),
+                                      EvaluationType.DECISION)
+    cid_manager.add_checkpoint_marker(7, CodePositionData(2, 6))
+
+    assert cid_manager.get_counter_indices() == {4: 0, 5: 1, 7: 3}
+    assert cid_manager.get_counter_count() == 4
+
+    # write non-compressed and check the mapping inside the CID
+    cid_manager.write_cid_file()
+
+    with open(tmpdir.join('test_file.cid'), 'r') as output_cid_ptr:
+        cid_data = json.loads(output_cid_ptr.read())
+
+    with open(os.path.join(os.path.dirname(__file__), 'CID_Schema.json'), 'r') as cid_schema_ptr:
+        jsonschema.validate(cid_data, json.loads(cid_schema_ptr.read()))
+
+    assert cid_data["runtime_mode"] == "counter"
+    assert cid_data["counter_data"] == {
+        "counter_count": 4,
+        "counter_indices": [{"marker_id": 4, "counter_index": 0},
+                            {"marker_id": 5, "counter_index": 1},
+                            {"marker_id": 7, "counter_index": 3}]}
+
+
+@patch('coveron_instrumenter.Configuration.Configuration')
+def test_CIDManager_mcdcDecisions(mock_config, tmpdir):
+
+    # setup for configuration mock
+    mock_config.checkpoint_markers_enabled = True
+    mock_config.evaluation_markers_enabled = True
+    mock_config.runtime_mode = RuntimeMode.MCDC
+    mock_config.output_abs_path = tmpdir
+    mock_config.nocomp_cid = True
+
+    cid_manager = CIDManager(
+        mock_config, SourceFile('test_file.c'), 'test_code')
+
+    cid_manager.add_mcdc_decision(3, [1, 2])
+    # decisions with too many conditions for a vector mask are left out
+    cid_manager.add_mcdc_decision(
+        100, list(range(200, 200 + CIDManager.MCDC_MAX_CONDITIONS + 1)))
+
+    mcdc_decisions = cid_manager.get_mcdc_decisions()
+    assert [(mcdc_decision.decision_marker_id, mcdc_decision.condition_marker_ids)
+            for mcdc_decision in mcdc_decisions] == [(3, [1, 2])]
+
+    cid_manager.write_cid_file()
+
+    with open(tmpdir.join('test_file.cid'), 'r') as output_cid_ptr:
+        cid_data = json.loads(output_cid_ptr.read())
+
+    with open(os.path.join(os.path.dirname(__file__), 'CID_Schema.json'), 'r') as cid_schema_ptr:
+        jsonschema.validate(cid_data, json.loads(cid_schema_ptr.read()))
+
+    assert cid_data["runtime_mode"] == "mcdc"
+    assert cid_data["mcdc_data"] == [
+        {"decision_marker_id": 3, "condition_marker_ids": [1, 2]}]
+
+
+def test_CIDManager_markerIdsDense(tmpdir):
+    config = Configuration()
+    cid_manager = CIDManager(
+        config, SourceFile(str(tmpdir.join('test_file.c'))), 'test_code')
+
+    # other data doesn't use up marker ids
+    assert cid_manager.get_new_marker_id() == 1
+    cid_manager.get_new_id()
+    cid_manager.get_new_id()
+    assert cid_manager.get_new_marker_id() == 2
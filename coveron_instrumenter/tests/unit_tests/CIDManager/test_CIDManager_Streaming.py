@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the streamed and background CID writing.
+"""
+
+import pytest
+import json
+import gzip
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.Configuration import Configuration, SourceFile, RuntimeMode, CIDFormat
+
+
+def create_cid_manager(tmpdir) -> CIDManager:
+    config = Configuration()
+    config.evaluation_markers_enabled = True
+    config.runtime_mode = RuntimeMode.COUNTER
+    config.output_abs_path = str(tmpdir)
+    cid_manager = CIDManager(config, SourceFile(
+        str(tmpdir.join('test_file.c'))), "int main() {\n    return 0;\n}\n")
+
+    # enough markers for several chunk batches
+    for line in range(1, 2001):
+        cid_manager.add_checkpoint_marker(
+            cid_manager.get_new_marker_id(), CodePositionData(line, 5))
+        cid_manager.add_evaluation_marker(cid_manager.get_new_marker_id(),
+                                          CodeSectionData(CodePositionData(
+                                              line, 12), CodePositionData(line, 13)),
+                                          EvaluationType.CONDITION)
+    return cid_manager
+
+
+def read_cid_string(cid_path: str, nocomp_cid: bool) -> str:
+    if nocomp_cid:
+        with open(cid_path, 'r') as cid_file_ptr:
+            return cid_file_ptr.read()
+    with gzip.GzipFile(cid_path, 'r') as cid_file_ptr:
+        return cid_file_ptr.read().decode('utf-8')
+
+
+@pytest.mark.parametrize("nocomp_cid, compression_level", [(True, 9), (False, 1), (False, 9)])
+def test_CIDManager_streamedCid(tmpdir, nocomp_cid, compression_level):
+    cid_manager = create_cid_manager(tmpdir)
+    cid_manager.config.nocomp_cid = nocomp_cid
+    cid_manager.config.cid_compression_level = compression_level
+    cid_path = str(tmpdir.join('test_file.cid'))
+
+    # the streamed document is the same as the document of json.dumps
+    cid_manager.write_cid_file()
+    assert read_cid_string(cid_path, nocomp_cid) == json.dumps(
+        cid_manager._cid_data, cls=CustomJSONEncoder, indent=4)
+
+
+@pytest.mark.parametrize("cid_format, nocomp_cid", [(CIDFormat.JSON, True),
+                                                    (CIDFormat.JSON, False),
+                                                    (CIDFormat.BINARY, True)])
+def test_CIDManager_backgroundCid(tmpdir, cid_format, nocomp_cid):
+    cid_manager = create_cid_manager(tmpdir)
+    cid_manager.config.cid_format = cid_format
+    cid_manager.config.nocomp_cid = nocomp_cid
+    cid_path = str(tmpdir.join('test_file.cid'))
+
+    cid_manager.write_cid_file()
+    with open(cid_path, 'rb') as cid_file_ptr:
+        cid_bytes = cid_file_ptr.read()
+
+    # the background writer creates the same file
+    cid_manager.write_cid_file(background=True)
+    cid_manager.wait_for_cid_file()
+    if cid_format == CIDFormat.BINARY or nocomp_cid:
+        with open(cid_path, 'rb') as cid_file_ptr:
+            assert cid_file_ptr.read() == cid_bytes
+    else:
+        with gzip.GzipFile(cid_path, 'r') as cid_file_ptr:
+            assert cid_file_ptr.read() == gzip.decompress(cid_bytes)
+
+    # waiting without a running writer does nothing
+    cid_manager.wait_for_cid_file()
+
+
+def test_CIDManager_backgroundCidError(tmpdir):
+    cid_manager = create_cid_manager(tmpdir)
+    cid_manager.config.output_abs_path = str(tmpdir.join("missing"))
+
+    # the write error of the writer thread is raised by wait_for_cid_file
+    cid_manager.write_cid_file(background=True)
+    with pytest.raises(RuntimeError):
+        cid_manager.wait_for_cid_file()
+    cid_manager.wait_for_cid_file()
+
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the CIDReader module.
+"""
+
+import io
+import pytest
+import json
+import gzip
+
+from unittest.mock import patch
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CIDReader import CIDReader
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.Configuration import Configuration, SourceFile, RuntimeMode
+
+source_code = "int main() {\n    return 0;\n}\n"
+
+
+def write_cid_file(tmpdir, nocomp_cid: bool) -> str:
+    config = Configuration()
+    config.nocomp_cid = nocomp_cid
+    config.evaluation_markers_enabled = True
+    config.runtime_mode = RuntimeMode.COUNTER
+    config.output_abs_path = str(tmpdir)
+    source_file = SourceFile(str(tmpdir.join('test_file.c')))
+
+    cid_manager = CIDManager(config, source_file, source_code)
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_marker_id(), CodePositionData(2, 5))
+    cid_manager.add_evaluation_marker(cid_manager.get_new_marker_id(),
+                                      CodeSectionData(CodePositionData(
+                                          2, 12), CodePositionData(2, 13)),
+                                      EvaluationType.CONDITION)
+    cid_manager.write_cid_file()
+    return str(tmpdir.join(source_file.cid_file))
+
+
+def load_cid_file(cid_path: str, nocomp_cid: bool) -> dict:
+    if nocomp_cid:
+        with open(cid_path, 'r') as cid_file_ptr:
+            return json.load(cid_file_ptr)
+    with gzip.GzipFile(cid_path, 'r') as cid_file_ptr:
+        return json.loads(cid_file_ptr.read())
+
+
+@pytest.mark.parametrize("nocomp_cid", [False, True])
+def test_CIDReader_sections(tmpdir, nocomp_cid):
+    cid_path = write_cid_file(tmpdir, nocomp_cid)
+    cid_data = load_cid_file(cid_path, nocomp_cid)
+
+    header = CIDReader.read_header(cid_path)
+    assert header == {key: cid_data[key] for key in CIDReader.HEADER_KEYS}
+    assert header["runtime_mode"] == "counter"
+
+    cid_reader = CIDReader(cid_path)
+    assert cid_reader.header == header
+    assert cid_reader.marker_data == cid_data["marker_data"]
+    assert cid_reader.code_data == cid_data["code_data"]
+    assert cid_reader.counter_data == cid_data["counter_data"]
+    assert cid_reader.mcdc_data == cid_data["mcdc_data"]
+    assert cid_reader.source_code == source_code
+    assert cid_reader.load() == cid_data
+
+
+def test_CIDReader_headerOnly(tmpdir):
+    cid_path = write_cid_file(tmpdir, True)
+    with open(cid_path, 'r') as cid_file_ptr:
+        cid_string = cid_file_ptr.read()
+
+    # the header stays readable, if the body behind the header is broken
+    broken_cid_string = cid_string[:cid_string.index('    "source_code_base64"')] + "    broken"
+    with open(cid_path, 'w') as cid_file_ptr:
+        cid_file_ptr.write(broken_cid_string)
+    assert CIDReader.read_header(cid_path)["source_code_hash"] == \
+        json.loads(cid_string)["source_code_hash"]
+    with pytest.raises(RuntimeError):
+        CIDReader(cid_path).marker_data
+
+
+class CountingStringIO(io.StringIO):
+    """In-memory CID counting the characters returned by readline"""
+
+    def __init__(self, content: str):
+        super().__init__(content)
+        self.read_length = 0
+
+    def readline(self, *args):
+        line = super().readline(*args)
+        self.read_length += len(line)
+        return line
+
+
+def test_CIDReader_headerLength(tmpdir):
+    cid_path = write_cid_file(tmpdir, True)
+    with open(cid_path, 'r') as cid_file_ptr:
+        cid_data = json.load(cid_file_ptr)
+
+    # the header is read from its key lines, the one line source code behind it isn't read
+    cid_data["source_code_base64"] = "A" * 1000000
+    cid_file = CountingStringIO(json.dumps(cid_data, indent=4))
+    with patch.object(CIDReader, '_open', return_value=cid_file):
+        assert CIDReader.read_header(cid_path) == {key: cid_data[key] for key in CIDReader.HEADER_KEYS}
+    assert cid_file.read_length < 2 * CIDReader.HEADER_LINE_LIMIT
+
+    # missing optional header keys stay missing, reading stops at the first other key
+    del cid_data["runtime_mode"]
+    cid_file = CountingStringIO(json.dumps(cid_data, indent=4))
+    with patch.object(CIDReader, '_open', return_value=cid_file):
+        assert "runtime_mode" not in CIDReader.read_header(cid_path)
+    assert cid_file.read_length < 2 * CIDReader.HEADER_LINE_LIMIT
+
+
+def test_CIDReader_compactDocument(tmpdir):
+    # documents without indentation get decoded as a whole
+    cid_data = load_cid_file(write_cid_file(tmpdir, True), True)
+    with open(tmpdir.join("compact.cid"), 'w') as cid_file_ptr:
+        json.dump(cid_data, cid_file_ptr)
+
+    cid_reader = CIDReader(str(tmpdir.join("compact.cid")))
+    assert cid_reader.header["cri_path"] == cid_data["cri_path"]
+    assert cid_reader.marker_data == cid_data["marker_data"]
+
+
+def test_CIDReader_invalid(tmpdir):
+    with open(tmpdir.join("invalid.cid"), 'w') as cid_file_ptr:
+        cid_file_ptr.write('{\n    "source_code_path": "test_file.c"\n}')
+    with pytest.raises(RuntimeError):
+        CIDReader.read_header(str(tmpdir.join("invalid.cid")))
+    with pytest.raises(RuntimeError):
+        CIDReader.read_header(str(tmpdir.join("missing.cid")))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the CRIDecoder module.
+"""
+
+import pytest
+
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+source_code_hash = bytes(range(0xA0, 0xC0))
+instrumentation_random = bytes(range(0x50, 0x60))
+cri_header = b"IMACRIF!" + b"\x00\x01" + source_code_hash + \
+    instrumentation_random + b"\n"
+
+
+def execution_marker(comment: bytes) -> bytes:
+    return b"\x00" * 5 + b"RUN!" + comment + b"\x00\n"
+
+
+def test_CRIDecoder_trace(tmpdir):
+    cri_bytes = (cri_header +
+                 execution_marker(b"\"first\"") +
+                 b"\x00\x00\x00\x01\xFF" + b"\x00\x00\x01\x02\x01" + b"\x00\x00\x01\x02\x00" +
+                 execution_marker(b"\"\"") +
+                 b"\x00\x00\x00\x01\xFF")
+    with open(tmpdir.join("test.cri"), 'wb') as cri_file_ptr:
+        cri_file_ptr.write(cri_bytes)
+
+    cri_data = CRIDecoder(str(tmpdir.join("test.cri"))).decode()
+
+    assert cri_data.version == 1
+    assert cri_data.source_code_hash == source_code_hash.hex()
+    assert cri_data.instrumentation_random == instrumentation_random.hex()
+    assert len(cri_data.executions) == 2
+    assert cri_data.executions[0].comment == "\"first\""
+    assert cri_data.executions[0].markers == [(1, 0xFF), (258, 1), (258, 0)]
+    assert cri_data.executions[1].markers == [(1, 0xFF)]
+
+
+def test_CRIDecoder_repeatRecords():
+    # CRI version 2 with repeat records behind marker records and MC/DC vectors
+    cri_bytes = (cri_header[0:8] + b"\x00\x02" + cri_header[10:] + execution_marker(b"\"\"") +
+                 b"\x00\x00\x00\x01\xFF" + b"\x00\x00\x00\x03\xFD" +
+                 b"\x00\x00\x00\x07\xFE\x01\x03\x01\x01" + b"\x00\x00\x00\x01\xFD" +
+                 b"\x00\x00\x00\x02\x00")
+
+    cri_data = CRIDecoder.decode_bytes(cri_bytes)
+    assert cri_data.version == 2
+    assert cri_data.executions[0].markers == [(1, 0xFF)] * 4 + [(2, 0)]
+    assert cri_data.executions[0].mcdc_vectors == [(7, 3, 1, True)] * 2
+
+    # repeat record without a record to repeat
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_header + execution_marker(b"\"\"") +
+                                b"\x00\x00\x00\x01\xFD")
+
+
+def test_CRIDecoder_counterTable():
+    cri_bytes = (cri_header + execution_marker(b"\"\"") +
+                 b"\x00" * 5 + b"CNT!" + b"\x00\x00\x00\x03" +
+                 (5).to_bytes(8, "big") + (0).to_bytes(8, "big") + (2 ** 40).to_bytes(8, "big"))
+
+    execution = CRIDecoder.decode_bytes(cri_bytes).executions[0]
+    assert execution.markers == []
+    assert execution.counters == [5, 0, 2 ** 40]
+
+    # checkpoint 4 uses counter 0, evaluation 5 counters 1 (false) and 2 (true)
+    cid_data = {"marker_data": {"evaluation_markers": [{"evaluation_marker_id": 5}]},
+                "counter_data": {"counter_count": 3,
+                                 "counter_indices": [{"marker_id": 4, "counter_index": 0},
+                                                     {"marker_id": 5, "counter_index": 1}]}}
+    assert CRIDecoder.resolve_counters(cid_data, execution) == {
+        4: 5, 5: (0, 2 ** 40)}
+
+
+@pytest.mark.parametrize("byte_order", ["big", "little"])
+def test_CRIDecoder_hostCounterTable(byte_order):
+    # counter table of a memory mapped table file with padded execution comment
+    cri_bytes = (cri_header + execution_marker(b"\"\"\x00\x00") +
+                 b"\x00" * 5 + b"CNH!" + b"\x00\x00\x00\x02" +
+                 (0x0102030405060708).to_bytes(8, byte_order) +
+                 (7).to_bytes(8, byte_order) + (2 ** 40).to_bytes(8, byte_order))
+
+    execution = CRIDecoder.decode_bytes(cri_bytes).executions[0]
+    assert execution.comment == "\"\""
+    assert execution.counters == [7, 2 ** 40]
+
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_bytes[:-1])
+
+
+def test_CRIDecoder_bitmap():
+    cri_bytes = (cri_header + execution_marker(b"\"\"") +
+                 b"\x00" * 5 + b"BIT!" + b"\x00\x00\x00\x0A" + b"\x81\x02")
+
+    execution = CRIDecoder.decode_bytes(cri_bytes).executions[0]
+    assert execution.bit_count == 10
+    assert [execution.is_bit_set(bit_index) for bit_index in range(10)] == \
+        [True, False, False, False, False, False, False, True, False, True]
+
+    # evaluation 2 uses bits 7 (false) and 8 (true)
+    cid_data = {"marker_data": {"evaluation_markers": [{"evaluation_marker_id": 2}]},
+                "counter_data": {"counter_count": 10,
+                                 "counter_indices": [{"marker_id": 1, "counter_index": 0},
+                                                     {"marker_id": 2, "counter_index": 7},
+                                                     {"marker_id": 3, "counter_index": 9}]}}
+    assert CRIDecoder.resolve_counters(cid_data, execution) == {
+        1: True, 2: (True, False), 3: True}
+
+
+def test_CRIDecoder_varintRecords():
+    # CRI version 3: checkpoint 1, evaluation 2 (true), checkpoint 300 (two byte varint),
+    # escaped MC/DC vector and repeat record
+    cri_bytes = (cri_header[0:8] + b"\x00\x03" + cri_header[10:] + execution_marker(b"\"\"") +
+                 b"\x04" + b"\x0B" + b"\xB0\x09" +
+                 b"\x01\x00\x00\x00\x07\xFE\x01\x03\x01\x01" + b"\x01\x00\x00\x00\x02\xFD" +
+                 b"\x0A" + execution_marker(b"\"second\"") + b"\x04")
+
+    cri_data = CRIDecoder.decode_bytes(cri_bytes)
+    assert cri_data.version == 3
+    assert cri_data.executions[0].markers == [(1, 0xFF), (2, 1), (300, 0xFF), (2, 0)]
+    assert cri_data.executions[0].mcdc_vectors == [(7, 3, 1, True)] * 3
+    assert cri_data.executions[1].markers == [(1, 0xFF)]
+
+    # truncated varint and escaped marker record
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_bytes + b"\x84")
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_bytes + b"\x01\x00\x00\x00\x01\xFF")
+
+
+def test_CRIDecoder_mcdcVectors():
+    # decision 9 with a one byte mask (short circuit after condition 0) and a two byte mask
+    cri_bytes = (cri_header + execution_marker(b"\"\"") +
+                 b"\x00\x00\x00\x09\xFE\x01" + b"\x01" + b"\x00" + b"\x00" +
+                 b"\x00\x00\x00\x01\xFF" +
+                 b"\x00\x00\x01\x00\xFE\x02" + b"\x01\x03" + b"\x01\x01" + b"\x01")
+
+    execution = CRIDecoder.decode_bytes(cri_bytes).executions[0]
+    assert execution.markers == [(1, 0xFF)]
+    assert execution.mcdc_vectors == [(9, 0x01, 0x00, False),
+                                      (256, 0x0103, 0x0101, True)]
+
+    cid_data = {"mcdc_data": [{"decision_marker_id": 9, "condition_marker_ids": [7, 8]}]}
+    assert CRIDecoder.resolve_mcdc_vector(cid_data, execution.mcdc_vectors[0]) == {
+        7: False}
+
+    # truncated vector
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_bytes[:-1])
+
+
+def file_table_entry(file_index: int, header_data: bytes, cri_filename: bytes) -> bytes:
+    return (b"\x00" * 7 + b"FIL!" + (50 + len(cri_filename)).to_bytes(4, "big") +
+            file_index.to_bytes(2, "big") + header_data + cri_filename)
+
+
+def test_CRIDecoder_sharedFile(tmpdir):
+    other_header_data = bytes(range(0x10, 0x40))
+    shared_bytes = (b"IMACRIS!" + b"\x00\x01" + b"\x00" * 48 + b"\n" +
+                    b"\x00\x00" + execution_marker(b"\"first\"") +
+                    file_table_entry(1, source_code_hash + instrumentation_random, b"a.cri") +
+                    file_table_entry(2, other_header_data, b"b.cri") +
+                    b"\x00\x02" + b"\x00\x00\x00\x07\xFF" +
+                    b"\x00\x01" + b"\x00\x00\x00\x01\xFF" +
+                    b"\x00\x02" + b"\x00\x00\x00\x08\x01" +
+                    # second execution only registers a.cri, now with index 2
+                    b"\x00\x00" + execution_marker(b"\"\"") +
+                    file_table_entry(2, source_code_hash + instrumentation_random, b"a.cri") +
+                    b"\x00\x02" + b"\x00\x00\x00\x02\x00")
+
+    cri_contents = CRIDecoder.split_shared_bytes(shared_bytes)
+    assert cri_contents["a.cri"] == (cri_header +
+                                     execution_marker(b"\"first\"") + b"\x00\x00\x00\x01\xFF" +
+                                     execution_marker(b"\"\"") + b"\x00\x00\x00\x02\x00")
+
+    cri_data = CRIDecoder.decode_shared_bytes(shared_bytes)
+    assert cri_data["b.cri"].source_code_hash == other_header_data[0:32].hex()
+    assert [execution.markers for execution in cri_data["b.cri"].executions] == [[(7, 0xFF), (8, 1)]]
+
+    # split into CRI files
+    with open(tmpdir.join("shared.cri"), 'wb') as shared_file_ptr:
+        shared_file_ptr.write(shared_bytes)
+    cri_paths = CRIDecoder.split_shared_file(
+        str(tmpdir.join("shared.cri")), str(tmpdir))
+    assert sorted(cri_paths) == [str(tmpdir.join("a.cri")),
+                                 str(tmpdir.join("b.cri"))]
+    assert len(CRIDecoder(str(tmpdir.join("a.cri"))).decode().executions) == 2
+
+    # records of unknown files
+    with pytest.raises(RuntimeError):
+        CRIDecoder.split_shared_bytes(shared_bytes + b"\x00\x03" + b"\x00\x00\x00\x01\xFF")
+
+
+def test_CRIDecoder_invalid():
+    # broken header
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(b"IMACRIF?" + cri_header[8:])
+
+    # marker before the first execution marker
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_header + b"\x00\x00\x00\x01\xFF")
+
+    # truncated counter table
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_header + execution_marker(b"\"\"") +
+                                b"\x00" * 5 + b"CNT!" + b"\x00\x00\x00\x02" + bytes(8))
+
+    # unknown record
+    with pytest.raises(RuntimeError):
+        CRIDecoder.decode_bytes(cri_header + execution_marker(b"\"\"") +
+                                b"\x00" * 5 + b"XYZ!")
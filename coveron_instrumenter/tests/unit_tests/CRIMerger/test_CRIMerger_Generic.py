@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the CRIMerger module.
+"""
+
+import os
+import pytest
+
+from coveron_instrumenter.CRIMerger import CRIMerger
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+cri_header = b"IMACRIF!" + b"\x00\x01" + bytes(range(0xA0, 0xC0)) + \
+    bytes(range(0x50, 0x60)) + b"\n"
+other_cri_header = b"IMACRIF!" + b"\x00\x01" + bytes(range(0xA0, 0xC0)) + \
+    bytes(range(0x60, 0x70)) + b"\n"
+
+
+def execution_marker(comment: bytes) -> bytes:
+    return b"\x00" * 5 + b"RUN!" + comment + b"\x00\n"
+
+
+def counter_table(counters: list) -> bytes:
+    return (b"\x00" * 5 + b"CNT!" + len(counters).to_bytes(4, "big") +
+            b"".join(counter.to_bytes(8, "big") for counter in counters))
+
+
+def write_cri_file(tmpdir, cri_filename: str, cri_bytes: bytes):
+    with open(tmpdir.join(cri_filename), 'wb') as cri_file_ptr:
+        cri_file_ptr.write(cri_bytes)
+
+
+def test_CRIMerger_mergedFilename():
+    assert CRIMerger.get_merged_filename(
+        "main_file.4711.1600000000.0.cri") == "main_file.cri"
+    assert CRIMerger.get_merged_filename("main_file.cri") == "main_file.cri"
+    assert CRIMerger.get_merged_filename(
+        "main_file.v2.cri") == "main_file.v2.cri"
+
+
+def test_CRIMerger_trace(tmpdir):
+    tmpdir.mkdir("input")
+    write_cri_file(tmpdir, "input/main_file.1.100.0.cri", cri_header + execution_marker(b"\"\"") +
+                   b"\x00\x00\x00\x01\xFF")
+    write_cri_file(tmpdir, "input/main_file.2.100.0.cri", cri_header + execution_marker(b"\"\"") +
+                   b"\x00\x00\x00\x02\x01\x00\x00\x00\x01\xFF")
+    # crashed process with a truncated record
+    write_cri_file(tmpdir, "input/main_file.3.100.0.cri", cri_header + execution_marker(b"\"\"") +
+                   b"\x00\x00\x00\x01\xFF\x00\x00")
+
+    merged_paths = CRIMerger().merge(
+        [str(tmpdir.join("input"))], str(tmpdir))
+    assert merged_paths == [str(tmpdir.join("main_file.cri"))]
+
+    executions = CRIDecoder(merged_paths[0]).decode().executions
+    assert [execution.markers for execution in executions] == [
+        [(1, 0xFF)], [(2, 1), (1, 0xFF)], [(1, 0xFF)]]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_CRIMerger_counterTables(tmpdir, jobs):
+    cri_paths = list()
+    for process_id in range(10):
+        cri_path = str(tmpdir.join(
+            "main_file." + str(process_id) + ".100.0.cri"))
+        write_cri_file(tmpdir, os.path.basename(cri_path), cri_header + execution_marker(b"\"\"") +
+                       counter_table([process_id, 1, 0]))
+        cri_paths.append(cri_path)
+    # counters of a memory mapped table file in host byte order
+    write_cri_file(tmpdir, "mapped.cri", cri_header + execution_marker(b"\"\"\x00") +
+                   b"\x00" * 5 + b"CNH!" + b"\x00\x00\x00\x03" +
+                   (0x0102030405060708).to_bytes(8, "little") +
+                   b"".join(counter.to_bytes(8, "little") for counter in [0, 0, 2 ** 64 - 1]))
+    # crashed before the counters were written
+    write_cri_file(tmpdir, "crashed.cri",
+                   cri_header + execution_marker(b"\"\""))
+
+    merged_paths = CRIMerger(jobs).merge(cri_paths + [str(tmpdir.join("mapped.cri")),
+                                                      str(tmpdir.join("crashed.cri"))],
+                                         str(tmpdir.mkdir("output")))
+    assert merged_paths == [str(tmpdir.join("output", "main_file.cri"))]
+
+    executions = CRIDecoder(merged_paths[0]).decode().executions
+    assert len(executions) == 1
+    assert executions[0].comment == "\"\""
+    # the counters saturate
+    assert executions[0].counters == [45, 10, 2 ** 64 - 1]
+
+
+def test_CRIMerger_bitmaps(tmpdir):
+    for process_id, bitmap in enumerate([b"\x01\x00", b"\x80\x02"]):
+        write_cri_file(tmpdir, "main_file." + str(process_id) + ".100.0.cri",
+                       cri_header + execution_marker(b"\"\"") +
+                       b"\x00" * 5 + b"BIT!" + b"\x00\x00\x00\x0A" + bitmap)
+
+    merged_paths = CRIMerger().merge([str(tmpdir)], str(tmpdir))
+
+    execution = CRIDecoder(merged_paths[0]).decode().executions[0]
+    assert execution.bit_count == 10
+    assert execution.bitmap == b"\x81\x02"
+
+
+def test_CRIMerger_repeatedMerge(tmpdir):
+    for process_id, counters in enumerate([[1, 2], [0, 3], [2, 1]]):
+        write_cri_file(tmpdir, "main_file." + str(process_id) + ".100.0.cri",
+                       cri_header + execution_marker(b"\"\"") + counter_table(counters))
+
+    # the merged CRI file inside the input directory isn't merged again
+    for _ in range(2):
+        merged_paths = CRIMerger().merge([str(tmpdir)], str(tmpdir))
+        assert merged_paths == [str(tmpdir.join("main_file.cri"))]
+        assert CRIDecoder(merged_paths[0]).decode().executions[0].counters == [3, 6]
+
+
+def test_CRIMerger_invalid(tmpdir):
+    # no CRI files
+    with pytest.raises(RuntimeError):
+        CRIMerger().merge([str(tmpdir)], str(tmpdir))
+
+    # different instrumentations of the same source file
+    write_cri_file(tmpdir, "main_file.1.100.0.cri",
+                   cri_header + execution_marker(b"\"\""))
+    write_cri_file(tmpdir, "main_file.2.100.0.cri",
+                   other_cri_header + execution_marker(b"\"\""))
+    with pytest.raises(RuntimeError):
+        CRIMerger().merge([str(tmpdir)], str(tmpdir))
+
+    # invalid header
+    write_cri_file(tmpdir, "invalid.cri", b"IMACRIF!")
+    with pytest.raises(RuntimeError):
+        CRIMerger().merge([str(tmpdir.join("invalid.cri"))], str(tmpdir))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the CompilerPipeline module.
+"""
+
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CompilerPipeline import CompilerPipeline
+from coveron_instrumenter.Configuration import Configuration, SourceFile
+
+abs_path_runtime_helper_source = os.path.join(os.path.abspath(
+    os.path.dirname(os.path.realpath(__file__))), "..", "..", "..",
+    "coveron_runtime_helper", "src", "coveron_helper.c")
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("gcc") is None, reason="needs gcc")
+
+
+def create_source_file(tmpdir, name: str, instrumented_code: str) -> SourceFile:
+    # the pipeline only compiles the instrumented file, so write it directly
+    source_file = SourceFile(str(tmpdir.join(name + ".c")))
+    with open(source_file.output_file, "w") as output_file_ptr:
+        output_file_ptr.write(instrumented_code)
+    return source_file
+
+
+def create_config(tmpdir) -> Configuration:
+    config = Configuration()
+    config.compiler_exec = "gcc"
+    config.compile_jobs = 2
+    config.compiler_output_args = "-o " + str(tmpdir.join("program"))
+    return config
+
+
+def test_CompilerPipeline_link(tmpdir):
+    config = create_config(tmpdir)
+    source_files = [create_source_file(tmpdir, "main", "int helper(void);\nint main(void) { return helper(); }\n"),
+                    create_source_file(tmpdir, "helper", "int helper(void) { return 0; }\n")]
+
+    compiler_pipeline = CompilerPipeline(
+        config, abs_path_runtime_helper_source)
+    try:
+        for source_file in source_files:
+            compiler_pipeline.submit(source_file)
+        assert compiler_pipeline.finish() == 0
+    finally:
+        compiler_pipeline.close()
+
+    for source_file in source_files:
+        assert os.path.isfile(source_file.object_file)
+    assert os.path.isfile(tmpdir.join("program"))
+
+
+def test_CompilerPipeline_compileError(tmpdir, capsys):
+    config = create_config(tmpdir)
+    source_files = [create_source_file(tmpdir, "main", "int main(void) { return 0; }\n"),
+                    create_source_file(tmpdir, "broken", "int broken(void) { return }\n")]
+
+    compiler_pipeline = CompilerPipeline(
+        config, abs_path_runtime_helper_source)
+    try:
+        for source_file in source_files:
+            compiler_pipeline.submit(source_file)
+        assert compiler_pipeline.finish() != 0
+    finally:
+        compiler_pipeline.close()
+
+    # the failure has to name the original source file and nothing gets linked
+    output = capsys.readouterr().out
+    assert "Compilation of " + source_files[1].input_file + " failed" in output
+    assert "Compilation of " + source_files[0].input_file not in output
+    assert not os.path.isfile(tmpdir.join("program"))
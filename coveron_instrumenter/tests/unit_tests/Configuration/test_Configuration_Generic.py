@@ -14,7 +14,7 @@ from unittest.mock import Mock, patch
 
 from coveron_instrumenter.DataTypes import *
 
-from coveron_instrumenter.Configuration import Configuration, SourceFile
+from coveron_instrumenter.Configuration import Configuration, SourceFile, RuntimeMode
 
 
 def test_Configuration_Init(tmpdir):
@@ -37,3 +37,85 @@ def test_Configuration_CompilerArgs():
 
     # check all compiler args to see, if defines were added
     assert config.compiler_args == "-arg1 -arg2 --arg3 hello -D___COVERON_CHECKPOINT_ANALYSIS_ENABLED -D___COVERON_EVALUATION_ANALYSIS_ENABLED"
+
+
+def test_Configuration_writeBufferSize():
+    config = Configuration()
+
+    # the default size is compiled into the runtime helper
+    config.compiler_args = ""
+    assert "COVERON_WRITE_BUFFER_SIZE" not in config.compiler_args
+
+    config.write_buffer_size = 0
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(" -DCOVERON_WRITE_BUFFER_SIZE=0")
+
+
+def test_Configuration_varintRecords():
+    config = Configuration()
+    config.varint_records = True
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(
+        " -D___COVERON_VARINT_RECORDS_ENABLED")
+
+    # counter and bitmap mode don't write marker records
+    config.runtime_mode = RuntimeMode.BITMAP
+    config.compiler_args = ""
+    assert "-D___COVERON_VARINT_RECORDS_ENABLED" not in config.compiler_args
+
+
+def test_Configuration_firstHit():
+    config = Configuration()
+    config.first_hit = True
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(" -D___COVERON_FIRST_HIT_ENABLED")
+
+    # counter and bitmap mode already count or mark every checkpoint
+    config.runtime_mode = RuntimeMode.COUNTER
+    config.compiler_args = ""
+    assert "-D___COVERON_FIRST_HIT_ENABLED" not in config.compiler_args
+
+
+def test_Configuration_threadSafe():
+    config = Configuration()
+    config.thread_safe = True
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(
+        " -pthread -D___COVERON_THREAD_SAFE_ENABLED")
+
+
+def test_Configuration_sharedCriFile():
+    config = Configuration()
+    config.shared_cri_file = "out/coveron.cri"
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(
+        " -D___COVERON_SHARED_WRITER_ENABLED -DCOVERON_SHARED_CRI_FILE=\\\"out/coveron.cri\\\"")
+
+
+def test_Configuration_mmapTables():
+    config = Configuration()
+    config.runtime_mode = RuntimeMode.COUNTER
+    config.mmap_tables = True
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(
+        " -D___COVERON_COUNTER_MODE_ENABLED -D___COVERON_MMAP_TABLES_ENABLED")
+
+
+def test_Configuration_perProcessCri():
+    config = Configuration()
+    config.per_process_cri = True
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(
+        " -D___COVERON_PER_PROCESS_CRI_ENABLED")
+
+
+def test_Configuration_traceRle():
+    config = Configuration()
+    config.trace_rle = True
+    config.compiler_args = ""
+    assert config.compiler_args.endswith(" -D___COVERON_TRACE_RLE_ENABLED")
+
+    # counter and bitmap mode don't write a trace
+    config.runtime_mode = RuntimeMode.COUNTER
+    config.compiler_args = ""
+    assert "-D___COVERON_TRACE_RLE_ENABLED" not in config.compiler_args
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the InstrumentationCache module.
+"""
+
+import time
+import json
+
+from unittest.mock import patch
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.JobManager import JobManager
+from coveron_instrumenter.InstrumentationCache import InstrumentationCache
+from coveron_instrumenter.Configuration import Configuration, SourceFile
+
+source_code = """#include "dep.h"
+
+int main(void)
+{
+    return DEP_VALUE;
+}
+"""
+
+
+def create_config(tmpdir) -> Configuration:
+    config = Configuration()
+    config.instr_cache = True
+    config.cache_dir = str(tmpdir.join("cache"))
+    config.output_abs_path = str(tmpdir)
+    config.runtime_helper_header_path = str(tmpdir.join("coveron_helper.h"))
+    return config
+
+
+def write_file(file_path: str, content: str):
+    with open(file_path, "w") as file_ptr:
+        file_ptr.write(content)
+
+
+def instrument(config: Configuration, source_file: SourceFile):
+    job_manager = JobManager(config)
+    result = next(job_manager.instrument([source_file]))
+    job_manager.close()
+    assert result.error is None
+    return result
+
+
+def test_InstrumentationCache_generic(tmpdir):
+    config = create_config(tmpdir)
+    write_file(str(tmpdir.join("dep.h")), "#define DEP_VALUE 0\n")
+    write_file(str(tmpdir.join("main.c")), source_code)
+    source_file = SourceFile(str(tmpdir.join("main.c")))
+    cid_path = str(tmpdir.join(source_file.cid_file))
+
+    assert instrument(config, source_file).cached == False
+    with open(source_file.output_file, "r") as output_file_ptr:
+        instrumented_code = output_file_ptr.read()
+
+    # a clean build gets served from the store (hard-linked or copied)
+    for file_path in (source_file.output_file, cid_path, cid_path + ".manifest"):
+        os.remove(file_path)
+    assert instrument(config, source_file).cached == True
+    with open(source_file.output_file, "r") as output_file_ptr:
+        assert output_file_ptr.read() == instrumented_code
+    assert os.path.isfile(cid_path)
+
+    # a changed header invalidates the result, reverting it hits again
+    write_file(str(tmpdir.join("dep.h")), "#define DEP_VALUE 10\n")
+    assert instrument(config, source_file).cached == False
+    write_file(str(tmpdir.join("dep.h")), "#define DEP_VALUE 0\n")
+    assert instrument(config, source_file).cached == True
+
+    # rewriting a served output must not change the stored entry
+    with open(source_file.output_file, "r") as output_file_ptr:
+        assert output_file_ptr.read() == instrumented_code
+
+    # changed marker switches are a miss
+    config.checkpoint_markers_enabled = False
+    assert instrument(config, source_file).cached == False
+    assert instrument(config, source_file).cached == True
+
+    # an updated runtime helper is a miss
+    write_file(config.runtime_helper_header_path, "#define ___COVERON_HELPER_VERSION 2\n")
+    assert instrument(config, source_file).cached == False
+
+
+def test_InstrumentationCache_eviction(tmpdir):
+    config = create_config(tmpdir)
+    instrumentation_cache = InstrumentationCache(config)
+
+    source_files = list()
+    for i in range(3):
+        source_file = SourceFile(str(tmpdir.join("file_" + str(i) + ".c")))
+        write_file(source_file.output_file, "x" * 100)
+        write_file(str(tmpdir.join(source_file.cid_file)), "y" * 100)
+        source_files.append(source_file)
+
+    # room for two entries only (eviction frees down to 90 % of the limit)
+    instrumentation_cache.max_size = 450
+    instrumentation_cache.store(source_files[0], "0", [])
+    time.sleep(0.01)
+    instrumentation_cache.store(source_files[1], "1", [])
+    time.sleep(0.01)
+
+    # using the first entry makes the second one the least recently used
+    assert instrumentation_cache.lookup(source_files[0], "0") == []
+    time.sleep(0.01)
+    instrumentation_cache.store(source_files[2], "2", [])
+
+    assert instrumentation_cache.lookup(source_files[0], "0") == []
+    assert instrumentation_cache.lookup(source_files[1], "1") is None
+    assert instrumentation_cache.lookup(source_files[2], "2") == []
+
+
+def test_InstrumentationCache_sizeIndex(tmpdir):
+    config = create_config(tmpdir)
+    instrumentation_cache = InstrumentationCache(config)
+    instrumentation_cache.max_size = 1000
+    size_index_path = os.path.join(instrumentation_cache.cache_dir,
+                                   InstrumentationCache.SIZE_INDEX_FILENAME)
+
+    source_files = list()
+    for i in range(6):
+        source_file = SourceFile(str(tmpdir.join("file_" + str(i) + ".c")))
+        write_file(source_file.output_file, "x" * 100)
+        write_file(str(tmpdir.join(source_file.cid_file)), "y" * 100)
+        source_files.append(source_file)
+
+    # the first store creates the size index, the next ones only update it
+    instrumentation_cache.store(source_files[0], "0", [])
+    with patch('os.walk', side_effect=os.walk) as walk:
+        for i in range(1, 5):
+            instrumentation_cache.store(source_files[i], str(i), [])
+        assert walk.call_count == 0
+    with open(size_index_path, "r") as size_index_ptr:
+        assert json.load(size_index_ptr)["total_size"] == 1000
+
+    # exceeding the limit scans the store and writes the scanned size
+    instrumentation_cache.store(source_files[5], "5", [])
+    with open(size_index_path, "r") as size_index_ptr:
+        assert json.load(size_index_ptr)["total_size"] == 800
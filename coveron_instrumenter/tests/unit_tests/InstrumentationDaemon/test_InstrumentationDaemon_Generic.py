@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the InstrumentationDaemon and DaemonClient modules.
+"""
+
+from unittest.mock import Mock, patch
+import pytest
+import shutil
+import socket
+import threading
+import time
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import Configuration
+from coveron_instrumenter.DaemonClient import DaemonClient
+from coveron_instrumenter.InstrumentationDaemon import InstrumentationDaemon
+
+abs_path_parser_input_dir = os.path.join(os.path.abspath(
+    os.path.dirname(os.path.realpath(__file__))), "..", "Parser", "input_files")
+
+# fake output of the include path probe of the target compiler
+isystem_probe_stderr = b"#include <...> search starts here:\n /usr/include\nEnd of search list.\n"
+
+
+def test_DaemonClient_socketPathArgument():
+    assert DaemonClient.get_daemon_socket_path(["-c", "test.c"]) is None
+    assert DaemonClient.get_daemon_socket_path(
+        ["--CVR_DAEMON", "test.c"]) == DaemonClient.get_default_socket_path()
+    assert DaemonClient.get_daemon_socket_path(
+        ["--CVR_DAEMON", "--CVR_DAEMON_SOCKET=/tmp/test.sock"]) == "/tmp/test.sock"
+
+
+def test_DaemonClient_defaultSocketPath(tmpdir, monkeypatch):
+    # the socket is placed in a directory of the user inside the runtime directory
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmpdir))
+    assert DaemonClient.get_default_socket_path() == str(
+        tmpdir.join("coveron_instrumenter", DaemonClient.SOCKET_NAME))
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert os.path.basename(os.path.dirname(DaemonClient.get_default_socket_path())) == \
+        "coveron_instrumenter_" + str(os.getuid())
+
+
+def test_DaemonClient_privateDir(tmpdir):
+    socket_dir = str(tmpdir.join("sockets"))
+    DaemonClient.create_private_dir(socket_dir)
+    assert DaemonClient.is_private_dir(socket_dir)
+    assert os.stat(socket_dir).st_mode & 0o777 == 0o700
+
+    # directories others can access are refused by the daemon and the client
+    os.chmod(socket_dir, 0o777)
+    assert not DaemonClient.is_private_dir(socket_dir)
+    with pytest.raises(RuntimeError):
+        DaemonClient.create_private_dir(socket_dir)
+    daemon_client = DaemonClient(os.path.join(socket_dir, "daemon.sock"))
+    assert daemon_client.request(["test.c"], str(tmpdir)) is None
+
+    # symlinks to a private directory aren't accepted either
+    os.chmod(socket_dir, 0o700)
+    os.symlink(socket_dir, str(tmpdir.join("link")))
+    assert not DaemonClient.is_private_dir(str(tmpdir.join("link")))
+
+
+@pytest.mark.skipif(not DaemonClient.is_supported(), reason="needs unix domain sockets")
+def test_DaemonClient_peerCredentials():
+    first_socket, second_socket = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    with first_socket, second_socket:
+        assert DaemonClient.get_peer_uid(first_socket) == os.getuid()
+        assert DaemonClient.is_trusted_peer(second_socket)
+
+
+def test_DaemonClient_noDaemon(tmpdir):
+    # a missing daemon has to be reported with None, so the caller can fall back
+    daemon_client = DaemonClient(str(tmpdir.join("missing.sock")))
+    assert daemon_client.request(["test.c"], str(tmpdir)) is None
+
+
+@pytest.mark.skipif(not DaemonClient.is_supported(), reason="needs unix domain sockets")
+@patch.object(DaemonClient, 'RESPONSE_TIMEOUT', 0.2)
+def test_DaemonClient_brokenDaemon(tmpdir):
+    socket_path = str(tmpdir.join("daemon.sock"))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server_socket:
+        server_socket.bind(socket_path)
+        server_socket.listen(2)
+        daemon_client = DaemonClient(socket_path)
+
+        # a daemon, which doesn't answer, lets the client fall back after the timeout
+        assert daemon_client.request(["test.c"], str(tmpdir)) is None
+        server_socket.accept()[0].close()
+
+        # so does a daemon answering with something else than a response
+        def answer_garbage():
+            connection, _ = server_socket.accept()
+            with connection:
+                connection.sendall(b"no json\n")
+        answer_thread = threading.Thread(target=answer_garbage)
+        answer_thread.start()
+        assert daemon_client.request(["test.c"], str(tmpdir)) is None
+        answer_thread.join()
+
+
+@pytest.mark.skipif(not DaemonClient.is_supported(), reason="needs unix domain sockets")
+@patch('ArgumentHandler.subprocess.run')
+def test_InstrumentationDaemon_request(mock_run, tmpdir):
+    mock_run.return_value = Mock(stdout=b"", stderr=isystem_probe_stderr)
+
+    source_file_path = str(tmpdir.join("daemon_input.c"))
+    shutil.copy(os.path.join(abs_path_parser_input_dir,
+                             "Goto", "Goto_basic.c"), source_file_path)
+
+    config = Configuration()
+    config.serve = True
+    config.daemon_socket_path = str(tmpdir.join("daemon.sock"))
+    daemon = InstrumentationDaemon(config, "coveron_helper.h")
+
+    daemon_thread = threading.Thread(target=daemon.serve_forever)
+    daemon_thread.start()
+    try:
+        # wait for the daemon socket
+        for _ in range(100):
+            if os.path.exists(config.daemon_socket_path):
+                break
+            time.sleep(0.05)
+
+        daemon_client = DaemonClient(config.daemon_socket_path)
+        working_dir = os.getcwd()
+        response = daemon_client.request(
+            ["--CVR_COMPILER_EXEC=gcc", "--CVR_CACHE_DIR=" + str(tmpdir), "--CVR_FORCE", "--CVR_NO_EVALUATION", "daemon_input.c"], str(tmpdir))
+
+        assert os.getcwd() == working_dir
+        assert response['errors'] == []
+        assert response['returncode'] == 0
+        assert response['output_files'] == [
+            str(tmpdir.join("daemon_input.instr.c"))]
+        # the client doesn't take the compiler call from the daemon
+        assert sorted(response) == ["errors", "output_files", "returncode"]
+        assert os.path.isfile(tmpdir.join("daemon_input.instr.c"))
+        assert os.path.isfile(tmpdir.join("daemon_input.cid"))
+
+        # errors are passed back to the client, the daemon keeps running
+        response = daemon_client.request(
+            ["--CVR_COMPILER_EXEC=gcc", "--CVR_FORCE", "missing.c"], str(tmpdir))
+        assert response['returncode'] == 1
+        assert "not found" in response['errors'][0]
+
+        # requests of parallel builds are served at the same time
+        for index in range(4):
+            shutil.copy(source_file_path, str(tmpdir.join("parallel_" + str(index) + ".c")))
+        responses = [None] * 4
+
+        def request_parallel(index: int):
+            responses[index] = daemon_client.request(
+                ["--CVR_COMPILER_EXEC=gcc", "--CVR_CACHE_DIR=" + str(tmpdir), "--CVR_FORCE",
+                 "--CVR_NO_EVALUATION", "parallel_" + str(index) + ".c"], str(tmpdir))
+        client_threads = [threading.Thread(target=request_parallel, args=(index,)) for index in range(4)]
+        for client_thread in client_threads:
+            client_thread.start()
+        for client_thread in client_threads:
+            client_thread.join()
+
+        for index, response in enumerate(responses):
+            assert response['returncode'] == 0
+            assert response['output_files'] == [str(tmpdir.join("parallel_" + str(index) + ".instr.c"))]
+    finally:
+        daemon.shutdown()
+        daemon_thread.join()
+
+    assert not os.path.exists(config.daemon_socket_path)
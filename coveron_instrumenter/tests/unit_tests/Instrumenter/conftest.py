@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Shared fixtures of the Instrumenter unit tests.
+   Instrument source code, compile it with the runtime helper and run the program in tmpdir.
+"""
+
+from typing import Callable
+import subprocess
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Instrumenter import Instrumenter
+from coveron_instrumenter.Configuration import Configuration, SourceFile, RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+
+abs_path_runtime_helper = os.path.join(os.path.abspath(
+    os.path.dirname(os.path.realpath(__file__))), "..", "..", "..",
+    "coveron_runtime_helper", "src")
+
+
+@pytest.fixture
+def create_instrumenter(tmpdir):
+    """Returns a factory for an Instrumenter of a source file in tmpdir.
+       add_markers gets the CIDManager of the file, the config options are set before the compiler args
+    """
+    def create(source_code: SourceCode, add_markers: Callable[[CIDManager], None],
+               runtime_mode: RuntimeMode = RuntimeMode.TRACE, file_name: str = 'test_file.c',
+               **config_options) -> Instrumenter:
+        config = Configuration()
+        config.runtime_mode = runtime_mode
+        for option_name, option_value in config_options.items():
+            setattr(config, option_name, option_value)
+        config.compiler_args = ""
+        config.output_abs_path = str(tmpdir)
+        config.runtime_helper_header_path = os.path.join(
+            abs_path_runtime_helper, "coveron_helper.h")
+        source_file = SourceFile(str(tmpdir.join(file_name)))
+
+        cid_manager = CIDManager(config, source_file, source_code)
+        add_markers(cid_manager)
+
+        return Instrumenter(config, cid_manager, source_file, source_code)
+    return create
+
+
+@pytest.fixture
+def build_program(tmpdir):
+    """Returns a function instrumenting the files and linking them with the runtime helper into tmpdir/program"""
+    def build(instrumenters: list, extra_args: str = "") -> str:
+        for instrumenter in instrumenters:
+            instrumenter.start_instrumentation()
+            instrumenter.write_output_file()
+
+        program_path = str(tmpdir.join("program"))
+        subprocess.run(" ".join(["gcc", instrumenters[0].config.compiler_args, extra_args] +
+                                [instrumenter.source_file.output_file for instrumenter in instrumenters] +
+                                [os.path.join(abs_path_runtime_helper, "coveron_helper.c"),
+                                 "-o", program_path]),
+                       shell=True, check=True)
+        return program_path
+    return build
+
+
+@pytest.fixture
+def run_program(tmpdir):
+    """Returns a function running tmpdir/program in tmpdir, a failing run raises unless check is False"""
+    def run(args: list = [], environment: dict = {}, check: bool = True) -> subprocess.CompletedProcess:
+        return subprocess.run([str(tmpdir.join("program"))] + args,
+                              cwd=str(tmpdir), check=check,
+                              env=dict(os.environ, **environment))
+    return run
+
+
+@pytest.fixture
+def pop_cri_bytes(tmpdir):
+    """Returns a function reading and removing a CRI file of tmpdir, so the next run starts a new file"""
+    def pop(cri_file_name: str = "test_file.cri") -> bytes:
+        with open(tmpdir.join(cri_file_name), 'rb') as cri_file_ptr:
+            cri_bytes = cri_file_ptr.read()
+        os.remove(tmpdir.join(cri_file_name))
+        return cri_bytes
+    return pop
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the bitmap runtime mode of the Instrumenter module.
+"""
+
+from unittest.mock import patch
+import json
+import gzip
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+dummySourceCode: SourceCode = ("int check(int x) {\n" +
+                               "    x++;\n" +
+                               "    return (x > 3);\n" +
+                               "}\n" +
+                               "int main() {\n" +
+                               "    for (int i = 0; i < 5; i++) { check(i); }\n" +
+                               "    return 0;\n" +
+                               "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(2, 5))
+    cid_manager.add_evaluation_marker(cid_manager.get_new_id(),
+                                      CodeSectionData(CodePositionData(
+                                          3, 12), CodePositionData(3, 19)),
+                                      EvaluationType.DECISION)
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(6, 35))
+
+
+def test_Instrumenter_bitmapProbes(create_instrumenter):
+    instrumenter = create_instrumenter(dummySourceCode, add_markers, RuntimeMode.BITMAP,
+                                       evaluation_markers_enabled=True)
+    with patch.object(CIDManager, 'get_instrumentation_random',
+                      return_value="abcdef0123456789abcdef0123456789"):
+        instrumenter.start_instrumentation()
+
+    instrumented_lines = instrumenter._instrumented_code.splitlines()
+
+    # 1 + 2 + 1 bits fit into one byte
+    assert instrumented_lines[1] == \
+        "static ___COVERON_BYTE ___COVERON_BITMAP_ABCDEF0123456789ABCDEF0123456789[1];"
+    assert instrumented_lines[7:11] == ["___COVERON_BITMAP_ABCDEF0123456789ABCDEF0123456789,",
+                                        "4,",
+                                        "(void *)0,",
+                                        " \"test_file.cri\"};"]
+
+    # checkpoints OR a constant mask into a constant byte, evaluations select their bit by the outcome
+    assert instrumented_lines[13] == ("    ___COVERON_MARK_CHECKPOINT(___COVERON_BITMAP_ABCDEF0123456789ABCDEF0123456789, 0, 0x01, " +
+                                      "&___COVERON_FILE_ABCDEF0123456789ABCDEF0123456789);x++;")
+    assert instrumented_lines[14] == ("    return ___COVERON_MARK_EVALUATION(___COVERON_BITMAP_ABCDEF0123456789ABCDEF0123456789, 1, " +
+                                      "&___COVERON_FILE_ABCDEF0123456789ABCDEF0123456789, (int) ((x > 3)));")
+    assert "___COVERON_BITMAP_ABCDEF0123456789ABCDEF0123456789, 0, 0x08, " in instrumented_lines[17]
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_bitmapAtExit(tmpdir, create_instrumenter, build_program, run_program):
+    instrumenter = create_instrumenter(dummySourceCode, add_markers, RuntimeMode.BITMAP,
+                                       evaluation_markers_enabled=True)
+
+    # compile, link and run the instrumented program twice
+    build_program([instrumenter])
+    instrumenter.cid_manager.write_cid_file()
+    for _ in range(2):
+        run_program()
+
+    cri_data = CRIDecoder(str(tmpdir.join("test_file.cri"))).decode()
+    assert cri_data.instrumentation_random == instrumenter.cid_manager.get_instrumentation_random()
+    assert len(cri_data.executions) == 2
+
+    with gzip.GzipFile(tmpdir.join("test_file.cid"), 'r') as cid_file_ptr:
+        cid_data = json.loads(cid_file_ptr.read())
+
+    # every marker was hit, the evaluation had both outcomes
+    for execution in cri_data.executions:
+        assert execution.bit_count == 4
+        assert CRIDecoder.resolve_counters(cid_data, execution) == {
+            1: True, 2: (True, True), 3: True}
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the counter runtime mode of the Instrumenter module.
+"""
+
+from unittest.mock import patch
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+
+dummySourceCode: SourceCode = ("int check(int x) {\n" +
+                               "    x++;\n" +
+                               "    return (x > 3);\n" +
+                               "}\n" +
+                               "int main() {\n" +
+                               "    for (int i = 0; i < 5; i++) { check(i); }\n" +
+                               "    return 0;\n" +
+                               "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(2, 5))
+    cid_manager.add_evaluation_marker(cid_manager.get_new_id(),
+                                      CodeSectionData(CodePositionData(
+                                          3, 12), CodePositionData(3, 19)),
+                                      EvaluationType.DECISION)
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(6, 35))
+
+
+def test_Instrumenter_counterProbes(create_instrumenter):
+    instrumenter = create_instrumenter(dummySourceCode, add_markers, RuntimeMode.COUNTER,
+                                       evaluation_markers_enabled=True)
+    with patch.object(CIDManager, 'get_instrumentation_random',
+                      return_value="abcdef0123456789abcdef0123456789"):
+        instrumenter.start_instrumentation()
+
+    instrumented_lines = instrumenter._instrumented_code.splitlines()
+
+    # the counter array is sized from the markers (1 + 2 + 1 counters)
+    assert instrumented_lines[1] == \
+        "static ___COVERON_COUNTER_T ___COVERON_COUNTERS_ABCDEF0123456789ABCDEF0123456789[4];"
+    assert instrumented_lines[7:11] == ["___COVERON_COUNTERS_ABCDEF0123456789ABCDEF0123456789,",
+                                        "4,",
+                                        "(void *)0,",
+                                        " \"test_file.cri\"};"]
+
+    # probes are counter increments instead of helper calls
+    assert instrumented_lines[13] == ("    ___COVERON_COUNT_CHECKPOINT(___COVERON_COUNTERS_ABCDEF0123456789ABCDEF0123456789, 0, " +
+                                      "&___COVERON_FILE_ABCDEF0123456789ABCDEF0123456789);x++;")
+    assert instrumented_lines[14] == ("    return ___COVERON_COUNT_EVALUATION(&___COVERON_COUNTERS_ABCDEF0123456789ABCDEF0123456789[1], " +
+                                      "&___COVERON_FILE_ABCDEF0123456789ABCDEF0123456789, (int) ((x > 3)));")
+    assert "___COVERON_COUNTERS_ABCDEF0123456789ABCDEF0123456789, 3, " in instrumented_lines[17]
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_counterTableAtExit(tmpdir, create_instrumenter, build_program, run_program):
+    # compile, link and run the instrumented program
+    build_program([create_instrumenter(dummySourceCode, add_markers, RuntimeMode.COUNTER,
+                                       evaluation_markers_enabled=True)])
+    run_program()
+
+    with open(tmpdir.join("test_file.cri"), 'rb') as cri_file_ptr:
+        cri_data = cri_file_ptr.read()
+
+    # the counter table follows the header and the execution marker
+    counter_table_start = cri_data.index(b"\x00" * 5 + b"CNT!")
+    assert counter_table_start > 59
+    counter_count = int.from_bytes(
+        cri_data[counter_table_start + 9:counter_table_start + 13], "big")
+    assert counter_count == 4
+    counters = [int.from_bytes(cri_data[counter_table_start + 13 + 8 * i:counter_table_start + 21 + 8 * i], "big")
+                for i in range(counter_count)]
+
+    # check() was called five times, returning true for i = 3 and i = 4
+    assert counters == [5, 3, 2, 5]
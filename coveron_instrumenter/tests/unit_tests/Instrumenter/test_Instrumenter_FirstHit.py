@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the first hit checkpoint probes.
+"""
+
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+# THREADS threads run the loop of the worker
+mainSourceCode: SourceCode = ("#include <pthread.h>\n" +
+                              "void *worker(void *arg) {\n" +
+                              "    int x = 0;\n" +
+                              "    for (int i = 0; i < 10000; i++) { if (i % 2 == 0) { x++; } }\n" +
+                              "    return arg;\n" +
+                              "}\n" +
+                              "int main() {\n" +
+                              "    pthread_t threads[THREADS];\n" +
+                              "    for (int i = 0; i < THREADS; i++) { pthread_create(&threads[i], 0, worker, 0); }\n" +
+                              "    for (int i = 0; i < THREADS; i++) { pthread_join(threads[i], 0); }\n" +
+                              "    return 0;\n" +
+                              "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_marker_id(), CodePositionData(3, 5))
+    cid_manager.add_evaluation_marker(cid_manager.get_new_marker_id(),
+                                      CodeSectionData(CodePositionData(
+                                          4, 43), CodePositionData(4, 53)),
+                                      EvaluationType.DECISION)
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_marker_id(), CodePositionData(4, 57))
+
+
+def test_Instrumenter_firstHitProbes(create_instrumenter):
+    instrumenter = create_instrumenter(mainSourceCode, add_markers, file_name='main_file.c',
+                                       evaluation_markers_enabled=True, first_hit=True)
+    instrumenter.start_instrumentation()
+
+    # one flag per checkpoint marker id, evaluation markers are still recorded on every hit
+    seen_flags_name = instrumenter._get_seen_flags_name()
+    file_struct_reference = "&" + instrumenter._get_file_struct_name()
+    instrumented_lines = instrumenter._instrumented_code.splitlines()
+    assert "static ___COVERON_BYTE " + seen_flags_name + "[4];" in instrumented_lines
+    assert ("    ___COVERON_FIRST_HIT_CHECKPOINT(" + seen_flags_name + "[1], " +
+            "___COVERON_SET_CHECKPOINT_MARKER(0x00, 0x00, 0x00, 0x01, " + file_struct_reference +
+            "));int x = 0;") in instrumented_lines
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("varint_records, thread_count, extra_args", [
+    (False, 1, "-pthread"),
+    (False, 4, "-pthread -D___COVERON_THREAD_SAFE_ENABLED"),
+    (True, 4, "-pthread -D___COVERON_THREAD_SAFE_ENABLED")])
+def test_Instrumenter_firstHit(tmpdir, create_instrumenter, build_program, run_program,
+                               varint_records, thread_count, extra_args):
+    build_program([create_instrumenter(mainSourceCode, add_markers, file_name='main_file.c',
+                                       evaluation_markers_enabled=True, first_hit=True,
+                                       varint_records=varint_records)],
+                  extra_args + " -DTHREADS=" + str(thread_count))
+    for _ in range(2):
+        run_program()
+
+    # every execution records both checkpoints once, even if all threads hit them at the same time
+    executions = CRIDecoder(
+        str(tmpdir.join("main_file.cri"))).decode().executions
+    assert len(executions) == 2
+    for execution in executions:
+        checkpoints = [marker for marker in execution.markers
+                       if marker[1] == CRIDecoder.CHECKPOINT_RESULT]
+        assert sorted(checkpoints) == [(1, CRIDecoder.CHECKPOINT_RESULT),
+                                       (3, CRIDecoder.CHECKPOINT_RESULT)]
+        assert len(execution.markers) - len(checkpoints) == thread_count * 10000
@@ -31,6 +31,10 @@ def test_Instrumenter_init(mock_config, mock_cid_manager, tmpdir):
 
     mock_config.checkpoint_markers_enabled = True
     mock_config.evaluation_markers_enabled = True
+    mock_config.shared_cri_file = ""
+    mock_config.mmap_tables = False
+    mock_config.varint_records = False
+    mock_config.first_hit = False
     mock_config.output_abs_path = tmpdir
     source_file = SourceFile('test_file.c')
 
@@ -57,6 +61,10 @@ def test_Instrumenter_writeMarkers(mock_config,
     mock_config.runtime_helper_header_path = "C:\\testpath\\coveron_helper.h"
     mock_config.checkpoint_markers_enabled = True
     mock_config.evaluation_markers_enabled = True
+    mock_config.shared_cri_file = ""
+    mock_config.mmap_tables = False
+    mock_config.varint_records = False
+    mock_config.first_hit = False
     mock_config.output_abs_path = tmpdir
     source_file = SourceFile(os.path.join(tmpdir, 'test_file.c'))
 
@@ -101,7 +109,10 @@ int main() {
     ___COVERON_SET_CHECKPOINT_MARKER(0x00, 0x00, 0x00, 0x01, &___COVERON_FILE_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456);test0;
     ___COVERON_SET_EVALUATION_MARKER(0x00, 0x00, 0x00, 0x02, &___COVERON_FILE_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456, (int) (test1));
     ___COVERON_SET_EVALUATION_MARKER(0x00, 0x00, 0x00, 0x03, &___COVERON_FILE_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456, (int) (test2));
-}'''
+}
+
+___COVERON_CONSTRUCTOR static void ___COVERON_REGISTER_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456(void) { ___COVERON_REGISTER_FILE(&___COVERON_FILE_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456); }
+'''
 
     assert source_code_instr_string == source_code_instr_ref_str
 
@@ -123,6 +134,10 @@ def test_Instrumenter_writeNestedEvalMarkers(mock_config,
     mock_config.runtime_helper_header_path = "C:\\testpath\\coveron_helper.h"
     mock_config.checkpoint_markers_enabled = True
     mock_config.evaluation_markers_enabled = True
+    mock_config.shared_cri_file = ""
+    mock_config.mmap_tables = False
+    mock_config.varint_records = False
+    mock_config.first_hit = False
     mock_config.output_abs_path = tmpdir
     source_file = SourceFile(os.path.join(tmpdir, 'test_file.c'))
 
@@ -166,6 +181,9 @@ int main() {
     test0;
     ___COVERON_SET_EVALUATION_MARKER(0x00, 0x00, 0x00, 0x02, &___COVERON_FILE_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456, (int) (___COVERON_SET_EVALUATION_MARKER(0x00, 0x00, 0x00, 0x03, &___COVERON_FILE_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456, (int) (test1))));
     test2;
-}'''
+}
+
+___COVERON_CONSTRUCTOR static void ___COVERON_REGISTER_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456(void) { ___COVERON_REGISTER_FILE(&___COVERON_FILE_ABCDEFGHIJKLMNOPQRSTUVWXYZ123456); }
+'''
 
     assert source_code_instr_string == source_code_instr_ref_str
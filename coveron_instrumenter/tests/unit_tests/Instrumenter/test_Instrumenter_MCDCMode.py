@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the mcdc runtime mode of the Instrumenter module.
+"""
+
+from unittest.mock import patch
+import json
+import gzip
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+dummySourceCode: SourceCode = ("int check(int x) {\n" +
+                               "    x++;\n" +
+                               "    return (x > 3 && x < 5);\n" +
+                               "}\n" +
+                               "int main() {\n" +
+                               "    for (int i = 0; i < 5; i++) { check(i); }\n" +
+                               "    return 0;\n" +
+                               "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(2, 5))
+    condition_ids = [cid_manager.add_evaluation_marker(cid_manager.get_new_id(),
+                                                       CodeSectionData(CodePositionData(
+                                                           3, 13), CodePositionData(3, 18)),
+                                                       EvaluationType.CONDITION),
+                     cid_manager.add_evaluation_marker(cid_manager.get_new_id(),
+                                                       CodeSectionData(CodePositionData(
+                                                           3, 22), CodePositionData(3, 27)),
+                                                       EvaluationType.CONDITION)]
+    decision_id = cid_manager.add_evaluation_marker(cid_manager.get_new_id(),
+                                                    CodeSectionData(CodePositionData(
+                                                        3, 12), CodePositionData(3, 28)),
+                                                    EvaluationType.DECISION)
+    cid_manager.add_mcdc_decision(decision_id, condition_ids)
+
+
+def test_Instrumenter_mcdcProbes(create_instrumenter):
+    instrumenter = create_instrumenter(dummySourceCode, add_markers, RuntimeMode.MCDC,
+                                       evaluation_markers_enabled=True)
+    with patch.object(CIDManager, 'get_instrumentation_random',
+                      return_value="abcdef0123456789abcdef0123456789"):
+        instrumenter.start_instrumentation()
+
+    instrumented_code = instrumenter._instrumented_code
+
+    # one scratch entry per decision
+    assert "static ___COVERON_THREAD_LOCAL ___COVERON_MCDC_SCRATCH_T ___COVERON_MCDC_ABCDEF0123456789ABCDEF0123456789[1];" \
+        in instrumented_code
+
+    # conditions fill the scratch masks, the decision writes the vector
+    assert ("return ___COVERON_SET_MCDC_VECTOR(0x00, 0x00, 0x00, 0x04, " +
+            "&___COVERON_FILE_ABCDEF0123456789ABCDEF0123456789, " +
+            "&___COVERON_MCDC_ABCDEF0123456789ABCDEF0123456789[0], 1, (int) (" +
+            "(___COVERON_SET_MCDC_CONDITION(&___COVERON_MCDC_ABCDEF0123456789ABCDEF0123456789[0], 0, (int) (x > 3)) && " +
+            "___COVERON_SET_MCDC_CONDITION(&___COVERON_MCDC_ABCDEF0123456789ABCDEF0123456789[0], 1, (int) (x < 5)))));") \
+        in instrumented_code
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("mcdc_dedupe, varint_records, expected_vectors", [
+    (False, False, [(4, 0b01, 0b00, False)] * 3 +
+     [(4, 0b11, 0b11, True), (4, 0b11, 0b01, False)]),
+    (True, False, [(4, 0b01, 0b00, False), (4, 0b11, 0b11, True), (4, 0b11, 0b01, False)]),
+    (False, True, [(4, 0b01, 0b00, False)] * 3 +
+     [(4, 0b11, 0b11, True), (4, 0b11, 0b01, False)])])
+def test_Instrumenter_mcdcVectors(tmpdir, create_instrumenter, build_program, run_program,
+                                  mcdc_dedupe, varint_records, expected_vectors):
+    instrumenter = create_instrumenter(dummySourceCode, add_markers, RuntimeMode.MCDC,
+                                       evaluation_markers_enabled=True,
+                                       mcdc_dedupe=mcdc_dedupe, varint_records=varint_records)
+
+    # compile, link and run the instrumented program
+    build_program([instrumenter])
+    instrumenter.cid_manager.write_cid_file()
+    run_program()
+
+    cri_data = CRIDecoder(str(tmpdir.join("test_file.cri"))).decode()
+    assert len(cri_data.executions) == 1
+    execution = cri_data.executions[0]
+
+    # x = 1..3 short circuit after the first condition, x = 4 is true, x = 5 fails the second condition
+    assert execution.mcdc_vectors == expected_vectors
+    # the checkpoint is still traced
+    assert execution.markers == [(1, CRIDecoder.CHECKPOINT_RESULT)] * 5
+
+    with gzip.GzipFile(tmpdir.join("test_file.cid"), 'r') as cid_file_ptr:
+        cid_data = json.loads(cid_file_ptr.read())
+
+    assert CRIDecoder.resolve_mcdc_vector(cid_data, expected_vectors[-1]) == {
+        2: True, 3: False}
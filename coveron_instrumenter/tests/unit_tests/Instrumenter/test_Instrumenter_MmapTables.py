@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the memory mapped counter and bitmap tables of the runtime helper.
+"""
+
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+# the parent forks three workers, so four processes hit the marker once each per run.
+# The parent crashes on request
+mainSourceCode: SourceCode = ("#include <stdlib.h>\n" +
+                              "#include <sys/wait.h>\n" +
+                              "#include <unistd.h>\n" +
+                              "int main() {\n" +
+                              "    for (int i = 0; i < 3; i++) { if (fork() == 0) { break; } }\n" +
+                              "    int x = 0;\n" +
+                              "    while (wait(NULL) > 0) { }\n" +
+                              "    if (getenv(\"CRASH\") != NULL) { abort(); }\n" +
+                              "    return x;\n" +
+                              "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(6, 5))
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("runtime_mode, extra_args", [
+    (RuntimeMode.COUNTER, ""),
+    (RuntimeMode.COUNTER, "-pthread -D___COVERON_THREAD_SAFE_ENABLED"),
+    (RuntimeMode.BITMAP, "")])
+def test_Instrumenter_mmapTables(tmpdir, create_instrumenter, build_program, run_program,
+                                 runtime_mode, extra_args):
+    build_program([create_instrumenter(mainSourceCode, add_markers, runtime_mode, 'main_file.c',
+                                       mmap_tables=True)],
+                  extra_args)
+
+    # all processes of both runs add into the same table, the crashed run included
+    run_program()
+    crashed_run = run_program(environment={"CRASH": "1"}, check=False)
+    assert crashed_run.returncode != 0
+
+    executions = CRIDecoder(
+        str(tmpdir.join("main_file.cri"))).decode().executions
+    assert len(executions) == 1
+    if runtime_mode == RuntimeMode.COUNTER:
+        assert executions[0].counters == [8]
+    else:
+        assert executions[0].bit_count == 1
+        assert executions[0].is_bit_set(0)
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_mmapTablesReplaced(tmpdir, create_instrumenter, build_program, run_program):
+    build_program([create_instrumenter(mainSourceCode, add_markers, RuntimeMode.COUNTER, 'main_file.c',
+                                       mmap_tables=True)])
+
+    # a table file of another build gets replaced
+    with open(tmpdir.join("main_file.cri"), 'wb') as cri_file_ptr:
+        cri_file_ptr.write(b"IMACRIF!" + b"\x00" * 200)
+
+    run_program()
+
+    assert CRIDecoder(str(tmpdir.join("main_file.cri"))).decode().executions[0].counters == [4]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the per-process CRI files of the runtime helper.
+"""
+
+import shutil
+import re
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+from coveron_instrumenter.CRIMerger import CRIMerger
+
+mainSourceCode: SourceCode = ("int main() {\n" +
+                              "    int x = 0;\n" +
+                              "    x++;\n" +
+                              "    return 0;\n" +
+                              "}\n")
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("runtime_mode", [RuntimeMode.TRACE, RuntimeMode.COUNTER])
+def test_Instrumenter_perProcessCri(tmpdir, create_instrumenter, build_program, run_program, runtime_mode):
+    build_program([create_instrumenter(mainSourceCode,
+                                       lambda cid_manager: cid_manager.add_checkpoint_marker(
+                                           cid_manager.get_new_id(), CodePositionData(3, 5)),
+                                       runtime_mode, 'main_file.c', per_process_cri=True)])
+    for _ in range(3):
+        run_program()
+
+    # every process writes its own CRI file
+    cri_filenames = [filename for filename in os.listdir(str(tmpdir))
+                     if filename.endswith(".cri")]
+    assert len(cri_filenames) == 3
+    assert all(re.fullmatch(r"main_file\.\d+\.\d+\.\d+\.cri", filename)
+               for filename in cri_filenames)
+
+    merged_paths = CRIMerger(2).merge(
+        [str(tmpdir)], str(tmpdir.mkdir("merged")))
+    assert merged_paths == [str(tmpdir.join("merged", "main_file.cri"))]
+    executions = CRIDecoder(merged_paths[0]).decode().executions
+    if runtime_mode == RuntimeMode.TRACE:
+        assert [execution.markers for execution in executions] == \
+            [[(1, CRIDecoder.CHECKPOINT_RESULT)]] * 3
+    else:
+        assert len(executions) == 1
+        assert executions[0].counters == [3]
+
+
+forkSourceCode: SourceCode = ("#include <sys/wait.h>\n" +
+                              "#include <unistd.h>\n" +
+                              "int main() {\n" +
+                              "    int x = 0;\n" +
+                              "    x++;\n" +
+                              "    pid_t pid = fork();\n" +
+                              "    x++;\n" +
+                              "    if (pid == 0) return 0;\n" +
+                              "    waitpid(pid, 0, 0);\n" +
+                              "    return 0;\n" +
+                              "}\n")
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("runtime_mode, thread_safe", [(RuntimeMode.TRACE, False),
+                                                       (RuntimeMode.TRACE, True),
+                                                       (RuntimeMode.COUNTER, False)])
+def test_Instrumenter_perProcessCriFork(tmpdir, create_instrumenter, build_program, run_program,
+                                        runtime_mode, thread_safe):
+    # one checkpoint before and one after the fork
+    def add_markers(cid_manager: CIDManager):
+        cid_manager.add_checkpoint_marker(
+            cid_manager.get_new_id(), CodePositionData(5, 5))
+        cid_manager.add_checkpoint_marker(
+            cid_manager.get_new_id(), CodePositionData(7, 5))
+
+    build_program([create_instrumenter(forkSourceCode, add_markers, runtime_mode, 'fork_file.c',
+                                       thread_safe=thread_safe, per_process_cri=True)])
+    run_program()
+
+    # the child writes its own file without the records and hits of the parent before the fork
+    cri_paths = [str(tmpdir.join(filename)) for filename in os.listdir(str(tmpdir))
+                 if filename.endswith(".cri")]
+    assert len(cri_paths) == 2
+    executions = [CRIDecoder(cri_path).decode().executions for cri_path in cri_paths]
+    assert all(len(file_executions) == 1 for file_executions in executions)
+    if runtime_mode == RuntimeMode.TRACE:
+        assert sorted(file_executions[0].markers for file_executions in executions) == \
+            [[(1, CRIDecoder.CHECKPOINT_RESULT), (2, CRIDecoder.CHECKPOINT_RESULT)],
+             [(2, CRIDecoder.CHECKPOINT_RESULT)]]
+    else:
+        assert sorted(file_executions[0].counters for file_executions in executions) == \
+            [[0, 1], [1, 1]]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the shared CRI writer of the runtime helper.
+"""
+
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Instrumenter import Instrumenter
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+mainSourceCode: SourceCode = ("int check(int x);\n" +
+                              "int main() {\n" +
+                              "    for (int i = 0; i < 5; i++) { check(i); }\n" +
+                              "    return 0;\n" +
+                              "}\n")
+
+checkSourceCode: SourceCode = ("int check(int x) {\n" +
+                               "    x++;\n" +
+                               "    return (x > 3);\n" +
+                               "}\n")
+
+
+def add_main_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(3, 35))
+
+
+def add_check_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(2, 5))
+    cid_manager.add_evaluation_marker(cid_manager.get_new_id(),
+                                      CodeSectionData(CodePositionData(
+                                          3, 12), CodePositionData(3, 19)),
+                                      EvaluationType.DECISION)
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("runtime_mode, extra_args, environment", [
+    (RuntimeMode.TRACE, "", {}),
+    (RuntimeMode.TRACE, "", {"COVERON_WRITE_BUFFER_SIZE": "0"}),
+    (RuntimeMode.TRACE, "-pthread -D___COVERON_THREAD_SAFE_ENABLED", {}),
+    (RuntimeMode.COUNTER, "", {}),
+    (RuntimeMode.BITMAP, "", {})])
+def test_Instrumenter_sharedWriter(tmpdir, create_instrumenter, build_program, run_program,
+                                   runtime_mode, extra_args, environment):
+    instrumenters = [create_instrumenter(source_code, add_markers, runtime_mode, file_name,
+                                         evaluation_markers_enabled=True)
+                     for source_code, add_markers, file_name in [(mainSourceCode, add_main_markers, 'main_file.c'),
+                                                                 (checkSourceCode, add_check_markers, 'check_file.c')]]
+
+    # one CRI file per source file
+    build_program(instrumenters, extra_args)
+    for _ in range(2):
+        run_program(environment=environment)
+    cri_contents = dict()
+    for cri_filename in ["main_file.cri", "check_file.cri"]:
+        with open(tmpdir.join(cri_filename), 'rb') as cri_file_ptr:
+            cri_contents[cri_filename] = cri_file_ptr.read()
+        os.remove(tmpdir.join(cri_filename))
+
+    # one shared CRI file for the whole program, both builds use the same CIDs,
+    # so the CRI files have the same headers
+    shared_config = create_instrumenter(mainSourceCode, add_main_markers, runtime_mode,
+                                        evaluation_markers_enabled=True,
+                                        shared_cri_file="shared.cri").config
+    build_program([Instrumenter(shared_config, instrumenter.cid_manager,
+                                instrumenter.source_file, instrumenter.source_code)
+                   for instrumenter in instrumenters],
+                  extra_args)
+    for _ in range(2):
+        run_program(environment=environment)
+    assert not os.path.exists(tmpdir.join("main_file.cri"))
+    with open(tmpdir.join("shared.cri"), 'rb') as shared_file_ptr:
+        shared_bytes = shared_file_ptr.read()
+
+    assert CRIDecoder.split_shared_bytes(shared_bytes) == cri_contents
+    if runtime_mode == RuntimeMode.TRACE:
+        check_data = CRIDecoder.decode_shared_bytes(shared_bytes)[
+            "check_file.cri"]
+        assert len(check_data.executions) == 2
+        assert check_data.executions[1].markers.count(
+            (1, CRIDecoder.CHECKPOINT_RESULT)) == 5
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the single pass splicing of the Instrumenter module.
+"""
+
+from unittest.mock import Mock, patch
+import random
+import itertools
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Instrumenter import Instrumenter
+from coveron_instrumenter.Configuration import SourceFile
+
+
+def insert_text_reference(code: str, insert_text: str, line: int, column: int) -> str:
+    """Previous implementation (splits and joins the whole code for every insert)"""
+    source_lines = code.splitlines()
+    source_lines[line - 1] = source_lines[line -
+                                          1][:(column - 1)] + insert_text + source_lines[line - 1][(column - 1):]
+    return "\n".join(source_lines)
+
+
+def create_instrumenter(source_code: str, random_generator: random.Random) -> Instrumenter:
+    """Creates an instrumenter with random markers at valid positions of the source code"""
+    source_lines = source_code.splitlines()
+
+    def random_position() -> CodePositionData:
+        line = random_generator.randint(1, len(source_lines))
+        return CodePositionData(line, random_generator.randint(1, len(source_lines[line - 1]) + 1))
+
+    def random_section() -> CodeSectionData:
+        return CodeSectionData(*sorted([random_position(), random_position()],
+                                       key=lambda position: (position.line, position.column)))
+
+    config = Mock()
+    config.checkpoint_markers_enabled = True
+    config.evaluation_markers_enabled = True
+    config.runtime_helper_header_path = "coveron_helper.h"
+
+    marker_ids = itertools.count(1)
+    cid_manager = Mock()
+    cid_manager.get_new_id.side_effect = marker_ids
+    cid_manager.get_instrumentation_random.return_value = "0123456789abcdef0123456789abcdef"
+    cid_manager.get_source_code_hash.return_value = "ab" * 32
+    cid_manager.get_checkpoint_markers.return_value = [
+        CheckpointMarkerData(next(marker_ids), random_position()) for _ in range(30)]
+    cid_manager.get_evaluation_markers.return_value = [
+        EvaluationMarkerData(next(marker_ids), random_generator.choice(list(EvaluationType)), random_section())
+        for _ in range(30)]
+    cid_manager.get_compound_statement_inserts.return_value = [
+        random_section() for _ in range(10)]
+
+    return Instrumenter(config, cid_manager, SourceFile("test_file.c"), source_code)
+
+
+def test_Instrumenter_Splice_reference():
+    random_generator = random.Random(4711)
+    for _ in range(50):
+        source_code = "".join(random_generator.choice(["a", "b", " ", ";", "\n", "\r\n", "\r"])
+                              for _ in range(random_generator.randint(1, 200)))
+        if source_code.splitlines() == []:
+            continue
+        instrumenter = create_instrumenter(source_code, random_generator)
+
+        # record the inserts handed to the splice engine
+        splice_text = Instrumenter._splice_text
+        with patch.object(Instrumenter, '_splice_text', autospec=True, side_effect=splice_text) as mock_splice_text:
+            instrumenter._prepare_markers()
+            instrumenter._write_markers()
+        recorded_inserts = mock_splice_text.call_args[0][1]
+
+        # the previous implementation inserted in reverse order, each insert on the full code
+        expected_code = source_code
+        for line, column, insert_text in reversed(recorded_inserts):
+            expected_code = insert_text_reference(
+                expected_code, insert_text, line, column)
+        assert instrumenter._instrumented_code == expected_code
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the registration of the instrumented files before main.
+"""
+
+from unittest.mock import patch
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+mainSourceCode: SourceCode = ("int main() {\n" +
+                              "    int x = 0;\n" +
+                              "    x++;\n" +
+                              "    return 0;\n" +
+                              "}\n")
+
+# never called by main
+unusedSourceCode: SourceCode = ("int unused(int x) {\n" +
+                                "    x++;\n" +
+                                "    return x;\n" +
+                                "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(3, 5))
+
+
+def test_Instrumenter_registrationFunction(create_instrumenter):
+    instrumenter = create_instrumenter(mainSourceCode, add_markers)
+    with patch.object(CIDManager, 'get_instrumentation_random',
+                      return_value="abcdef0123456789abcdef0123456789"):
+        instrumenter.start_instrumentation()
+
+    # the registration function is appended to the source code
+    assert instrumenter._instrumented_code.splitlines()[-1] == \
+        ("___COVERON_CONSTRUCTOR static void ___COVERON_REGISTER_ABCDEF0123456789ABCDEF0123456789(void) " +
+         "{ ___COVERON_REGISTER_FILE(&___COVERON_FILE_ABCDEF0123456789ABCDEF0123456789); }")
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("runtime_mode, extra_args, environment", [
+    (RuntimeMode.TRACE, "", {}),
+    (RuntimeMode.TRACE, "", {"COVERON_WRITE_BUFFER_SIZE": "0"}),
+    (RuntimeMode.TRACE, "-pthread -D___COVERON_THREAD_SAFE_ENABLED", {}),
+    (RuntimeMode.COUNTER, "", {}),
+    (RuntimeMode.BITMAP, "", {})])
+def test_Instrumenter_registeredBeforeMain(tmpdir, create_instrumenter, build_program, run_program,
+                                           runtime_mode, extra_args, environment):
+    build_program([create_instrumenter(source_code, add_markers, runtime_mode, file_name)
+                   for file_name, source_code in [('main_file.c', mainSourceCode),
+                                                  ('unused_file.c', unusedSourceCode)]],
+                  extra_args)
+    run_program(environment=environment)
+
+    main_execution = CRIDecoder(
+        str(tmpdir.join("main_file.cri"))).decode().executions
+    unused_execution = CRIDecoder(
+        str(tmpdir.join("unused_file.cri"))).decode().executions
+    assert len(main_execution) == 1
+    assert len(unused_execution) == 1
+
+    # files without hits are part of the execution as well
+    if runtime_mode == RuntimeMode.TRACE:
+        assert main_execution[0].markers == [(1, CRIDecoder.CHECKPOINT_RESULT)]
+        assert unused_execution[0].markers == []
+    elif runtime_mode == RuntimeMode.COUNTER:
+        assert main_execution[0].counters == [1]
+        assert unused_execution[0].counters == [0]
+    else:
+        assert main_execution[0].is_bit_set(0)
+        assert not unused_execution[0].is_bit_set(0)
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_lazyRegistration(tmpdir, create_instrumenter, build_program, run_program):
+    build_program([create_instrumenter(source_code, add_markers, RuntimeMode.TRACE, file_name)
+                   for file_name, source_code in [('main_file.c', mainSourceCode),
+                                                  ('unused_file.c', unusedSourceCode)]],
+                  "-DCOVERON_LAZY_REGISTRATION")
+    run_program()
+
+    # files get registered on their first hit
+    assert CRIDecoder(str(tmpdir.join("main_file.cri"))).decode().executions[0].markers == \
+        [(1, CRIDecoder.CHECKPOINT_RESULT)]
+    assert not os.path.exists(str(tmpdir.join("unused_file.cri")))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the thread safe runtime.
+"""
+
+import json
+import gzip
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Instrumenter import Instrumenter
+from coveron_instrumenter.Configuration import RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+THREAD_COUNT = 16
+CALL_COUNT = 20000
+
+thread_apis = {
+    "pthread": ("#include <pthread.h>\n",
+                "pthread_t threads[" + str(THREAD_COUNT) + "];\n",
+                "pthread_create(&threads[i], 0, worker, 0);",
+                "pthread_join(threads[i], 0);",
+                "void *worker(void *argument) {\n"),
+    "c11": ("#include <threads.h>\n",
+            "thrd_t threads[" + str(THREAD_COUNT) + "];\n",
+            "thrd_create(&threads[i], worker, 0);",
+            "thrd_join(threads[i], 0);",
+            "int worker(void *argument) {\n")}
+
+
+def get_source_code(thread_api: str) -> SourceCode:
+    include, declaration, create, join, worker = thread_apis[thread_api]
+    return (include +
+            "int check(int x) {\n" +
+            "    x++;\n" +
+            "    return (x > 3);\n" +
+            "}\n" +
+            worker +
+            "    for (int i = 0; i < " + str(CALL_COUNT) + "; i++) { check(i % 5); }\n" +
+            "    return 0;\n" +
+            "}\n" +
+            "int main() {\n" +
+            "    " + declaration +
+            "    for (int i = 0; i < " + str(THREAD_COUNT) + "; i++) { " + create + " }\n" +
+            "    for (int i = 0; i < " + str(THREAD_COUNT) + "; i++) { " + join + " }\n" +
+            "    return 0;\n" +
+            "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(3, 5))
+    cid_manager.add_evaluation_marker(cid_manager.get_new_id(),
+                                      CodeSectionData(CodePositionData(
+                                          4, 12), CodePositionData(4, 19)),
+                                      EvaluationType.DECISION)
+
+
+def read_results(tmpdir, instrumenter: Instrumenter):
+    instrumenter.cid_manager.write_cid_file()
+    with gzip.GzipFile(tmpdir.join("test_file.cid"), 'r') as cid_file_ptr:
+        cid_data = json.loads(cid_file_ptr.read())
+    return cid_data, CRIDecoder(str(tmpdir.join("test_file.cri"))).decode()
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("thread_api, environment", [
+    ("pthread", {}),
+    ("c11", {}),
+    # tiny thread buffers get flushed all the time
+    ("pthread", {"COVERON_WRITE_BUFFER_SIZE": "96"}),
+    ("pthread", {"COVERON_WRITE_BUFFER_SIZE": "0"})])
+def test_Instrumenter_threadSafeTrace(tmpdir, create_instrumenter, build_program, run_program,
+                                      thread_api, environment):
+    instrumenter = create_instrumenter(get_source_code(thread_api), add_markers, RuntimeMode.TRACE,
+                                       evaluation_markers_enabled=True, thread_safe=True)
+    build_program([instrumenter])
+    run_program(environment=environment)
+    _, cri_data = read_results(tmpdir, instrumenter)
+
+    # one execution with every record complete
+    assert len(cri_data.executions) == 1
+    markers = cri_data.executions[0].markers
+    assert len(markers) == 2 * THREAD_COUNT * CALL_COUNT
+    assert markers.count((1, CRIDecoder.CHECKPOINT_RESULT)) == THREAD_COUNT * CALL_COUNT
+    # x > 3 for two out of five calls
+    assert markers.count((2, 1)) == THREAD_COUNT * CALL_COUNT * 2 // 5
+    assert markers.count((2, 0)) == THREAD_COUNT * CALL_COUNT * 3 // 5
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_threadSafeCounter(tmpdir, create_instrumenter, build_program, run_program):
+    instrumenter = create_instrumenter(get_source_code("pthread"), add_markers, RuntimeMode.COUNTER,
+                                       evaluation_markers_enabled=True, thread_safe=True)
+    build_program([instrumenter])
+    run_program()
+    cid_data, cri_data = read_results(tmpdir, instrumenter)
+
+    assert CRIDecoder.resolve_counters(cid_data, cri_data.executions[0]) == {
+        1: THREAD_COUNT * CALL_COUNT,
+        2: (THREAD_COUNT * CALL_COUNT * 3 // 5, THREAD_COUNT * CALL_COUNT * 2 // 5)}
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_threadSafeBitmap(tmpdir, create_instrumenter, build_program, run_program):
+    instrumenter = create_instrumenter(get_source_code("pthread"), add_markers, RuntimeMode.BITMAP,
+                                       evaluation_markers_enabled=True, thread_safe=True)
+    build_program([instrumenter])
+    run_program()
+    cid_data, cri_data = read_results(tmpdir, instrumenter)
+
+    assert CRIDecoder.resolve_counters(cid_data, cri_data.executions[0]) == {
+        1: True, 2: (True, True)}
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_threadSafeManyFiles(tmpdir, create_instrumenter, build_program, run_program):
+    # more files than the old thread buffer slots, recorded alternately by every thread
+    file_count = 12
+    call_count = CALL_COUNT // 10
+    instrumenters = [create_instrumenter("int x_" + str(file_number) + ";\n" +
+                                         "void hit_" + str(file_number) + "(void) {\n" +
+                                         "    x_" + str(file_number) + "++;\n" +
+                                         "}\n",
+                                         lambda cid_manager: cid_manager.add_checkpoint_marker(
+                                             cid_manager.get_new_id(), CodePositionData(3, 5)),
+                                         file_name="hit_" + str(file_number) + ".c", thread_safe=True)
+                     for file_number in range(file_count)]
+
+    include, declaration, create, join, worker = thread_apis["pthread"]
+    with open(str(tmpdir.join("main.c")), "w") as main_file:
+        main_file.write(include +
+                        "".join("void hit_" + str(file_number) + "(void);\n"
+                                for file_number in range(file_count)) +
+                        worker +
+                        "    for (int i = 0; i < " + str(call_count) + "; i++) {\n" +
+                        "".join("        hit_" + str(file_number) + "();\n"
+                                for file_number in range(file_count)) +
+                        "    }\n" +
+                        "    return 0;\n" +
+                        "}\n" +
+                        "int main() {\n" +
+                        "    " + declaration +
+                        "    for (int i = 0; i < " + str(THREAD_COUNT) + "; i++) { " + create + " }\n" +
+                        "    for (int i = 0; i < " + str(THREAD_COUNT) + "; i++) { " + join + " }\n" +
+                        "    return 0;\n" +
+                        "}\n")
+
+    build_program(instrumenters, str(tmpdir.join("main.c")))
+    run_program()
+
+    for file_number in range(file_count):
+        cri_data = CRIDecoder(str(tmpdir.join("hit_" + str(file_number) + ".cri"))).decode()
+        assert len(cri_data.executions) == 1
+        assert cri_data.executions[0].markers == \
+            [(1, CRIDecoder.CHECKPOINT_RESULT)] * (THREAD_COUNT * call_count)
+
+
+# the workers keep recording, while main exits. The exit handler registered before the one of the runtime
+# helper runs after its flush: it stops the workers and writes the number of hits recorded by them
+exitSourceCode: SourceCode = ("#include <pthread.h>\n" +
+                              "#include <stdio.h>\n" +
+                              "#include <stdlib.h>\n" +
+                              "#include <time.h>\n" +
+                              "#include <unistd.h>\n" +
+                              "int stop = 0;\n" +
+                              "int stopped = 0;\n" +
+                              "unsigned long hits = 0;\n" +
+                              "void *worker(void *argument) {\n" +
+                              "    while (!__atomic_load_n(&stop, __ATOMIC_ACQUIRE)) { __atomic_fetch_add(&hits, 1, __ATOMIC_RELAXED); }\n" +
+                              "    __atomic_fetch_add(&stopped, 1, __ATOMIC_RELEASE);\n" +
+                              "    for (;;) { pause(); }\n" +
+                              "    return argument;\n" +
+                              "}\n" +
+                              "void stop_workers(void) {\n" +
+                              "    __atomic_store_n(&stop, 1, __ATOMIC_RELEASE);\n" +
+                              "    while (__atomic_load_n(&stopped, __ATOMIC_ACQUIRE) < " + str(THREAD_COUNT) + ") { }\n" +
+                              "    FILE *hits_file = fopen(\"hits.txt\", \"w\");\n" +
+                              "    fprintf(hits_file, \"%lu\", __atomic_load_n(&hits, __ATOMIC_RELAXED));\n" +
+                              "    fclose(hits_file);\n" +
+                              "}\n" +
+                              "__attribute__((constructor(101))) void register_stop_workers(void) { atexit(stop_workers); }\n" +
+                              "int main() {\n" +
+                              "    " + thread_apis["pthread"][1] +
+                              "    for (int i = 0; i < " + str(THREAD_COUNT) + "; i++) { " + thread_apis["pthread"][2] + " }\n" +
+                              "    struct timespec delay = {0, 20000000};\n" +
+                              "    nanosleep(&delay, 0);\n" +
+                              "    exit(0);\n" +
+                              "}\n")
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("trace_rle", [False, True])
+def test_Instrumenter_threadSafeExitWhileRecording(tmpdir, create_instrumenter, build_program, run_program,
+                                                   trace_rle):
+    # the checkpoint is recorded before the hit gets counted
+    build_program([create_instrumenter(exitSourceCode,
+                                       lambda cid_manager: cid_manager.add_checkpoint_marker(
+                                           cid_manager.get_new_id(), CodePositionData(10, 57)),
+                                       thread_safe=True, trace_rle=trace_rle)])
+    run_program()
+
+    # every record is written exactly once: the buffered ones by the flush at exit, the later ones directly
+    with open(tmpdir.join("hits.txt")) as hits_file_ptr:
+        hit_count = int(hits_file_ptr.read())
+    executions = CRIDecoder(str(tmpdir.join("test_file.cri"))).decode().executions
+    assert len(executions) == 1
+    assert hit_count > 0
+    assert executions[0].markers == [(1, CRIDecoder.CHECKPOINT_RESULT)] * hit_count
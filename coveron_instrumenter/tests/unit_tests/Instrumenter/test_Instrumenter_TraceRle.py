@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the run-length encoding of the runtime trace.
+"""
+
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+mainSourceCode: SourceCode = ("int main() {\n" +
+                              "    int x = 0;\n" +
+                              "    for (int i = 0; i < 10000; i++) { x++; }\n" +
+                              "    return 0;\n" +
+                              "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(2, 5))
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(3, 37))
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("extra_args", ["", "-pthread -D___COVERON_THREAD_SAFE_ENABLED"])
+def test_Instrumenter_traceRle(create_instrumenter, build_program, run_program, pop_cri_bytes, extra_args):
+    build_program([create_instrumenter(mainSourceCode, add_markers, file_name='main_file.c')],
+                  extra_args)
+    run_program()
+    plain_cri_bytes = pop_cri_bytes("main_file.cri")
+
+    build_program([create_instrumenter(mainSourceCode, add_markers, file_name='main_file.c',
+                                       trace_rle=True)],
+                  extra_args)
+    run_program()
+    rle_cri_bytes = pop_cri_bytes("main_file.cri")
+
+    # the version advertises the repeat records
+    assert CRIDecoder.decode_bytes(plain_cri_bytes).version == 1
+    rle_cri_data = CRIDecoder.decode_bytes(rle_cri_bytes)
+    assert rle_cri_data.version == 2
+
+    # the same trace in a fraction of the size
+    assert rle_cri_data.executions[0].markers == \
+        CRIDecoder.decode_bytes(plain_cri_bytes).executions[0].markers
+    assert rle_cri_data.executions[0].markers == \
+        [(1, CRIDecoder.CHECKPOINT_RESULT)] + \
+        [(2, CRIDecoder.CHECKPOINT_RESULT)] * 10000
+    assert len(rle_cri_bytes) * 100 < len(plain_cri_bytes)
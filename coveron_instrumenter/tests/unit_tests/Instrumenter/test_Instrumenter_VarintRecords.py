@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the varint marker records of the runtime trace.
+"""
+
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+mainSourceCode: SourceCode = ("int main() {\n" +
+                              "    int x = 0;\n" +
+                              "    for (int i = 0; i < 200; i++) { if (i % 3 == 0) { x++; } }\n" +
+                              "    return 0;\n" +
+                              "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_marker_id(), CodePositionData(2, 5))
+    cid_manager.add_evaluation_marker(cid_manager.get_new_marker_id(),
+                                      CodeSectionData(CodePositionData(
+                                          3, 41), CodePositionData(3, 51)),
+                                      EvaluationType.DECISION)
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_marker_id(), CodePositionData(3, 55))
+
+
+def test_Instrumenter_varintProbes(create_instrumenter):
+    instrumenter = create_instrumenter(mainSourceCode, add_markers, file_name='main_file.c',
+                                       evaluation_markers_enabled=True, varint_records=True)
+    instrumenter.start_instrumentation()
+
+    # the runtime helper encodes the plain marker id
+    file_struct_reference = "&" + instrumenter._get_file_struct_name()
+    assert ("    for (int i = 0; i < 200; i++) { if (___COVERON_SET_EVALUATION_VARINT(2, " +
+         file_struct_reference + ", (int) (i % 3 == 0))) { ___COVERON_SET_CHECKPOINT_VARINT(3, " +
+         file_struct_reference + ");x++; } }") in instrumenter._instrumented_code.splitlines()
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("trace_rle, extra_args, environment", [
+    (False, "", {}),
+    (False, "", {"COVERON_WRITE_BUFFER_SIZE": "0"}),
+    (False, "-pthread -D___COVERON_THREAD_SAFE_ENABLED", {}),
+    (True, "", {})])
+def test_Instrumenter_varintRecords(create_instrumenter, build_program, run_program, pop_cri_bytes,
+                                    trace_rle, extra_args, environment):
+    cri_bytes = list()
+    for varint_records in [False, True]:
+        build_program([create_instrumenter(mainSourceCode, add_markers, file_name='main_file.c',
+                                           evaluation_markers_enabled=True,
+                                           varint_records=varint_records, trace_rle=trace_rle)],
+                      extra_args)
+        run_program(environment=environment)
+        cri_bytes.append(pop_cri_bytes("main_file.cri"))
+    plain_cri_bytes, varint_cri_bytes = cri_bytes
+
+    # the version advertises the varint records
+    varint_cri_data = CRIDecoder.decode_bytes(varint_cri_bytes)
+    assert varint_cri_data.version == 3
+
+    # the same trace with 1 byte instead of 5 per record (repeat records stay the same size)
+    expected_markers = [(1, CRIDecoder.CHECKPOINT_RESULT)]
+    for i in range(200):
+        expected_markers.append((2, int(i % 3 == 0)))
+        if i % 3 == 0:
+            expected_markers.append((3, CRIDecoder.CHECKPOINT_RESULT))
+    assert varint_cri_data.executions[0].markers == expected_markers
+    assert CRIDecoder.decode_bytes(plain_cri_bytes).executions[0].markers == expected_markers
+    if trace_rle:
+        assert len(varint_cri_bytes) < len(plain_cri_bytes)
+    else:
+        assert (len(varint_cri_bytes) - CRIDecoder.HEADER_LENGTH) * 4 < \
+            len(plain_cri_bytes) - CRIDecoder.HEADER_LENGTH
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the runtime write buffer of the trace mode.
+"""
+
+import shutil
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Configuration import Configuration, RuntimeMode
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.CRIDecoder import CRIDecoder
+
+dummySourceCode: SourceCode = ("#include <stdlib.h>\n" +
+                               "int main(int argc, char *argv[]) {\n" +
+                               "    for (int i = 0; i < 3; i++) { argc++; }\n" +
+                               "    if (argc > 4) { abort(); }\n" +
+                               "    return 0;\n" +
+                               "}\n")
+
+
+def add_markers(cid_manager: CIDManager):
+    cid_manager.add_checkpoint_marker(
+        cid_manager.get_new_id(), CodePositionData(3, 35))
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+@pytest.mark.parametrize("write_buffer_size, environment", [
+    (Configuration.DEFAULT_WRITE_BUFFER_SIZE, {}),
+    (Configuration.DEFAULT_WRITE_BUFFER_SIZE, {"COVERON_WRITE_BUFFER_SIZE": "7"}),
+    (0, {})])
+def test_Instrumenter_writeBufferAtExit(tmpdir, create_instrumenter, build_program, run_program,
+                                        write_buffer_size, environment):
+    build_program([create_instrumenter(dummySourceCode, add_markers, RuntimeMode.TRACE,
+                                       write_buffer_size=write_buffer_size)])
+
+    for _ in range(2):
+        run_program(environment=environment)
+
+    cri_data = CRIDecoder(str(tmpdir.join("test_file.cri"))).decode()
+    assert [execution.markers for execution in cri_data.executions] == \
+        [[(1, CRIDecoder.CHECKPOINT_RESULT)] * 3] * 2
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_Instrumenter_writeBufferOnFatalSignal(tmpdir, create_instrumenter, build_program, run_program):
+    build_program([create_instrumenter(dummySourceCode, add_markers)])
+
+    # abort() skips the exit handlers, the buffer gets flushed by the signal handler
+    program = run_program(["x"], check=False)
+    assert program.returncode != 0
+
+    cri_data = CRIDecoder(str(tmpdir.join("test_file.cri"))).decode()
+    assert cri_data.executions[0].markers == [
+        (1, CRIDecoder.CHECKPOINT_RESULT)] * 3
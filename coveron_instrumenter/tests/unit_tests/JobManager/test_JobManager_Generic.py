@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the JobManager module.
+"""
+
+import shutil
+
+from unittest.mock import patch
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.JobManager import JobManager, JobResult
+from coveron_instrumenter.Configuration import Configuration, SourceFile
+
+abs_path_parser_input_dir = os.path.join(os.path.abspath(
+    os.path.dirname(os.path.realpath(__file__))), "..", "Parser", "input_files")
+
+
+def create_config(tmpdir, jobs: int) -> Configuration:
+    config = Configuration()
+    config.force = True
+    config.jobs = jobs
+    config.output_abs_path = str(tmpdir)
+    config.runtime_helper_header_path = "coveron_helper.h"
+    return config
+
+
+def copy_input_files(tmpdir, count: int) -> list:
+    source_files = list()
+    for i in range(count):
+        target_path = os.path.join(str(tmpdir), "input_" + str(i) + ".c")
+        shutil.copy(os.path.join(abs_path_parser_input_dir,
+                                 "Goto", "Goto_basic.c"), target_path)
+        source_files.append(SourceFile(target_path))
+    return source_files
+
+
+def test_JobManager_sequential(tmpdir):
+    config = create_config(tmpdir, 1)
+    source_files = copy_input_files(tmpdir, 2)
+
+    job_manager = JobManager(config)
+    results = list(job_manager.instrument(source_files))
+    job_manager.close()
+
+    assert [result.source_file.input_file for result in results] == [
+        source_file.input_file for source_file in source_files]
+    for result in results:
+        assert isinstance(result, JobResult) == True
+        assert result.error is None
+        assert os.path.isfile(result.source_file.output_file)
+        assert os.path.isfile(tmpdir.join(result.source_file.cid_file))
+
+
+def test_JobManager_parallel_keeps_order(tmpdir):
+    config = create_config(tmpdir, 3)
+    source_files = copy_input_files(tmpdir, 4)
+
+    # insert a missing file in the middle, so the error has to show up at the right position
+    source_files.insert(2, SourceFile(
+        os.path.join(str(tmpdir), "missing_file.c")))
+
+    job_manager = JobManager(config)
+    results = list(job_manager.instrument(source_files))
+    job_manager.close()
+
+    assert [result.source_file.input_file for result in results] == [
+        source_file.input_file for source_file in source_files]
+    assert "not found" in results[2].error
+    for i, result in enumerate(results):
+        if i != 2:
+            assert result.error is None
+            assert os.path.isfile(result.source_file.output_file)
+
+
+
+def test_JobManager_cached(tmpdir):
+    config = create_config(tmpdir, 1)
+    config.force = False
+    source_files = copy_input_files(tmpdir, 1)
+
+    job_manager = JobManager(config)
+    assert next(job_manager.instrument(source_files)).cached == False
+
+    # a cache hit must be decided without hashing the source or decoding the CID
+    with patch('coveron_instrumenter.JobManager.CIDManager', side_effect=AssertionError("CIDManager created")):
+        result = next(job_manager.instrument(source_files))
+    assert result.error is None
+    assert result.cached == True
+
+    # touching the source keeps the cache valid
+    os.utime(source_files[0].input_file, ns=(0, 0))
+    assert next(job_manager.instrument(source_files)).cached == True
+
+    # changed switches invalidate the cache
+    changed_config = create_config(tmpdir, 1)
+    changed_config.evaluation_markers_enabled = not config.evaluation_markers_enabled
+    assert changed_config.get_fingerprint() != config.get_fingerprint()
+
+    # changed source code invalidates the cache
+    with open(source_files[0].input_file, "a") as source_file_ptr:
+        source_file_ptr.write("\n")
+    assert next(job_manager.instrument(source_files)).cached == False
+    assert next(job_manager.instrument(source_files)).cached == True
+    job_manager.close()
@@ -128,6 +128,8 @@ def test_Parser_IfBranches_complex_decisions(mock_config, mock_cid_manager):
     mock_cid_manager.source_file = SourceFile(source_file_path)
     mock_cid_manager.get_new_id.side_effect = itertools.count(
         start=1, step=1)  # id generator for inifinite new ids
+    mock_cid_manager.get_new_marker_id.side_effect = itertools.count(
+        start=1, step=1)  # marker id generator for inifinite new marker ids
 
     # create the clang bridge
     clang_bridge = ClangBridge()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the statement end lookup of the Parser module
+"""
+
+import random
+
+from unittest.mock import Mock, patch
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.Parser import Parser
+
+
+def find_statement_end_reference(source_code: str, start_line: int, start_column: int):
+    """Previous implementation (re-splits the source code for every call)"""
+    found_end = False
+    found_line = 0
+    found_column = 0
+    for i_line, line in enumerate("\n".join(source_code.splitlines()[start_line - 1:])[start_column - 1:].splitlines()):
+        for i_column, column in enumerate(line):
+            if column == ";":
+                found_end = True
+                found_line = i_line
+                found_column = i_column
+                break
+
+        if found_end == True:
+            break
+
+    if found_line == 0:
+        found_column += start_column
+    else:
+        found_column += 1
+
+    return (start_line + found_line), found_column
+
+
+def test_Parser_StatementEnd_reference():
+    random_generator = random.Random(4711)
+    for _ in range(200):
+        source_code = "".join(random_generator.choice("ab ;\n\r\t")
+                              for _ in range(random_generator.randint(0, 80)))
+        parser = Parser(Mock(), Mock(), None, source_code)
+        line_count = len(source_code.splitlines())
+        for start_line in range(1, line_count + 2):
+            for start_column in range(1, 12):
+                assert parser.find_statement_end(start_line, start_column) == \
+                    find_statement_end_reference(
+                        source_code, start_line, start_column)
+
+
+class SplitCountingSourceCode(str):
+    """Source code counting its splitlines calls"""
+    split_count = 0
+
+    def splitlines(self, *args, **kwargs):
+        SplitCountingSourceCode.split_count += 1
+        return str.splitlines(self, *args, **kwargs)
+
+
+def test_Parser_StatementEnd_indexBuiltOnce():
+    branch_count = 1000
+    SplitCountingSourceCode.split_count = 0
+    source_code = SplitCountingSourceCode("int f(int x)\n{\n" +
+                                          "    if (x)\n        foo(x);\n" * branch_count + "}\n")
+    parser = Parser(Mock(), Mock(), None, source_code)
+
+    # the source code gets split once for the index, not once per lookup
+    with patch.object(Parser, '_build_statement_end_index', autospec=True,
+                      side_effect=Parser._build_statement_end_index) as build_index:
+        for i in range(branch_count):
+            assert parser.find_statement_end(4 + 2 * i, 9) == (4 + 2 * i, 15)
+    assert build_index.call_count == 1
+    assert SplitCountingSourceCode.split_count == 1
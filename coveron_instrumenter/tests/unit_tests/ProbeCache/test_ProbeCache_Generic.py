@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Unit Tests for the ProbeCache module.
+"""
+
+import sys
+import shutil
+import pytest
+
+from unittest.mock import Mock
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.ProbeCache import ProbeCache
+
+# the python interpreter is an executable, which exists on every test machine
+compiler_exec = shutil.which(sys.executable) or sys.executable
+
+
+def test_ProbeCache_relevantFlags():
+    compiler_args = ["-std=c99", "-I.", "-O2", "-m32", "-DTEST",
+                     "--target=arm-none-eabi", "-target", "x86_64-linux-gnu", "-Wall"]
+    assert ProbeCache.get_relevant_flags(compiler_args) == [
+        "-std=c99", "-m32", "--target=arm-none-eabi", "-target", "x86_64-linux-gnu"]
+
+
+def test_ProbeCache_hit(tmpdir):
+    probe_cache = ProbeCache(str(tmpdir))
+    probe_function = Mock(return_value=["-isystem /usr/include"])
+
+    assert probe_cache.get_probe(compiler_exec, [], "isystem_paths", probe_function) == [
+        "-isystem /usr/include"]
+    assert probe_function.call_count == 1
+
+    # a second cache instance (next wrapper call) must not probe again
+    probe_cache = ProbeCache(str(tmpdir))
+    assert probe_cache.get_probe(compiler_exec, [], "isystem_paths", probe_function) == [
+        "-isystem /usr/include"]
+    assert probe_function.call_count == 1
+
+    # no temporary files are left behind
+    assert all(file_name.endswith(".json")
+               for file_name in os.listdir(probe_cache.cache_dir))
+
+
+def test_ProbeCache_keys(tmpdir):
+    probe_cache = ProbeCache(str(tmpdir))
+    probe_function = Mock(return_value=["-isystem /usr/include"])
+
+    # other flags, other probes and other compilers get their own entries
+    probe_cache.get_probe(compiler_exec, [], "isystem_paths", probe_function)
+    probe_cache.get_probe(compiler_exec, ["-m32"], "isystem_paths", probe_function)
+    probe_cache.get_probe(compiler_exec, [], "predefined_macros", probe_function)
+    assert probe_function.call_count == 3
+
+    # a changed compiler executable invalidates the entries
+    fake_compiler_path = str(tmpdir.join("fake_cc"))
+    with open(fake_compiler_path, "w") as fake_compiler_ptr:
+        fake_compiler_ptr.write("#!/bin/sh\n")
+    os.chmod(fake_compiler_path, 0o755)
+    probe_cache.get_probe(fake_compiler_path, [], "isystem_paths", probe_function)
+    assert probe_function.call_count == 4
+    with open(fake_compiler_path, "a") as fake_compiler_ptr:
+        fake_compiler_ptr.write("exit 0\n")
+    probe_cache.get_probe(fake_compiler_path, [], "isystem_paths", probe_function)
+    assert probe_function.call_count == 5
+
+
+def test_ProbeCache_unknownCompiler(tmpdir):
+    # without an executable to key on, nothing gets cached
+    probe_cache = ProbeCache(str(tmpdir))
+    probe_function = Mock(return_value=[])
+    probe_cache.get_probe("coveron_missing_compiler", [], "isystem_paths", probe_function)
+    probe_cache.get_probe("coveron_missing_compiler", [], "isystem_paths", probe_function)
+    assert probe_function.call_count == 2
+
+
+def test_ProbeCache_brokenEntry(tmpdir):
+    probe_cache = ProbeCache(str(tmpdir))
+    probe_function = Mock(return_value=["-DTEST=1"])
+    probe_cache.get_probe(compiler_exec, [], "predefined_macros", probe_function)
+
+    # a damaged entry counts as miss and gets replaced
+    for file_name in os.listdir(probe_cache.cache_dir):
+        with open(os.path.join(probe_cache.cache_dir, file_name), "w") as cache_file_ptr:
+            cache_file_ptr.write("{broken")
+    assert probe_cache.get_probe(compiler_exec, [], "predefined_macros", probe_function) == [
+        "-DTEST=1"]
+    assert probe_function.call_count == 2
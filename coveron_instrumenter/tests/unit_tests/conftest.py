@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+#
+# Copyright 2020 Glenn Töws
+#
+# This file is part of the Coveron project
+#
+# The Coveron project is licensed under the LGPL-3.0 license
+
+"""Shared fixtures of the unit tests.
+"""
+
+import pytest
+
+from coveron_instrumenter.DataTypes import *
+
+from coveron_instrumenter.CIDManager import CIDManager
+from coveron_instrumenter.Configuration import Configuration, SourceFile, RuntimeMode
+
+source_code = "int main() {\n    return 0; /* äöü */\n}\n"
+
+
+@pytest.fixture
+def create_cid_manager(tmpdir):
+    """Returns a factory for a CIDManager of tmpdir/test_file.c with data of every CID section"""
+    def create(runtime_mode: RuntimeMode) -> CIDManager:
+        config = Configuration()
+        config.evaluation_markers_enabled = True
+        config.runtime_mode = runtime_mode
+        config.output_abs_path = str(tmpdir)
+        cid_manager = CIDManager(config, SourceFile(
+            str(tmpdir.join('test_file.c'))), source_code)
+
+        cid_manager.add_checkpoint_marker(1, CodePositionData(1, 12))
+        cid_manager.add_evaluation_marker(2, CodeSectionData(CodePositionData(
+            2, 5), CodePositionData(2, 15)), EvaluationType.DECISION)
+        cid_manager.add_evaluation_marker(3, CodeSectionData(CodePositionData(
+            2, 5), CodePositionData(2, 9)), EvaluationType.CONDITION)
+        cid_manager.add_mcdc_decision(2, [3])
+        cid_manager.add_class_data(4, "test_class")
+        # top level function without parent function
+        cid_manager.add_function_data(5, "main", FunctionType.NORMAL, None, 1,
+                                      CodeSectionData(CodePositionData(1, 1), CodePositionData(1, 10)),
+                                      CodeSectionData(CodePositionData(1, 12), CodePositionData(3, 1)))
+        cid_manager.add_statement_data(6, StatementType.RETURN, 5, 1,
+                                       CodeSectionData(CodePositionData(2, 5), CodePositionData(2, 13)))
+        # if branch with else branch (the else branch stores its conditions as dict)
+        cid_manager.add_if_branch_data(7, 5, [
+            BranchResultData(2,
+                             [ConditionPossibility(True, [ConditionResult(3, True)]),
+                              ConditionPossibility(False, [ConditionResult(3, False)])],
+                             [ConditionData(3, CodeSectionData(
+                                 CodePositionData(2, 5), CodePositionData(2, 9)))],
+                             CodeSectionData(CodePositionData(2, 5), CodePositionData(2, 15)),
+                             CodeSectionData(CodePositionData(2, 16), CodePositionData(2, 20))),
+            BranchResultData(-1, list(), dict(true=[], false=[]),
+                             CodeSectionData(CodePositionData(2, 21), CodePositionData(2, 25)),
+                             CodeSectionData(CodePositionData(2, 21), CodePositionData(2, 25)))])
+        cid_manager.add_switch_branch_data(8, 5, CodeSectionData(CodePositionData(2, 1), CodePositionData(2, 30)),
+                                           [CaseData(1, CaseType.DEFAULT,
+                                                     CodeSectionData(CodePositionData(2, 2),
+                                                                     CodePositionData(2, 9)),
+                                                     CodeSectionData(CodePositionData(2, 10), CodePositionData(2, 29)))])
+        cid_manager.add_ternary_expression_data(9, 5, 2, CodeSectionData(CodePositionData(2, 5), CodePositionData(2, 9)),
+                                                [ConditionPossibility(True, [ConditionResult(3, True)]),
+                                                 ConditionPossibility(False, [ConditionResult(3, False)])],
+                                                [ConditionData(3, CodeSectionData(
+                                                    CodePositionData(2, 5), CodePositionData(2, 9)))],
+                                                CodeSectionData(CodePositionData(2, 12), CodePositionData(2, 13)),
+                                                CodeSectionData(CodePositionData(2, 16), CodePositionData(2, 17)))
+        cid_manager.add_loop_data(10, LoopType.WHILE, 5, 2,
+                                  CodeSectionData(CodePositionData(2, 5), CodePositionData(2, 9)),
+                                  CodeSectionData(CodePositionData(2, 10), CodePositionData(2, 20)),
+                                  [ConditionPossibility(True, [ConditionResult(3, True)]),
+                                   ConditionPossibility(False, [ConditionResult(3, False)])],
+                                  [ConditionData(3, CodeSectionData(
+                                      CodePositionData(2, 5), CodePositionData(2, 9)))])
+        return cid_manager
+    return create
@@ -14,7 +14,19 @@ from unittest.mock import Mock, patch
 
 from coveron_instrumenter.DataTypes import *
 
-from coveron_instrumenter.Configuration import Configuration
-from coveron_instrumenter.ArgumentHandler import ArgumentHandler
+# the config has to be of the Configuration class the ArgumentHandler module checks against
+from coveron_instrumenter.ArgumentHandler import ArgumentHandler, Configuration
 
-# To be done
+
+def test_ArgumentHandler_clientWorkingDirectory():
+    # the daemon resolves relative paths against the working directory of its client
+    config = Configuration()
+    ArgumentHandler(config, ["--CVR_COMPILER_EXEC=gcc", "-Iinclude", "-isystem", "system",
+                             "-I/usr/local/include", "-DPATH=x", "src/input.c", "-o", "build/input"],
+                    probe_compiler=False, cwd="/work")
+
+    assert [source_file.input_file for source_file in config.source_files] == ["/work/src/input.c"]
+    assert config.output_abs_path == "/work/build"
+    assert config.clang_args == "-I/work/include -isystem /work/system -I/usr/local/include -DPATH=x"
+    # the compiler runs in the directory of the client and gets the arguments unchanged
+    assert config.compiler_args.startswith("-Iinclude -isystem system -I/usr/local/include -DPATH=x")